@@ -6,12 +6,15 @@ This file is part of QuakePy12.
 
 
 import bz2
+import copy
 import cPickle
 import cStringIO
 import csv
 import datetime
+import functools
 import gzip
 import math
+import multiprocessing
 import numpy
 import os
 import pyRXP
@@ -68,11 +71,21 @@ from quakepy import QPCore
 from quakepy import QPUtils
 from quakepy import QPDateTime
 
+from quakepy import QPCatalogColumns
 from quakepy import QPCatalogCompact
+from quakepy import QPCatalogFilter
+from quakepy import QPCatalogIndex
+from quakepy import QPCatalogTimeIndex
+from quakepy import QPFileShards
 from quakepy import QPPolygon
 from quakepy import QPGrid
+from quakepy import QPRegionIndex
+
+from quakepy.QPRecordLayout import Field, RecordError, RecordLayout
+from quakepy.QPRecordLayout import degreesMinutes, impliedDecimal, text
 
 import quakepy.cumuldist
+import quakepy.qpfmd
 import quakepy.qpplot
 import quakepy.qpseismicityplot
 
@@ -144,6 +157,357 @@ LOCAL_AUTHORITY_ID = 'local'
 
 DEFAULT_MAG_REBIN_BINSIZE = 0.1
 
+# margin (in seconds) around time limits of cut(), within which origin 
+# times are compared with QPDateTime operators
+TIME_CMP_MARGIN = 1.0e-03
+
+
+def limitMask(values, name, kwargs):
+    """
+    return mask of values that do not meet limits 'min<name>' and
+    'max<name>' in kwargs (limits are excluded if 'min<name>_excl' or
+    'max<name>_excl' is set), NaN values meet all limits
+    """
+    mask = numpy.zeros(len(values), dtype=numpy.bool_)
+
+    minkey = 'min%s' % name
+    if minkey in kwargs:
+        if '%s_excl' % minkey in kwargs and kwargs['%s_excl' % minkey]:
+            mask |= values <= kwargs[minkey]
+        else:
+            mask |= values < kwargs[minkey]
+
+    maxkey = 'max%s' % name
+    if maxkey in kwargs:
+        if '%s_excl' % maxkey in kwargs and kwargs['%s_excl' % maxkey]:
+            mask |= values >= kwargs[maxkey]
+        else:
+            mask |= values > kwargs[maxkey]
+
+    return mask
+
+
+def createsObjects(method):
+    """
+    decorator for QPCatalog methods that create objects (readers and
+    importers): publicID generator and slotted objects setting of catalog
+    are used in current thread while method runs
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        previous = self._installObjectSettings()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._restoreObjectSettings(previous)
+
+    return wrapper
+
+
+def updatesIndex(method):
+    """
+    decorator for QPCatalog methods that add events: update catalog
+    index afterwards, if it has been built
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._updateIndex()
+
+    return wrapper
+
+
+## record layouts of fixed-width formats
+# field positions are Python-style, i.e. first position is zero-offset, and
+# last position is zero-offset plus one
+
+def anssSolutionDate(value):
+    """
+    return QPDateTime of date of creation of solution in ANSS unified
+    catalog, given as YYYYMMDD
+    """
+    return QPDateTime.QPDateTime((int(value[0:4]), int(value[4:6]), 
+        int(value[6:8])))
+
+
+def ogsYear(value):
+    """
+    convert two-digit year of OGS HPL format: catalog starts in 1977, 
+    years >= 77 -> 19XX, < 77 -> 20XX
+    """
+    if int(value) >= OGS_YEAR_START_1900:
+        return int("%s%s" % ('19', value))
+    else:
+        return int("%s%s" % ('20', value))
+
+
+def gse2_0OriginLayouts(fieldIndices):
+    """
+    return layouts of first and second line of origin in GSE2.0 bulletin,
+    with positions of author, origin id, and magnitudes from dictionary
+    fieldIndices, see QPCatalog.importGSE2_0Bulletin()
+    """
+    origin_fields = [
+        Field('year', 0, 4, int, False),
+        Field('month', 5, 7, int, False),
+        Field('day', 8, 10, int, False),
+        Field('hour', 11, 13, int, False),
+        Field('minute', 14, 16, int, False),
+        Field('second', 17, 21, float, False),
+        Field('time_fixed', 22, 23, text, default=''),
+        Field('lat', 25, 33, float, False),
+        Field('lon', 34, 43, float, False),
+        Field('epicenter_fixed', 44, 45, text, default=''),
+        Field('depth', 47, 52),
+        Field('depth_fixed', 53, 54, text, default=''),
+        Field('phase_count', 56, 60, int),
+        Field('station_count', 61, 65, int),
+        Field('azimuthal_gap', 66, 69),
+        Field('author', fieldIndices['author_from'], 
+            fieldIndices['author_to'], text, default=''),
+        Field('id', fieldIndices['id_from'], fieldIndices['id_to'], text, 
+            default='')]
+
+    error_fields = [
+        Field('std_dev', 5, 10),
+        Field('time_err', 15, 21),
+        Field('min_hz_err', 25, 31),
+        Field('max_hz_err', 32, 38),
+        Field('azimuth_hz_err', 40, 43),
+        Field('depth_err', 49, 54),
+        Field('min_dist', 56, 62),
+        Field('max_dist', 63, 69),
+        Field('analysis_type', 104, 105, text, default=''),
+        Field('event_type', 108, 110, text, default='')]
+
+    for mag_ctr, mag_indices in enumerate(
+        fieldIndices['mag'][0:GSE2_0_MAGNITUDE_COUNT]):
+
+        origin_fields.extend((
+            Field('mag%s_type' % (mag_ctr+1), mag_indices['magtype_from'],
+                mag_indices['magtype_to'], text, default=''),
+            Field('mag%s' % (mag_ctr+1), mag_indices['mag_from'],
+                mag_indices['mag_to'], text, default=''),
+            Field('mag%s_station_count' % (mag_ctr+1), 
+                mag_indices['st_cnt_from'], mag_indices['st_cnt_to'], int)))
+
+        error_fields.append(Field('mag%s_err' % (mag_ctr+1), 
+            mag_indices['magerr_from'], mag_indices['magerr_to']))
+
+    return (RecordLayout(origin_fields), RecordLayout(error_fields))
+
+
+# hypocenter line of Global CMT catalog in NDK format
+CMT_HYPOCENTER_LAYOUT = RecordLayout((
+    Field('catalog', 0, 4, text, default=''),
+    Field('date', 5, 15, text, default=''),
+    Field('time', 15, 26, text, default=''),
+    Field('lat', 26, 33, float, False),
+    Field('lon', 33, 41, float, False),
+    Field('depth', 41, 47, float, False),
+    Field('magnitudes', 47, 55, text, default=''),
+    Field('location', 55, 80, text, default='')))
+
+# second line of NDK format: CMT info (1)
+CMT_INFO_LAYOUT = RecordLayout((
+    Field('name', 0, 16, text, default=''),
+    Field('data_used', 17, 61, text, default=''),
+    Field('source_type', 62, 68, text, default=''),
+    Field('moment_rate', 69, 80, text, default='')))
+
+# third line of NDK format: centroid parameters
+CMT_CENTROID_LAYOUT = RecordLayout((
+    Field('time', 9, 18, float, False),
+    Field('time_err', 18, 22, float, False),
+    Field('lat', 22, 29, float, False),
+    Field('lat_err', 29, 34, float, False),
+    Field('lon', 34, 42, float, False),
+    Field('lon_err', 42, 47, float, False),
+    Field('depth', 47, 53, float, False),
+    Field('depth_err', 53, 58, float, False),
+    Field('depth_type', 59, 63, text, default=''),
+    Field('timestamp', 64, 80, text, default='')))
+
+# fourth line of NDK format: exponent and moment tensor elements
+# errors are non-negative, therefore use only 6 digits (values use 7 digits)
+CMT_TENSOR_LAYOUT = RecordLayout((
+    Field('exponent', 0, 2, int, False),
+    Field('mrr', 2, 9, float, False),
+    Field('mrr_err', 9, 15, float, False),
+    Field('mtt', 15, 22, float, False),
+    Field('mtt_err', 22, 28, float, False),
+    Field('mpp', 28, 35, float, False),
+    Field('mpp_err', 35, 41, float, False),
+    Field('mrt', 41, 48, float, False),
+    Field('mrt_err', 48, 54, float, False),
+    Field('mrp', 54, 61, float, False),
+    Field('mrp_err', 61, 67, float, False),
+    Field('mtp', 67, 74, float, False),
+    Field('mtp_err', 74, 80, float, False)))
+
+# fifth line of NDK format: principal axes, scalar moment, nodal planes
+# dip is only from 0-90 degrees, therefore uses only 2 digits
+CMT_AXES_LAYOUT = RecordLayout((
+    Field('version', 0, 3, text, default=''),
+    Field('pa_ei_1', 3, 11, float, False),
+    Field('pa_pl_1', 11, 14, float, False),
+    Field('pa_az_1', 14, 18, float, False),
+    Field('pa_ei_2', 18, 26, float, False),
+    Field('pa_pl_2', 26, 29, float, False),
+    Field('pa_az_2', 29, 33, float, False),
+    Field('pa_ei_3', 33, 41, float, False),
+    Field('pa_pl_3', 41, 44, float, False),
+    Field('pa_az_3', 44, 48, float, False),
+    Field('scalar_moment', 48, 56, float, False),
+    Field('np_st_1', 56, 60, float, False),
+    Field('np_di_1', 60, 63, float, False),
+    Field('np_ra_1', 63, 68, float, False),
+    Field('np_st_2', 68, 72, float, False),
+    Field('np_di_2', 72, 75, float, False),
+    Field('np_ra_2', 75, 80, float, False)))
+
+# $loc block of ANSS unified catalog, see QPCatalog.importANSSUnified()
+ANSS_LOCATION_LAYOUT = RecordLayout((
+    Field('year', 5, 9, int, False),
+    Field('month', 9, 11, int, False),
+    Field('day', 11, 13, int, False),
+    Field('hour', 13, 15, int, False),
+    Field('minute', 15, 17, int, False),
+    Field('second', 17, 24, float, False),
+    Field('lat', 24, 33, float, False),
+    Field('lon', 33, 43, float, False),
+    Field('depth', 43, 51, float, False),
+    Field('location_type', 51, 53, text, default=''),
+    Field('location_source', 53, 56, text, default=''),
+    Field('phase_count', 56, 60, int),
+    Field('azimuthal_gap', 60, 63),
+    Field('nearest_station', 63, 73),
+    Field('rms', 73, 80),
+    Field('time_err', 80, 87),
+    Field('hz_err', 87, 94),
+    Field('depth_err', 94, 101),
+    Field('event_remarks', 101, 103, text, default=''),
+    Field('solution_date', 103, 111, text, default='')))
+
+# $mag block of ANSS unified catalog, starts at column 125
+ANSS_MAGNITUDE_LAYOUT = RecordLayout((
+    Field('mag', 129, 134),
+    Field('mag_type', 134, 136, text, default=''),
+    Field('mag_source', 136, 139, text, default=''),
+    Field('station_count', 139, 143, int),
+    Field('mag_err', 143, 148),
+    Field('solution_date', 152, 160, text, default='')))
+
+# $addloc block of ANSS unified catalog, starts at column 174
+ANSS_ADDITIONAL_LOCATION_LAYOUT = RecordLayout((
+    Field('phase_count', 181, 185, int),
+    Field('first_motion_count', 189, 193, int),
+    Field('lat_err', 238, 248),
+    Field('lon_err', 248, 258)))
+
+# USGS/NEIC (PDE) catalog in "compressed" format, minutes and seconds can
+# be missing
+PDE_LAYOUT = RecordLayout((
+    Field('year', 6, 12, int, False),
+    Field('month', 12, 14, int, False),
+    Field('day', 14, 16, int, False),
+    Field('hour', 16, 18, int, False),
+    Field('minute', 18, 20, int, default=0),
+    Field('second', 20, 25, float, default=0.0),
+    Field('location_source', 25, 27, text, default=''),
+    Field('lat', 27, 34, float, False),
+    Field('lon', 34, 42, float, False),
+    Field('depth', 42, 45),
+    Field('depth_control', 47, 48, text, default=''),
+    Field('depth_phase_count', 48, 50, int),
+    Field('std_dev', 50, 54),
+    Field('mag1', 54, 57),
+    Field('mag1_obs', 57, 59, int),
+    Field('mag2', 59, 62),
+    Field('mag2_obs', 63, 65, int),
+    Field('mag3', 65, 69),
+    Field('mag3_type', 69, 71, text, default=''),
+    Field('mag3_source', 71, 76, text, default=''),
+    Field('mag4', 76, 80),
+    Field('mag4_type', 80, 82, text, default=''),
+    Field('mag4_source', 82, 87, text, default=''),
+    Field('fe_region', 87, 90, text, default='')))
+
+# hypocenter line of JMA catalog in "deck" format, numbers w/o decimal 
+# point, coordinates as degrees + decimal minutes (w/o decimal point), 
+# magnitude codes are not stripped
+JMA_HYPOCENTER_LAYOUT = RecordLayout((
+    Field('year', 1, 5, int, False),
+    Field('month', 5, 7, int, False),
+    Field('day', 7, 9, int, False),
+    Field('hour', 9, 11, int, False),
+    Field('minute', 11, 13, int, False),
+    Field('second_int', 13, 15, int, False),
+    Field('second_frac', 15, 17, text, default=''),
+    Field('time_err', 17, 21, impliedDecimal(2)),
+    Field('lat', 22, 28, degreesMinutes(2)),
+    Field('lat_err', 28, 32, impliedDecimal(2)),
+    Field('lon', 33, 40, degreesMinutes(3)),
+    Field('lon_err', 40, 44, impliedDecimal(2)),
+    Field('depth', 44, 49, impliedDecimal(3)),
+    Field('depth_err', 49, 52, impliedDecimal(1)),
+    Field('mag1', 52, 54, str, default=''),
+    Field('mag1_type', 54, 55, text, default=''),
+    Field('mag2', 55, 57, str, default=''),
+    Field('mag2_type', 57, 58, text, default=''),
+    Field('subsidiary', 60, 61, text, default=''),
+    Field('region', 68, 92, text, default=''),
+    Field('station_count', 92, 95, int)))
+
+# standard-conforming default field positions of GSE2.0 bulletin
+GSE2_0_FIELD_INDICES = { 
+    'author_from': 104,
+    'author_to': 112,
+    'id_from': 114,
+    'id_to': 122,
+    'mag': (
+        {'magtype_from': 71, 'magtype_to': 73, 'mag_from': 73, 
+         'mag_to': 77,  'st_cnt_from': 78, 'st_cnt_to': 80, 
+         'magerr_from': 74, 'magerr_to': 77 },
+        {'magtype_from': 82, 'magtype_to': 84, 'mag_from': 84, 
+         'mag_to': 88, 'st_cnt_from': 89, 'st_cnt_to': 91, 
+         'magerr_from': 85, 'magerr_to': 88 },
+        {'magtype_from': 93, 'magtype_to': 95, 'mag_from': 95,
+         'mag_to': 99,  'st_cnt_from': 100, 'st_cnt_to': 102, 
+         'magerr_from': 96, 'magerr_to': 99 }
+        )
+}
+
+GSE2_0_ORIGIN_LAYOUTS = gse2_0OriginLayouts(GSE2_0_FIELD_INDICES)
+
+# sequence number of origin and phase lines in OGS HPL format
+OGS_SEQUENCE_LAYOUT = RecordLayout((Field('sequence', 0, 6, int, False),))
+
+# origin line of OGS HPL format, coordinates as degrees and decimal minutes
+OGS_HYPOCENTER_LAYOUT = RecordLayout((
+    Field('year', 7, 9, ogsYear, False),
+    Field('month', 9, 11, int, False),
+    Field('day', 11, 13, int, False),
+    Field('hour', 14, 16, int, False),
+    Field('minute', 16, 18, int, False),
+    Field('second', 19, 24, float, False),
+    Field('lat_deg', 25, 27, float, False),
+    Field('lat_min', 28, 33, float, False),
+    Field('lon_deg', 35, 37, float, False),
+    Field('lon_min', 38, 43, float, False),
+    Field('depth', 45, 50),
+    Field('mag', 52, 57),
+    Field('phase_count', 58, 60, int),
+    Field('azimuthal_gap', 64, 67),
+    Field('rms', 70, 74),
+    Field('hz_err', 74, 79),
+    Field('depth_err', 79, 84),
+    Field('station_count', 99, 101, int),
+    Field('mag_station_count', 125, 127, int)))
+
+
 class QPCatalog(QPCore.QPObject):
     """
     QuakePy: QPCatalog 
@@ -154,26 +518,79 @@ class QPCatalog(QPCore.QPObject):
     """
     
     root_attributes = {}
+
+    # publicID generator for objects created by readers and importers of
+    # catalog, None: generator of current thread or global generator
+    publicIDGenerator = None
+
+    # create objects of readers and importers of catalog as slotted objects
+    # (see QPCore.createSlottedClass), None: setting of current thread or
+    # global setting
+    slotted = None
     
     def __init__(self, input=None, **kwargs):
         """
         input can either be a iostream like a file handle or StringIO object,
         or a string, which is then interpreted as a filename
+
+        kwargs:
+            idgenerator - publicID generator (QPCore.QPPublicIDGenerator)
+            idstyle     - publicID style from PUBLIC_ID_STYLE_VALUES
+            idnamespace - namespace (authority ID) of publicIDs
+            slotted     - create origins, magnitudes, picks, arrivals, 
+                          quantities and other objects of events as slotted
+                          objects (lower memory usage, see 
+                          QPCore.createSlottedClass)
+
+        publicID generator and slotted objects setting are used for objects
+        created by readers and importers of this catalog only, global 
+        settings are not changed (see QPPublicObject.setPublicIDGenerator,
+        QPObject.setSlottedObjects)
         """
         super(QPCatalog, self).__init__(**kwargs)
 
-        # set publicID style
-        if 'idstyle' in kwargs and kwargs['idstyle'] is not None :
-            QPCore.QPPublicObject.setPublicIDStyle(kwargs['idstyle'])
+        # set publicID generator, or publicID style and namespace (authority
+        # ID of publicIDs)
+        if 'idgenerator' in kwargs and kwargs['idgenerator'] is not None:
+            self.publicIDGenerator = kwargs['idgenerator']
+
+        elif ('idstyle' in kwargs and kwargs['idstyle'] is not None) or (
+            'idnamespace' in kwargs and kwargs['idnamespace'] is not None):
+
+            generator = QPCore.QPPublicObject.getPublicIDGenerator()
+
+            if 'idstyle' in kwargs and kwargs['idstyle'] is not None:
+                idstyle = kwargs['idstyle']
+            else:
+                idstyle = generator.style
+
+            if 'idnamespace' in kwargs and kwargs['idnamespace'] is not None:
+                namespace = kwargs['idnamespace']
+            else:
+                namespace = generator.namespace
+
+            # set publicID style only if it is a valid entry
+            if idstyle in QPCore.PUBLIC_ID_STYLE_VALUES:
+                self.publicIDGenerator = QPCore.createPublicIDGenerator(
+                    idstyle, namespace)
+
+        # create objects of events (origins, magnitudes, picks, arrivals,
+        # quantities, ...) as slotted objects (lower memory usage)
+        if 'slotted' in kwargs and kwargs['slotted'] is not None:
+            self.slotted = bool(kwargs['slotted'])
 
         # set element axis
         self.setElementAxis(QPCore.ROOT_ELEMENT_AXIS)
 
         # add eventParameters explicitly
         # child elements of eventParameters are defined via QPElementList
-        self.eventParameters = EventParameters(
-            parentAxis=self.elementAxis, 
-            elementName=QPCore.PACKAGE_ELEMENT_NAME)
+        previous = self._installObjectSettings()
+        try:
+            self.eventParameters = EventParameters(
+                parentAxis=self.elementAxis, 
+                elementName=QPCore.PACKAGE_ELEMENT_NAME)
+        finally:
+            self._restoreObjectSettings(previous)
         
         if input is not None:
 
@@ -191,7 +608,8 @@ class QPCatalog(QPCore.QPObject):
         NOTE: loses publicID, creationInfo, and comment of merged catalog
         """
         self.eventParameters.event.extend(T.eventParameters.event)
-        
+        self._updateIndex()
+
     
     def __eq__(self, T):
         """
@@ -213,6 +631,103 @@ class QPCatalog(QPCore.QPObject):
         return True
 
     
+    @property
+    def index(self):
+        """
+        index of public objects of catalog (QPCatalogIndex)
+        built on first access, events added since last access are indexed
+        """
+        if getattr(self, '_index', None) is None:
+            self._index = QPCatalogIndex.QPCatalogIndex()
+
+        self._index.sync(self.eventParameters)
+        return self._index
+
+
+    def reindex(self):
+        """
+        rebuild catalog index and time index
+        required after publicIDs or associations (originID, pickID) of
+        indexed objects, or origin times / preferred origins of events have
+        been changed in place
+        """
+        self.index.build(self.eventParameters)
+        self.timeIndex.build(self.eventParameters)
+
+
+    @property
+    def timeIndex(self):
+        """
+        index of events sorted by preferred origin time (QPCatalogTimeIndex)
+        built on first access, rebuilt if events have been added or removed
+        """
+        if getattr(self, '_timeIndex', None) is None:
+            self._timeIndex = QPCatalogTimeIndex.QPCatalogTimeIndex()
+
+        if not self._timeIndex.isCurrent(self.eventParameters):
+            self._timeIndex.build(self.eventParameters)
+
+        return self._timeIndex
+
+
+    def _updateIndex(self):
+        if getattr(self, '_index', None) is not None:
+            self._index.sync(self.eventParameters)
+
+
+    def _installObjectSettings(self):
+        """
+        use publicID generator and slotted objects setting of catalog in
+        current thread, returns previous settings of thread for 
+        _restoreObjectSettings()
+        """
+        previous = (
+            QPCore.QPPublicObject.getPublicIDGenerator(threadlocal=True),
+            QPCore.QPObject.getSlottedObjects(threadlocal=True))
+
+        if self.publicIDGenerator is not None:
+            QPCore.QPPublicObject.setPublicIDGenerator(
+                self.publicIDGenerator, threadlocal=True)
+
+        if self.slotted is not None:
+            QPCore.QPObject.setSlottedObjects(self.slotted,
+                threadlocal=True)
+
+        return previous
+
+
+    def _restoreObjectSettings(self, previous):
+        generator, slotted = previous
+
+        QPCore.QPPublicObject.setPublicIDGenerator(generator, 
+            threadlocal=True)
+        QPCore.QPObject.setSlottedObjects(slotted, threadlocal=True)
+
+
+    def _iterCreatedObjects(self, iterator):
+        """
+        yield items of iterator, with settings of catalog installed while
+        an item is created (see createsObjects), iterator is closed when 
+        generator is closed
+        """
+        try:
+            while True:
+                previous = self._installObjectSettings()
+                try:
+                    try:
+                        item = iterator.next()
+                    except StopIteration:
+                        return
+                finally:
+                    self._restoreObjectSettings(previous)
+
+                yield item
+
+        finally:
+            if hasattr(iterator, 'close'):
+                iterator.close()
+
+
     def save(self, filename):
         """
         write catalog object to cPickle
@@ -225,16 +740,28 @@ class QPCatalog(QPCore.QPObject):
         fh.close()
     
     
-    def readXML(self, input, **kwargs):
+    @updatesIndex
+    @createsObjects
+    def readXML(self, input, streaming=False, **kwargs):
         """
         read catalog from QuakeML serialization
+
+        Input:
+            streaming - parse input incrementally and add events one by one,
+                        instead of building the XML tree of the whole
+                        document in memory (see iterEvents())
         """
-        
+
         if isinstance(input, QPCore.STRING_TYPES):
             istream = QPUtils.getQPDataSource(input, **kwargs)
         else:
             istream = input
-                
+
+        if streaming:
+            for ev in self._iterXMLEvents(istream, readHeader=True):
+                ev.add(self.eventParameters, 'event')
+            return
+
         # get whole content of stream at once
         lines = istream.read()
         
@@ -271,6 +798,122 @@ class QPCatalog(QPCore.QPObject):
                 QPCore.PACKAGE_ELEMENT_NAME)
 
 
+    def iterEvents(self, input, format='QuakeML', **kwargs):
+        """
+        generator that reads events one by one from QuakeML serialization
+        or other registered format (see QPCatalogFormats), format None is
+        detected from start of input
+        input can be a stream or a filename (kwargs are passed to
+        QPUtils.getQPDataSource(), e.g., compression='gz', and to import
+        method of format)
+
+        the XML document is parsed incrementally, events are yielded as
+        Event objects and are not added to the catalog, so that memory
+        usage does not grow with the size of the input. Other formats are
+        imported in batches of records
+
+        a stream that has been opened for a file name is closed when the
+        generator is exhausted or closed
+        """
+
+        if format != 'QuakeML':
+            import quakepy.QPCatalogFormats
+
+            if format is None:
+                format = quakepy.QPCatalogFormats.detectFormat(input, 
+                    **kwargs)
+
+            if format != 'QuakeML':
+                return self._iterCreatedObjects(
+                    quakepy.QPCatalogFormats.getFormat(format).iterEvents(
+                        input, **kwargs))
+
+        if isinstance(input, QPCore.STRING_TYPES):
+            istream = QPUtils.getQPDataSource(input, **kwargs)
+            closeStream = True
+        else:
+            istream = input
+            closeStream = False
+
+        return self._iterCreatedObjects(self._iterXMLEvents(istream,
+            closeStream=closeStream))
+
+
+    def _iterXMLEvents(self, istream, readHeader=False, closeStream=False):
+        """
+        parse QuakeML incrementally and yield Event objects
+        if readHeader is True, root attributes and non-event contents of
+        eventParameters are read into self
+        if closeStream is True, istream is closed when generator is 
+        exhausted or closed
+        """
+
+        # element depth of event element: quakeml/eventParameters/event
+        event_depth = 3
+
+        depth = 0
+        package_found = False
+
+        try:
+            for action, element in etree.iterparse(istream,
+                events=('start', 'end')):
+
+                tagname = etree.QName(element).localname
+
+                if action == 'start':
+                    depth += 1
+
+                    if depth == 1:
+                        if tagname != QPCore.ROOT_ELEMENT_NAME:
+                            error_msg = "input stream is not QuakeML, root "\
+                                "element is %s" % tagname
+                            raise RuntimeError, error_msg
+
+                        if readHeader:
+                            root_attributes = QPUtils.lxmlAttributes2Dict(
+                                element)
+                            if root_attributes is not None:
+                                self.root_attributes = root_attributes
+                    continue
+
+                depth -= 1
+
+                # only first eventParameters element is considered
+                if package_found:
+                    continue
+
+                if depth == event_depth - 1 and tagname == 'event' and \
+                    etree.QName(element.getparent()).localname == \
+                        QPCore.PACKAGE_ELEMENT_NAME:
+
+                    ev = Event(parentAxis=self.eventParameters.elementAxis,
+                        elementName='event')
+                    ev.fromXML(QPUtils.lxmlElement2pyrxpTupleTree(element))
+
+                    # free memory of processed subtree
+                    element.clear()
+                    element.getparent().remove(element)
+
+                    yield ev
+
+                elif depth == 1 and tagname == QPCore.PACKAGE_ELEMENT_NAME:
+
+                    # event children have been removed at this point
+                    if readHeader:
+                        self.eventParameters.fromXML(
+                            QPUtils.lxmlElement2pyrxpTupleTree(element))
+
+                    element.clear()
+                    package_found = True
+
+        except etree.XMLSyntaxError, e:
+            raise RuntimeError, "error parsing XML input stream, %s" % e
+
+        finally:
+            if closeStream:
+                istream.close()
+
+
     def writeXML(self, output, prettyPrint=True, **kwargs):
         """
         serialize catalog to QuakeML
@@ -343,6 +986,159 @@ class QPCatalog(QPCore.QPObject):
             QPCore.ROOT_ELEMENT_NAME))
 
 
+    @updatesIndex
+    @createsObjects
+    def importMany(self, inputs, format=None, workers=None, **kwargs):
+        """
+        import several catalog files (e.g., monthly chunks of 
+        the ANSS catalog, see importANSSUnified()), parsed in parallel by a
+        pool of worker processes
+
+        the imported events are appended to the catalog sorted by time of
+        their preferred origin (events of equal time in order of inputs), 
+        events w/o origin time follow in order of inputs. The order does 
+        not depend on the number of workers
+
+        each worker creates publicIDs in its own namespace (authority ID of
+        publicID generator of catalog, or of current generator, extended by
+        process ID), so that IDs from different workers do not collide. This is not possible for the
+        'numeric' and 'short' publicID styles, which are rejected for more
+        than one worker
+
+        a file that cannot be imported does not stop the import of the
+        other files
+
+        input:
+            inputs  - sequence of file names
+            format  - name of registered format (see QPCatalogFormats), 
+                      e.g., 'ANSSUnified', 'ZMAP', 'JMADeck'. If not given,
+                      format is detected for each file
+            workers - number of worker processes, default: number of CPUs.
+                      With one worker, files are imported in this process
+
+        output:
+            list of dicts, one per input in order of inputs, with keys
+                'input'   - file name
+                'format'  - name of format of file
+                'events'  - number of imported events
+                'seconds' - wall clock time of import (parsing) of file
+                'error'   - None, or error message if import failed
+
+        kwargs are passed to import method
+        """
+
+        import quakepy.QPCatalogFormats
+
+        if format is not None:
+            quakepy.QPCatalogFormats.getFormat(format)
+
+        inputs = list(inputs)
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+        workers = max(1, min(int(workers), len(inputs)))
+
+        tasks = [(format, curr_input, kwargs) for curr_input in inputs]
+
+        results = mapImportTasks(importFileEvents, tasks, workers)
+
+        imported = QPCatalog()
+        for events, report in results:
+            imported.eventParameters.event.extend(events)
+
+        time_index = imported.timeIndex
+        untimed = numpy.ones(imported.size, dtype=numpy.bool_)
+        untimed[time_index.positions] = False
+
+        events = imported.eventParameters.event
+        self.eventParameters.event.extend([events[idx] for idx in 
+            numpy.concatenate((time_index.positions, 
+                numpy.flatnonzero(untimed)))])
+
+        return [report for events, report in results]
+
+
+    @updatesIndex
+    @createsObjects
+    def importSharded(self, input, format=None, shards=None, workers=None,
+        mapped=True, **kwargs):
+        """
+        import large file of line-oriented format, split into shards at
+        record boundaries that are parsed in parallel by a pool of worker
+        processes, see importMany()
+
+        events are appended in order of the file, as with the import 
+        method of the format. Errors of the import method are raised
+
+        shards start at 
+            any line        for ZMAP, ANSSUnified, PDECompressed
+            event line      for STPPhase
+            EVENT line      for GSE2_0Bulletin
+            ^-line          for OGS_HPL (events are only read after region
+                            line)
+            5-line group    for CMT
+            line after E    for JMADeck
+        
+        input:
+            input   - file name of uncompressed file
+            format  - name of registered format with records (see 
+                      QPCatalogFormats), detected if not given
+            shards  - number of shards, default: number of workers
+            workers - number of worker processes, default: number of CPUs.
+                      With one worker, shards are imported in this process
+            mapped  - read shards from memory map of file (no copy of
+                      shard data), otherwise read shards from file
+
+        kwargs are passed to import method
+        """
+
+        import quakepy.QPCatalogFormats
+
+        if format is None:
+            format = quakepy.QPCatalogFormats.detectFormat(input)
+
+        records = quakepy.QPCatalogFormats.getFormat(format).records
+        if records is None:
+            raise ValueError, "QPCatalog::importSharded - no sharded import"\
+                " of format %s" % format
+
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        if shards is None:
+            shards = workers
+
+        file_shards = QPFileShards.shardFile(input, shards, mapped=mapped,
+            **records)
+
+        workers = max(1, min(int(workers), len(file_shards)))
+        tasks = [(format, shard, kwargs) for shard in file_shards]
+
+        for events in mapImportTasks(importShardEvents, tasks, workers):
+            self.eventParameters.event.extend(events)
+
+
+    def importAny(self, input, format=None, **kwargs):
+        """
+        import input (stream or file name) with import method of registered
+        format (see QPCatalogFormats). If format is not given, it is 
+        detected from start of input (stream has to be seekable)
+
+        returns name of format, kwargs are passed to import method
+        """
+        import quakepy.QPCatalogFormats
+
+        if format is None:
+            format = quakepy.QPCatalogFormats.detectFormat(input, **kwargs)
+
+        getattr(self, quakepy.QPCatalogFormats.getFormat(format).method)(
+            input, **kwargs)
+
+        return format
+
+
+    @updatesIndex
+    @createsObjects
     def importZMAP(self, input, **kwargs):
         """ 
         Input ZMAP stream has to provide the first 10 columns as 
@@ -452,7 +1248,7 @@ class QPCatalog(QPCore.QPObject):
                 try:
                     horizontal_error = float(zmap_pars[10])
 
-                    ou = OriginUncertainty.OriginUncertainty()
+                    ou = OriginUncertainty()
                     
                     # NOTE: changed from kilometres to metres, QuakeML v1.2
                     ou.horizontalUncertainty = 1000 * horizontal_error
@@ -490,6 +1286,16 @@ class QPCatalog(QPCore.QPObject):
         else:
             ostream = output
 
+        # catalog backed by compact catalog: write from columns, skip
+        # events without coordinates
+        compact_events = self._compactEvents()
+        if compact_events is not None:
+            compact = compact_events.toCompact()
+            compact.subset(~(numpy.isnan(compact.column('lon')) | \
+                numpy.isnan(compact.column('lat')))).exportZMAP(ostream, 
+                **kwargs)
+            return
+
         if 'withUncertainties' in kwargs and kwargs['withUncertainties']:
             withUncertainties = True
         else:
@@ -604,6 +1410,8 @@ class QPCatalog(QPCore.QPObject):
             ostream.writelines(('\t'.join(line_arr), '\n'))
 
     
+    @updatesIndex
+    @createsObjects
     def importSTPPhase(self, input, **kwargs):
         """
         Import SCSN event/phase data as obtained via STP:
@@ -851,6 +1659,8 @@ class QPCatalog(QPCore.QPObject):
                 raise RuntimeError, "format error in input stream"
 
     
+    @updatesIndex
+    @createsObjects
     def importCMT(self, input, **kwargs):
         """
         TODO(fab): avoid 'magic numbers' in import and export
@@ -930,20 +1740,19 @@ class QPCatalog(QPCore.QPObject):
                 #[57-80] Geographical location (24 characters)
 
                 try:
-                    ref_catalog       = line[0:4].strip()
-                    curr_date_str     = line[5:15].strip()
-                    curr_time_str     = line[15:26].strip()
-                    curr_lat          = float( line[26:33].strip() )
-                    curr_lon          = float( line[33:41].strip() )
-                    curr_depth        = 1000 * float( line[41:47].strip() )
-                    curr_mag_str      = line[47:55].strip()
-                    curr_location_str = line[55:80].strip()
-                except Exception:
+                    rec = CMT_HYPOCENTER_LAYOUT.decode(line)
+                except RecordError:
                     print " error in hypocenter input line %s: %s" % ( line_ctr, line )
                     target_line = line_ctr + CMT_LINES_PER_EVENT - ev_line_ctr
                     line_ctr = line_ctr + 1
                     continue
                 
+                ref_catalog       = rec['catalog']
+                curr_date_str     = rec['date']
+                curr_time_str     = rec['time']
+                curr_mag_str      = rec['magnitudes']
+                curr_location_str = rec['location']
+
                 ev = Event()
                 ev.add(self.eventParameters)
 
@@ -965,9 +1774,9 @@ class QPCatalog(QPCore.QPObject):
                     ct = Comment("CMT:catalog=%s" % ref_catalog)
                     ori.comment.append(ct)
                 
-                ori.latitude  = RealQuantity( curr_lat )
-                ori.longitude = RealQuantity( curr_lon )
-                ori.depth     = RealQuantity( curr_depth )
+                ori.latitude  = RealQuantity(rec['lat'])
+                ori.longitude = RealQuantity(rec['lon'])
+                ori.depth     = RealQuantity(1000 * rec['depth'])
                 
                 # get time components
                 try:
@@ -1061,10 +1870,12 @@ class QPCatalog(QPCore.QPObject):
                         #following a standard scaling relationship (see note (2) below),
                         #and is not derived from the analysis.
 
-                ev_name = line[0:16].strip()
-                data_used_str = line[17:61].strip()
-                source_type_str = line[62:68].strip()
-                moment_rate_str = line[69:80].strip()
+                rec = CMT_INFO_LAYOUT.decode(line)
+
+                ev_name = rec['name']
+                data_used_str = rec['data_used']
+                source_type_str = rec['source_type']
+                moment_rate_str = rec['moment_rate']
 
                 fm = FocalMechanism(QPUtils.build_resource_identifier(
                     CMT_AUTHORITY_KEY, 'cmt', ev_name))
@@ -1186,24 +1997,11 @@ class QPCatalog(QPCore.QPObject):
                         #are calculated later. The format for this string should not be 
                         #considered fixed.
                         
-                centroid_par_str = line[0:58].strip()
-                depth_type       = line[59:63].strip()
-                timestamp_str    = line[64:80].strip()
-
                 try:
-                    curr_time      = float( centroid_par_str[9:18].strip() )
-                    curr_time_err  = float( centroid_par_str[18:22].strip() )
-                    curr_lat       = float( centroid_par_str[22:29].strip() )
-                    curr_lat_err   = float( centroid_par_str[29:34].strip() )
-                    curr_lon       = float( centroid_par_str[34:42].strip() )
-                    curr_lon_err   = float( centroid_par_str[42:47].strip() )
-                    curr_depth     = 1000 * float(
-                        centroid_par_str[47:53].strip())
-                    curr_depth_err = 1000 * float(
-                        centroid_par_str[53:58].strip())
-                except Exception:
+                    rec = CMT_CENTROID_LAYOUT.decode(line)
+                except RecordError:
                     print " error (centroid) in input line %s: %s" % (
-                        line_ctr, centroid_par_str)
+                        line_ctr, line[0:58].strip())
                     target_line = line_ctr + CMT_LINES_PER_EVENT - ev_line_ctr
                     line_ctr = line_ctr + 1
                     continue
@@ -1216,16 +2014,19 @@ class QPCatalog(QPCore.QPObject):
                 # set origin from mt inversion as preferred origin
                 ev.preferredOriginID = ori_inv.publicID
 
-                ori_inv.latitude  = RealQuantity( curr_lat, curr_lat_err )
-                ori_inv.longitude = RealQuantity( curr_lon, curr_lon_err )
-                ori_inv.depth     = RealQuantity( curr_depth, curr_depth_err )
+                ori_inv.latitude  = RealQuantity(rec['lat'], rec['lat_err'])
+                ori_inv.longitude = RealQuantity(rec['lon'], rec['lon_err'])
+                ori_inv.depth     = RealQuantity(1000 * rec['depth'], 
+                    1000 * rec['depth_err'])
 
                 # add seconds of centroid correction to time from triggering origin
-                inv_time = ori.time.value.datetime + DateTimeDeltaFromSeconds( curr_time )
+                inv_time = ori.time.value.datetime + DateTimeDeltaFromSeconds(
+                    rec['time'])
                 ori_inv.time = TimeQuantity(QPDateTime.QPDateTime(inv_time),  
-                    curr_time_err)
+                    rec['time_err'])
                                       
                 # depth type
+                depth_type = rec['depth_type']
                 if depth_type == 'FREE':
                     depth_type_str = 'from moment tensor inversion'
                 elif depth_type == 'FIX':
@@ -1237,6 +2038,7 @@ class QPCatalog(QPCore.QPObject):
 
                 ori_inv.depthType = depth_type_str
 
+                timestamp_str = rec['timestamp']
                 if timestamp_str[0:1] == 'S':
                     analysis = 'standard'
                 elif timestamp_str[0:1] == 'Q':
@@ -1278,48 +2080,35 @@ class QPCatalog(QPCore.QPObject):
                 # errors are non-negative, therefore use only 6 digits (values use 7 digits)
 
                 try:
-
-                    moment_exponent = int( line[0:2].strip() )
-                    
-                    mrr             = float( line[2:9].strip() )
-                    mrr_err         = float( line[9:15].strip() )
-                    mtt             = float( line[15:22].strip() )
-                    mtt_err         = float( line[22:28].strip() )
-                    mpp             = float( line[28:35].strip() )
-                    mpp_err         = float( line[35:41].strip() )
-                    mrt             = float( line[41:48].strip() )
-                    mrt_err         = float( line[48:54].strip() )
-                    mrp             = float( line[54:61].strip() )
-                    mrp_err         = float( line[61:67].strip() )
-                    mtp             = float( line[67:74].strip() )
-                    mtp_err         = float( line[74:80].strip() )
-                    
-                except Exception:
+                    rec = CMT_TENSOR_LAYOUT.decode(line)
+                except RecordError:
                     print " error (tensor) in input line %s: %s" % (line_ctr,
                         line)
                     target_line = line_ctr + CMT_LINES_PER_EVENT - ev_line_ctr
                     line_ctr = line_ctr + 1
                     continue
 
+                moment_exponent = rec['exponent']
+
                 mt.tensor = Tensor(
                     RealQuantity(
-                        QPUtils.exponentialFloatFromString( mrr, moment_exponent ),
-                        QPUtils.exponentialFloatFromString( mrr_err, moment_exponent ) ),
+                        QPUtils.exponentialFloatFromString( rec['mrr'], moment_exponent ),
+                        QPUtils.exponentialFloatFromString( rec['mrr_err'], moment_exponent ) ),
                     RealQuantity(
-                        QPUtils.exponentialFloatFromString( mtt, moment_exponent ),
-                        QPUtils.exponentialFloatFromString( mtt_err, moment_exponent ) ),
+                        QPUtils.exponentialFloatFromString( rec['mtt'], moment_exponent ),
+                        QPUtils.exponentialFloatFromString( rec['mtt_err'], moment_exponent ) ),
                     RealQuantity(
-                        QPUtils.exponentialFloatFromString( mpp, moment_exponent ),
-                        QPUtils.exponentialFloatFromString( mpp_err, moment_exponent ) ),
+                        QPUtils.exponentialFloatFromString( rec['mpp'], moment_exponent ),
+                        QPUtils.exponentialFloatFromString( rec['mpp_err'], moment_exponent ) ),
                     RealQuantity(
-                        QPUtils.exponentialFloatFromString( mrt, moment_exponent ),
-                        QPUtils.exponentialFloatFromString( mrt_err, moment_exponent ) ),
+                        QPUtils.exponentialFloatFromString( rec['mrt'], moment_exponent ),
+                        QPUtils.exponentialFloatFromString( rec['mrt_err'], moment_exponent ) ),
                     RealQuantity(
-                        QPUtils.exponentialFloatFromString( mrp, moment_exponent ),
-                        QPUtils.exponentialFloatFromString( mrp_err, moment_exponent ) ),
+                        QPUtils.exponentialFloatFromString( rec['mrp'], moment_exponent ),
+                        QPUtils.exponentialFloatFromString( rec['mrp_err'], moment_exponent ) ),
                     RealQuantity(
-                        QPUtils.exponentialFloatFromString( mtp, moment_exponent ),
-                        QPUtils.exponentialFloatFromString( mtp_err, moment_exponent ) ) )
+                        QPUtils.exponentialFloatFromString( rec['mtp'], moment_exponent ),
+                        QPUtils.exponentialFloatFromString( rec['mtp_err'], moment_exponent ) ) )
                                     
             elif ev_line_ctr == 4:
                 # Fifth line: CMT info (4)
@@ -1339,45 +2128,22 @@ class QPCatalog(QPCore.QPObject):
                 # dip is only from 0-90 degrees, therefore uses only 2 digits
                         
                 try:
-                    version_str         = line[0:3].strip()
-
-                    pa_ei_1             = float( line[3:11].strip() )
-                    pa_pl_1             = float( line[11:14].strip() )
-                    pa_az_1             = float( line[14:18].strip() )
-
-                    pa_ei_2             = float( line[18:26].strip() )
-                    pa_pl_2             = float( line[26:29].strip() )
-                    pa_az_2             = float( line[29:33].strip() )
-
-                    pa_ei_3             = float( line[33:41].strip() )
-                    pa_pl_3             = float( line[41:44].strip() )
-                    pa_az_3             = float( line[44:48].strip() )
-
-                    scalar_moment       = float( line[48:56].strip() )
-
-                    np_st_1             = float( line[56:60].strip() )
-                    np_di_1             = float( line[60:63].strip() )
-                    np_ra_1             = float( line[63:68].strip() )
-
-                    np_st_2             = float( line[68:72].strip() )
-                    np_di_2             = float( line[72:75].strip() )
-                    np_ra_2             = float( line[75:80].strip() )
-                    
-                except Exception:
+                    rec = CMT_AXES_LAYOUT.decode(line)
+                except RecordError:
                     print " error (principal axes/nodal planes) in input "\
                         "line %s: %s" % (line_ctr, line)
                     target_line = line_ctr + CMT_LINES_PER_EVENT - ev_line_ctr
                     line_ctr = line_ctr + 1
                     continue
 
-                ct = Comment("CMT:cmtVersion=%s" % version_str)
+                ct = Comment("CMT:cmtVersion=%s" % rec['version'])
                 mt.comment.append(ct)
                 
                 # scalar moment M0 (in dyne*cm) to moment magnitude MW:
                 # Kanamori (1977): MW = (2/3)*(log10(M0) - 16.1)
                 # see http://www.globalcmt.org/CMTsearch.html#MWnote
                 mt.scalarMoment = RealQuantity(
-                    QPUtils.exponentialFloatFromString(scalar_moment, 
+                    QPUtils.exponentialFloatFromString(rec['scalar_moment'], 
                         moment_exponent))
                 
                 mag = Magnitude(QPUtils.build_resource_identifier(
@@ -1391,28 +2157,28 @@ class QPCatalog(QPCore.QPObject):
                 ev.preferredMagnitudeID = mag.publicID
 
                 fm.principalAxes = PrincipalAxes(
-                    Axis( RealQuantity( pa_az_1 ),
-                        RealQuantity( pa_pl_1 ),
+                    Axis( RealQuantity( rec['pa_az_1'] ),
+                        RealQuantity( rec['pa_pl_1'] ),
                         RealQuantity(
-                            QPUtils.exponentialFloatFromString( pa_ei_1, moment_exponent ) ) ),
-                    Axis( RealQuantity( pa_az_2 ),
-                        RealQuantity( pa_pl_2 ),
+                            QPUtils.exponentialFloatFromString( rec['pa_ei_1'], moment_exponent ) ) ),
+                    Axis( RealQuantity( rec['pa_az_2'] ),
+                        RealQuantity( rec['pa_pl_2'] ),
                         RealQuantity(
-                            QPUtils.exponentialFloatFromString( pa_ei_2, moment_exponent ) ) ),
-                    Axis( RealQuantity( pa_az_3 ),
-                        RealQuantity( pa_pl_3 ),
+                            QPUtils.exponentialFloatFromString( rec['pa_ei_2'], moment_exponent ) ) ),
+                    Axis( RealQuantity( rec['pa_az_3'] ),
+                        RealQuantity( rec['pa_pl_3'] ),
                         RealQuantity(
-                            QPUtils.exponentialFloatFromString( pa_ei_3, moment_exponent ) ) ) )
+                            QPUtils.exponentialFloatFromString( rec['pa_ei_3'], moment_exponent ) ) ) )
 
                 fm.nodalPlanes = NodalPlanes(
                     NodalPlane(
-                        RealQuantity( np_st_1 ),
-                        RealQuantity( np_di_1 ),
-                        RealQuantity( np_ra_1 ) ),
+                        RealQuantity( rec['np_st_1'] ),
+                        RealQuantity( rec['np_di_1'] ),
+                        RealQuantity( rec['np_ra_1'] ) ),
                     NodalPlane(
-                        RealQuantity( np_st_2 ),
-                        RealQuantity( np_di_2 ),
-                        RealQuantity( np_ra_2 ) ) )
+                        RealQuantity( rec['np_st_2'] ),
+                        RealQuantity( rec['np_di_2'] ),
+                        RealQuantity( rec['np_ra_2'] ) ) )
 
                 
             else:
@@ -1451,17 +2217,20 @@ class QPCatalog(QPCore.QPObject):
         else:
             ostream = output
 
+        # catalog index for lookups of origins and magnitudes
+        index = self.index
+
         ## loop over events, use preferred origin
         for curr_ev in self.eventParameters.event:
 
             # get shortcuts for required objects
-            fm = curr_ev.getPreferredFocalMechanism()
+            fm = curr_ev.getPreferredFocalMechanism(index)
 
             # NOTE: can there be more than one moment tensor?
             mt = fm.momentTensor[0]
 
-            trig_ori = curr_ev.getOrigin(fm.triggeringOriginID)
-            derived_ori = curr_ev.getOrigin(mt.derivedOriginID)
+            trig_ori = curr_ev.getOrigin(fm.triggeringOriginID, index)
+            derived_ori = curr_ev.getOrigin(mt.derivedOriginID, index)
 
             # First line: Hypocenter line
             # 12345678901234567890123456789012345678901234567890123456789012345678901234567890
@@ -1513,7 +2282,7 @@ class QPCatalog(QPCore.QPObject):
                 ostream.write( '%6.1f' % 0.0 )
             
             # mb
-            mags = curr_ev.getMagnitudes( trig_ori )
+            mags = curr_ev.getMagnitudes( trig_ori, index )
             
             mb = None
             for curr_mag in mags:
@@ -1878,6 +2647,8 @@ class QPCatalog(QPCore.QPObject):
             ostream.write( '\n' )
 
     
+    @updatesIndex
+    @createsObjects
     def importANSSUnified(self, input, **kwargs):
         """
         Import data from ANSS "reduced" unified catalog, one event per line
@@ -1965,26 +2736,16 @@ class QPCatalog(QPCore.QPObject):
             #------- -----   -------------
             
             try:
-                # first get required fields
-                # NOTE: 
+                # required fields: see ANSS_LOCATION_LAYOUT
+                # NOTE:
                 # "data center id" is claimed to be a required field,
                 # but is often only whitespace in the cnss catalog files
                 # therefore it is not treated as 'required' here
-                # all fields right from depth can be missing in cnss files, 
-                # are not truly required 
+                # all fields right from depth can be missing in cnss files,
+                # are not truly required
                 # we do not process lines that are shorter that 51 characters
-                curr_year   = int( line[5:9] )
-                curr_month  = int( line[9:11] )
-                curr_day    = int( line[11:13] )
-                curr_hour   = int( line[13:15] )
-                curr_minute = int( line[15:17] )
-                curr_second = float( line[17:24] )
-                
-                curr_lat    = float( line[24:33].strip() )
-                curr_lon    = float( line[33:43].strip() )
-                curr_depth  = 1000 * float( line[43:51].strip() )
-
-            except Exception:
+                loc = ANSS_LOCATION_LAYOUT.decode(line)
+            except RecordError:
                 print " error in $loc block of line %s: %s" % (line_ctr, line)
                 continue
 
@@ -2007,87 +2768,61 @@ class QPCatalog(QPCore.QPObject):
                 curr_id))
             ori.add(ev)
             
-            ori.latitude = RealQuantity( curr_lat )
-            ori.longitude = RealQuantity( curr_lon )
-            ori.depth = RealQuantity( curr_depth )
-            ori.time = TimeQuantity(QPDateTime.QPDateTime((curr_year, 
-                curr_month, curr_day, curr_hour, curr_minute, curr_second)))
+            ori.latitude = RealQuantity(loc['lat'])
+            ori.longitude = RealQuantity(loc['lon'])
+            ori.depth = RealQuantity(1000 * loc['depth'])
+            ori.time = TimeQuantity(QPDateTime.QPDateTime((loc['year'], 
+                loc['month'], loc['day'], loc['hour'], loc['minute'], 
+                loc['second'])))
             
             # set preferred origin
             ev.preferredOriginID = ori.publicID
 
             ## get optional fields
             
-            try:
-                curr_loctype = line[51:53].strip()
-                if curr_loctype.lower() ==  'h':
-                    ori.type = 'hypocenter'
-                elif curr_loctype.lower() == 'c':
-                    ori.type = 'centroid'
-                elif curr_loctype.lower() == 'a':
-                    ori.type = 'amplitude'    
-            except Exception: 
-                  pass
+            curr_loctype = loc['location_type'].lower()
+            if curr_loctype == 'h':
+                ori.type = 'hypocenter'
+            elif curr_loctype == 'c':
+                ori.type = 'centroid'
+            elif curr_loctype == 'a':
+                ori.type = 'amplitude'    
                 
             # this can be a network code or a different agency/institution ID
             # map this to creationInfo.agencyID
-            try:
-                curr_locsource = line[53:56].strip()
-                
-                if curr_locsource:
-                    self.create_object_creationinfo(ori)
-                    ori.creationInfo.agencyID = curr_locsource
-            except Exception:
-                pass
+            if loc['location_source']:
+                self.create_object_creationinfo(ori)
+                ori.creationInfo.agencyID = loc['location_source']
                 
-            try:    
-                curr_traveltime_cnt = int( line[56:60].strip() )
+            if loc['phase_count'] is not None:
                 self.create_origin_quality(ori)
-                ori.quality.usedPhaseCount = curr_traveltime_cnt
-            except Exception: 
-                pass
+                ori.quality.usedPhaseCount = loc['phase_count']
             
-            try:
-                curr_azimuthalGap = float( line[60:63].strip() )
+            if loc['azimuthal_gap'] is not None:
                 self.create_origin_quality(ori)
-                ori.quality.azimuthalGap = curr_azimuthalGap
-            except Exception: 
-                pass
+                ori.quality.azimuthalGap = loc['azimuthal_gap']
 
             # distance to nearest station is given in km
-            try:
-                curr_nearestStation = float( line[63:73].strip() )
+            if loc['nearest_station'] is not None:
                 self.create_origin_quality(ori)
                 ori.quality.minimumDistance = \
                     QPUtils.central_angle_degrees_from_distance(
-                        curr_nearestStation)
-            except Exception: 
-                pass
+                        loc['nearest_station'])
             
-            try:
-                curr_rms_residual_phases = float( line[73:80].strip() )
+            if loc['rms'] is not None:
                 self.create_origin_quality(ori)
-                ori.quality.standardError = curr_rms_residual_phases
-            except Exception: 
-                pass
+                ori.quality.standardError = loc['rms']
             
-            try:    
-                ori.time.uncertainty = float( line[80:87].strip() )
-            except Exception: 
-                pass
+            if loc['time_err'] is not None:
+                ori.time.uncertainty = loc['time_err']
             
-            try:
-                che = float( line[87:94].strip() )
-                ou = OriginUncertainty.OriginUncertainty()
-                ou.horizontalUncertainty = 1000 * che
+            if loc['hz_err'] is not None:
+                ou = OriginUncertainty()
+                ou.horizontalUncertainty = 1000 * loc['hz_err']
                 ou.add(ori)
-            except Exception:
-                pass
             
-            try:    
-                ori.depth.uncertainty = 1000 * float( line[94:101].strip() )
-            except Exception: 
-                pass
+            if loc['depth_err'] is not None:
+                ori.depth.uncertainty = 1000 * loc['depth_err']
             
             # NOTE: QuakeML does not have EventType entries for all possible 
             # values of ANSS format
@@ -2104,29 +2839,21 @@ class QPCatalog(QPCore.QPObject):
                 #H = (Harmonic) Tremor associated
                 #V = Long Period event
                         
-            try:
-                curr_ev_remarks = line[101:103].strip()
-                
-                ec = Comment("ANSS:event_type=%s" % curr_ev_remarks)
-                ev.comment.append(ec)
-                
-                if curr_ev_remarks.lower() in ('l', 't', 'r'):
-                    ev.type = 'earthquake'
-                elif curr_ev_remarks.lower() == 'n':
-                    ev.type = 'nuclear explosion'
-                elif curr_ev_remarks.lower() == 'q':
-                    ev.type = 'quarry blast'
-            except Exception:
-                pass
+            curr_ev_remarks = loc['event_remarks']
+            
+            ec = Comment("ANSS:event_type=%s" % curr_ev_remarks)
+            ev.comment.append(ec)
+            
+            if curr_ev_remarks.lower() in ('l', 't', 'r'):
+                ev.type = 'earthquake'
+            elif curr_ev_remarks.lower() == 'n':
+                ev.type = 'nuclear explosion'
+            elif curr_ev_remarks.lower() == 'q':
+                ev.type = 'quarry blast'
             
             # date of creation of solution, has format YYYYMMDD
             try:
-                curr_solution_date = line[103:111].strip()
-                cict = QPDateTime.QPDateTime(
-                    (int( curr_solution_date[0:4] ), 
-                    int( curr_solution_date[4:6] ), 
-                    int( curr_solution_date[6:8] ) ) )
-                                 
+                cict = anssSolutionDate(loc['solution_date'])
                 self.create_object_creationinfo(ori)
                 ori.creationInfo.creationTime = cict
             except Exception:
@@ -2157,10 +2884,10 @@ class QPCatalog(QPCore.QPObject):
             # if line length > 123 chars, look for magitude information
             if len(line.strip()) > ANSS_MINIMUM_LINE_LENGTH_MAGNITUDE:
 
-                # copy rest of line into new zero-offset string
-                # $mag block goes potentially from column 125 to column 172 (48 columns, list indices 124-171)
-                # but can contain fewer characters, therefore we cannot specify an end position explicitly
-                mag_info = line[124:]
+                # $mag block goes potentially from column 125 to column 172 
+                # (48 columns, list indices 124-171), but can contain fewer 
+                # characters, see ANSS_MAGNITUDE_LAYOUT
+                mag_info = ANSS_MAGNITUDE_LAYOUT.decode(line)
 
                 ## NOTE: although documentation says that some fields are required,
                 ## there lines in the cnss files with almost ALL entries missing (even magnitude value)
@@ -2171,19 +2898,13 @@ class QPCatalog(QPCore.QPObject):
                 
                 # we need a magnitude value (is a required attribute for QuakeML)
                 # skip magnitude block if magnitude is missing
-                validMagBlock = True
-                try:
-                    curr_mag = float(mag_info[5:10].strip())
-                except Exception:
-                    validMagBlock = False
-                    
-                if validMagBlock:
+                if mag_info['mag'] is not None:
                   
                     mag = Magnitude(
                         QPUtils.build_resource_identifier(
                             auth_id, 'magnitude', curr_id))
                     mag.add(ev)
-                    mag.mag = RealQuantity( curr_mag )
+                    mag.mag = RealQuantity(mag_info['mag'])
                     mag.setOriginAssociation( ori.publicID )
                     
                     # set preferred magnitude
@@ -2208,54 +2929,38 @@ class QPCatalog(QPCore.QPObject):
                         #h = helicorder magnitude (CIT, short-period Benioff)
                         #n = no magnitude
                                         
-                    try:
-                        curr_magtype = mag_info[10:12].strip()
-                        mc = Comment("ANSS:magnitude_type=%s" % curr_magtype)
-                        mag.comment.append(mc)
-                        
-                        if curr_magtype.lower() == 'b':
-                            mag.type = 'MB'
-                        elif curr_magtype.lower() in ('l', 'l1', 'l2'):
-                            mag.type = 'ML'
-                        elif curr_magtype.lower() == 's':
-                            mag.type = 'MS'
-                        elif curr_magtype.lower() == 'w':
-                            mag.type = 'MW'
-                        elif curr_magtype.lower() == 'e':
-                            mag.type = 'ME'
-                        elif curr_magtype.lower() == 'c':
-                            mag.type = 'Mc'
-                        elif curr_magtype.lower() == 'd':
-                            mag.type = 'Md'
-                    except Exception:
-                        pass
+                    curr_magtype = mag_info['mag_type']
+                    mc = Comment("ANSS:magnitude_type=%s" % curr_magtype)
+                    mag.comment.append(mc)
                     
-                    try:
-                        curr_magsource = mag_info[12:15].strip()
-                        if curr_magsource:
-                            self.create_object_creationinfo(mag)
-                            mag.creationInfo.agencyID = curr_magsource
-                    except Exception:
-                        pass
+                    if curr_magtype.lower() == 'b':
+                        mag.type = 'MB'
+                    elif curr_magtype.lower() in ('l', 'l1', 'l2'):
+                        mag.type = 'ML'
+                    elif curr_magtype.lower() == 's':
+                        mag.type = 'MS'
+                    elif curr_magtype.lower() == 'w':
+                        mag.type = 'MW'
+                    elif curr_magtype.lower() == 'e':
+                        mag.type = 'ME'
+                    elif curr_magtype.lower() == 'c':
+                        mag.type = 'Mc'
+                    elif curr_magtype.lower() == 'd':
+                        mag.type = 'Md'
                     
-                    try:    
-                        mag.stationCount = int(mag_info[15:19].strip())
-                    except Exception: 
-                        pass
+                    if mag_info['mag_source']:
+                        self.create_object_creationinfo(mag)
+                        mag.creationInfo.agencyID = mag_info['mag_source']
                     
-                    try:    
-                        mag.mag.uncertainty = float(mag_info[19:24].strip())
-                    except Exception: 
-                        pass
+                    if mag_info['station_count'] is not None:
+                        mag.stationCount = mag_info['station_count']
+                    
+                    if mag_info['mag_err'] is not None:
+                        mag.mag.uncertainty = mag_info['mag_err']
 
                     # date of creation of solution, has format YYYYMMDD
                     try:
-                        curr_mag_solution_date = mag_info[28:36].strip()
-                        cict = QPDateTime.QPDateTime(
-                            ( int( curr_mag_solution_date[0:4] ), 
-                            int( curr_mag_solution_date[4:6] ), 
-                            int( curr_mag_solution_date[6:8] ) ) )
-                                            
+                        cict = anssSolutionDate(mag_info['solution_date'])
                         self.create_object_creationinfo(mag)
                         mag.creationInfo.creationTime = cict
                     except Exception:
@@ -2295,54 +3000,44 @@ class QPCatalog(QPCore.QPObject):
             # information
             if len(line.strip()) > ANSS_MINIMUM_LINE_LENGTH_ADDITIONAL:
 
-                # copy remaining $addloc block into new zero-offset string
                 # $addloc block can go from column 174 to column 282 
                 # (109 columns, list indices 173-281)
                 # NOTE: $addloc block can contain fewer characters, has no 
-                # required fields
-                addloc_info = line[ANSS_MINIMUM_LINE_LENGTH_ADDITIONAL+1:]
+                # required fields, see ANSS_ADDITIONAL_LOCATION_LAYOUT
+                addloc_info = ANSS_ADDITIONAL_LOCATION_LAYOUT.decode(line)
                 
-                try:
-                    self.create_origin_quality(ori)
-                    ori.quality.associatedPhaseCount = int(
-                        addloc_info[8:12].strip())
-                except Exception: 
-                    pass
+                self.create_origin_quality(ori)
+                if addloc_info['phase_count'] is not None:
+                    ori.quality.associatedPhaseCount = \
+                        addloc_info['phase_count']
                     
-                try:
-                    first_motion_cnt = int(addloc_info[16:20].strip())
+                if addloc_info['first_motion_count'] is not None:
                     fm = FocalMechanism(
                         QPUtils.build_resource_identifier(auth_id, 
                         'focalmechanism', curr_id))
-                    fm.stationPolarityCount = first_motion_cnt
+                    fm.stationPolarityCount = \
+                        addloc_info['first_motion_count']
                     fm.add(ev)
                     ev.preferredFocalMechanismID = fm.publicID
-                except Exception:
-                    pass
                 
                 # if lat/lon uncertainties in km are given, convert to 
                 # degrees and add to quantity
-                try:
-                    ori.latitude.uncertainty = float(
-                        addloc_info[65:75].strip()) / (
+                if addloc_info['lat_err'] is not None:
+                    ori.latitude.uncertainty = addloc_info['lat_err'] / (
                         QPUtils.EARTH_KM_PER_DEGREE)
-                except Exception:
-                    pass
                 
-                try:
-                    # if latitude is +/- 90 degrees, set longitude error to 0.0
-                    # avoid division by zero
-                    if abs( ori.latitude.value ) == 90.0:
-                        ori.longitude.uncertainty = 0.0
-                    else:
-                        ori.longitude.uncertainty = float(
-                            addloc_info[75:85].strip()) / (
-                                QPUtils.EARTH_KM_PER_DEGREE * math.cos( 
-                                    ori.latitude.value))
-                except Exception:
-                    pass
+                # if latitude is +/- 90 degrees, set longitude error to 0.0
+                # avoid division by zero
+                if abs( ori.latitude.value ) == 90.0:
+                    ori.longitude.uncertainty = 0.0
+                elif addloc_info['lon_err'] is not None:
+                    ori.longitude.uncertainty = addloc_info['lon_err'] / (
+                        QPUtils.EARTH_KM_PER_DEGREE * math.cos( 
+                            ori.latitude.value * math.pi/180.0))
 
     
+    @updatesIndex
+    @createsObjects
     def importPDECompressed(self, input, **kwargs):
         """
         Import data from USGS/NEIC (PDE) catalog in "compressed" format,
@@ -2438,32 +3133,16 @@ class QPCatalog(QPCore.QPObject):
                 continue
 
             try:
-                # first get required fields
+                # first get required fields, see PDE_LAYOUT
                 # NOTE: minutes, seconds, and depth can be missing!
-                curr_source = line[1:6].strip()
-                
-                curr_year   = int( line[6:12].strip() )
-                curr_month  = int( line[12:14] )
-                curr_day    = int( line[14:16] )
-                
-                curr_hour   = int( line[16:18] )
-                curr_lat    = float( line[27:34].strip() )
-                curr_lon    = float( line[34:42].strip() )
-            except Exception:
+                # if minutes part is not given, set to 0
+                # if seconds part is not given, set to 0.0
+                rec = PDE_LAYOUT.decode(line)
+            except RecordError:
                 print " error in line %s: %s" % (line_ctr, line)
                 continue
 
-            # if minutes part is not given, set to 0
-            try:
-                curr_minute = int( line[18:20].strip() )
-            except Exception:
-                curr_minute = 0
-                
-            # if seconds part is not given, set to 0.0
-            try:
-                curr_second = float( line[20:25].strip() )
-            except Exception:
-                curr_second = 0.0
+            curr_year = rec['year']
 
             ## define event id
             # - use year + datetime block 
@@ -2479,10 +3158,11 @@ class QPCatalog(QPCore.QPObject):
                 curr_id))
             ori.add(ev)
             
-            ori.latitude  = RealQuantity( curr_lat )
-            ori.longitude = RealQuantity( curr_lon )
+            ori.latitude  = RealQuantity(rec['lat'])
+            ori.longitude = RealQuantity(rec['lon'])
             ori.time = TimeQuantity(QPDateTime.QPDateTime((curr_year, 
-                curr_month, curr_day, curr_hour, curr_minute, curr_second)))
+                rec['month'], rec['day'], rec['hour'], rec['minute'], 
+                rec['second'])))
             
             # set preferred origin
             ev.preferredOriginID = ori.publicID
@@ -2490,136 +3170,82 @@ class QPCatalog(QPCore.QPObject):
             ## get optional fields
 
             # depth
-            try:
-                curr_depth = 1000 * float(line[42:45].strip())
-                ori.depth = RealQuantity( curr_depth )
-            except Exception:
-                pass
+            if rec['depth'] is not None:
+                ori.depth = RealQuantity(1000 * rec['depth'])
                     
             # location authority
             # map this to creationInfo.agencyID
-            try:
-                curr_locsource = line[25:27].strip()
-                
-                if curr_locsource:
-                    self.create_object_creationinfo(ori)
-                    ori.creationInfo.agencyID = curr_locsource
-            except Exception:
-                pass
+            if rec['location_source']:
+                self.create_object_creationinfo(ori)
+                ori.creationInfo.agencyID = rec['location_source']
 
             # depth control designator
-            try:
-                curr_depthcontrol = line[47:48].strip()
+            curr_depthcontrol = rec['depth_control']
 
-                if curr_depthcontrol:
-                    oc = Comment(
-                        "PDE:depth_control_designator=%s" % curr_depthcontrol)
-                    ori.comment.append(oc)
-                
-                # TODO(fab): look up in documentatioin
-                if curr_depthcontrol.lower() == 'a':
-                    ori.depthType = 'operator assigned'
-                elif curr_depthcontrol.lower() ==  'd':
-                    ori.depthType = 'constrained by depth phases'
-                elif curr_depthcontrol.lower() in ('n', 'g', 's'):
-                    ori.depthType = 'other'
-            except Exception: 
-                  pass
+            if curr_depthcontrol:
+                oc = Comment(
+                    "PDE:depth_control_designator=%s" % curr_depthcontrol)
+                ori.comment.append(oc)
+            
+            # TODO(fab): look up in documentatioin
+            if curr_depthcontrol.lower() == 'a':
+                ori.depthType = 'operator assigned'
+            elif curr_depthcontrol.lower() ==  'd':
+                ori.depthType = 'constrained by depth phases'
+            elif curr_depthcontrol.lower() in ('n', 'g', 's'):
+                ori.depthType = 'other'
 
             # number of pP phases for depth determination
-            try:    
-                curr_pP_cnt = int( line[48:50].strip() )
+            if rec['depth_phase_count'] is not None:
                 self.create_origin_quality(ori)
-                ori.quality.depthPhaseCount = curr_pP_cnt
-            except Exception: 
-                pass
+                ori.quality.depthPhaseCount = rec['depth_phase_count']
                 
             # standard deviation of arrival time residuals
-            try:    
-                curr_std_dev = float( line[50:54].strip() )
+            if rec['std_dev'] is not None:
                 self.create_origin_quality(ori)
-                ori.quality.standardError = curr_std_dev
-            except Exception: 
-                pass
+                ori.quality.standardError = rec['std_dev']
 
             # Flinn-Engdahl region
-            try:
-                curr_fe_region = line[87:90].strip()
-                if curr_fe_region:
-                    desc = EventDescription(curr_fe_region)
-                    desc.type = 'Flinn-Engdahl region'
-                    
-                    ev.description.append( desc )
-            except Exception: 
-                  pass
+            if rec['fe_region']:
+                desc = EventDescription(rec['fe_region'])
+                desc.type = 'Flinn-Engdahl region'
                 
-            # up to 4 magnitudes
-            mag_indices = [ 
-                { 'from': 54, 'to': 57, 'obs_from': 57, 'obs_to': 59, 
-                    'mag_type': 'mb' },
-                { 'from': 59, 'to': 62, 'obs_from': 63, 'obs_to': 65, 
-                    'mag_type': 'Ms' },
-                { 'from': 65, 'to': 69, 'magtype_from': 69, 'magtype_to': 71, 
-                    'magsrc_from': 71, 'magsrc_to': 76 },
-                { 'from': 76, 'to': 80, 'magtype_from': 80, 'magtype_to': 82, 
-                    'magsrc_from': 82, 'magsrc_to': 87 }]
-                            
-            for mag_ctr in xrange(len(mag_indices)):
+                ev.description.append( desc )
                 
-                validMagBlock = True
-                try:
-                    curr_mag = float(
-                        line[mag_indices[mag_ctr]['from']:\
-                        mag_indices[mag_ctr]['to']].strip())
-                except Exception:
-                    validMagBlock = False
-
-                if validMagBlock:
-                    mag = Magnitude(QPUtils.build_resource_identifier(auth_id,
-                        'magnitude',  "%s/%s" % (curr_id, mag_ctr+1)))
-                    mag.add(ev)
-                    mag.mag = RealQuantity( curr_mag )
-                    mag.setOriginAssociation( ori.publicID )
-
-                    # magnitude type
-                    try:
-                        if mag_ctr <= 1:
-                            curr_magtype = mag_indices[mag_ctr]['mag_type']
-                        else:    
-                            curr_magtype = \
-                                line[mag_indices[mag_ctr]['magtype_from']:\
-                                mag_indices[mag_ctr]['magtype_to']].strip()
-
-                        if curr_magtype:
-                            mag.type = curr_magtype
-                    except Exception:
-                        pass
+            # up to 4 magnitudes: mb and Ms with number of observations, two
+            # additional magnitudes with type and source
+            for mag_ctr in xrange(4):
+                
+                curr_mag = rec['mag%s' % (mag_ctr+1)]
+                if curr_mag is None:
+                    continue
 
-                    # source of magnitude determination 
-                    # (for mb and Ms it is 'NEIS')
-                    try:
-                        if mag_ctr <= 1:
-                            curr_magsource = PDE_MAGNITUDE_SOURCE_NEIS
-                        else:
-                            curr_magsource = \
-                                line[mag_indices[mag_ctr]['magsrc_from']:\
-                                mag_indices[mag_ctr]['magsrc_to']].strip()
+                mag = Magnitude(QPUtils.build_resource_identifier(auth_id,
+                    'magnitude',  "%s/%s" % (curr_id, mag_ctr+1)))
+                mag.add(ev)
+                mag.mag = RealQuantity( curr_mag )
+                mag.setOriginAssociation( ori.publicID )
+
+                # magnitude type and source of magnitude determination 
+                # (for mb and Ms it is 'NEIS')
+                if mag_ctr <= 1:
+                    curr_magtype = ('mb', 'Ms')[mag_ctr]
+                    curr_magsource = PDE_MAGNITUDE_SOURCE_NEIS
+                else:    
+                    curr_magtype = rec['mag%s_type' % (mag_ctr+1)]
+                    curr_magsource = rec['mag%s_source' % (mag_ctr+1)]
+
+                if curr_magtype:
+                    mag.type = curr_magtype
+
+                if curr_magsource:
+                    self.create_object_creationinfo(mag)
+                    mag.creationInfo.agencyID = curr_magsource
                             
-                        if curr_magsource:
-                            self.create_object_creationinfo(mag)
-                            mag.creationInfo.agencyID = curr_magsource
-                    except Exception:
-                        pass
-                                
-                    # number of observations (only for mb and Ms)
-                    if mag_ctr <= 1:
-                        try:
-                            curr_obs = int(
-                                line[mag_indices[mag_ctr]['obs_from']:\
-                                mag_indices[mag_ctr]['obs_to']].strip() )
-                            mag.stationCount = curr_obs
-                        except Exception:
-                            pass
+                # number of observations (only for mb and Ms)
+                if mag_ctr <= 1 and \
+                    rec['mag%s_obs' % (mag_ctr+1)] is not None:
+                    mag.stationCount = rec['mag%s_obs' % (mag_ctr+1)]
 
             ## set preferred magnitude
             # - take first given magnitude from the 4 positions as preferred
@@ -2632,6 +3258,8 @@ class QPCatalog(QPCore.QPObject):
                 ev.preferredMagnitudeID = ev.magnitude[0].publicID
 
     
+    @updatesIndex
+    @createsObjects
     def importJMADeck(self, input, **kwargs):
         """
         import data from Japanese JMA catalog in "deck" format
@@ -2765,10 +3393,6 @@ class QPCatalog(QPCore.QPObject):
         # time shift in hours of Japan Standard Time
         time_delta_jst = JMA_JST_TIME_SHIFT
 
-        mag_indices = [
-            {'from': 52, 'to': 54, 'magtype_from': 54, 'magtype_to': 55},
-            {'from': 55, 'to': 57, 'magtype_from': 57, 'magtype_to': 58}]
-                                
         line_ctr = 0
 
         phasesMode     = None
@@ -2878,26 +3502,23 @@ class QPCatalog(QPCore.QPObject):
                 # set this to True if a good hypocenter (with full time 
                 #  information) has been found
                 try:
-                    # first get required fields
+                    # first get required fields, see JMA_HYPOCENTER_LAYOUT
                     # NOTE: coordinates and depth need not be there
                     # NOTE: sometimes seconds are not there, this is not a 
                     #       valid hypocenter
-                    curr_source = line[0]
-                    
-                    curr_year   = int( line[1:5] )
-                    curr_month  = int( line[5:7] )
-                    curr_day    = int( line[7:9] )
-                    
-                    curr_hour   = int( line[9:11] )
-                    curr_minute = int( line[11:13] )
-
-                    # seconds are given w/o decimal point
-                    curr_second_int  = int( line[13:15] )
-                    curr_second_frac = line[15:17].strip()
-
-                except Exception:
+                    rec = JMA_HYPOCENTER_LAYOUT.decode(line)
+                except RecordError:
                     continue
 
+                curr_source = line[0]
+                
+                curr_year   = rec['year']
+                curr_month  = rec['month']
+                curr_day    = rec['day']
+                
+                curr_hour   = rec['hour']
+                curr_minute = rec['minute']
+
                 # if only JMA hypocenters are requested, discard all others
                 if 'jmaonly' in kwargs and kwargs['jmaonly'] and \
                         curr_source != 'J':
@@ -2923,9 +3544,10 @@ class QPCatalog(QPCore.QPObject):
                     ori.publicID = QPUtils.build_resource_identifier(auth_id, 
                         'origin', curr_id)
                     
+                # seconds are given w/o decimal point
                 try:
-                    curr_second = float('.'.join((str(curr_second_int), 
-                        curr_second_frac)))
+                    curr_second = float('.'.join((str(rec['second_int']), 
+                        rec['second_frac'])))
                 except Exception:
                     print " illegal time format (seconds) in hypocenter line "\
                         "%s: %s" % (line_ctr, line)
@@ -2967,110 +3589,52 @@ class QPCatalog(QPCore.QPObject):
 
                 ## get optional fields
 
-                # latitude is given as degrees + decimal minutes (w/o decimal 
-                # point)
-                try:
-                    curr_lat_deg      = line[22:24].strip()
-                    curr_lat_min_int  = line[24:26].strip()
-                    curr_lat_min_frac = line[26:28].strip()
-
-                    curr_lat_min = float('.'.join((curr_lat_min_int, 
-                        curr_lat_min_frac)))
-                    curr_lat = float(curr_lat_deg) + (curr_lat_min / 60.0)
+                # latitude and longitude are given as degrees + decimal 
+                # minutes (w/o decimal point)
+                if rec['lat'] is not None:
+                    ori.latitude = RealQuantity(rec['lat'])
 
-                    ori.latitude = RealQuantity(curr_lat)
-
-                except Exception:
-                    pass
-
-                # longitude is given as degrees + decimal minutes (w/o decimal 
-                # point)
-                try:
-                    curr_lon_deg      = line[33:36].strip()
-                    curr_lon_min_int  = line[36:38].strip()
-                    curr_lon_min_frac = line[38:40].strip()
-                    
-                    curr_lon_min = float('.'.join((curr_lon_min_int, 
-                        curr_lon_min_frac)))
-                    curr_lon = float(curr_lon_deg) + (curr_lon_min / 60.0)
-
-                    ori.longitude = RealQuantity(curr_lon)
-
-                except Exception:
-                    pass
+                if rec['lon'] is not None:
+                    ori.longitude = RealQuantity(rec['lon'])
 
                 # depth
-                try:
-                    curr_depth_int  = line[44:47].strip()
-                    curr_depth_frac = line[47:49].strip()
-
-                    # if depth was determined using 'depth slice method', no 
-                    # fraction is there
-                    if curr_depth_frac:
-                        curr_depth = float('.'.join((curr_depth_int, 
-                            curr_depth_frac)))
-                    else:
-                        curr_depth = float( curr_depth_int )
-
-                    ori.depth = RealQuantity( 1000 * curr_depth )
-
-                except Exception:
-                    pass
+                # if depth was determined using 'depth slice method', no 
+                # fraction is there
+                if rec['depth'] is not None:
+                    ori.depth = RealQuantity(1000 * rec['depth'])
 
                 # do not read uncertainties if minimum configuration is 
                 # selected
+                # uncertainties are only set for given values
                 if not minConf:
 
                     # focal time error (seconds)
-                    try:
-                        curr_second_err_int  = line[17:19].strip()
-                        curr_second_err_frac = line[19:21].strip()
-                        curr_second_err = float('.'.join((curr_second_err_int,
-                            curr_second_err_frac)))
-                        ori.time.uncertainty = curr_second_err
-                    except Exception:
-                        pass
+                    if rec['time_err'] is not None:
+                        ori.time.uncertainty = rec['time_err']
                     
                     # latitude minutes error
-                    try:
-                        curr_lat_err_min_int  = line[28:30].strip()
-                        curr_lat_err_min_frac = line[30:32].strip()
-                        curr_lat_err = float('.'.join((curr_lat_err_min_int, 
-                            curr_lat_err_min_frac))) / 60.0
-                        ori.latitude.uncertainty = curr_lat_err
-                    except Exception:
-                        pass
+                    if rec['lat_err'] is not None and \
+                        rec['lat'] is not None:
+                        ori.latitude.uncertainty = rec['lat_err'] / 60.0
                     
                     # longitude minutes error
-                    try:
-                        curr_lon_err_min_int  = line[40:42].strip()
-                        curr_lon_err_min_frac = line[42:44].strip()
-                        curr_lon_err = float('.'.join( (curr_lon_err_min_int, 
-                            curr_lon_err_min_frac))) / 60.0
-                        ori.longitude.uncertainty = curr_lon_err
-                    except Exception:
-                        pass
+                    if rec['lon_err'] is not None and \
+                        rec['lon'] is not None:
+                        ori.longitude.uncertainty = rec['lon_err'] / 60.0
                     
                     # depth error
-                    try:
-                        # NOTE: format %3.2f, so 9.99 km is maximum error!
-                        curr_depth_err_int  = line[49:50].strip()
-                        curr_depth_err_frac = line[50:52].strip()
-                        curr_depth_err = float('.'.join((curr_depth_err_int,
-                            curr_depth_err_frac)))
-                        ori.depth.uncertainty = 1000 * curr_depth_err
-                    except Exception:
-                        pass
+                    # NOTE: format %3.2f, so 9.99 km is maximum error!
+                    if rec['depth_err'] is not None and \
+                        rec['depth'] is not None:
+                        ori.depth.uncertainty = 1000 * rec['depth_err']
                   
                 ## magnitudes
                 for mag_ctr in xrange(JMA_MAGNITUDE_COUNT):
 
-                    curr_mag_code = \
-                        line[mag_indices[mag_ctr]['from']:\
-                        mag_indices[mag_ctr]['to']]
+                    curr_mag_code = rec['mag%s' % (mag_ctr+1)]
 
                     # something there?
-                    if curr_mag_code.strip():
+                    if curr_mag_code:
 
                         # magnitude entry should have 2 characters, but
                         #  sometimes a charcater is missing
@@ -3156,12 +3720,7 @@ class QPCatalog(QPCore.QPObject):
                         mag.setOriginAssociation( ori.publicID )
 
                         # magnitude type
-                        try:
-                            curr_magtype = \
-                                line[mag_indices[mag_ctr]['magtype_from']:\
-                                mag_indices[mag_ctr]['magtype_to']].strip()
-                        except Exception:
-                            curr_magtype = ''
+                        curr_magtype = rec['mag%s_type' % (mag_ctr+1)]
                         
                         if curr_magtype == 'J':
                             mag.type = 'MJ'
@@ -3195,8 +3754,8 @@ class QPCatalog(QPCore.QPObject):
                     ev.preferredMagnitudeID = ev.magnitude[0].publicID
 
                 ## get "subsidiary information": event type
-                try:
-                    subsidiary = line[60].strip()
+                if len(line) > 60:
+                    subsidiary = rec['subsidiary']
 
                     # valid classifications are
                     # '1': Natural earthquake
@@ -3213,33 +3772,24 @@ class QPCatalog(QPCore.QPObject):
                     # comment: 'JMA:subsidiary=<subsidiary>'
                     oc = Comment("JMA:subsidiary=%s" % subsidiary)
                     ev.comment.append(oc)
-                    
-                except Exception:
-                    pass
                         
                 ## geographical region
-                try:
-                    curr_region_str = line[68:92].strip()
+                curr_region_str = rec['region']
 
-                    if curr_region_str:
-                        curr_region_str_xml = saxutils.escape(curr_region_str)
+                if curr_region_str:
+                    curr_region_str_xml = saxutils.escape(curr_region_str)
 
-                        if not minConf:
-                            descr = EventDescription( 
-                                curr_region_str_xml, 
-                                EVENT_DESCRIPTION_REGION_NAME_STRING)
-                            ev.description.append(descr)
-                except Exception:
-                    pass
+                    if not minConf:
+                        descr = EventDescription( 
+                            curr_region_str_xml, 
+                            EVENT_DESCRIPTION_REGION_NAME_STRING)
+                        ev.description.append(descr)
                     
                 ## origin quality
-                try:
-                    curr_stations_used = int(line[92:95].strip())
+                if rec['station_count'] is not None:
                     self.create_origin_quality(ori)
                     if not minConf:
-                        ori.quality.usedStationCount = curr_stations_used
-                except Exception:
-                    pass
+                        ori.quality.usedStationCount = rec['station_count']
 
             elif phasesMode:
 
@@ -3429,6 +3979,8 @@ class QPCatalog(QPCore.QPObject):
                     line[2:].strip()))
 
     
+    @updatesIndex
+    @createsObjects
     def importGSE2_0Bulletin(self, input, **kwargs):
         """
         Import earthquake catalog data in GSE2.0 Bulletin format 
@@ -3564,32 +4116,14 @@ class QPCatalog(QPCore.QPObject):
         else:
             do_codeMapping = False
 
-        # if input field positions are given, replace default
+        # if input field positions are given, replace default layouts of 
+        # origin lines
         if 'fieldIndices' in kwargs and isinstance(
                 kwargs['fieldIndices'], dict):
-            fieldIndices = kwargs['fieldIndices']
+            origin_layout, origin_error_layout = gse2_0OriginLayouts(
+                kwargs['fieldIndices'])
         else:
-
-            # standard-conforming default field positions
-            # NOTE: these are Python-style, i.e. first position is 
-            # zero-offset, and last position is zero-offset plus one
-            fieldIndices = { 
-                'author_from': 104,
-                'author_to': 112,
-                'id_from': 114,
-                'id_to': 122,
-                'mag': (
-                    {'magtype_from': 71, 'magtype_to': 73, 'mag_from': 73, 
-                     'mag_to': 77,  'st_cnt_from': 78, 'st_cnt_to': 80, 
-                     'magerr_from': 74, 'magerr_to': 77 },
-                    {'magtype_from': 82, 'magtype_to': 84, 'mag_from': 84, 
-                     'mag_to': 88, 'st_cnt_from': 89, 'st_cnt_to': 91, 
-                     'magerr_from': 85, 'magerr_to': 88 },
-                    {'magtype_from': 93, 'magtype_to': 95, 'mag_from': 95,
-                     'mag_to': 99,  'st_cnt_from': 100, 'st_cnt_to': 102, 
-                     'magerr_from': 96, 'magerr_to': 99 }
-                    )
-            }
+            origin_layout, origin_error_layout = GSE2_0_ORIGIN_LAYOUTS
                     
         line_ctr = 0
 
@@ -3603,6 +4137,9 @@ class QPCatalog(QPCore.QPObject):
         
         commentMode     = None
         comment_str_xml = ''
+
+        # current origin, None if origin line could not be read
+        ori = None
         
         for line in istream:
 
@@ -3753,103 +4290,75 @@ class QPCatalog(QPCore.QPObject):
                 if origin_line == 1:
                     try:
                         # require time and lat/lon
-                        
-                        curr_year   = int( line[0:4] )
-                        curr_month  = int( line[5:7] )
-                        curr_day    = int( line[8:10] )
-                        
-                        curr_hour   = int( line[11:13] )
-                        curr_minute = int( line[14:16] )
-                        curr_second = float( line[17:21].strip() )
-
-                        curr_lat    = float( line[25:33].strip() )
-                        curr_lon    = float( line[34:43].strip() )
+                        rec = origin_layout.decode(line)
 
                         # create origin, set publicID later
                         ori = Origin()
 
                         ori.time = TimeQuantity(QPDateTime.QPDateTime((
-                            curr_year, curr_month, curr_day, curr_hour, 
-                            curr_minute, curr_second)))
-                        ori.latitude  = RealQuantity(curr_lat)
-                        ori.longitude = RealQuantity(curr_lon)
-
-                        ori.add(ev)
+                            rec['year'], rec['month'], rec['day'], 
+                            rec['hour'], rec['minute'], rec['second'])))
 
-                    except Exception:
+                    except ValueError:
+                        # RecordError or invalid date/time, origin line 2 
+                        # of skipped origin is skipped as well
                         print " error in origin line %s: %s" % (line_ctr, line)
+                        ori = None
                         continue
 
+                    ori.latitude  = RealQuantity(rec['lat'])
+                    ori.longitude = RealQuantity(rec['lon'])
+
+                    ori.add(ev)
+
                     ## optional fields
                     
                     # 23 fixf a1 fixed flag (f=fixed origin time solution, or blank)
-                    time_fixed_flag = line[22:23].strip()
-                    if time_fixed_flag == 'f':
+                    if rec['time_fixed'] == 'f':
                         ori.timeFixed = True
                     
                     # 45 fixf a1 fixed flag (f= fixed epicenter solution, or blank)
-                    epicenter_fixed_flag = line[44:45].strip()
-                    if epicenter_fixed_flag == 'f':
+                    if rec['epicenter_fixed'] == 'f':
                         ori.epicenterFixed = True
                     
                     # 54 fixf a1 fixed flag (f= fixed depth station, d=depth phases, or blank)
-                    depth_fixed_flag = line[53:54].strip()
-                    if depth_fixed_flag == 'd':
+                    if rec['depth_fixed'] == 'd':
                         ori.depthType = 'constrained by depth phases'
                     
                     # origin ID
-                    try:    
-                        ori_id = \
-                            line[fieldIndices['id_from']:fieldIndices['id_to']].strip()
-                    except Exception: 
-                        ori_id = ev_id
+                    ori_id = rec['id']
 
                     if not minConf:
                         ori.publicID = QPUtils.build_resource_identifier(
                             auth_id, 'origin', ori_id)
                     
                     # depth
-                    try:
-                        curr_depth = 1000 * float(line[47:52].strip())
-                        ori.depth = RealQuantity(curr_depth)
-                    except Exception:
-                        pass
+                    if rec['depth'] is not None:
+                        ori.depth = RealQuantity(1000 * rec['depth'])
 
                     if not minConf:
 
                         # number of used phases
-                        try:    
-                            used_phase_cnt = int( line[56:60].strip() )
+                        if rec['phase_count'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.usedPhaseCount = used_phase_cnt
-                        except Exception: 
-                            pass
+                            ori.quality.usedPhaseCount = rec['phase_count']
                             
                         # number of used stations
-                        try:    
-                            used_sta_cnt = int( line[61:65].strip() )
+                        if rec['station_count'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.usedStationCount = used_sta_cnt
-                        except Exception: 
-                            pass
+                            ori.quality.usedStationCount = \
+                                rec['station_count']
                         
                         # azimuthal gap
-                        try:    
-                            azimuthal_gap = float( line[66:69].strip() )
+                        if rec['azimuthal_gap'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.azimuthalGap = azimuthal_gap
-                        except Exception: 
-                            pass
+                            ori.quality.azimuthalGap = rec['azimuthal_gap']
 
                     ## magnitudes
                     mag_arr = []
                     for mag_ctr in xrange(GSE2_0_MAGNITUDE_COUNT):
 
-                        try:
-                            curr_mag_str = \
-                                line[fieldIndices['mag'][mag_ctr]['mag_from']:fieldIndices['mag'][mag_ctr]['mag_to']].strip()
-                        except Exception:
-                            curr_mag_str = ''
+                        curr_mag_str = rec['mag%s' % (mag_ctr+1)]
 
                         # something there?
                         if curr_mag_str:
@@ -3866,11 +4375,7 @@ class QPCatalog(QPCore.QPObject):
                                 raise ValueError, error_str
 
                             # magnitude type
-                            try:
-                                mag.type = \
-                                    line[fieldIndices['mag'][mag_ctr]['magtype_from']:fieldIndices['mag'][mag_ctr]['magtype_to']].strip()
-                            except Exception:
-                                mag.type = 'unknown'
+                            mag.type = rec['mag%s_type' % (mag_ctr+1)]
 
                             if not minConf:
 
@@ -3880,11 +4385,10 @@ class QPCatalog(QPCore.QPObject):
                                     'magnitude', "%s/%s" % (ori_id, mag_ctr+1))
                                 
                                 # station count
-                                try:
-                                    mag.stationCount = \
-                                        int(line[fieldIndices['mag'][mag_ctr]['st_cnt_from']:fieldIndices['mag'][mag_ctr]['st_cnt_to']].strip())
-                                except Exception:
-                                    pass
+                                if rec['mag%s_station_count' % (
+                                    mag_ctr+1)] is not None:
+                                    mag.stationCount = rec[
+                                        'mag%s_station_count' % (mag_ctr+1)]
 
                             # fill mag_arr for later identification of magnitude instance
                             mag_arr.append(mag)
@@ -3893,15 +4397,9 @@ class QPCatalog(QPCore.QPObject):
                             mag_arr.append(None)
 
                     # Author: map to creationInfo.agencyID
-                    try:
-                        curr_locsource = \
-                            line[fieldIndices['author_from']:fieldIndices['author_to']].strip()
-                        
-                        if curr_locsource:
-                            self.create_object_creationinfo(ori)
-                            ori.creationInfo.agencyID = curr_locsource
-                    except Exception:
-                        pass
+                    if rec['author']:
+                        self.create_object_creationinfo(ori)
+                        ori.creationInfo.agencyID = rec['author']
 
                     # set preferred origin
                     # TODO(fab): set first origin as preferred
@@ -3913,159 +4411,133 @@ class QPCatalog(QPCore.QPObject):
 
                 # everything in origin line 2 is ignored in minimum 
                 # configuration
-                elif origin_line == 2 and (not minConf):
+                elif origin_line == 2 and (not minConf) and ori is not None:
+
+                    rec = origin_error_layout.decode(line)
 
                     # rms - standard deviation of arrival time residuals
-                    try:
-                        curr_std_dev = float(line[5:10].strip())
+                    if rec['std_dev'] is not None:
                         self.create_origin_quality(ori)
-                        ori.quality.standardError = curr_std_dev
-                    except Exception:
-                        pass
+                        ori.quality.standardError = rec['std_dev']
 
                     # focal time error (seconds)
-                    try:    
-                        ori.time.uncertainty = float(line[15:21].strip())
-                    except Exception: 
-                        pass
+                    if rec['time_err'] is not None:
+                        ori.time.uncertainty = rec['time_err']
 
                     ## horizontal error ellipse
 
                     # add only if complete description is there
-                    try:
-                        ou = OriginUncertainty.OriginUncertainty()
-                        ori.originUncertainty.append(ou)
-
-                        ou.minHorizontalUncertainty = float( 
-                            line[25:31].strip())
-                        ou.maxHorizontalUncertainty = float(
-                            line[32:38].strip())
-                        ou.azimuthMaxHorizontalUncertainty = float(
-                            line[40:43].strip())
-                        ou.preferredDescription = 'uncertainty ellipse'
+                    ou = OriginUncertainty()
+                    ori.originUncertainty.append(ou)
 
-                    except Exception:
-                        pass
+                    for attribute, key in (
+                        ('minHorizontalUncertainty', 'min_hz_err'),
+                        ('maxHorizontalUncertainty', 'max_hz_err'),
+                        ('azimuthMaxHorizontalUncertainty', 'azimuth_hz_err')):
 
-                    # depth Error
-                    try:    
-                        ori.depth.uncertainty = 1000 * float(
-                            line[49:54].strip())
-                    except Exception: 
-                        pass
+                        if rec[key] is None:
+                            break
+                        setattr(ou, attribute, rec[key])
+                    else:
+                        ou.preferredDescription = 'uncertainty ellipse'
+
+                    # depth Error (depth is read from origin line 1)
+                    if rec['depth_err'] is not None and \
+                        getattr(ori, 'depth', None) is not None:
+                        ori.depth.uncertainty = 1000 * rec['depth_err']
 
                     # minumum distance to station (degrees)
-                    try:
-                        min_dist = float(line[56:62].strip())
+                    if rec['min_dist'] is not None:
                         self.create_origin_quality(ori)
-                        ori.quality.minimumDistance = min_dist
-                    except Exception:
-                        pass
+                        ori.quality.minimumDistance = rec['min_dist']
 
                     # maximum distance to station (degrees)
-                    try:
-                        max_dist = float(line[63:69].strip())
+                    if rec['max_dist'] is not None:
                         self.create_origin_quality(ori)
-                        ori.quality.maximumDistance = max_dist
-                    except Exception:
-                        pass
+                        ori.quality.maximumDistance = rec['max_dist']
 
                     # magnitude errors, mags from 1st origin line are 
                     # saved in mag_arr
                     for mag_ctr, curr_mag in enumerate(mag_arr):
 
-                        if curr_mag is None:
-                            continue
-                        else:
-                            try:
-                                curr_mag.mag.uncertainty = \
-                                    float(line[fieldIndices['mag'][mag_ctr]\
-                                        ['magerr_from']:fieldIndices['mag']\
-                                            [mag_ctr]['magerr_to']].strip())
-                            except Exception:
-                                pass
+                        if curr_mag is not None and \
+                            rec['mag%s_err' % (mag_ctr+1)] is not None:
+                            curr_mag.mag.uncertainty = \
+                                rec['mag%s_err' % (mag_ctr+1)]
 
                     # antype -> Origin.evaluationMode, (evaluationStatus)
                     # no match for 'g' (guess) in QuakeML
                     # we map 'g' to 'manual', set evaluationStatus to 
                     # 'preliminary', and create a comment for origin
-                    try:
-                        curr_ori_mode = line[104:105].strip()
-                        if curr_ori_mode.lower() == 'm':
-                            ori.evaluationMode = 'manual'
-                        elif curr_ori_mode.lower() == 'a':
-                            ori.evaluationMode = 'automatic'
-                        elif curr_ori_mode.lower() == 'g':
-                            ori.evaluationMode = 'manual'
-                            ori.evaluationStatus = 'preliminary'
-                            
-                            # comment: 'GSE2.0:antype=g'
-                            oc = Comment("GSE2.0:antype=%s" % curr_ori_mode)
-                            ori.comment.append(oc)
-
-                    except Exception:
-                        pass
+                    curr_ori_mode = rec['analysis_type']
+                    if curr_ori_mode.lower() == 'm':
+                        ori.evaluationMode = 'manual'
+                    elif curr_ori_mode.lower() == 'a':
+                        ori.evaluationMode = 'automatic'
+                    elif curr_ori_mode.lower() == 'g':
+                        ori.evaluationMode = 'manual'
+                        ori.evaluationStatus = 'preliminary'
+                        
+                        # comment: 'GSE2.0:antype=g'
+                        oc = Comment("GSE2.0:antype=%s" % curr_ori_mode)
+                        ori.comment.append(oc)
 
                     # ignore loctype field, no match in QuakeML
 
                     # evtype -> Event.type, Event.typeCertainty
                     # if classification is 'unknown', we do not set the Event.type
                     # add comment to event with GSE2.0 classification
-                    try:
-                        curr_ev_remarks = line[108:110].strip()
-                        if curr_ev_remarks.lower() == 'ke':
-                            ev.type = 'earthquake'
-                            ev.typeCertainty = 'known'
-                        elif curr_ev_remarks.lower() == 'se':
-                            ev.type = 'earthquake'
-                            ev.typeCertainty = 'suspected'
-                            
-                        elif curr_ev_remarks.lower() == 'kr':
-                            ev.type = 'rock burst'
-                            ev.typeCertainty = 'known'
-                        elif curr_ev_remarks.lower() == 'sr':
-                            ev.type = 'rock burst'
-                            ev.typeCertainty = 'suspected'
-                            
-                        elif curr_ev_remarks.lower() == 'ki':
-                            ev.type = 'induced or triggered event'
-                            ev.typeCertainty = 'known'
-                        elif curr_ev_remarks.lower() == 'si':
-                            ev.type = 'induced or triggered event'
-                            ev.typeCertainty = 'suspected'
-                            
-                        elif curr_ev_remarks.lower() == 'km':
-                            ev.type = 'mining explosion'
-                            ev.typeCertainty = 'known'
-                        elif curr_ev_remarks.lower() == 'sm':
-                            ev.type = 'mining explosion'
-                            ev.typeCertainty = 'suspected'
-                            
-                        elif curr_ev_remarks.lower() == 'kx':
-                            ev.type = 'experimental explosion'
-                            ev.typeCertainty = 'known'
-                        elif curr_ev_remarks.lower() == 'sx':
-                            ev.type = 'experimental explosion'
-                            ev.typeCertainty = 'suspected'
-                            
-                        elif curr_ev_remarks.lower() == 'kn':
-                            ev.type = 'nuclear explosion'
-                            ev.typeCertainty = 'known'
-                        elif curr_ev_remarks.lower() == 'sn':
-                            ev.type = 'nuclear explosion'
-                            ev.typeCertainty = 'suspected'
-                            
-                        elif curr_ev_remarks.lower() == 'ls':
-                            ev.type = 'landslide'
-                            ev.typeCertainty = 'known'
-                            
-                        # comment: 'GSE2.0:evtype=<evtype>'
-                        if curr_ev_remarks:
-                            oc = Comment("GSE2.0:evtype=%s" % curr_ev_remarks)
-                            ev.comment.append(oc)
-
-                    except Exception:
-                        pass
+                    curr_ev_remarks = rec['event_type']
+                    if curr_ev_remarks.lower() == 'ke':
+                        ev.type = 'earthquake'
+                        ev.typeCertainty = 'known'
+                    elif curr_ev_remarks.lower() == 'se':
+                        ev.type = 'earthquake'
+                        ev.typeCertainty = 'suspected'
+                        
+                    elif curr_ev_remarks.lower() == 'kr':
+                        ev.type = 'rock burst'
+                        ev.typeCertainty = 'known'
+                    elif curr_ev_remarks.lower() == 'sr':
+                        ev.type = 'rock burst'
+                        ev.typeCertainty = 'suspected'
+                        
+                    elif curr_ev_remarks.lower() == 'ki':
+                        ev.type = 'induced or triggered event'
+                        ev.typeCertainty = 'known'
+                    elif curr_ev_remarks.lower() == 'si':
+                        ev.type = 'induced or triggered event'
+                        ev.typeCertainty = 'suspected'
+                        
+                    elif curr_ev_remarks.lower() == 'km':
+                        ev.type = 'mining explosion'
+                        ev.typeCertainty = 'known'
+                    elif curr_ev_remarks.lower() == 'sm':
+                        ev.type = 'mining explosion'
+                        ev.typeCertainty = 'suspected'
+                        
+                    elif curr_ev_remarks.lower() == 'kx':
+                        ev.type = 'experimental explosion'
+                        ev.typeCertainty = 'known'
+                    elif curr_ev_remarks.lower() == 'sx':
+                        ev.type = 'experimental explosion'
+                        ev.typeCertainty = 'suspected'
+                        
+                    elif curr_ev_remarks.lower() == 'kn':
+                        ev.type = 'nuclear explosion'
+                        ev.typeCertainty = 'known'
+                    elif curr_ev_remarks.lower() == 'sn':
+                        ev.type = 'nuclear explosion'
+                        ev.typeCertainty = 'suspected'
+                        
+                    elif curr_ev_remarks.lower() == 'ls':
+                        ev.type = 'landslide'
+                        ev.typeCertainty = 'known'
+                        
+                    # comment: 'GSE2.0:evtype=<evtype>'
+                    if curr_ev_remarks:
+                        oc = Comment("GSE2.0:evtype=%s" % curr_ev_remarks)
+                        ev.comment.append(oc)
 
                 elif regionMode:
 
@@ -4143,8 +4615,10 @@ class QPCatalog(QPCore.QPObject):
                         phasesMode   = False
                         eventEndMode = True
 
-                    # if keyword argument 'nopicks' set, skip line
-                    elif not ('nopicks' in kwargs and kwargs['nopicks']):
+                    # if keyword argument 'nopicks' set, or origin was 
+                    # skipped, skip line
+                    elif not ('nopicks' in kwargs and kwargs['nopicks']) \
+                        and ori is not None:
 
                         ##  read regular phase line
                         try:
@@ -4342,6 +4816,8 @@ class QPCatalog(QPCore.QPObject):
                                     pass
 
 
+    @updatesIndex
+    @createsObjects
     def importOGS_HPL(self, input, **kwargs):
         """
         Import earthquake catalog data in HPL format as used by OGS
@@ -4463,64 +4939,50 @@ class QPCatalog(QPCore.QPObject):
 
                     # get event sequence number of data set
                     try:
-                        ev_seq = int(line[0:6].strip())
-                    except Exception:
+                        ev_seq = OGS_SEQUENCE_LAYOUT.decode(line)['sequence']
+                    except RecordError:
                         error_str = " no valid sequence number in origin "\
                             "line %s: %s" % (line_ctr, line)
                         raise RuntimeError, error_str
                     
                     try:
-                        
-                        # require time, lat/lon
-                        
-                        curr_year_str = line[7:9]
-                        curr_month    = int( line[9:11] )
-                        curr_day      = int( line[11:13] )
-
+                        # require time, lat/lon, see OGS_HYPOCENTER_LAYOUT
                         # catalog starts in 1977
                         # make years >= 77 -> 19XX, < 77 -> 20XX
-                        if int( curr_year_str ) >= OGS_YEAR_START_1900:
-                            curr_year = int("%s%s" % ('19', curr_year_str))
-                        else:
-                            curr_year = int("%s%s" % ('20', curr_year_str))
-                            
-                        curr_hour   = int( line[14:16] )
-                        curr_minute = int( line[16:18] )
-                        curr_second = float( line[19:24].strip() )
-
-                        # latitude and longitude are given as degrees and decimal minutes
-                        curr_lat_deg = float( line[25:27].strip() )
-                        curr_lat_min = float( line[28:33].strip() )
-                        curr_lat     = curr_lat_deg + ( curr_lat_min / 60.0 )
-                        
-                        curr_lon_deg = float( line[35:37].strip() )
-                        curr_lon_min = float( line[38:43].strip() )
-                        curr_lon     = curr_lon_deg + ( curr_lon_min / 60.0 )
-                        
+                        rec = OGS_HYPOCENTER_LAYOUT.decode(line)
+
                         # create origin, set publicID later
                         ori = Origin()
 
                         ori.time = TimeQuantity(QPDateTime.QPDateTime((
-                            curr_year, curr_month, curr_day,
-                            curr_hour, curr_minute, curr_second)))
-                        ori.latitude  = RealQuantity( curr_lat )
-                        ori.longitude = RealQuantity( curr_lon )
-                        
-                        ori.add(ev)
+                            rec['year'], rec['month'], rec['day'],
+                            rec['hour'], rec['minute'], rec['second'])))
 
-                    except Exception:
+                    except ValueError:
+                        # RecordError or invalid date/time
                         print " error in origin line %s: %s" % (line_ctr, line)
                         skipMode = True
                         continue
 
+                    # date is also used for pick times
+                    curr_year  = rec['year']
+                    curr_month = rec['month']
+                    curr_day   = rec['day']
+
+                    # latitude and longitude are given as degrees and decimal minutes
+                    curr_lat = rec['lat_deg'] + ( rec['lat_min'] / 60.0 )
+                    curr_lon = rec['lon_deg'] + ( rec['lon_min'] / 60.0 )
+
+                    ori.latitude  = RealQuantity( curr_lat )
+                    ori.longitude = RealQuantity( curr_lon )
+                    
+                    ori.add(ev)
+
                     ## optional fields
                     
                     # depth
-                    try:
-                        curr_depth = 1000 * float( line[45:50].strip() )
-                        ori.depth  = RealQuantity( curr_depth )
-                    except Exception:
-                        pass
+                    if rec['depth'] is not None:
+                        ori.depth = RealQuantity(1000 * rec['depth'])
 
                     ## origin/event id is not provided in HPL format
                     # get origin id from date and time, show as ISO datetime 
@@ -4536,15 +4998,14 @@ class QPCatalog(QPCore.QPObject):
                     ev.preferredOriginID = ori.publicID
                         
                     ## magnitude
-                    try:
-                        curr_mag = float( line[52:57].strip() )
+                    if rec['mag'] is not None:
                         
                         mag = Magnitude()
                         mag.add(ev)
                         mag.setOriginAssociation( ori.publicID )
 
                         # duration magnitude (local?)
-                        mag.mag  = RealQuantity( curr_mag )
+                        mag.mag  = RealQuantity(rec['mag'])
                         mag.type = 'Md'
 
                         if not minConf:
@@ -4553,13 +5014,8 @@ class QPCatalog(QPCore.QPObject):
                                 auth_id, 'magnitude', ori_id)
 
                             # station count
-                            try:
-                                mag.stationCount = int( line[125:127].strip() )
-                            except Exception:
-                                pass
-
-                    except Exception:
-                        pass
+                            if rec['mag_station_count'] is not None:
+                                mag.stationCount = rec['mag_station_count']
 
                     ## set first magnitude as preferred one
                     if ev.magnitude:
@@ -4575,55 +5031,37 @@ class QPCatalog(QPCore.QPObject):
                         ev.description.append( descr )
                         
                         # number of used phases
-                        try:    
-                            used_phase_cnt = int(line[58:60].strip())
+                        if rec['phase_count'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.usedPhaseCount = used_phase_cnt
-                        except Exception: 
-                            pass
+                            ori.quality.usedPhaseCount = rec['phase_count']
 
                         # azimuthal gap
-                        try:    
-                            azimuthal_gap = float(line[64:67].strip())
+                        if rec['azimuthal_gap'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.azimuthalGap = azimuthal_gap
-                        except Exception: 
-                            pass
+                            ori.quality.azimuthalGap = rec['azimuthal_gap']
 
                         # standardError (rms)
-                        try:
-                            curr_rms_residual_phases = float(
-                                line[70:74].strip())
+                        if rec['rms'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.standardError = \
-                                curr_rms_residual_phases
-                        except Exception: 
-                            pass
+                            ori.quality.standardError = rec['rms']
                         
                         # TODO(fab): degrees?
                         # horizontal error (km)
-                        try:
-                            che = float(line[74:79].strip())
-                            ou = OriginUncertainty.OriginUncertainty()
-                            ou.horizontalUncertainty = che
+                        if rec['hz_err'] is not None:
+                            ou = OriginUncertainty()
+                            ou.horizontalUncertainty = rec['hz_err']
                             ou.add(ori)
-                        except Exception:
-                            pass
 
                         # depth error (km)
-                        try:    
-                            ori.depth.uncertainty = 1000 * float(
-                                line[79:84].strip())
-                        except Exception: 
-                            pass
+                        if rec['depth_err'] is not None and \
+                            rec['depth'] is not None:
+                            ori.depth.uncertainty = 1000 * rec['depth_err']
                         
                         # number of associated stations
-                        try:    
-                            ass_sta_cnt = int( line[99:101].strip() )
+                        if rec['station_count'] is not None:
                             self.create_origin_quality(ori)
-                            ori.quality.associatedStationCount = ass_sta_cnt
-                        except Exception: 
-                            pass
+                            ori.quality.associatedStationCount = \
+                                rec['station_count']
 
                     phaseMode      = True
                     phase_line_ctr = 0
@@ -4641,8 +5079,9 @@ class QPCatalog(QPCore.QPObject):
                         
                         # get sequence number
                         try:
-                            curr_ev_seq = int( line[0:6].strip() )
-                        except Exception:
+                            curr_ev_seq = OGS_SEQUENCE_LAYOUT.decode(line)[
+                                'sequence']
+                        except RecordError:
                             error_str = " no valid sequence number in phase "\
                                 "line %s: %s" % (line_ctr, line)
                             raise RuntimeError, error_str
@@ -5028,7 +5467,8 @@ class QPCatalog(QPCore.QPObject):
         ostream.close()
 
 
-    def cut(self, polygon=None, grid=None, geometry=None, **kwargs):
+    def cut(self, polygon=None, grid=None, geometry=None, inplace=True, 
+        **kwargs):
         """
         Cut (= filter) catalog according to given parameter ranges.
         
@@ -5036,6 +5476,9 @@ class QPCatalog(QPCore.QPObject):
             polygon     tuple, list, numpy.array OR QPPolygon object
             grid        QPGrid object
             geometry    Shapely aggregate geometry object
+            inplace     True: remove events from catalog (default)
+                        False: return view of catalog with remaining events
+                        (QPCatalogView), catalog is not changed
         
             kwargs:     min* and max* for lat, lon, depth, time, magnitude
                         default: cutting limits are included in result
@@ -5048,19 +5491,27 @@ class QPCatalog(QPCore.QPObject):
             
         Strategy for cutting: 
             An event is deleted if one origin/magnitude meets criterion
+
+            if catalog is backed by a compact catalog (see fromCompact()),
+            criteria are evaluated on its columns, no events are created
             
-            Loop over event array (from end)
-                (1) loop over origins:
-                    - check if lat/lon falls into polygon: if not, break origin
-                      loop, delete event, continue event loop.
-                      Keep event if it falls on polygon boundary.
-                      (Polygon: isInside(), QPPolygon: isInsideOrOnBoundary())
-                    - if cut criterion met for lat/lon/depth/time, break origin
-                      loop, delete event, continue event loop
-                
-                (2) loop over magnitudes: if cut criterion met, break mag loop, 
-                    delete event, continue event loop
-        
+            (1) origins (if polygon, grid, geometry, or a lat/lon/depth/time
+                criterion is given):
+                - extract lat/lon/depth/time of all origins into arrays
+                  (QPCatalogColumns), evaluate criteria as boolean masks.
+                  With removeNaN=True, origins with NaN lat/lon/depth are
+                  removed. Values that are not set are treated as NaN.
+                - origin times that are within comparison epsilon of
+                  mintime/maxtime are compared with QPDateTime operators
+                - polygon/grid/geometry are checked for origins of events
+                  that are still kept, in one batch (QPPolygon: 
+                  contains_points(), QPGrid: locate()). Keep event if it 
+                  falls on polygon boundary
+            
+            (2) magnitudes (if a magnitude criterion is given): evaluate
+                criteria as boolean masks over all magnitudes
+
+            event list is rebuilt in one pass
         """
         
         cut_params = kwargs.keys()
@@ -5073,284 +5524,298 @@ class QPCatalog(QPCore.QPObject):
                 poly_area = QPPolygon.QPPolygon(polygon)
         else:
             poly_area = None
-        
-        # loop over list of events in reversed order
-        for curr_ev_idx in reversed(xrange(len(self.eventParameters.event))):
-            
-            cut_ev = False
-            
-            # need to go into origins?
-            if     poly_area is not None \
-                or grid is not None \
-                or geometry is not None \
-                or 'minlat' in cut_params or 'maxlat' in cut_params \
-                or 'minlon' in cut_params or 'maxlon' in cut_params \
-                or 'mindepth' in cut_params or 'maxdepth' in cut_params \
-                or 'mintime' in cut_params or 'maxtime' in cut_params:
-                
-                for curr_ori in self.eventParameters.event[curr_ev_idx].origin:
-                    
-                    # check for polygon
-                    if poly_area is not None:
-                        if not poly_area.isInsideOrOnBoundary(
-                            float(curr_ori.longitude.value),
-                            float( curr_ori.latitude.value)):
-                            
-                            cut_ev = True
-                            break
-                        
-                    # check for grid
-                    if grid is not None:
-                        
-                        # check if grid is correct object
-                        try:
-                            isinstance(grid, QPGrid.QPGrid)
-                        except Exception:
-                            raise TypeError, \
-                                'QPCatalog::cut - grid has wrong type'
-                        
-                        if not grid.inGrid(
-                            float(curr_ori.latitude.value), 
-                            float(curr_ori.longitude.value),
-                            float(curr_ori.depth.value)):
-                            
-                            cut_ev = True
-                            break
 
-                    # check for geometry
-                    if geometry is not None:
-                        ev_point = shapely.geometry.Point( 
-                            float(curr_ori.longitude.value),
-                            float(curr_ori.latitude.value)) 
-                        
-                        if not (
-                            geometry.contains(ev_point) or \
-                            geometry.touches(ev_point)):
-                            
-                            cut_ev = True
-                            break
+        removeNaN = 'removeNaN' in cut_params and kwargs['removeNaN']
 
-                    # cut latitude
-                    if ('removeNaN' in cut_params and kwargs['removeNaN'] and (
-                        curr_ori.latitude.value is None or numpy.isnan(
-                            curr_ori.latitude.value))):
-                        
-                        cut_ev = True
-                        break
-                    
-                    else:
-                        if 'minlat' in cut_params:
-                            if 'minlat_excl' in cut_params and \
-                                kwargs['minlat_excl']:
-                                
-                                if float(
-                                    curr_ori.latitude.value) <= \
-                                        kwargs['minlat']:
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(
-                                curr_ori.latitude.value) < kwargs['minlat']:
-                                
-                                cut_ev = True
-                                break
-                                    
-                        if 'maxlat' in cut_params:
-                            if 'maxlat_excl' in cut_params and \
-                                kwargs['maxlat_excl']:
-                                
-                                if float(
-                                    curr_ori.latitude.value) >= \
-                                        kwargs['maxlat']:
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(
-                                curr_ori.latitude.value) > kwargs['maxlat']:
-                                
-                                cut_ev = True
-                                break
-                
-                    # cut longitude
-                    if ('removeNaN' in cut_params and kwargs['removeNaN'] and (
-                        curr_ori.longitude.value is None or numpy.isnan(
-                            curr_ori.longitude.value))):
-                            
-                        cut_ev = True
-                        break
-                    
-                    else:
-                        if 'minlon' in cut_params:
-                            if 'minlon_excl' in cut_params and \
-                                kwargs['minlon_excl']:
-                                
-                                if float(
-                                    curr_ori.longitude.value) <= \
-                                        kwargs['minlon']:
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(
-                                curr_ori.longitude.value) < kwargs['minlon']:
-                                    
-                                cut_ev = True
-                                break
-                                    
-                        if 'maxlon' in cut_params:
-                            if 'maxlon_excl' in cut_params and \
-                                kwargs['maxlon_excl']:
-                                
-                                if float(
-                                    curr_ori.longitude.value) >= \
-                                        kwargs['maxlon']:
-                                    cut_ev = True
-                                    break
-                            elif float(
-                                curr_ori.longitude.value) > kwargs['maxlon']:
-                                
-                                cut_ev = True
-                                break
-                    
-                    # cut depth
-                    if 'removeNaN' in cut_params and kwargs['removeNaN'] and (
-                        curr_ori.depth.value is None or numpy.isnan(
-                            curr_ori.depth.value)):
-                        
-                        cut_ev = True
-                        break
-                    
-                    else:
-                        if 'mindepth' in cut_params:
-                            if 'mindepth_excl' in cut_params and \
-                                kwargs['mindepth_excl']:
-                                
-                                if float(
-                                    curr_ori.depth.value) <= kwargs['mindepth']:
-                                    
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(
-                                curr_ori.depth.value) < kwargs['mindepth']:
-                                
-                                cut_ev = True
-                                break
-                                
-                        if 'maxdepth' in cut_params:
-                            if 'maxdepth_excl' in cut_params and \
-                                kwargs['maxdepth_excl']:
-                                
-                                if float(
-                                    curr_ori.depth.value) >= kwargs['maxdepth']:
-                                    
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(
-                                curr_ori.depth.value) > kwargs['maxdepth']:
-                                
-                                cut_ev = True
-                                break
-                    
-                    # cut time
-                    if 'mintime' in cut_params:
-                        
-                        mintime = QPDateTime.QPDateTime(
-                            ParseDateTimeUTC(kwargs['mintime']))
-                        
-                        if 'mintime_excl' in cut_params and \
-                            kwargs['mintime_excl']:
-                            
-                            if curr_ori.time.value <= mintime:
-                                cut_ev = True
-                                break
-                        
-                        elif curr_ori.time.value < mintime:
-                            cut_ev = True
-                            break
+        # need to go into origins?
+        check_origins = poly_area is not None \
+            or grid is not None \
+            or geometry is not None \
+            or 'minlat' in cut_params or 'maxlat' in cut_params \
+            or 'minlon' in cut_params or 'maxlon' in cut_params \
+            or 'mindepth' in cut_params or 'maxdepth' in cut_params \
+            or 'mintime' in cut_params or 'maxtime' in cut_params
 
-                    if 'maxtime' in cut_params:
-                        
-                        maxtime = QPDateTime.QPDateTime(
-                            ParseDateTimeUTC(kwargs['maxtime']))
-                        
-                        if 'maxtime_excl' in cut_params and \
-                            kwargs['maxtime_excl']:
-                            
-                            if curr_ori.time.value >= maxtime:
-                                cut_ev = True
-                                break
-                        
-                        elif curr_ori.time.value > maxtime:
-                            cut_ev = True
-                            break
-                
-                # origin loop finished    
-                if cut_ev:
-                    self.eventParameters.event.pop(curr_ev_idx)
-                    continue
-                   
-            # need to go into magnitudes?
-            if 'minmag' in cut_params or 'maxmag' in cut_params:
+        # need to go into magnitudes?
+        check_magnitudes = 'minmag' in cut_params or 'maxmag' in cut_params
 
-                for curr_mag in \
-                    self.eventParameters.event[curr_ev_idx].magnitude:
+        if not (check_origins or check_magnitudes):
+            if inplace:
+                return
+            else:
+                return self.view(numpy.ones(self.size, dtype=numpy.bool_))
 
-                    if 'removeNaN' in cut_params and kwargs['removeNaN'] and (
-                        curr_mag.mag.value is None or numpy.isnan(
-                            curr_mag.mag.value)):
-                        
-                        cut_ev = True
-                        break
-                    
-                    else:
-                        if 'minmag' in cut_params:
-                            
-                            if 'minmag_excl' in cut_params and \
-                                kwargs['minmag_excl']:
-                                
-                                if float(
-                                    curr_mag.mag.value) <= kwargs['minmag']:
-                                    
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(curr_mag.mag.value) < kwargs['minmag']:
-                                cut_ev = True
-                                break
+        compact_events = self._compactEvents()
+        if compact_events is not None:
+            cut_ev = self._compactCutMask(compact_events, poly_area, grid,
+                geometry, check_origins, check_magnitudes, kwargs)
+
+            if not inplace:
+                return self.view(~cut_ev)
+
+            self._removeEvents(cut_ev)
+            return
+
+        events = self.eventParameters.event
+        columns = QPCatalogColumns.QPCatalogColumns(events, 
+            origins=check_origins, magnitudes=check_magnitudes)
+
+        cut_ev = numpy.zeros(len(events), dtype=numpy.bool_)
+
+        # NaN values do not meet any limit
+        numpy_err = numpy.seterr(invalid='ignore')
+        try:
+            if check_origins:
+                cut_ori = numpy.zeros(len(columns.origins), dtype=numpy.bool_)
+
+                for name in ('lat', 'lon', 'depth'):
+                    values = getattr(columns, name)
+
+                    if removeNaN:
+                        cut_ori |= numpy.isnan(values)
+
+                    cut_ori |= limitMask(values, name, kwargs)
+
+                for limit in ('mintime', 'maxtime'):
+                    if limit in cut_params:
+                        cut_ori |= self._timeLimitMask(columns, limit, kwargs)
+
+                cut_ev |= columns.eventMask(columns.originEvent, cut_ori)
+
+            if check_magnitudes:
+                cut_mag = limitMask(columns.mag, 'mag', kwargs)
+
+                if removeNaN:
+                    cut_mag |= numpy.isnan(columns.mag)
+
+                cut_ev |= columns.eventMask(columns.magnitudeEvent, cut_mag)
+
+        finally:
+            numpy.seterr(**numpy_err)
+
+        # check location of origins of remaining events, points on
+        # boundary of polygon/geometry are inside
+        if poly_area is not None or grid is not None or geometry is not None:
+            outside = outsideMask(columns.lon, columns.lat, columns.depth,
+                numpy.flatnonzero(~cut_ev[columns.originEvent]), poly_area,
+                grid, geometry)
+
+            cut_ev |= columns.eventMask(columns.originEvent, outside)
+
+        if not inplace:
+            return self.view(~cut_ev)
+
+        self._removeEvents(cut_ev)
 
-                        if 'maxmag' in cut_params:
-                            
-                            if 'maxmag_excl' in cut_params and \
-                                kwargs['maxmag_excl']:
-                                
-                                if float(
-                                    curr_mag.mag.value) >= kwargs['maxmag']:
-                                    
-                                    cut_ev = True
-                                    break
-                            
-                            elif float(curr_mag.mag.value) > kwargs['maxmag']:
-                                cut_ev = True
-                                break    
-                
-                # mag loop finished
-                if cut_ev:
-                    self.eventParameters.event.pop(curr_ev_idx)
-                    continue
+
+    def _compactCutMask(self, events, poly_area, grid, geometry, 
+        check_origins, check_magnitudes, kwargs):
+        """
+        return mask of events of compact event list that do not meet cut
+        criteria (see cut()), evaluated on columns of compact catalog
+        """
+        removeNaN = 'removeNaN' in kwargs and kwargs['removeNaN']
+
+        def columnValues(name, scale=1.0):
+            values = events.column(name)
+            if values is None:
+                return numpy.nan * numpy.ones(len(events), dtype=numpy.float_)
+            else:
+                return scale * values
+
+        cut_ev = numpy.zeros(len(events), dtype=numpy.bool_)
+
+        # origin depth is in metres, compact catalog depth in km
+        lat = columnValues('lat')
+        lon = columnValues('lon')
+        depth = columnValues('depth', 1000.0)
+
+        numpy_err = numpy.seterr(invalid='ignore')
+        try:
+            if check_origins:
+                for name, values in (('lat', lat), ('lon', lon), 
+                    ('depth', depth)):
+
+                    if removeNaN:
+                        cut_ev |= numpy.isnan(values)
+
+                    cut_ev |= limitMask(values, name, kwargs)
+
+                # compare decimal years of origin times and time limits
+                time_limits = {}
+                for limit in ('mintime', 'maxtime'):
+                    if limit in kwargs:
+                        time_limits[limit] = QPUtils.decimalYear(
+                            ParseDateTimeUTC(kwargs[limit]))
+                        time_limits['%s_excl' % limit] = kwargs.get(
+                            '%s_excl' % limit, False)
+
+                cut_ev |= limitMask(columnValues('time'), 'time', time_limits)
+
+            if check_magnitudes:
+                mag = columnValues('mag')
+                cut_ev |= limitMask(mag, 'mag', kwargs)
+
+                if removeNaN:
+                    cut_ev |= numpy.isnan(mag)
+
+        finally:
+            numpy.seterr(**numpy_err)
+
+        if poly_area is not None or grid is not None or geometry is not None:
+            cut_ev |= outsideMask(lon, lat, depth, numpy.flatnonzero(~cut_ev),
+                poly_area, grid, geometry)
+
+        return cut_ev
+
+
+    def filter(self, predicate, inplace=True):
+        """
+        Filter catalog with predicate expression (see QPCatalogFilter), 
+        evaluated for preferred origin and magnitude of each event.
+
+        Input:
+            predicate   QPCatalogFilter.Predicate object, e.g.
+                        (Field('mag') >= 4.0) & Within(polygon)
+            inplace     True: remove events that do not pass from catalog
+                        (default, as in cut())
+                        False: return view of catalog with events that 
+                        pass (QPCatalogView), catalog is not changed
+
+        """
+
+        keep = predicate.evaluate(QPCatalogFilter.EventColumns(
+            self.eventParameters.event))
+
+        if not inplace:
+            return self.view(keep)
+
+        self._removeEvents(~keep)
+
+
+    def assignRegions(self, regions, views=False):
+        """
+        Assign events to regions by epicenter of preferred origin, in one 
+        pass over all events (see QPRegionIndex).
+
+        Input:
+            regions     sequence of regions, or dict region id -> region
+                        region can be QPPolygon object, list of polygon
+                        vertices (lon, lat), or Shapely geometry
+            views       False: return list with region id of each event,
+                        None if event is not in any region (default)
+                        True: return dict region id -> view of catalog 
+                        with events of region (QPCatalogView)
+
+        Region ids are positions in sequence, or keys of dict. Events on
+        boundary of a region belong to region. If regions overlap, events
+        are assigned to first region (in order of sequence, or of sorted 
+        dict keys).
+
+        """
+
+        if isinstance(regions, QPRegionIndex.QPRegionIndex):
+            region_index = regions
+        else:
+            region_index = QPRegionIndex.QPRegionIndex(regions)
+
+        columns = QPCatalogFilter.EventColumns(self.eventParameters.event)
+        region_idx = region_index.locate(
+            columns.column(QPCatalogFilter.FIELD_ALIASES['lon'])[1],
+            columns.column(QPCatalogFilter.FIELD_ALIASES['lat'])[1])
+
+        if not views:
+            return [region_index.ids[idx] if idx >= 0 else None for idx in \
+                region_idx]
+
+        region_views = {}
+        for idx, region_id in enumerate(region_index.ids):
+            region_views[region_id] = self.view(region_idx == idx)
+
+        return region_views
+
+
+    def _removeEvents(self, mask):
+        """
+        remove events for which mask is True, rebuild event list in one pass
+        """
+        events = self.eventParameters.event
+
+        if self._compactEvents() is not None:
+            # only events that have been created can be in index
+            removed_events = events.removeRows(numpy.asarray(mask, 
+                dtype=numpy.bool_))
+        else:
+            removed_events = [ev for ev, cut in zip(events, mask) if cut]
+
+            if removed_events:
+                events[:] = [ev for ev, cut in zip(events, mask) if not cut]
+
+        if removed_events and getattr(self, '_index', None) is not None:
+            self._index.removeEvents(removed_events)
+
+
+    def _timeLimitMask(self, columns, limit, kwargs):
+        """
+        return mask of origins that do not meet time limit 'mintime' or
+        'maxtime' (with optional '_excl' flag in kwargs)
+
+        origin times that are not set or that differ from limit by less
+        than comparison epsilon are compared with QPDateTime operators
+        """
+        limit_time = QPDateTime.QPDateTime(ParseDateTimeUTC(kwargs[limit]))
+        exclude = '%s_excl' % limit in kwargs and kwargs['%s_excl' % limit]
+
+        time_diff = columns.timeDifference(limit_time.datetime)
+
+        # margin covers epsilon of QPDateTime comparison and rounding of
+        # time differences
+        undecided = ~columns.timeDefined | (numpy.abs(time_diff) <= (
+            columns.timeEpsilon + TIME_CMP_MARGIN))
+
+        if limit == 'mintime':
+            if exclude:
+                mask = time_diff <= 0.0
+            else:
+                mask = time_diff < 0.0
+        else:
+            if exclude:
+                mask = time_diff >= 0.0
+            else:
+                mask = time_diff > 0.0
+
+        for ori_idx in numpy.flatnonzero(undecided):
+            ori_time = columns.origins[ori_idx].time.value
+
+            if limit == 'mintime':
+                if exclude:
+                    mask[ori_idx] = ori_time <= limit_time
+                else:
+                    mask[ori_idx] = ori_time < limit_time
+            else:
+                if exclude:
+                    mask[ori_idx] = ori_time >= limit_time
+                else:
+                    mask[ori_idx] = ori_time > limit_time
+
+        return mask
 
 
     def rebin(self, binsize=DEFAULT_MAG_REBIN_BINSIZE, allorigins=True):
-        
+
+        # catalog index for lookups of magnitudes
+        index = self.index
+
         # loop over events
         for curr_ev in self.eventParameters.event:
             
             # if allorgins=False, rebin only preferred origins, otherwise all
             if not allorigins:
-                curr_ori = curr_ev.getPreferredOrigin()
+                curr_ori = curr_ev.getPreferredOrigin(index)
                 
                 # rebin all magnitudes
-                for curr_mag_idx in curr_ev.getMagnitudesIdx(curr_ori):
+                for curr_mag_idx in curr_ev.getMagnitudesIdx(curr_ori,
+                    index):
                     
                     curr_mag_value = curr_ev.magnitude[curr_mag_idx].mag.value
                     curr_ev.magnitude[curr_mag_idx].mag.value = \
@@ -5360,7 +5825,8 @@ class QPCatalog(QPCore.QPObject):
                 for curr_ori in curr_ev.origin:
                     
                     # rebin all magnitudes
-                    for curr_mag_idx in curr_ev.getMagnitudesIdx(curr_ori):
+                    for curr_mag_idx in curr_ev.getMagnitudesIdx(curr_ori,
+                        index):
                         
                         curr_mag_value = \
                             curr_ev.magnitude[curr_mag_idx].mag.value
@@ -5374,6 +5840,25 @@ class QPCatalog(QPCore.QPObject):
         """Return event count of a catalogue."""
         
         return len(self.eventParameters.event)
+
+
+    def __iter__(self):
+        """Iterate over events of catalog."""
+
+        return iter(self.eventParameters.event)
+
+
+    def view(self, mask_or_indices):
+        """
+        Return view of catalog (QPCatalogView) with a subset of its events.
+        Event objects are shared, not copied.
+
+        mask_or_indices: boolean sequence with one entry for each event,
+                         or sequence of event positions
+        
+        """
+
+        return QPCatalogView(self, mask_or_indices)
     
     
     def timeSpan(self):
@@ -5381,40 +5866,81 @@ class QPCatalog(QPCore.QPObject):
         Compute time span of events (use preferred origins).
         
         Returns a triple of time difference (in years), start time, end time
+
+        Start and end time are taken from time index of catalog, or from
+        time column of compact catalog (see fromCompact()). Events without
+        origin time are ignored.
         
         """
+
+        compact_events = self._compactEvents()
+        if compact_events is not None:
+            return compactTimeSpan(compact_events)
         
-        time_start = None
-        time_end = None
-        
-        for curr_ev in self.eventParameters.event:
-            curr_ori = curr_ev.getPreferredOrigin()
-            curr_time = curr_ori.time.value
-            
-            if time_start is None:
-                time_start = curr_time
-                time_end = curr_time
-            else:
-                if curr_time < time_start:
-                    time_start = curr_time
-                elif curr_time > time_end:
-                    time_end = curr_time
+        time_index = self.timeIndex
+
+        if len(time_index) == 0:
+            raise IndexError, \
+                "QPCatalog::timeSpan - no events with origin time"
+
+        time_start = time_index.startTime
+        time_end = time_index.endTime
                     
         time_diff = QPDateTime.diffQPDateTime(time_end, time_start)
         
-        # TODO(fab): remove magic number, account for leap year
-        return (
-            time_diff.days / 365.25, time_start.datetime, time_end.datetime)
+        # TODO(fab): account for leap year
+        return (time_diff.days / QPUtils.DAYS_PER_YEAR, time_start.datetime,
+            time_end.datetime)
+
+
+    def select_time(self, starttime=None, endtime=None):
+        """
+        Return view of catalog (QPCatalogView) with events whose preferred
+        origin time is in interval starttime <= time < endtime. Events are
+        kept in order of this catalog.
+
+        starttime/endtime can be QPDateTime or mx.DateTime objects, ISO 
+        strings, or seconds since 1970-01-01. None: no limit
+
+        If catalog is backed by a compact catalog, the time column is 
+        compared with the limits, no event objects are created.
+        
+        """
+
+        compact_events = self._compactEvents()
+        if compact_events is not None:
+            return self.view(compactTimeSelection(compact_events, starttime,
+                endtime))
+
+        return self.view(numpy.sort(self.timeIndex.select(starttime, 
+            endtime)))
 
 
     def getFmd(self, allorigins=False, **kwargs):
         """
         Compute and return frequency-magnitude distribution (FMD) object.
+
+        Time span of events is taken from time index of catalog, if not
+        given as 'time_span' parameter.
+
+        If catalog is backed by a compact catalog (see fromCompact()), 
+        magnitudes are taken from its magnitude column.
         
         """
+
+        if kwargs.get('time_span') is None:
+            try:
+                kwargs['time_span'] = self.timeSpan()[0]
+            except IndexError:
+                pass
+
+        compact_events = self._compactEvents()
+        if compact_events is not None and \
+            compact_events.column('mag') is not None:
+            kwargs['magnitudes'] = compact_events.column('mag').tolist()
         
         self.frequencyMagnitudeDistribution = \
-            qpfmd.FrequencyMagnitudeDistribution( 
+            quakepy.qpfmd.FrequencyMagnitudeDistribution( 
                 self.eventParameters, **kwargs)
         
         return self.frequencyMagnitudeDistribution
@@ -5426,7 +5952,7 @@ class QPCatalog(QPCore.QPObject):
         
         """
         
-        self.cumulativeDistribution = cumuldist.CumulativeDistribution(
+        self.cumulativeDistribution = quakepy.cumuldist.CumulativeDistribution(
             self.eventParameters)
         
         return self.cumulativeDistribution 
@@ -5435,23 +5961,56 @@ class QPCatalog(QPCore.QPObject):
     def toCompact(self):
         """
         Return compact catalog object from  current catalog.
+
+        If catalog is backed by a compact catalog, rows of its events are
+        copied.
         
         """
+
+        compact_events = self._compactEvents()
+        if compact_events is not None:
+            return compact_events.toCompact()
         
         compact = QPCatalogCompact.QPCatalogCompact()
-        compact.update(self.catalog)
+        compact.update(self)
 
         return compact
 
 
     def fromCompact(self, compact):
         """
-        TODO(fab): Return full catalog from compact catalog.
+        Replace events of catalog by events of compact catalog 
+        (QPCatalogCompact), return catalog.
+
+        Catalog is backed by compact catalog: an event object (with
+        preferred origin, magnitude and focal mechanism) is created when it
+        is accessed for the first time (see QPCatalogCompact.
+        CompactEventList). cut(), getFmd(), timeSpan(), exportZMAP() and 
+        toCompact() work on the columns of the compact catalog, views
+        share the compact catalog. Adding or removing events otherwise 
+        creates all events and ends backing.
         
         """
-        
-        raise NotImplementedError, \
-            "compact catalog to full catalog not yet implemented"
+
+        self.eventParameters.event = QPCatalogCompact.CompactEventList(
+            QPCatalogCompact.CompactEventStore(compact, 
+                self.eventParameters.elementAxis))
+
+        return self
+
+
+    def _compactEvents(self):
+        """
+        return event list if catalog is backed by compact catalog, None
+        otherwise
+        """
+        events = self.eventParameters.event
+
+        if isinstance(events, QPCatalogCompact.CompactEventList) and \
+            events.isCompact():
+            return events
+        else:
+            return None
     
     
     def origin_without_quality(self, ori):
@@ -5469,7 +6028,7 @@ class QPCatalog(QPCore.QPObject):
         
         """
         
-        if origin_without_quality(ori):
+        if self.origin_without_quality(ori):
             ori.quality = OriginQuality()
 
 
@@ -5489,5 +6048,213 @@ class QPCatalog(QPCore.QPObject):
         
         """
         
-        if object_without_creationinfo(obj):
+        if self.object_without_creationinfo(obj):
             obj.creationInfo = CreationInfo()
+
+
+class QPCatalogView(QPCatalog):
+    """
+    QuakePy: QPCatalogView
+    catalog with a subset of the events of another catalog
+
+    event objects are shared with the viewed catalog. eventParameters is a
+    shallow copy of eventParameters of the viewed catalog (publicID, 
+    description, comments and creationInfo are shared) with its own event
+    list, which is a snapshot of the selected events. Changes of the event
+    list of the viewed catalog do not affect the view and vice versa
+
+    views can be chained, base is the catalog that is not a view
+    """
+
+    def __init__(self, catalog, mask_or_indices):
+
+        # QPCatalog.__init__() is not called, view shares eventParameters
+        # attributes and creates no new publicID
+        QPCore.QPObject.__init__(self)
+        self.setElementAxis(QPCore.ROOT_ELEMENT_AXIS)
+
+        if isinstance(catalog, QPCatalogView):
+            self.base = catalog.base
+        else:
+            self.base = catalog
+
+        events = catalog.eventParameters.event
+        positions = viewPositions(mask_or_indices, len(events))
+
+        self.eventParameters = copy.copy(catalog.eventParameters)
+
+        if isinstance(events, QPCatalogCompact.CompactEventList):
+            self.eventParameters.event = events.subset(positions)
+        else:
+            self.eventParameters.event = [events[idx] for idx in positions]
+
+
+def viewPositions(mask_or_indices, size):
+    """
+    return array of event positions for boolean mask or sequence of
+    positions
+    """
+    selection = numpy.asarray(mask_or_indices)
+
+    if selection.dtype == numpy.bool_:
+        if selection.shape != (size,):
+            raise ValueError, \
+                "QPCatalog::view - mask does not match number of events"
+        return numpy.flatnonzero(selection)
+
+    elif selection.size == 0:
+        return numpy.zeros(0, dtype=numpy.int_)
+
+    elif issubclass(selection.dtype.type, numpy.integer):
+        return selection.ravel()
+
+    else:
+        raise TypeError, \
+            "QPCatalog::view - selection must be boolean mask or positions"
+
+
+def mapImportTasks(function, tasks, workers):
+    """
+    return list of results of function for import tasks, called in pool of
+    worker processes, or in this process for one worker
+    """
+    if workers == 1:
+        return [function(task) for task in tasks]
+
+    generator = QPCore.QPPublicObject.getPublicIDGenerator()
+    if generator.style in ('numeric', 'short'):
+        raise ValueError, "QPCatalog - publicID style %s is not unique "\
+            "across worker processes" % generator.style
+
+    pool = multiprocessing.Pool(workers, initImportWorker, 
+        (generator, QPCore.QPObject.getSlottedObjects()))
+    try:
+        results = pool.map(function, tasks, chunksize=1)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    return results
+
+
+def initImportWorker(generator, slotted):
+    """
+    set up worker process of QPCatalog.importMany() and importSharded(): 
+    publicID generator of same style as generator, in namespace of worker
+    process
+    """
+    namespace = "%s.%s" % (generator.namespace, os.getpid())
+
+    if generator.style in QPCore.PUBLIC_ID_GENERATORS:
+        generator = QPCore.createPublicIDGenerator(generator.style, 
+            namespace)
+    else:
+        generator.namespace = namespace
+
+    QPCore.QPPublicObject.setPublicIDGenerator(generator)
+    QPCore.QPObject.setSlottedObjects(slotted)
+
+
+def importFileEvents(task):
+    """
+    import file of task (format, input, kwargs) into new catalog, returns
+    (list of events, report dict), see QPCatalog.importMany()
+    """
+    format, input, kwargs = task
+
+    report = {'input': input, 'format': format, 'events': 0, 
+        'seconds': 0.0, 'error': None}
+    catalog = QPCatalog()
+
+    start_time = time.time()
+    try:
+        report['format'] = catalog.importAny(input, format, **kwargs)
+    except Exception, e:
+        report['error'] = "%s: %s" % (e.__class__.__name__, e)
+        report['seconds'] = time.time() - start_time
+        return ([], report)
+
+    report['seconds'] = time.time() - start_time
+    report['events'] = catalog.size
+
+    return (list(catalog.eventParameters.event), report)
+
+
+def importShardEvents(task):
+    """
+    import shard of task (format, shard, kwargs) into new catalog, returns
+    list of events, see QPCatalog.importSharded()
+    """
+    format, shard, kwargs = task
+
+    catalog = QPCatalog()
+    catalog.importAny(shard, format, **kwargs)
+
+    return list(catalog.eventParameters.event)
+
+
+def outsideMask(lon, lat, depth, rows, poly_area=None, grid=None, 
+    geometry=None):
+    """
+    return mask of origins (given by coordinate arrays) that are outside
+    of polygon, grid, or geometry, only origins at positions rows are
+    checked, in one batch. Points on boundary of polygon/geometry are inside
+    """
+    outside = numpy.zeros(len(lon), dtype=numpy.bool_)
+
+    if poly_area is not None:
+        outside[rows] |= ~poly_area.contains_points(lon[rows], lat[rows])
+
+    if grid is not None:
+        outside[rows] |= (grid.locate(lat[rows], lon[rows], depth[rows]) < 0)
+
+    if geometry is not None:
+        outside[rows] |= ~QPPolygon.geometryContainsPoints(geometry,
+            lon[rows], lat[rows])
+
+    return outside
+
+
+def compactTimeSpan(events):
+    """
+    return time span of events of compact event list, as in 
+    QPCatalog.timeSpan()
+    """
+    times = events.column('time')
+
+    if times is not None:
+        times = times[~numpy.isnan(times)]
+
+    if times is None or len(times) == 0:
+        raise IndexError, \
+            "QPCatalog::timeSpan - no events with origin time"
+
+    time_start = QPUtils.fromDecimalYear(times.min())
+    time_end = QPUtils.fromDecimalYear(times.max())
+
+    return ((time_end - time_start).days / QPUtils.DAYS_PER_YEAR, time_start,
+        time_end)
+
+
+def compactTimeSelection(events, starttime=None, endtime=None):
+    """
+    return positions of events of compact event list with starttime <= 
+    time < endtime, in order of event list, as in QPCatalog.select_time()
+    """
+    times = events.column('time')
+
+    if times is None:
+        return numpy.zeros(0, dtype=numpy.int_)
+
+    selected = ~numpy.isnan(times)
+
+    if starttime is not None:
+        selected &= (times >= QPCatalogTimeIndex.toDecimalYear(starttime))
+
+    if endtime is not None:
+        selected &= (times < QPCatalogTimeIndex.toDecimalYear(endtime))
+
+    return numpy.flatnonzero(selected)
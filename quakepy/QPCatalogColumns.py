@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import numpy
+
+# columns of origin values: column name -> attribute of Origin
+ORIGIN_VALUE_COLUMNS = (('lat', 'latitude'), ('lon', 'longitude'),
+    ('depth', 'depth'))
+
+# first names of attribute paths of QPEventColumns: preferred object of
+# event -> getter of Event
+PREFERRED_OBJECT_GETTERS = {
+    'origin': 'getPreferredOrigin',
+    'magnitude': 'getPreferredMagnitude',
+    'focalMechanism': 'getPreferredFocalMechanism'
+}
+
+
+class QPCatalogColumns(object):
+    """
+    QuakePy: QPCatalogColumns
+    columnar snapshot of origin and magnitude values of a list of events,
+    one row for each origin / magnitude (not only preferred ones)
+
+    origin rows:
+        origins         list of Origin objects
+        originEvent     position of event in event list (int)
+        lat, lon, depth float, NaN if value is not set
+        timeDate        absolute date of origin time in days (int)
+        timeSeconds     seconds of origin time since start of day (float)
+        timeDefined     False if origin has no time value
+        timeEpsilon     largest comparison epsilon of origin times
+
+    magnitude rows:
+        magnitudeEvent  position of event in event list (int)
+        mag             float, NaN if value is not set
+
+    time is held as separate day and seconds parts, so that differences
+    to a reference time are exact to the precision of the seconds part
+    """
+
+    def __init__(self, events, origins=True, magnitudes=True):
+        self.eventCount = len(events)
+
+        if origins:
+            self._extractOrigins(events)
+
+        if magnitudes:
+            self._extractMagnitudes(events)
+
+
+    def _extractOrigins(self, events):
+        self.origins = []
+        origin_event = []
+        values = dict((name, []) for name, attr in ORIGIN_VALUE_COLUMNS)
+        time_date = []
+        time_seconds = []
+        time_defined = []
+        time_epsilon = 0.0
+
+        for ev_idx, ev in enumerate(events):
+            for ori in ev.origin:
+                self.origins.append(ori)
+                origin_event.append(ev_idx)
+
+                for name, attr in ORIGIN_VALUE_COLUMNS:
+                    values[name].append(quantityValue(getattr(ori, attr,
+                        None)))
+
+                time_value = quantityValue(getattr(ori, 'time', None), None)
+                if time_value is not None:
+                    time_date.append(time_value.datetime.absdate)
+                    time_seconds.append(time_value.datetime.abstime)
+                    time_defined.append(True)
+                    time_epsilon = max(time_epsilon, time_value.cmpEpsilon)
+                else:
+                    time_date.append(0)
+                    time_seconds.append(0.0)
+                    time_defined.append(False)
+
+        self.originEvent = numpy.array(origin_event, dtype=numpy.int_)
+
+        for name, attr in ORIGIN_VALUE_COLUMNS:
+            setattr(self, name, numpy.array(values[name], dtype=numpy.float_))
+
+        self.timeDate = numpy.array(time_date, dtype=numpy.int_)
+        self.timeSeconds = numpy.array(time_seconds, dtype=numpy.float_)
+        self.timeDefined = numpy.array(time_defined, dtype=numpy.bool_)
+        self.timeEpsilon = time_epsilon
+
+
+    def _extractMagnitudes(self, events):
+        magnitude_event = []
+        mag = []
+
+        for ev_idx, ev in enumerate(events):
+            for curr_mag in ev.magnitude:
+                magnitude_event.append(ev_idx)
+                mag.append(quantityValue(getattr(curr_mag, 'mag', None)))
+
+        self.magnitudeEvent = numpy.array(magnitude_event, dtype=numpy.int_)
+        self.mag = numpy.array(mag, dtype=numpy.float_)
+
+
+    def timeDifference(self, datetime):
+        """
+        return array of differences of origin times to given mx.DateTime
+        object, in seconds
+        """
+        return (self.timeDate - datetime.absdate) * 86400.0 + (
+            self.timeSeconds - datetime.abstime)
+
+
+    def eventMask(self, rowEvent, rowMask):
+        """
+        reduce mask over origin or magnitude rows to mask over events:
+        event is True if it has at least one row that is True
+        """
+        mask = numpy.zeros(self.eventCount, dtype=numpy.bool_)
+        mask[rowEvent[rowMask]] = True
+        return mask
+
+
+class QPEventColumns(object):
+    """
+    QuakePy: QPEventColumns
+    values of attribute paths for a list of events, one row per event
+
+    paths start at preferred origin ('origin'), preferred magnitude 
+    ('magnitude'), preferred focal mechanism ('focalMechanism'), or event 
+    ('event'), e.g. 'origin.quality.azimuthalGap' or ('origin', 'depth', 
+    'value'). Preferred objects are looked up once, on first request
+    """
+
+    def __init__(self, events):
+        self.events = events
+        self.size = len(events)
+
+        self._preferred = {}
+
+
+    def preferred(self, name):
+        """
+        return list of preferred objects (name is key of 
+        PREFERRED_OBJECT_GETTERS), None for events without such object
+        """
+        if name not in self._preferred:
+            try:
+                getter = PREFERRED_OBJECT_GETTERS[name]
+            except KeyError:
+                raise ValueError, "QPEventColumns - illegal start of "\
+                    "attribute path: %s" % name
+
+            self._preferred[name] = [preferredObject(getattr(ev, getter)) \
+                for ev in self.events]
+
+        return self._preferred[name]
+
+
+    def values(self, path):
+        """
+        return list of values of attribute path (string with names 
+        separated by '.' or sequence of names), None if value is missing
+        """
+        if isinstance(path, basestring):
+            path = path.split('.')
+
+        if path[0] == 'event':
+            objects = self.events
+        else:
+            objects = self.preferred(path[0])
+
+        values = []
+        for obj in objects:
+            for name in path[1:]:
+                if obj is None:
+                    break
+                obj = getattr(obj, name, None)
+
+            values.append(obj)
+
+        return values
+
+
+    def floatValues(self, path):
+        """
+        return float array of values of attribute path, NaN if value is
+        missing
+        """
+
+        # numpy converts None to NaN
+        return numpy.array(self.values(path), dtype=numpy.float_)
+
+
+def preferredObject(getter):
+    """
+    return result of getter (getPreferredOrigin, getPreferredMagnitude, 
+    ... of event), None if not found
+    """
+    try:
+        return getter()
+    except IndexError:
+        return None
+
+
+def quantityValue(quantity, default=numpy.nan):
+    """
+    return value of a quantity object, default if quantity or its value
+    is not set
+    """
+    if quantity is None or quantity.value is None:
+        return default
+    else:
+        return quantity.value
@@ -15,6 +15,8 @@ import re
 import gzip, bz2
 
 import cStringIO
+import itertools
+import struct
 
 import math
 import numpy
@@ -37,10 +39,58 @@ from mx.DateTime.ISO import ParseDateTimeUTC
 from QPCore import *
 from QPUtils import *
 
+import QPDateTime
+
+from quakepy import QPCatalogColumns
+from quakepy.QPRecordLayout import floatColumn
+
+from quakepy.datamodel.Event                      import Event
+from quakepy.datamodel.Origin                     import Origin
+from quakepy.datamodel.Magnitude                  import Magnitude
+from quakepy.datamodel.FocalMechanism             import FocalMechanism
+from quakepy.datamodel.NodalPlanes                import NodalPlanes
+from quakepy.datamodel.NodalPlane                 import NodalPlane
+from quakepy.datamodel.OriginUncertainty          import OriginUncertainty
+from quakepy.datamodel.RealQuantity               import RealQuantity
+from quakepy.datamodel.TimeQuantity               import TimeQuantity
+
+# binary compact catalog format:
+#  - prefix: magic string, format version, byte lengths of header and id map
+#  - header: pickled dict with number of rows, column names in order of
+#            data, comment
+#  - id map: pickled list of event publicIDs
+#  - data:   little-endian float64 values, column by column, starting at
+#            next multiple of 8 bytes
+COMPACT_BINARY_MAGIC   = 'QPCOMPCT'
+COMPACT_BINARY_VERSION = 1
+COMPACT_BINARY_PREFIX  = struct.Struct( '<8sIQQ' )
+COMPACT_BINARY_DTYPE   = numpy.dtype( '<f8' )
+
+# row capacity of columns grows by this factor, starting with at least
+# COMPACT_MIN_CAPACITY rows
+COMPACT_GROWTH_FACTOR = 2.0
+COMPACT_MIN_CAPACITY  = 1024
+
+# number of rows formatted at once in text output
+COMPACT_WRITE_CHUNK = 100000
+
+# number of parsed rows converted to columns at once in import
+COMPACT_IMPORT_CHUNK = 100000
+
 
 class QPCatalogCompact( QPObject ):
     """
     QuakePy: QPCatalogCompact
+    catalog as numpy array, one row per event, one column per parameter
+
+    units as in ZMAP format: depth, depth_err and hz_err in km, time as 
+    decimal year
+
+    columns are stored as separate arrays with spare rows (capacity grows
+    geometrically), so that appending events and adding columns do not
+    copy existing columns. catalog is a 2-D view of all columns, columns
+    are copied into one block on first access after a column has been 
+    added or reallocated. Columns and catalog share their data
     """
 
     __standardCols = ( 'lon', 'lat', 'depth', 'time', 'mag' )
@@ -60,6 +110,83 @@ class QPCatalogCompact( QPObject ):
         self.idMap   = []
         self.catalog = None
         self.comment = ''
+
+
+    def __getstate__( self ):
+        state = self.__dict__.copy()
+        
+        # columns are views of catalog
+        del state['_columns']
+        del state['_block']
+        state['catalog'] = self.catalog
+        
+        return state
+
+
+    def __setstate__( self, state ):
+        catalog = state.pop( 'catalog' )
+        self.__dict__.update( state )
+        self.catalog = catalog
+
+
+    def _getCatalog( self ):
+        if len( self._columns ) == 0:
+            return None
+
+        if self._block is None:
+            self._consolidate( len( self._columns[0] ) )
+
+        return self._block[:self._size]
+
+
+    def _setCatalog( self, catalog ):
+        """
+        use columns of 2-D array as columns of compact catalog (not copied),
+        None: empty catalog
+        """
+        if catalog is None:
+            self._columns = []
+            self._block   = None
+            self._size    = 0
+        else:
+            self._block   = catalog
+            self._columns = [ catalog[:, curr_col_ctr] for curr_col_ctr in xrange( catalog.shape[1] ) ]
+            self._size    = catalog.shape[0]
+
+    catalog = property( _getCatalog, _setCatalog )
+
+
+    @property
+    def size( self ):
+        """
+        number of events (rows)
+        """
+        return self._size
+
+
+    def _consolidate( self, capacity ):
+        """
+        copy columns into new block with capacity rows, spare rows are NaN
+        """
+        block = numpy.empty( ( capacity, len( self._columns ) ), dtype=float, order='F' )
+        block[self._size:] = numpy.nan
+
+        for curr_col_ctr, curr_col in enumerate( self._columns ):
+            block[:self._size, curr_col_ctr] = curr_col[:self._size]
+            
+        self._block   = block
+        self._columns = [ block[:, curr_col_ctr] for curr_col_ctr in xrange( block.shape[1] ) ]
+
+
+    def _reserve( self, rows ):
+        """
+        make sure that columns can hold rows, grow capacity geometrically
+        """
+        capacity = len( self._columns[0] )
+        
+        if rows > capacity:
+            self._consolidate( max( rows, COMPACT_MIN_CAPACITY, 
+                                    int( COMPACT_GROWTH_FACTOR * capacity ) ) )
         
 
     def read( self, input, **kwargs ):
@@ -136,37 +263,164 @@ class QPCatalogCompact( QPObject ):
                 if len( curr_comment ) > 0:
                     ostream.write( 'C ' + curr_comment + '\n' )
 
-        # write event lines
-        for curr_ev_idx in xrange( self.catalog.shape[0] ):
+        # write event lines, formatted in chunks of rows
+        fmt = []
+        for curr_col in headerColumns:
+            if curr_col in ( 'time', 'time_err' ):
+                fmt.append( QPCatalogCompact.__floatFmtTime )
+            else:
+                fmt.append( QPCatalogCompact.__floatFmt )
+
+        writeRows( ostream, [ self.column( curr_col ) for curr_col in headerColumns ],
+                   ' '.join( fmt ) + '\n' )
+
+        # close file
+        ostream.close()
+
+
+    def writeBinary( self, output ):
+        """
+        write compact catalog to binary file (see COMPACT_BINARY_MAGIC),
+        output is file name
+        """
+        headerColumns = self.__getOrderedColumns( True )
+
+        if self.catalog is None:
+            catalog = numpy.zeros( ( 0, len( headerColumns ) ), dtype=float )
+        else:
+            catalog = self.catalog
+
+        header = cPickle.dumps( { 'rows':    catalog.shape[0],
+                                  'columns': headerColumns,
+                                  'comment': self.comment }, 2 )
+        idMap = cPickle.dumps( list( self.idMap ), 2 )
+
+        ostream = open( output, 'wb' )
+        try:
+            ostream.write( COMPACT_BINARY_PREFIX.pack( COMPACT_BINARY_MAGIC, 
+                COMPACT_BINARY_VERSION, len( header ), len( idMap ) ) )
+            ostream.write( header )
+            ostream.write( idMap )
+            ostream.write( '\0' * ( -ostream.tell() % COMPACT_BINARY_DTYPE.itemsize ) )
 
-            line_arr = []
-            
             for curr_col in headerColumns:
+                numpy.asarray( catalog[:, self.map[curr_col]], 
+                               dtype=COMPACT_BINARY_DTYPE ).tofile( ostream )
+        finally:
+            ostream.close()
 
-                if curr_col == 'time':
-                    fmt   = QPCatalogCompact.__floatFmtTime
-                    # value = decimalYear( DateTimeFromAbsDays( self.catalog[curr_ev_idx, self.map[curr_col]] ) )
-                    value = self.catalog[curr_ev_idx, self.map[curr_col]]
-                    
-                elif curr_col == 'time_err':
-                    fmt   = QPCatalogCompact.__floatFmtTime
-                    value = self.catalog[curr_ev_idx, self.map[curr_col]]
-                else:
-                    fmt   = QPCatalogCompact.__floatFmt
-                    value = self.catalog[curr_ev_idx, self.map[curr_col]]
-                    
-                line_arr.append( fmt % value )
 
-            ostream.write( ' '.join( line_arr ) + '\n' )
+    def readBinary( self, input, columns=None, mmap=True, withIds=True ):
+        """
+        read compact catalog from binary file written by writeBinary()
+
+        mmap:    if True, catalog is a copy-on-write numpy.memmap of the data
+                 in the file, columns are read from disk on first access
+        columns: read only these columns (and idx column) into memory
+        withIds: if False, id map is not read
+        """
+        istream = open( input, 'rb' )
+        try:
+            prefix = istream.read( COMPACT_BINARY_PREFIX.size )
 
-        # close file
-        ostream.close()
+            if len( prefix ) != COMPACT_BINARY_PREFIX.size:
+                error_str = "QPCatalogCompact.readBinary(): file too short: %s" % input
+                raise ValueError, error_str
 
+            magic, version, headerLength, idMapLength = COMPACT_BINARY_PREFIX.unpack( prefix )
 
-    def importZMAP( self, input, **kwargs ):
+            if magic != COMPACT_BINARY_MAGIC:
+                error_str = "QPCatalogCompact.readBinary(): not a binary compact catalog: %s" % input
+                raise ValueError, error_str
+
+            if version > COMPACT_BINARY_VERSION:
+                error_str = "QPCatalogCompact.readBinary(): unsupported format version %s: %s" % ( 
+                    version, input )
+                raise ValueError, error_str
+
+            header = cPickle.loads( istream.read( headerLength ) )
+
+            if withIds is True:
+                idMap = cPickle.loads( istream.read( idMapLength ) )
+            else:
+                idMap = []
+
+        finally:
+            istream.close()
+
+        rows        = header['rows']
+        fileColumns = header['columns']
+        dataOffset  = COMPACT_BINARY_PREFIX.size + headerLength + idMapLength
+        dataOffset += -dataOffset % COMPACT_BINARY_DTYPE.itemsize
+
+        if columns is not None:
+            for curr_col in columns:
+                if curr_col not in fileColumns:
+                    error_str = "QPCatalogCompact.readBinary(): column %s not in file: %s" % ( 
+                        curr_col, input )
+                    raise ValueError, error_str
+
+            readColumns = [ 'idx' ] + [ curr_col for curr_col in columns if curr_col != 'idx' ]
+        else:
+            readColumns = fileColumns
+
+        if rows == 0:
+            # empty files cannot be memory-mapped
+            catalog = numpy.zeros( ( 0, len( readColumns ) ), dtype=float )
+            
+        else:
+            data = numpy.memmap( input, dtype=COMPACT_BINARY_DTYPE, mode='c', 
+                                 offset=dataOffset, shape=( rows, len( fileColumns ) ), 
+                                 order='F' )
+
+            if columns is None and mmap is True:
+                catalog = data
+            else:
+                catalog = numpy.empty( ( rows, len( readColumns ) ), dtype=float )
+                for curr_col_ctr, curr_col in enumerate( readColumns ):
+                    catalog[:, curr_col_ctr] = data[:, fileColumns.index( curr_col )]
+                del data
+
+        self.map     = dict( [ ( curr_col, curr_col_ctr ) for curr_col_ctr, curr_col in enumerate( readColumns ) ] )
+        self.idMap   = idMap
+        self.catalog = catalog
+        self.comment = header['comment']
+
+
+    def column( self, column, rows=None ):
+        """
+        return values of column for rows (all rows if None), None if
+        catalog has no such column
+        """
+        if column not in self.map:
+            return None
+        elif rows is None:
+            return self._columns[self.map[column]][:self._size]
+        else:
+            return self._columns[self.map[column]][:self._size][rows]
+
+
+    def subset( self, rows ):
         """
+        return new compact catalog with given rows (copy)
+        """
+        compact = QPCatalogCompact()
+        compact.map     = dict( self.map )
+        compact.comment = self.comment
+        
+        if self.catalog is not None:
+            compact.catalog = numpy.array( self.catalog[rows], dtype=float )
+
+        if len( self.idMap ) > 0:
+            compact.idMap = [ self.idMap[curr_row] for curr_row in numpy.arange( len( self.idMap ) )[rows] ]
+
+        return compact
+
 
-        import catalog from ZMAP format (10 or 13 columns)
+    def importZMAP( self, input, **kwargs ):
+        """
+        import catalog from ZMAP format (10 or 13 columns), see 
+        QPCatalog.importZMAP(), into columns lon, lat, depth, time, mag
         
         col   value                     type
          ---   -----                     ----
@@ -184,29 +438,155 @@ class QPCatalogCompact( QPObject ):
           11   horizontal error, in km   float
           12   depth error, in km        float
           13   magnitude error           float
-          
+
+        time column is computed from time components (integer part of 
+        decimal year is year), as for events of QPCatalog
+
+        kwargs: withUncertainties = True - add columns hz_err, depth_err, mag_err
         """
-        
         if isinstance( input, basestring ):
             istream = getQPDataSource( input, **kwargs )
         else:
             istream = input
 
         if 'withUncertainties' in kwargs.keys() and kwargs['withUncertainties'] is True:
-            withUncertainties = True
-            self.map    = { 'idx': 0, 'lon': 1, 'lat': 2, 'time': 3, 'mag': 4, 'depth': 5,
-                            'hz_err': 6, 'depth_err': 7, 'mag_err': 8 }
-            col_indices = ( 3, 0, 1, 2, 5, 6, 10, 11, 12 )
-            
+            columns = ( 'hz_err', 'depth_err', 'mag_err' )
         else:
-            withUncertainties = False
-            self.map    = { 'idx': 0, 'lon': 1, 'lat': 2, 'time': 3, 'mag': 4, 'depth': 5 }
-            col_indices = ( 3, 0, 1, 2, 5, 6 )
+            columns = ()
+
+        self._importRows( zmapRows( istream, len( columns ) > 0 ), columns )
+
+
+    def importANSSUnified( self, input, **kwargs ):
+        """
+        import ANSS unified catalog, see QPCatalog.importANSSUnified(), into
+        columns lon, lat, depth, time, mag (NaN if event has no magnitude)
+
+        kwargs: withUncertainties = True - add columns time_err, hz_err, depth_err, mag_err
+                withMagnitudeType = True - add column mag_type
+        """
+        if isinstance( input, basestring ):
+            istream = getQPDataSource( input, **kwargs )
+        else:
+            istream = input
+
+        withUncertainties = kwargs.get( 'withUncertainties', False ) is True
+        withMagnitudeType = kwargs.get( 'withMagnitudeType', False ) is True
 
-        self.catalog = numpy.loadtxt( istream, usecols=col_indices )
+        columns = ()
+        if withUncertainties is True:
+            columns += ( 'time_err', 'hz_err', 'depth_err', 'mag_err' )
+        if withMagnitudeType is True:
+            columns += ( 'mag_type', )
 
-        # set indices in first columns (replace read-in column)
-        self.catalog[:,self.map['idx']] = range( self.catalog.shape[0] )
+        self._importBlocks( anssUnifiedBlocks( istream, withUncertainties, withMagnitudeType ), columns )
+
+
+    def importPDECompressed( self, input, **kwargs ):
+        """
+        import USGS/NEIC (PDE) catalog in "compressed" format, see 
+        QPCatalog.importPDECompressed(), into columns lon, lat, depth, 
+        time, mag (first given magnitude, NaN if event has no magnitude)
+
+        format has no uncertainties of location or magnitude
+
+        kwargs: withMagnitudeType = True - add column mag_type
+        """
+        if isinstance( input, basestring ):
+            istream = getQPDataSource( input, **kwargs )
+        else:
+            istream = input
+
+        withMagnitudeType = kwargs.get( 'withMagnitudeType', False ) is True
+
+        if withMagnitudeType is True:
+            columns = ( 'mag_type', )
+        else:
+            columns = ()
+
+        self._importBlocks( pdeCompressedBlocks( istream, withMagnitudeType ), columns )
+
+
+    def importJMADeck( self, input, **kwargs ):
+        """
+        import JMA catalog in "deck" format, see QPCatalog.importJMADeck(),
+        into columns lon, lat, depth, time, mag (first valid magnitude, NaN
+        if hypocenter has no magnitude), one row for each hypocenter line.
+        Phase lines are skipped
+
+        kwargs: jmaonly           = True - import only JMA hypocenters
+                withUncertainties = True - add columns time_err, lat_err, lon_err, 
+                                           hz_err, depth_err
+                withMagnitudeType = True - add column mag_type
+        """
+        if isinstance( input, basestring ):
+            istream = getQPDataSource( input, **kwargs )
+        else:
+            istream = input
+
+        jmaOnly           = kwargs.get( 'jmaonly', False ) is True
+        withUncertainties = kwargs.get( 'withUncertainties', False ) is True
+        withMagnitudeType = kwargs.get( 'withMagnitudeType', False ) is True
+
+        columns = ()
+        if withUncertainties is True:
+            columns += ( 'time_err', 'lat_err', 'lon_err', 'hz_err', 'depth_err' )
+        if withMagnitudeType is True:
+            columns += ( 'mag_type', )
+
+        import quakepy.QPCatalog
+
+        self._importBlocks( jmaDeckBlocks( istream, jmaOnly, withUncertainties, withMagnitudeType ),
+                            columns, -3600.0 * quakepy.QPCatalog.JMA_JST_TIME_SHIFT )
+
+
+    def _importRows( self, rows, columns, timeOffset=0.0 ):
+        """
+        replace catalog by parsed rows (iterable of tuples) with values
+        lon, lat, depth, year, month, day, hour, minute, second, mag, and
+        values of additional columns, see _importBlocks(). Rows are 
+        converted to blocks of COMPACT_IMPORT_CHUNK rows
+        """
+        rows = iter( rows )
+        self._importBlocks( ( numpy.array( chunk, dtype=float ) for chunk in 
+                              iter( lambda: list( itertools.islice( rows, COMPACT_IMPORT_CHUNK ) ), [] ) ),
+                            columns, timeOffset )
+
+
+    def _importBlocks( self, blocks, columns, timeOffset=0.0 ):
+        """
+        replace catalog by parsed blocks (iterable of 2-d float arrays), 
+        rows of blocks have values lon, lat, depth, year, month, day, hour, 
+        minute, second, mag, and values of additional columns. Events have 
+        no publicIDs
+
+        timeOffset: seconds added to time (e.g., time zone shift)
+        """
+        self.map     = dict( [ ( curr_col, curr_col_ctr ) for curr_col_ctr, curr_col in 
+                               enumerate( ( 'idx', ) + QPCatalogCompact.__standardCols + tuple( columns ) ) ] )
+        self.idMap   = []
+        self.catalog = numpy.zeros( ( 0, len( self.map ) ), dtype=float )
+
+        for values in blocks:
+
+            if len( values ) == 0:
+                continue
+
+            time = decimalYearsFromComponents( 
+                *[ values[:, curr_idx] for curr_idx in xrange( 3, 9 ) ], offset=timeOffset )
+
+            eventCtr = self._size
+            self._reserve( eventCtr + len( values ) )
+            rows_sel = slice( eventCtr, eventCtr + len( values ) )
+
+            self._columns[0][rows_sel] = numpy.arange( eventCtr, eventCtr + len( values ), dtype=float )
+            
+            # columns lon, lat, depth, time, mag, additional columns
+            for curr_col_ctr, curr_values in enumerate( [ values[:, 0], values[:, 1], values[:, 2], time ] + 
+                                                        [ values[:, curr_idx] for curr_idx in xrange( 9, values.shape[1] ) ] ):
+                self._columns[curr_col_ctr + 1][rows_sel] = curr_values
+
+            self._size = eventCtr + len( values )
 
 
     def exportZMAP( self, output, **kwargs ):
@@ -222,53 +602,46 @@ class QPCatalogCompact( QPObject ):
             withUncertainties = True
         else:
             withUncertainties = False
-            
-        for curr_ev_ctr in xrange( self.catalog.shape[0] ):
-
-            # curr_datetime = DateTimeFromAbsDays( self.catalog[curr_ev_ctr, self.map['time']] )
-            curr_datetime = fromDecimalYear( self.catalog[curr_ev_ctr, self.map['time']] )
-
-            if withUncertainties is False:
-                ostream.write( '\t'.join(
-                              ( '%10.6f' % self.catalog[curr_ev_ctr, self.map['lon']],
-                                '%10.6f' % self.catalog[curr_ev_ctr, self.map['lat']],
-                                '%18.12f' % self.catalog[curr_ev_ctr, self.map['time']],
-                                str( float( curr_datetime.month ) ),
-                                str( float( curr_datetime.day ) ),
-                                str( self.catalog[curr_ev_ctr, self.map['mag']] ),
-                                str( self.catalog[curr_ev_ctr, self.map['depth']] ),
-                                str( float( curr_datetime.hour ) ),
-                                str( float( curr_datetime.minute ) ),
-                                str( curr_datetime.second )
-                              ) ) + '\n' )
+
+        # missing columns are written as NaN
+        nan_column = numpy.nan * numpy.ones( self.size )
+        values = {}
+        for curr_col in ( 'lon', 'lat', 'time', 'mag', 'depth', 'hz_err', 'depth_err', 'mag_err' ):
+            if curr_col in self.map:
+                values[curr_col] = self.column( curr_col )
             else:
-                ostream.write( '\t'.join(
-                              ( '%10.6f' % self.catalog[curr_ev_ctr, self.map['lon']],
-                                '%10.6f' % self.catalog[curr_ev_ctr, self.map['lat']],
-                                '%18.12f' % self.catalog[curr_ev_ctr, self.map['time']],
-                                str( float( curr_datetime.month ) ),
-                                str( float( curr_datetime.day ) ),
-                                str( self.catalog[curr_ev_ctr, self.map['mag']] ),
-                                str( self.catalog[curr_ev_ctr, self.map['depth']] ),
-                                str( float( curr_datetime.hour ) ),
-                                str( float( curr_datetime.minute ) ),
-                                str( curr_datetime.second ),
-                                str( self.catalog[curr_ev_ctr, self.map['hz_err']] ),
-                                str( self.catalog[curr_ev_ctr, self.map['depth_err']] ),
-                                str( self.catalog[curr_ev_ctr, self.map['mag_err']] )
-                              ) ) + '\n' )
+                values[curr_col] = nan_column
+
+        # date and time components of all events at once
+        year, month, day, hour, minute, second = fromDecimalYears( values['time'] )
+
+        # %s formats components and values as str( float ) does
+        columns = [ values['lon'], values['lat'], values['time'], month, day, 
+                    values['mag'], values['depth'], hour, minute, second ]
+        fmt     = '%10.6f\t%10.6f\t%18.12f' + '\t%s' * 7
+
+        if withUncertainties is True:
+            columns.extend( ( values['hz_err'], values['depth_err'], values['mag_err'] ) )
+            fmt += '\t%s' * 3
+
+        writeRows( ostream, columns, fmt + '\n' )
                         
 
     def update( self, qpcatalog, columns = None, **kwargs ):
 
         if columns is None:
             columns = QPCatalogCompact.__standardCols
+
+        for curr_col in columns:
+            if curr_col not in COLUMN_EXTRACTORS:
+                error_msg = "QPCatalogCompact.update(): illegal column type: %s" % curr_col
+                raise ValueError, error_msg
         
         noCols = len( columns ) + 1
 
-        ##  resize catalog, add dimensions of new chunk
+        ##  reserve rows for new chunk
 
-        if self.catalog is None:
+        if len( self._columns ) == 0:
 
             eventCtr = 0
             
@@ -277,11 +650,11 @@ class QPCatalogCompact( QPObject ):
             for col_ctr, col in enumerate( columns ):
                 self.map[col] = col_ctr + 1
             
-            self.catalog = numpy.ones( ( qpcatalog.size, noCols ), dtype=float ) * numpy.nan
+            self.catalog = numpy.ones( ( qpcatalog.size, noCols ), dtype=float, order='F' ) * numpy.nan
 
         else:
 
-            eventCtr = self.catalog.shape[0]
+            eventCtr = self._size
             
             # check if added columns match type of existing cols
             # order key dictionary by value and skip first (index) entry
@@ -292,10 +665,7 @@ class QPCatalogCompact( QPObject ):
                         columns, referenceColumns )
                 raise ValueError, error_msg
             
-            self.catalog.resize( eventCtr + qpcatalog.size, noCols )
-
-        # event.origin.latitude.value
-        # longitude, latitude, depth, time, magnitude
+            self._reserve( eventCtr + qpcatalog.size )
 
         # set comment if present in input QPCatalog and if not yet set
         if len( self.comment ) == 0 and len( qpcatalog.eventParameters.comment ) > 0:
@@ -303,39 +673,43 @@ class QPCatalogCompact( QPObject ):
             for curr_comment in qpcatalog.eventParameters.comment:
                 self.comment = ''.join( ( self.comment, curr_comment.text, '\n' ) )
 
-        # loop over events in input catalog
-        for curr_ev_ctr, curr_ev in enumerate( qpcatalog.eventParameters.event ):
+        events = qpcatalog.eventParameters.event
+        rows   = slice( eventCtr, eventCtr + len( events ) )
 
-            # update first column with id
-            self.catalog[eventCtr + curr_ev_ctr, 0] = float( eventCtr + curr_ev_ctr )
+        # first column is event index
+        self._columns[0][rows] = numpy.arange( eventCtr, eventCtr + len( events ), dtype=float )
+        self.idMap.extend( [ curr_ev.publicID for curr_ev in events ] )
 
-            # update entry in id map
-            self.idMap.append( curr_ev.publicID )
+        # extract columns for all events at once, time column is decimal year
+        source = QPCatalogColumns.QPEventColumns( events )
+        
+        for curr_col_ctr, curr_col in enumerate( columns ):
+            self._columns[curr_col_ctr + 1][rows] = COLUMN_EXTRACTORS[curr_col]( source )
 
-            # get preferred origin and magnitude
-            curr_ori = curr_ev.getPreferredOrigin()
+        self._size = eventCtr + len( events )
 
-            if 'mag' in columns:
-                try:
-                    curr_mag = curr_ev.getPreferredMagnitude()
-                except Exception, e:
-                    print e
-                    raise ValueError
-            else:
-                curr_mag = None
-                
-            # loop over columns to add, time column is decimal year
-            for curr_col_ctr, curr_col in enumerate( columns ):
-                self.catalog[eventCtr + curr_ev_ctr, curr_col_ctr + 1] = \
-                    self.__setColumnValue( curr_col, curr_ev, curr_ori, curr_mag )
 
+    def addColumn( self, column, values=None ):
+        """
+        add column with values (NaN if None), existing columns are not
+        copied
+        """
+        if column in self.map:
+            error_msg = "QPCatalogCompact.addColumn(): column exists: %s" % column
+            raise ValueError, error_msg
 
-    def addColumn( self, column ):
+        if len( self._columns ) == 0:
+            capacity = 0
+        else:
+            capacity = len( self._columns[0] )
+        
+        new_column = numpy.ones( capacity, dtype=float ) * numpy.nan
+        if values is not None:
+            new_column[:self._size] = values
 
-        evCtr  = self.catalog.shape[0]
-        colCtr = self.catalog.shape[1]
-        self.catalog.resize( evCtr, colCtr + 1 )
-        self.map[column] = colCtr + 1
+        self.map[column] = len( self._columns )
+        self._columns.append( new_column )
+        self._block = None
 
 
     def __getOrderedColumns( self, withIdx = False ):
@@ -358,146 +732,744 @@ class QPCatalogCompact( QPObject ):
     def __loadASCIIFile( self, istream ):
         return numpy.loadtxt( istream, comments='C', skiprows=1 )
 
-        
-    def __setColumnValue( self, curr_col, curr_ev, curr_ori, curr_mag ):
 
-        return_value = None
-        
-        if curr_col == 'lon':
-            try:
-                return_value = curr_ori.longitude.value
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'lon_err':
-            try:
-                return_value = curr_ori.longitude.uncertainty
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'lat':
-            try:
-                return_value = curr_ori.latitude.value
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'lat_err':
-            try:
-                return_value = curr_ori.latitude.uncertainty
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'depth':
-            try:
-                return_value = curr_ori.depth.value
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'depth_err':
-            try:
-                return_value = curr_ori.depth.uncertainty
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'time':
-            try:
-                return_value = curr_ori.time.value.toDecimalYear()
-                # return_value = curr_ori.time.value.datetime.absdays
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'time_err':
-            try:
-                return_value = curr_ori.time.uncertainty
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'mag':
-            try:
-                return_value = curr_mag.mag.value
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'mag_err':
-            try:
-                return_value = curr_mag.mag.uncertainty
-            except:
-                return numpy.nan
-            
-        elif curr_col == 'hz_err':
+def writeRows( ostream, columns, fmt ):
+    """
+    write rows of columns (numpy arrays of equal length) to ostream, each
+    row formatted with fmt, in chunks of COMPACT_WRITE_CHUNK rows
+    """
+    if len( columns ) == 0:
+        return
 
-            hzErrorFound = False
-                
-            # look if explicit horizontal error is given in OriginUncertainty object
-            # this overrides possible separate lat/lon errors
-            if len( curr_ori.originUncertainty ) > 0:
-                ou = curr_ori.originUncertainty[0]
-
-                if hasattr( ou, 'horizontalUncertainty' ):
-                    try:
-                        return_value = ou.horizontalUncertainty
-                        hzErrorFound = True
-                    except:
-                        pass
-
-            # if no explicit horizontal error is given, compute horizontal error from lat/lon errors
-            if hzErrorFound is False:
-
-                if ( hasattr( curr_ori.longitude, 'uncertainty' ) and hasattr( curr_ori.latitude, 'uncertainty' ) ):
-
-                    try:
-                        curr_lon_err = curr_ori.longitude.uncertainty
-                        curr_lat_err = curr_ori.latitude.uncertainty
-                        
-                        # math.pi * 6371.0087714 / 180
-                        return_value = math.sqrt( math.pow( curr_lat_err * EARTH_KM_PER_DEGREE, 2 ) +
-                                                  math.pow( curr_lon_err * math.cos(curr_lat * math.pi/180.0) *
-                                                            EARTH_KM_PER_DEGREE, 2 ) )
-                        hzErrorFound = True
-                    except:
-                        pass
-
-                if hzErrorFound is False:
-                    return numpy.nan
-
-        elif curr_col == 'strike1':
-            try:
-                return_value = curr_ev.getPreferredFocalMechanism().nodalPlanes.nodalPlane1.strike.value
-            except:
-                return numpy.nan
-
-        elif curr_col == 'strike2':
-            try:
-                return_value = curr_ev.getPreferredFocalMechanism().nodalPlanes.nodalPlane2.strike.value
-            except:
-                return numpy.nan
-
-        elif curr_col == 'dip1':
-            try:
-                return_value = curr_ev.getPreferredFocalMechanism().nodalPlanes.nodalPlane1.dip.value
-            except:
-                return numpy.nan
-
-        elif curr_col == 'dip2':
-            try:
-                return_value = curr_ev.getPreferredFocalMechanism().nodalPlanes.nodalPlane2.dip.value
-            except:
-                return numpy.nan
-
-        elif curr_col == 'rake1':
-            try:
-                return_value = curr_ev.getPreferredFocalMechanism().nodalPlanes.nodalPlane1.rake.value
-            except:
-                return numpy.nan
-
-        elif curr_col == 'rake2':
-            try:
-                return_value = curr_ev.getPreferredFocalMechanism().nodalPlanes.nodalPlane2.rake.value
-            except:
-                return numpy.nan
-                
+    rows = len( columns[0] )
+    for chunk_start in xrange( 0, rows, COMPACT_WRITE_CHUNK ):
+        chunk = numpy.column_stack( [ curr_col[chunk_start:chunk_start+COMPACT_WRITE_CHUNK] 
+                                      for curr_col in columns ] ).tolist()
+        ostream.write( ''.join( [ fmt % tuple( curr_row ) for curr_row in chunk ] ) )
+
+
+def floatOrNaN( value_str ):
+    """
+    return float value of string, NaN if string is not a number
+    """
+    try:
+        return float( value_str )
+    except ValueError:
+        return numpy.nan
+
+
+def zmapRows( istream, withUncertainties=False ):
+    """
+    generate rows for QPCatalogCompact._importRows() from ZMAP lines
+    """
+    import quakepy.QPCatalog
+
+    for line_ctr, line in enumerate( istream ):
+
+        zmap_pars = line.split()
+
+        if len( zmap_pars ) < quakepy.QPCatalog.ZMAP_PARAMETER_COUNT:
+            error_str = "format error in input file, line %s: %s" % ( line_ctr+1, line )
+            raise RuntimeError, error_str
+
+        row = ( float( zmap_pars[0] ), float( zmap_pars[1] ), float( zmap_pars[6] ),
+                float( zmap_pars[2] ), float( zmap_pars[3] ), float( zmap_pars[4] ),
+                float( zmap_pars[7] ), float( zmap_pars[8] ), float( zmap_pars[9] ),
+                float( zmap_pars[5] ) )
+
+        if withUncertainties is True:
+            if len( zmap_pars ) >= quakepy.QPCatalog.ZMAP_WITH_UNCERTAINTIES_PARAMETER_COUNT:
+                row += ( floatOrNaN( zmap_pars[10] ), floatOrNaN( zmap_pars[11] ), 
+                         floatOrNaN( zmap_pars[12] ) )
+            else:
+                row += ( numpy.nan, numpy.nan, numpy.nan )
+
+        yield row
+
+
+def lineBlocks( istream, accept ):
+    """
+    generate numpy string arrays of accepted lines of input stream, from
+    chunks of COMPACT_IMPORT_CHUNK lines
+    """
+    istream = iter( istream )
+    for chunk in iter( lambda: list( itertools.islice( istream, COMPACT_IMPORT_CHUNK ) ), [] ):
+
+        lines = [ line for line in chunk if accept( line ) ]
+        if lines:
+            yield numpy.array( lines, dtype=numpy.string_ )
+
+
+def magnitudeTypeCodes( magTypes ):
+    """
+    return float array of codes of magnitude types (None for missing
+    type), see magnitudeTypeCode()
+    """
+    return numpy.array( [ magnitudeTypeCode( curr_type ) for curr_type in magTypes ], dtype=float )
+
+
+# ANSS magnitude type codes (lower case) -> magnitude type
+ANSS_MAGNITUDE_TYPES = { 'b': 'MB', 'l': 'ML', 'l1': 'ML', 'l2': 'ML', 's': 'MS', 
+                         'w': 'MW', 'e': 'ME', 'c': 'Mc', 'd': 'Md' }
+
+def anssUnifiedBlocks( istream, withUncertainties=False, withMagnitudeType=False ):
+    """
+    generate blocks for QPCatalogCompact._importBlocks() from ANSS unified 
+    catalog lines, decoded with record layouts of QPCatalog. Lines w/o 
+    valid location are skipped
+    """
+    import quakepy.QPCatalog
+
+    if withUncertainties is True:
+        fields = ( 'time_err', 'hz_err', 'depth_err' )
+    else:
+        fields = ()
+
+    for lines in lineBlocks( istream, lambda line: 
+        len( line.strip() ) >= quakepy.QPCatalog.ANSS_MINIMUM_LINE_LENGTH ):
+
+        loc, valid = quakepy.QPCatalog.ANSS_LOCATION_LAYOUT.decodeBlock( lines, fields )
+
+        lines = lines[valid]
+        loc   = dict( [ ( key, values[valid] ) for key, values in loc.iteritems() ] )
+
+        line_length = numpy.char.str_len( numpy.char.strip( lines ) )
+
+        # $mag block
+        mag      = numpy.empty( len( lines ) )
+        mag_err  = numpy.empty( len( lines ) )
+        mag.fill( numpy.nan )
+        mag_err.fill( numpy.nan )
+        mag_type = [ None ] * len( lines )
+
+        has_mag = numpy.flatnonzero( line_length > quakepy.QPCatalog.ANSS_MINIMUM_LINE_LENGTH_MAGNITUDE )
+        if len( has_mag ) > 0:
+            mag_info, mag_valid = quakepy.QPCatalog.ANSS_MAGNITUDE_LAYOUT.decodeBlock( 
+                lines[has_mag], ( 'mag', 'mag_type', 'mag_err' ) )
+
+            has_value = ~numpy.isnan( mag_info['mag'] )
+            mag[has_mag]     = mag_info['mag']
+            mag_err[has_mag] = numpy.where( has_value, mag_info['mag_err'], numpy.nan )
+
+            for curr_idx, curr_type in zip( has_mag[has_value], 
+                                            numpy.char.lower( mag_info['mag_type'][has_value] ) ):
+                mag_type[curr_idx] = ANSS_MAGNITUDE_TYPES.get( curr_type )
+
+        columns = [ loc['lon'], loc['lat'], loc['depth'], loc['year'], loc['month'], loc['day'], 
+                    loc['hour'], loc['minute'], loc['second'], mag ]
+
+        if withUncertainties is True:
+            hz_err = loc['hz_err'].copy()
+
+            # horizontal error from lat/lon errors of $addloc block
+            addloc = numpy.flatnonzero( numpy.isnan( hz_err ) & 
+                ( line_length > quakepy.QPCatalog.ANSS_MINIMUM_LINE_LENGTH_ADDITIONAL ) )
+
+            if len( addloc ) > 0:
+                addloc_info, addloc_valid = quakepy.QPCatalog.ANSS_ADDITIONAL_LOCATION_LAYOUT.decodeBlock( 
+                    lines[addloc], ( 'lat_err', 'lon_err' ) )
+
+                lat     = loc['lat'][addloc]
+                lat_err = addloc_info['lat_err'] / EARTH_KM_PER_DEGREE
+
+                lon_err = numpy.where( numpy.abs( lat ) == 90.0, 0.0,
+                    addloc_info['lon_err'] / ( EARTH_KM_PER_DEGREE * numpy.cos( numpy.radians( lat ) ) ) )
+
+                hz_err[addloc] = horizontalError( lat, lat_err, lon_err )
+
+            columns.extend( ( loc['time_err'], hz_err, loc['depth_err'], mag_err ) )
+
+        if withMagnitudeType is True:
+            columns.append( magnitudeTypeCodes( mag_type ) )
+
+        yield numpy.column_stack( columns )
+
+
+def pdeCompressedBlocks( istream, withMagnitudeType=False ):
+    """
+    generate blocks for QPCatalogCompact._importBlocks() from PDE lines,
+    decoded with record layout of QPCatalog. Lines w/o valid location are 
+    skipped
+    """
+    import quakepy.QPCatalog
+
+    fields = [ 'minute', 'second', 'depth', 'mag1', 'mag2', 'mag3', 'mag4' ]
+    if withMagnitudeType is True:
+        fields.extend( ( 'mag3_type', 'mag4_type' ) )
+
+    for lines in lineBlocks( istream, lambda line:
+        len( line.rstrip() ) >= quakepy.QPCatalog.PDE_MINIMUM_LINE_LENGTH ):
+
+        rec, valid = quakepy.QPCatalog.PDE_LAYOUT.decodeBlock( lines, fields )
+        rec = dict( [ ( key, values[valid] ) for key, values in rec.iteritems() ] )
+
+        # minutes and seconds can be missing
+        for key in ( 'minute', 'second' ):
+            rec[key][numpy.isnan( rec[key] )] = 0.0
+
+        # first given magnitude: assign in reverse order
+        mag      = numpy.empty( len( rec['year'] ) )
+        mag.fill( numpy.nan )
+        mag_type = numpy.empty( len( rec['year'] ), dtype=object )
+
+        for mag_key, curr_mag_type in reversed( ( ( 'mag1', 'mb' ), ( 'mag2', 'Ms' ), 
+                                                  ( 'mag3', 'mag3_type' ), ( 'mag4', 'mag4_type' ) ) ):
+            has_value = ~numpy.isnan( rec[mag_key] )
+            mag[has_value] = rec[mag_key][has_value]
+
+            if withMagnitudeType is True:
+                if curr_mag_type in rec:
+                    mag_type[has_value] = [ curr_type or None for curr_type in rec[curr_mag_type][has_value] ]
+                else:
+                    mag_type[has_value] = curr_mag_type
+
+        columns = [ rec['lon'], rec['lat'], rec['depth'], rec['year'], rec['month'], rec['day'], 
+                    rec['hour'], rec['minute'], rec['second'], mag ]
+
+        if withMagnitudeType is True:
+            columns.append( magnitudeTypeCodes( mag_type ) )
+
+        yield numpy.column_stack( columns )
+
+
+# JMA magnitude type codes -> magnitude type, other codes: 'unknown'
+JMA_MAGNITUDE_TYPES = { 'J': 'MJ', 'D': 'MD', 'd': 'MD', 'V': 'MV', 'v': 'MV', 'B': 'mb', 'S': 'MS' }
+
+# letter codes of JMA magnitudes <= -1.0
+JMA_NEGATIVE_MAGNITUDE_CODES = { 'A': '-1', 'B': '-2', 'C': '-3' }
+
+def jmaDeckBlocks( istream, jmaOnly=False, withUncertainties=False, withMagnitudeType=False ):
+    """
+    generate blocks for QPCatalogCompact._importBlocks() from hypocenter 
+    lines of JMA deck format, decoded with record layout of QPCatalog. 
+    Hypocenter lines w/o valid date are skipped, hypocenter lines with 
+    illegal seconds give rows of NaN values (as events w/o origin values 
+    in QPCatalog.importJMADeck())
+    """
+    import quakepy.QPCatalog
+
+    fields = [ 'second_frac', 'lat', 'lon', 'depth', 'mag1', 'mag1_type', 'mag2', 'mag2_type' ]
+    if withUncertainties is True:
+        fields.extend( ( 'time_err', 'lat_err', 'lon_err', 'depth_err' ) )
+
+    if jmaOnly is True:
+        sources = ( 'J', )
+    else:
+        sources = ( 'J', 'U', 'I' )
+
+    # lines starting with source character are not empty
+    for lines in lineBlocks( istream, lambda line: line[:1] in sources ):
+
+        rec, valid = quakepy.QPCatalog.JMA_HYPOCENTER_LAYOUT.decodeBlock( lines, fields )
+        rec = dict( [ ( key, values[valid] ) for key, values in rec.iteritems() ] )
+
+        # seconds are given w/o decimal point
+        second = floatColumn( numpy.char.add( numpy.char.add( 
+            rec['second_int'].astype( numpy.int_ ).astype( numpy.string_ ), '.' ), rec['second_frac'] ) )
+
+        mag      = numpy.empty( len( second ) )
+        mag.fill( numpy.nan )
+        mag_type = numpy.empty( len( second ), dtype=object )
+
+        # first valid magnitude: assign in reverse order
+        for mag_key in ( 'mag2', 'mag1' ):
+            curr_mag  = numpy.array( [ jmaMagnitude( code ) if code else numpy.nan 
+                                       for code in rec[mag_key] ], dtype=float )
+            has_value = ~numpy.isnan( curr_mag )
+
+            mag[has_value]      = curr_mag[has_value]
+            mag_type[has_value] = [ JMA_MAGNITUDE_TYPES.get( curr_type, 'unknown' ) 
+                                    for curr_type in rec['%s_type' % mag_key][has_value] ]
+
+        columns = [ rec['lon'], rec['lat'], rec['depth'], rec['year'], rec['month'], rec['day'], 
+                    rec['hour'], rec['minute'], second, mag ]
+
+        if withUncertainties is True:
+
+            # uncertainties are only set for given values
+            lat_err   = numpy.where( numpy.isnan( rec['lat'] ), numpy.nan, rec['lat_err'] / 60.0 )
+            lon_err   = numpy.where( numpy.isnan( rec['lon'] ), numpy.nan, rec['lon_err'] / 60.0 )
+            depth_err = numpy.where( numpy.isnan( rec['depth'] ), numpy.nan, rec['depth_err'] )
+
+            columns.extend( ( rec['time_err'], lat_err, lon_err, 
+                              horizontalError( rec['lat'], lat_err, lon_err ), depth_err ) )
+
+        if withMagnitudeType is True:
+            columns.append( magnitudeTypeCodes( mag_type ) )
+
+        block = numpy.column_stack( columns )
+
+        # illegal seconds: rows of NaN values
+        block[numpy.isnan( second )] = numpy.nan
+
+        yield block
+
+
+def jmaMagnitude( code ):
+    """
+    return magnitude of two-character JMA magnitude code, NaN if code is
+    missing or illegal, see QPCatalog.importJMADeck()
+    """
+    if not code.strip():
+        return numpy.nan
+
+    # missing last character is read as '0', missing first character is 
+    # illegal
+    if len( code ) > len( code.strip() ):
+        if not code[0].strip():
+            return numpy.nan
+        elif not code[1].strip():
+            code = "%s%s" % ( code[0], '0' )
+
+    try:
+        code_int = int( code )
+    except ValueError:
+
+        # mag. <= -1.0, letter code and digit
+        if code[0] in JMA_NEGATIVE_MAGNITUDE_CODES and code[1].isdigit():
+            return float( '.'.join( ( JMA_NEGATIVE_MAGNITUDE_CODES[code[0]], code[1] ) ) )
+        else:
+            return numpy.nan
+
+    try:
+        if code_int >= 0:
+            return float( '.'.join( ( code[0], code[1] ) ) )
         else:
-            error_msg = "QPCatalogCompact.__setColumnValue(): illegal column type: %s" % curr_col
+            # -1, -2, ..., -9 (-0.9 <= mag <= 0.1)
+            return float( '.'.join( ( '-0', code[1] ) ) )
+    except ( ValueError, IndexError ):
+        return numpy.nan
+
+
+def preferredOrigins( source ):
+    """
+    preferred origins of QPEventColumns object, raises IndexError if an
+    event has no origin (as Event.getPreferredOrigin())
+    """
+    origins = source.preferred( 'origin' )
+    for curr_ori, curr_ev in zip( origins, source.events ):
+        if curr_ori is None:
+            error_msg = "QPCatalogCompact.update(): no preferred origin for event %s" % curr_ev.publicID
+            raise IndexError, error_msg
+
+    return origins
+
+
+def originColumn( *path, **kwargs ):
+    unit = kwargs.get( 'unit', 1.0 )
+    def extractor( source ):
+        preferredOrigins( source )
+        return source.floatValues( ( 'origin', ) + path ) / unit
+    return extractor
+
+
+def magnitudeColumn( *path ):
+    def extractor( source ):
+        return source.floatValues( ( 'magnitude', ) + path )
+    return extractor
+
+
+def focalMechanismColumn( *path ):
+    def extractor( source ):
+        return source.floatValues( ( 'focalMechanism', ) + path )
+    return extractor
+
+
+def extractTime( source ):
+    """
+    origin time as decimal year
+    """
+    values = numpy.ones( len( source.events ), dtype=float ) * numpy.nan
+
+    rows     = []
+    absdates = []
+    abstimes = []
+    for curr_ori_idx, curr_ori in enumerate( preferredOrigins( source ) ):
+        curr_time = getattr( getattr( curr_ori, 'time', None ), 'value', None )
+        if curr_time is not None:
+            rows.append( curr_ori_idx )
+            absdates.append( curr_time.datetime.absdate )
+            abstimes.append( curr_time.datetime.abstime )
+
+    if rows:
+        values[rows] = decimalYears( absdates, abstimes )
+
+    return values
+
+
+def extractMagnitude( source ):
+    """
+    value of preferred magnitude, raises ValueError if an event has no magnitude
+    """
+    for curr_mag, curr_ev in zip( source.preferred( 'magnitude' ), source.events ):
+        if curr_mag is None:
+            error_msg = "QPCatalogCompact.update(): no preferred magnitude for event %s" % curr_ev.publicID
             raise ValueError, error_msg
 
-        return return_value
+    return source.floatValues( ( 'magnitude', 'mag', 'value' ) )
+
+
+def extractHorizontalError( source ):
+    """
+    horizontal error (km) from first OriginUncertainty object of origin (m),
+    or computed from lat/lon errors
+    """
+    values    = numpy.ones( len( source.events ), dtype=float ) * numpy.nan
+    from_ou   = []
+    ou_values = []
+    
+    for curr_ori_idx, curr_ori in enumerate( preferredOrigins( source ) ):
+
+        # explicit horizontal error in OriginUncertainty object overrides
+        # separate lat/lon errors
+        if len( curr_ori.originUncertainty ) > 0 and \
+            hasattr( curr_ori.originUncertainty[0], 'horizontalUncertainty' ):
+            from_ou.append( curr_ori_idx )
+            ou_values.append( curr_ori.originUncertainty[0].horizontalUncertainty )
+
+    latlon = numpy.ones( len( source.events ), dtype=bool )
+    latlon[from_ou] = False
+
+    lat     = source.floatValues( ( 'origin', 'latitude', 'value' ) )
+    lat_err = source.floatValues( ( 'origin', 'latitude', 'uncertainty' ) )
+    lon_err = source.floatValues( ( 'origin', 'longitude', 'uncertainty' ) )
+
+    values[latlon] = horizontalError( lat[latlon], lat_err[latlon], lon_err[latlon] )
+
+    if from_ou:
+        values[from_ou] = numpy.array( ou_values, dtype=float ) / 1000.0
+
+    return values
+
+
+def horizontalError( lat, latErr, lonErr ):
+    """
+    horizontal error (km) from latitude and errors of latitude and
+    longitude (degrees), values or arrays
+    """
+    return numpy.sqrt( 
+        numpy.power( latErr * EARTH_KM_PER_DEGREE, 2 ) +
+        numpy.power( lonErr * numpy.cos( lat * math.pi / 180.0 ) * EARTH_KM_PER_DEGREE, 2 ) )
+
+
+def extractMagnitudeType( source ):
+    """
+    code of type of preferred magnitude, see magnitudeTypeCode()
+    """
+    return numpy.array( [ magnitudeTypeCode( getattr( curr_mag, 'type', None ) ) 
+                          for curr_mag in source.preferred( 'magnitude' ) ], dtype=float )
+
+
+def magnitudeTypeCode( magType ):
+    """
+    return code of magnitude type (position in MAGNITUDE_TYPES) for 
+    mag_type column, NaN if magType is None. Types that are not in
+    MAGNITUDE_TYPES get the code of 'unknown'
+    """
+    if magType is None:
+        return numpy.nan
+
+    try:
+        return float( MAGNITUDE_TYPES.index( magType ) )
+    except ValueError:
+        return float( MAGNITUDE_TYPE_UNKNOWN )
+
+
+def magnitudeType( code ):
+    """
+    return magnitude type of code in mag_type column, None if code is NaN
+    """
+    if numpy.isnan( code ):
+        return None
+    else:
+        return MAGNITUDE_TYPES[int( code )]
+
+
+# magnitude types of mag_type column, column value is position in tuple.
+# The codes are written to binary files and stores, so the table is fixed:
+# new types are only appended, other types are stored as 'unknown'
+MAGNITUDE_TYPES = ( 'unknown', 'ML', 'MB', 'mb', 'MS', 'Ms', 'MW', 'Mw', 'ME', 
+                    'Mc', 'Md', 'MD', 'MJ', 'MV', 'Lg', 'Ml', 'mB', 'mbLg', 
+                    'Mwp', 'Mwc', 'Mwb', 'Mwr', 'Mww', 'Me', 'MN', 'Mn', 
+                    'helicorder magnitude' )
+
+MAGNITUDE_TYPE_UNKNOWN = MAGNITUDE_TYPES.index( 'unknown' )
+
+
+# column extractors: column name -> function( QPEventColumns ),
+# returns array of column values for all events
+COLUMN_EXTRACTORS = {
+    'lon':       originColumn( 'longitude', 'value' ),
+    'lon_err':   originColumn( 'longitude', 'uncertainty' ),
+    'lat':       originColumn( 'latitude', 'value' ),
+    'lat_err':   originColumn( 'latitude', 'uncertainty' ),
+    'depth':     originColumn( 'depth', 'value', unit=1000.0 ),
+    'depth_err': originColumn( 'depth', 'uncertainty', unit=1000.0 ),
+    'time':      extractTime,
+    'time_err':  originColumn( 'time', 'uncertainty' ),
+    'mag':       extractMagnitude,
+    'mag_err':   magnitudeColumn( 'mag', 'uncertainty' ),
+    'mag_type':  extractMagnitudeType,
+    'hz_err':    extractHorizontalError,
+    'strike1':   focalMechanismColumn( 'nodalPlanes', 'nodalPlane1', 'strike', 'value' ),
+    'strike2':   focalMechanismColumn( 'nodalPlanes', 'nodalPlane2', 'strike', 'value' ),
+    'dip1':      focalMechanismColumn( 'nodalPlanes', 'nodalPlane1', 'dip', 'value' ),
+    'dip2':      focalMechanismColumn( 'nodalPlanes', 'nodalPlane2', 'dip', 'value' ),
+    'rake1':     focalMechanismColumn( 'nodalPlanes', 'nodalPlane1', 'rake', 'value' ),
+    'rake2':     focalMechanismColumn( 'nodalPlanes', 'nodalPlane2', 'rake', 'value' )
+}
+
+
+def registerColumn( column, extractor ):
+    """
+    register extractor for (custom) column, extractor is called with a
+    QPCatalogColumns.QPEventColumns object and returns sequence of column 
+    values for all events (NaN for missing values)
+    """
+    COLUMN_EXTRACTORS[column] = extractor
+
+
+class CompactEventStore( object ):
+    """
+    QuakePy: CompactEventStore
+    events of a compact catalog, each event is created from its row on 
+    first access and kept
+    """
+
+    def __init__( self, compact, parentAxis=None ):
+        self.compact    = compact
+        self.parentAxis = parentAxis
+        self.events     = {}
+
+
+    def event( self, row ):
+        row = int( row )
+        
+        try:
+            return self.events[row]
+        except KeyError:
+            curr_ev = compactEvent( self.compact, row, self.parentAxis )
+            self.events[row] = curr_ev
+            return curr_ev
+
+
+class CompactEventList( object ):
+    """
+    QuakePy: CompactEventList
+    event list of a QPCatalog that is backed by rows of a compact catalog
+
+    events are created on access (see CompactEventStore). Lists with 
+    shared store share their event objects. The first change of the list
+    (append, remove, assignment, ...) creates all events and detaches the
+    list from the compact catalog, afterwards it behaves as a plain list
+
+    while attached, bulk operations of QPCatalog work on the columns of the
+    compact catalog. Changes of created events in place are not seen by 
+    these operations
+    """
+
+    # list methods that change the list
+    __detachingMethods = ( 'append', 'extend', 'insert', 'remove', 'pop', 'sort', 'reverse' )
+    
+    def __init__( self, store, rows=None ):
+        self.store = store
+
+        if rows is None and store.compact.catalog is None:
+            rows = []
+        elif rows is None:
+            rows = numpy.arange( store.compact.catalog.shape[0] )
+
+        # rows of compact catalog, None if detached
+        self.rows = numpy.asarray( rows, dtype=numpy.int_ )
+
+        # plain event list, if detached
+        self.events = None
+
+
+    def isCompact( self ):
+        return self.rows is not None
+
+
+    def detach( self ):
+        """
+        create all events, replace rows by plain event list
+        """
+        if self.rows is not None:
+            self.events = [ self.store.event( curr_row ) for curr_row in self.rows ]
+            self.rows   = None
+        return self.events
+
+
+    def subset( self, positions ):
+        """
+        return list with events at positions, sharing store
+        """
+        if self.rows is None:
+            return [ self.events[curr_pos] for curr_pos in positions ]
+        else:
+            return CompactEventList( self.store, self.rows[positions] )
+
+
+    def removeRows( self, mask ):
+        """
+        remove events for which mask is True, return removed events that 
+        have already been created
+        """
+        removed = [ self.store.events[curr_row] for curr_row in self.rows[mask] 
+                    if curr_row in self.store.events ]
+        self.rows = self.rows[~mask]
+        return removed
+
+
+    def column( self, column ):
+        """
+        return column values of events, None if compact catalog has no
+        such column
+        """
+        return self.store.compact.column( column, self.rows )
+
+
+    def toCompact( self ):
+        return self.store.compact.subset( self.rows )
+
+
+    def __len__( self ):
+        if self.rows is None:
+            return len( self.events )
+        else:
+            return len( self.rows )
+
+
+    def __getitem__( self, key ):
+        if self.rows is None:
+            return self.events[key]
+        elif isinstance( key, slice ):
+            return [ self.store.event( curr_row ) for curr_row in self.rows[key] ]
+        else:
+            return self.store.event( self.rows[key] )
+
+
+    def __iter__( self ):
+        if self.rows is None:
+            return iter( self.events )
+        else:
+            return ( self.store.event( curr_row ) for curr_row in self.rows )
+
+
+    def __contains__( self, ev ):
+        return ev in list( self )
+
+
+    def __eq__( self, other ):
+        return list( self ) == list( other )
+
+
+    def __ne__( self, other ):
+        return not self.__eq__( other )
+
+
+    def __setitem__( self, key, value ):
+        self.detach()[key] = value
+
+
+    def __delitem__( self, key ):
+        del self.detach()[key]
+
+
+    def __iadd__( self, other ):
+        self.detach().extend( other )
+        return self
+
+
+    def index( self, ev ):
+        return list( self ).index( ev )
+
+
+    def count( self, ev ):
+        return list( self ).count( ev )
+
+
+    def __getattr__( self, name ):
+        if name in CompactEventList.__detachingMethods:
+            return getattr( self.detach(), name )
+        else:
+            raise AttributeError, name
+
+
+def compactEvent( compact, row, parentAxis=None ):
+    """
+    create Event with preferred Origin, Magnitude and FocalMechanism from
+    row of compact catalog
+    """
+    values = dict( [ ( curr_col, float( compact.catalog[row, curr_pos] ) ) 
+                     for curr_col, curr_pos in compact.map.items() ] )
+
+    if row < len( compact.idMap ):
+        ev = Event( compact.idMap[row] )
+    else:
+        ev = Event()
+    ev.setElementAxis( parentAxis, 'event' )
+
+    ori = Origin()
+    ori.add( ev )
+    ev.preferredOriginID = ori.publicID
+
+    if 'lon' in values:
+        ori.longitude = compactQuantity( RealQuantity, values, 'lon', 'lon_err' )
+
+    if 'lat' in values:
+        ori.latitude = compactQuantity( RealQuantity, values, 'lat', 'lat_err' )
+
+    if 'depth' in values:
+        ori.depth = compactQuantity( RealQuantity, values, 'depth', 'depth_err', 1000.0 )
+
+    if not numpy.isnan( values.get( 'time', numpy.nan ) ):
+        ori.time = TimeQuantity( QPDateTime.QPDateTime( fromDecimalYear( values['time'] ) ) )
+        
+        if not numpy.isnan( values.get( 'time_err', numpy.nan ) ):
+            ori.time.uncertainty = values['time_err']
+
+    if not numpy.isnan( values.get( 'hz_err', numpy.nan ) ):
+        ou = OriginUncertainty()
+        ou.horizontalUncertainty = 1000.0 * values['hz_err']
+        ou.add( ori )
+
+    if 'mag' in values:
+        mag = Magnitude()
+        mag.add( ev )
+        mag.mag = compactQuantity( RealQuantity, values, 'mag', 'mag_err' )
+        mag.setOriginAssociation( ori.publicID )
+        ev.preferredMagnitudeID = mag.publicID
+
+        if not numpy.isnan( values.get( 'mag_type', numpy.nan ) ):
+            mag.type = magnitudeType( values['mag_type'] )
+
+    planes = []
+    for curr_plane in ( '1', '2' ):
+        plane_values = [ values.get( curr_col + curr_plane, numpy.nan ) for curr_col in ( 'strike', 'dip', 'rake' ) ]
+        
+        if numpy.isnan( plane_values ).all():
+            planes.append( None )
+        else:
+            planes.append( NodalPlane( *[ RealQuantity( curr_value ) for curr_value in plane_values ] ) )
+
+    if planes != [ None, None ]:
+        fm = FocalMechanism()
+        fm.add( ev )
+        fm.nodalPlanes = NodalPlanes( *planes )
+        ev.preferredFocalMechanismID = fm.publicID
+
+    return ev
+
+
+def compactQuantity( quantityType, values, column, errorColumn, scale=1.0 ):
+    """
+    return quantity with value of column and uncertainty of errorColumn,
+    uncertainty is only set if present and not NaN
+    """
+    quantity = quantityType( scale * values[column] )
+
+    if not numpy.isnan( values.get( errorColumn, numpy.nan ) ):
+        quantity.uncertainty = scale * values[errorColumn]
+
+    return quantity
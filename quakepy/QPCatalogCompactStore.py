@@ -0,0 +1,514 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import cPickle
+import math
+import os
+
+import numpy
+
+from mx.DateTime.ISO import ParseDateTimeUTC
+
+from quakepy import QPCore
+from quakepy import QPDateTime
+from quakepy import QPUtils
+from quakepy import QPCatalogCompact
+
+import quakepy.qpfmd
+
+STORE_VERSION = 1
+
+# index file and block files in store directory
+STORE_INDEX_FILE = 'index'
+STORE_BLOCK_FILE = 'block-%06d.bin'
+
+DEFAULT_BLOCK_SIZE = 100000
+
+# bin size (in years) of rate histogram
+DEFAULT_RATE_BINSIZE = 1.0
+
+
+def decimalYearValue(value):
+    """
+    convert time to decimal year
+    value can be a QPDateTime or mx.DateTime object, an ISO string, or a
+    decimal year
+    """
+    if isinstance(value, QPDateTime.QPDateTime):
+        return value.toDecimalYear()
+    elif isinstance(value, QPCore.STRING_TYPES):
+        return QPUtils.decimalYear(ParseDateTimeUTC(value))
+    elif isinstance(value, (int, long, float)):
+        return float(value)
+    else:
+        return QPUtils.decimalYear(value)
+
+
+class QPCatalogCompactStore(object):
+    """
+    QuakePy: QPCatalogCompactStore
+    compact catalog on disk, for catalogs larger than memory
+
+    store is a directory with an index file and block files. Each block
+    file holds blockSize events (last block can be shorter) in binary
+    compact catalog format (see QPCatalogCompact.writeBinary()). For each
+    block and column, the index holds minimum and maximum value and number
+    of NaN values (zone map)
+
+    selections take limits as in QPCatalog.cut(): min<column> and
+    max<column> for any column, min<column>_excl and max<column>_excl to
+    exclude limits, removeNaN to remove NaN values of limited columns.
+    Otherwise, NaN values meet all limits. Values are in units of compact
+    catalog (depth in km, time as decimal year), time limits can also be
+    given as ISO strings, mx.DateTime or QPDateTime objects
+
+    blocks whose zone maps exclude all events are skipped, selected blocks
+    are read one at a time
+    """
+
+    def __init__(self, path, blockSize=DEFAULT_BLOCK_SIZE):
+        """
+        open store in directory path, create store if it does not exist
+        block size of existing store is kept
+        """
+        self.path = path
+
+        if os.path.isfile(os.path.join(path, STORE_INDEX_FILE)):
+            self._readIndex()
+
+        else:
+            if not os.path.isdir(path):
+                os.makedirs(path)
+
+            self.blockSize = blockSize
+
+            # column names in order of block files, idx column first
+            self.columns = []
+            self.comment = ''
+
+            # zone maps: dict with keys file, rows, min, max, nan (dicts
+            # column -> value)
+            self.blocks = []
+
+            self._writeIndex()
+
+
+    def __len__(self):
+        return self.size
+
+
+    @property
+    def size(self):
+        """
+        number of events in store
+        """
+        return sum([block['rows'] for block in self.blocks])
+
+
+    def append(self, compact):
+        """
+        append events of compact catalog (QPCatalogCompact), which needs
+        the same columns as the events in store
+        idx column is set to position of event in store
+        """
+        if compact.size == 0:
+            return
+
+        columns = sorted(compact.map.keys(), key=lambda column: \
+            compact.map[column])
+
+        if len(self.columns) == 0:
+            self.columns = columns
+            self.comment = compact.comment
+
+        elif set(columns) != set(self.columns):
+            raise ValueError, "QPCatalogCompactStore::append - columns %s "\
+                "do not match columns of store %s" % (columns, self.columns)
+
+        offset = self.size
+
+        data = numpy.empty((compact.size, len(self.columns)), dtype=float)
+        for column_idx, column in enumerate(self.columns):
+            data[:, column_idx] = compact.column(column)
+
+        data[:, self.columns.index('idx')] = numpy.arange(offset,
+            offset + compact.size)
+
+        if len(compact.idMap) == compact.size:
+            ids = list(compact.idMap)
+        else:
+            ids = [None] * compact.size
+
+        # fill up last block
+        if len(self.blocks) > 0 and self.blocks[-1]['rows'] < self.blockSize:
+            last_block = self._readBlock(self.blocks.pop(), withIds=True,
+                mmap=False)
+
+            last_data = numpy.empty((last_block.size, len(self.columns)),
+                dtype=float)
+            for column_idx, column in enumerate(self.columns):
+                last_data[:, column_idx] = last_block.column(column)
+
+            data = numpy.vstack((last_data, data))
+            ids = last_block.idMap + ids
+
+        for start in xrange(0, len(data), self.blockSize):
+            self._writeBlock(data[start:start+self.blockSize],
+                ids[start:start+self.blockSize])
+
+        self._writeIndex()
+
+
+    def update(self, qpcatalog, columns=None):
+        """
+        append events of QPCatalog, see QPCatalogCompact.update()
+        """
+        compact = QPCatalogCompact.QPCatalogCompact()
+        compact.update(qpcatalog, columns)
+
+        self.append(compact)
+
+
+    def iterBlocks(self, columns=None, withIds=False, **kwargs):
+        """
+        iterate over selected events, block by block (compact catalogs)
+
+        columns: read only these columns (and idx column, and columns with
+                 limits), None: all columns (memory-mapped if no event of
+                 block is removed)
+        withIds: read publicIDs of events
+        kwargs:  limits, see class description
+        """
+        limits, removeNaN = self._limits(kwargs)
+
+        if columns is not None:
+            columns = list(columns) + [column for column, bound, value, \
+                exclusive in limits if column not in columns]
+
+        for block in self.blocks:
+
+            if blockExcluded(block, limits, removeNaN):
+                continue
+
+            compact = self._readBlock(block, columns, withIds)
+
+            if len(limits) > 0:
+                selected = limitsMask(compact, limits, removeNaN)
+                if not selected.all():
+                    compact = compact.subset(selected)
+
+            if compact.size > 0:
+                yield compact
+
+
+    def iterColumn(self, column, **kwargs):
+        """
+        iterate over values of column (arrays) of selected events, block
+        by block
+        """
+        for compact in self.iterBlocks([column], **kwargs):
+            yield compact.column(column)
+
+
+    def cut(self, columns=None, withIds=True, **kwargs):
+        """
+        return compact catalog (in memory) with selected events, see
+        iterBlocks()
+        """
+        blocks = list(self.iterBlocks(columns, withIds, **kwargs))
+
+        compact = QPCatalogCompact.QPCatalogCompact()
+        compact.comment = self.comment
+
+        if len(blocks) == 0:
+            if columns is None:
+                columns = self.columns
+            else:
+                columns = ['idx'] + [column for column in columns \
+                    if column != 'idx']
+
+            compact.map = dict([(column, column_idx) for column_idx, \
+                column in enumerate(columns)])
+            compact.catalog = numpy.zeros((0, len(columns)), dtype=float)
+
+        else:
+            compact.map = dict(blocks[0].map)
+            compact.catalog = numpy.vstack([block.catalog for block in \
+                blocks])
+
+            if withIds:
+                for block in blocks:
+                    compact.idMap.extend(block.idMap)
+
+        return compact
+
+
+    def timeSpan(self, **kwargs):
+        """
+        return time span of selected events, as QPCatalog.timeSpan():
+        triple of time difference (in years), start time, end time
+        without limits, start and end time are taken from zone maps
+        """
+        if len(kwargs) == 0:
+            time_min = self._zoneMapValue('min', min)
+            time_max = self._zoneMapValue('max', max)
+
+        else:
+            time_min = time_max = None
+            for times in self.iterColumn('time', **kwargs):
+                times = times[~numpy.isnan(times)]
+
+                if len(times) > 0:
+                    time_min = min(times.min(), time_min) \
+                        if time_min is not None else times.min()
+                    time_max = max(times.max(), time_max) \
+                        if time_max is not None else times.max()
+
+        if time_min is None:
+            raise IndexError, \
+                "QPCatalogCompactStore::timeSpan - no events with origin time"
+
+        time_start = QPUtils.fromDecimalYear(time_min)
+        time_end = QPUtils.fromDecimalYear(time_max)
+
+        return ((time_end - time_start).days / QPUtils.DAYS_PER_YEAR,
+            time_start, time_end)
+
+
+    def getFmd(self, time_span=None, **kwargs):
+        """
+        compute frequency-magnitude distribution of selected events, block
+        by block (qpfmd.StreamingFrequencyMagnitudeDistribution)
+
+        kwargs: parameters of FMD (binsize, Mc, Mstart, Mend,
+                minEventsGR), and limits of selection
+        """
+        fmd_kwargs = {}
+        for name in ('binsize', 'Mc', 'Mstart', 'Mend', 'minEventsGR'):
+            if name in kwargs:
+                fmd_kwargs[name] = kwargs.pop(name)
+
+        if time_span is None:
+            try:
+                time_span = self.timeSpan(**kwargs)[0]
+            except IndexError:
+                pass
+
+        return quakepy.qpfmd.StreamingFrequencyMagnitudeDistribution(
+            lambda: self.iterColumn('mag', **kwargs), time_span=time_span,
+            **fmd_kwargs)
+
+
+    def getRateHistogram(self, binsize=DEFAULT_RATE_BINSIZE, starttime=None,
+        endtime=None, **kwargs):
+        """
+        return number of selected events in time bins of binsize years
+        (numpy array), and bin edges (decimal years), computed block by
+        block. Rates per year are numbers divided by binsize
+
+        starttime/endtime: start of first bin, end of last bin, default:
+        time range of selected blocks (from zone maps)
+        """
+        limits, removeNaN = self._limits(kwargs)
+        blocks = [block for block in self.blocks \
+            if not blockExcluded(block, limits, removeNaN)]
+
+        if starttime is None:
+            start = self._zoneMapValue('min', min, blocks)
+        else:
+            start = decimalYearValue(starttime)
+
+        if endtime is None:
+            end = self._zoneMapValue('max', max, blocks)
+        else:
+            end = decimalYearValue(endtime)
+
+        if start is None or end is None:
+            raise IndexError, "QPCatalogCompactStore::getRateHistogram - "\
+                "no events with origin time"
+
+        bin_count = max(int(math.ceil((end - start) / binsize)), 1)
+        edges = start + binsize * numpy.arange(bin_count + 1)
+
+        counts = numpy.zeros(bin_count, dtype=numpy.int_)
+        for times in self.iterColumn('time', **kwargs):
+            counts += numpy.histogram(times[~numpy.isnan(times)], edges)[0]
+
+        return (counts, edges)
+
+
+    def _zoneMapValue(self, bound, reduce, blocks=None):
+        """
+        reduce minima or maxima of time column of blocks, None if there
+        are no origin times
+        """
+        if blocks is None:
+            blocks = self.blocks
+
+        values = [block[bound]['time'] for block in blocks \
+            if not numpy.isnan(block[bound]['time'])]
+
+        if len(values) == 0:
+            return None
+        else:
+            return reduce(values)
+
+
+    def _limits(self, kwargs):
+        """
+        return list of limits (column, 'min'/'max', value, exclusive) and
+        removeNaN flag from keyword arguments
+        """
+        limits = []
+        for key, value in kwargs.items():
+
+            if key == 'removeNaN' or key.endswith('_excl'):
+                continue
+
+            if key[:3] not in ('min', 'max') or key[3:] not in self.columns:
+                raise ValueError, \
+                    "QPCatalogCompactStore - illegal limit: %s" % key
+
+            if key[3:] == 'time':
+                value = decimalYearValue(value)
+
+            limits.append((key[3:], key[:3], float(value),
+                bool(kwargs.get('%s_excl' % key, False))))
+
+        return (limits, bool(kwargs.get('removeNaN', False)))
+
+
+    def _readBlock(self, block, columns=None, withIds=False, mmap=True):
+        compact = QPCatalogCompact.QPCatalogCompact()
+        compact.readBinary(os.path.join(self.path, block['file']),
+            columns=columns, mmap=mmap, withIds=withIds)
+
+        return compact
+
+
+    def _writeBlock(self, data, ids):
+        """
+        write block file, append zone map of block to index
+        """
+        compact = QPCatalogCompact.QPCatalogCompact()
+        compact.map = dict([(column, column_idx) for column_idx, column in \
+            enumerate(self.columns)])
+        compact.catalog = data
+        compact.idMap = ids
+
+        block = {'file': STORE_BLOCK_FILE % len(self.blocks),
+                 'rows': len(data), 'min': {}, 'max': {}, 'nan': {}}
+
+        for column_idx, column in enumerate(self.columns):
+            values = data[:, column_idx]
+            values = values[~numpy.isnan(values)]
+
+            block['nan'][column] = len(data) - len(values)
+
+            if len(values) > 0:
+                block['min'][column] = float(values.min())
+                block['max'][column] = float(values.max())
+            else:
+                block['min'][column] = numpy.nan
+                block['max'][column] = numpy.nan
+
+        compact.writeBinary(os.path.join(self.path, block['file']))
+        self.blocks.append(block)
+
+
+    def _readIndex(self):
+        istream = open(os.path.join(self.path, STORE_INDEX_FILE), 'rb')
+        try:
+            index = cPickle.load(istream)
+        finally:
+            istream.close()
+
+        if index['version'] > STORE_VERSION:
+            raise ValueError, "QPCatalogCompactStore - unsupported store "\
+                "version %s: %s" % (index['version'], self.path)
+
+        self.blockSize = index['blockSize']
+        self.columns = index['columns']
+        self.comment = index['comment']
+        self.blocks = index['blocks']
+
+
+    def _writeIndex(self):
+        """
+        write index to temporary file, and replace index file
+        """
+        index_file = os.path.join(self.path, STORE_INDEX_FILE)
+
+        ostream = open('%s.tmp' % index_file, 'wb')
+        try:
+            cPickle.dump({'version': STORE_VERSION,
+                          'blockSize': self.blockSize,
+                          'columns': self.columns,
+                          'comment': self.comment,
+                          'blocks': self.blocks}, ostream, 2)
+        finally:
+            ostream.close()
+
+        os.rename('%s.tmp' % index_file, index_file)
+
+
+def blockExcluded(block, limits, removeNaN):
+    """
+    return True if zone map of block shows that no event of block meets
+    limits
+    """
+    for column, bound, value, exclusive in limits:
+
+        nan_count = block['nan'][column]
+
+        if removeNaN and nan_count == block['rows']:
+            return True
+
+        # NaN values meet limits
+        elif nan_count > 0 and not removeNaN:
+            continue
+
+        if bound == 'min':
+            if block['max'][column] < value or (exclusive and \
+                block['max'][column] <= value):
+                return True
+        else:
+            if block['min'][column] > value or (exclusive and \
+                block['min'][column] >= value):
+                return True
+
+    return False
+
+
+def limitsMask(compact, limits, removeNaN):
+    """
+    return mask of events of compact catalog that meet limits
+    """
+    selected = numpy.ones(compact.size, dtype=numpy.bool_)
+
+    numpy_err = numpy.seterr(invalid='ignore')
+    try:
+        for column, bound, value, exclusive in limits:
+            values = compact.column(column)
+
+            if bound == 'min':
+                if exclusive:
+                    selected &= ~(values <= value)
+                else:
+                    selected &= ~(values < value)
+            else:
+                if exclusive:
+                    selected &= ~(values >= value)
+                else:
+                    selected &= ~(values > value)
+
+            if removeNaN:
+                selected &= ~numpy.isnan(values)
+
+    finally:
+        numpy.seterr(**numpy_err)
+
+    return selected
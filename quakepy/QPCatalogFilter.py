@@ -0,0 +1,614 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+Filter expressions over events of a catalog
+
+    from quakepy.QPCatalogFilter import Field, Within, TimeRange
+
+    expr = (Field('mag') >= 4.0) & (Field('evaluationMode') == 'manual') & \
+        Within(polygon) & TimeRange('2010-01-01', '2011-01-01')
+    selected = catalog.filter(expr, inplace=False)
+
+comparisons have to be put in parentheses, since operator & binds more
+tightly than comparison operators
+"""
+
+import operator
+import time
+
+import numpy
+
+from quakepy import QPDateTime
+from quakepy import QPPolygon
+from quakepy import QPCatalogColumns
+from quakepy import QPCatalogTimeIndex
+
+# field names that are shortcuts for attribute paths, paths start at
+# preferred origin ('origin'), preferred magnitude ('magnitude'), or
+# event ('event')
+FIELD_ALIASES = {
+    'lat': 'origin.latitude.value',
+    'lon': 'origin.longitude.value',
+    'depth': 'origin.depth.value',
+    'time': 'origin.time.value',
+    'evaluationMode': 'origin.evaluationMode',
+    'evaluationStatus': 'origin.evaluationStatus',
+    'azimuthalGap': 'origin.quality.azimuthalGap',
+    'stationCount': 'origin.quality.usedStationCount',
+    'mag': 'magnitude.mag.value',
+    'magType': 'magnitude.type'
+}
+
+# column kinds
+COLUMN_NUMBER = 'number'
+COLUMN_TIME = 'time'
+COLUMN_OBJECT = 'object'
+
+# relative evaluation cost of predicates, per event
+COST_ATTRIBUTE = 1.0
+COST_GRID = 5.0
+COST_SPATIAL = 20.0
+
+# assumed fraction of events that pass a predicate that has not been
+# evaluated yet
+DEFAULT_SELECTIVITY = 0.5
+
+COMPARISON_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+
+class EventColumns(QPCatalogColumns.QPEventColumns):
+    """
+    QuakePy: EventColumns
+    columns of field values of a list of events, one row per event
+    columns are extracted on first request
+
+    origin and magnitude fields are taken from preferred origin and
+    preferred magnitude of event (see QPCatalogColumns.QPEventColumns).
+    Missing values are NaN (number and time columns) or None (object
+    columns). Times are seconds since 1970-01-01
+    """
+
+    def __init__(self, events):
+        super(EventColumns, self).__init__(events)
+        self._columns = {}
+
+
+    def column(self, path):
+        """
+        return (kind, numpy array) of field values for attribute path
+        """
+        if path not in self._columns:
+            self._columns[path] = self._extract(path)
+
+        return self._columns[path]
+
+
+    def _extract(self, path):
+
+        values = []
+        kinds = set()
+
+        for obj in self.values(path):
+
+            if obj is None:
+                values.append(None)
+            elif isinstance(obj, QPDateTime.QPDateTime):
+                values.append(QPCatalogTimeIndex.toEpoch(obj))
+                kinds.add(COLUMN_TIME)
+            elif isinstance(obj, (int, long, float)) and \
+                not isinstance(obj, bool):
+                values.append(obj)
+                kinds.add(COLUMN_NUMBER)
+            else:
+                values.append(obj)
+                kinds.add(COLUMN_OBJECT)
+
+        if len(kinds) == 1 and COLUMN_OBJECT not in kinds:
+            kind = kinds.pop()
+            column = numpy.array([numpy.nan if value is None else value \
+                for value in values], dtype=numpy.float_)
+
+        else:
+            kind = COLUMN_OBJECT
+            column = numpy.empty(len(values), dtype=object)
+            column[:] = values
+
+        return (kind, column)
+
+
+def missingValues(kind, values):
+    if kind == COLUMN_OBJECT:
+        return numpy.array([value is None for value in values],
+            dtype=numpy.bool_)
+    else:
+        return numpy.isnan(values)
+
+
+class Predicate(object):
+    """
+    QuakePy: Predicate
+    base class of filter predicates
+
+    predicates are combined with operators & (and), | (or), ~ (not)
+
+    each predicate counts how often it has been evaluated, for how many
+    events, how many events passed, and the time spent (statistics()).
+    Composite predicates use the counted fraction of passed events to plan
+    the order of evaluation of their parts
+    """
+
+    # relative evaluation cost per event
+    cost = COST_ATTRIBUTE
+
+    # spatial predicates are evaluated after attribute predicates
+    spatial = False
+
+    def __init__(self):
+        self.resetStatistics()
+
+
+    def __and__(self, other):
+        return And(self, other)
+
+
+    def __or__(self, other):
+        return Or(self, other)
+
+
+    def __invert__(self):
+        return Not(self)
+
+
+    def __rand__(self, other):
+        raise TypeError, "filter predicates can only be combined with " \
+            "predicates, put comparisons in parentheses"
+
+    __ror__ = __rand__
+
+
+    def __nonzero__(self):
+        raise TypeError, "filter predicates have no truth value, use & and " \
+            "| instead of 'and' and 'or', no chained comparisons"
+
+
+    def __str__(self):
+        return self.describe()
+
+
+    def describe(self):
+        return self.__class__.__name__
+
+
+    def evaluate(self, columns, rows=None):
+        """
+        evaluate predicate for events of EventColumns object columns
+        rows: array of event positions, None: all events
+        returns boolean numpy array with one entry per row
+        """
+        if rows is None:
+            rows = numpy.arange(columns.size)
+
+        time_start = time.time()
+        result = self._evaluate(columns, rows)
+
+        self.calls += 1
+        self.evaluated += len(rows)
+        self.passed += int(numpy.count_nonzero(result))
+        self.seconds += time.time() - time_start
+
+        return result
+
+
+    def _evaluate(self, columns, rows):
+        raise NotImplementedError
+
+
+    @property
+    def selectivity(self):
+        """
+        fraction of evaluated events that passed
+        """
+        if self.evaluated > 0:
+            return float(self.passed) / self.evaluated
+        else:
+            return DEFAULT_SELECTIVITY
+
+
+    def resetStatistics(self):
+        self.calls = 0
+        self.evaluated = 0
+        self.passed = 0
+        self.seconds = 0.0
+
+
+    def statistics(self, level=0):
+        """
+        return list of tuples (level, description, calls, evaluated events,
+        passed events, seconds) for predicate and its parts
+        """
+        return [(level, self.describe(), self.calls, self.evaluated,
+            self.passed, self.seconds)]
+
+
+class Field(object):
+    """
+    QuakePy: Field
+    field of events, to be compared with values
+
+    name is an alias from FIELD_ALIASES or an attribute path that starts
+    with 'origin', 'magnitude', 'focalMechanism', or 'event', e.g.
+    'origin.quality.associatedPhaseCount'
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.path = FIELD_ALIASES.get(name, name)
+
+
+    def __lt__(self, value):
+        return Comparison(self, '<', value)
+
+    def __le__(self, value):
+        return Comparison(self, '<=', value)
+
+    def __gt__(self, value):
+        return Comparison(self, '>', value)
+
+    def __ge__(self, value):
+        return Comparison(self, '>=', value)
+
+    def __eq__(self, value):
+        return Comparison(self, '==', value)
+
+    def __ne__(self, value):
+        return Comparison(self, '!=', value)
+
+    __hash__ = object.__hash__
+
+
+    def isin(self, values):
+        return In(self, values)
+
+
+class Comparison(Predicate):
+    """
+    QuakePy: Comparison
+    compare field with value, events with missing value do not pass
+    values of time fields can be given as QPDateTime, mx.DateTime, or ISO
+    string
+    """
+
+    def __init__(self, field, op, value):
+        super(Comparison, self).__init__()
+
+        self.field = field
+        self.op = op
+        self.value = value
+
+
+    def describe(self):
+        return "%s %s %r" % (self.field.name, self.op, self.value)
+
+
+    def _evaluate(self, columns, rows):
+
+        kind, values = columns.column(self.field.path)
+        values = values[rows]
+
+        if kind == COLUMN_TIME:
+            value = QPCatalogTimeIndex.toEpoch(self.value)
+        else:
+            value = self.value
+
+        numpy_err = numpy.seterr(invalid='ignore')
+        try:
+            result = numpy.asarray(COMPARISON_OPERATORS[self.op](values,
+                value), dtype=numpy.bool_)
+        finally:
+            numpy.seterr(**numpy_err)
+
+        return result & ~missingValues(kind, values)
+
+
+class In(Predicate):
+    """
+    QuakePy: In
+    field value is one of given values
+    """
+
+    def __init__(self, field, values):
+        super(In, self).__init__()
+
+        self.field = field
+        self.values = set(values)
+
+
+    def describe(self):
+        return "%s in %r" % (self.field.name, sorted(self.values))
+
+
+    def _evaluate(self, columns, rows):
+
+        kind, values = columns.column(self.field.path)
+
+        return numpy.array([value in self.values for value in values[rows]],
+            dtype=numpy.bool_)
+
+
+class TimeRange(Predicate):
+    """
+    QuakePy: TimeRange
+    preferred origin time in interval starttime <= time < endtime
+    starttime/endtime None: no limit
+    """
+
+    def __init__(self, starttime=None, endtime=None):
+        super(TimeRange, self).__init__()
+
+        self.starttime = starttime
+        self.endtime = endtime
+
+
+    def describe(self):
+        return "TimeRange(%s, %s)" % (self.starttime, self.endtime)
+
+
+    def _evaluate(self, columns, rows):
+
+        kind, values = columns.column(FIELD_ALIASES['time'])
+        values = values[rows]
+
+        result = ~numpy.isnan(values)
+
+        if self.starttime is not None:
+            result[result] = values[result] >= \
+                QPCatalogTimeIndex.toEpoch(self.starttime)
+
+        if self.endtime is not None:
+            result[result] = values[result] < \
+                QPCatalogTimeIndex.toEpoch(self.endtime)
+
+        return result
+
+
+class Within(Predicate):
+    """
+    QuakePy: Within
+    epicenter of preferred origin inside area
+    area can be QPPolygon object, list of polygon vertices (lon, lat), or
+    Shapely geometry
+    include_boundary=True: points on boundary are inside
+    """
+
+    cost = COST_SPATIAL
+    spatial = True
+
+    def __init__(self, area, include_boundary=True):
+        super(Within, self).__init__()
+
+        if isinstance(area, QPPolygon.QPPolygon):
+            self.polygon = area
+            self.geometry = None
+
+        elif isinstance(area, (list, tuple, numpy.ndarray)):
+            self.polygon = QPPolygon.QPPolygon(area)
+            self.geometry = None
+
+        else:
+            self.polygon = None
+            self.geometry = area
+
+        self.includeBoundary = include_boundary
+
+
+    def _evaluate(self, columns, rows):
+
+        lons = columns.column(FIELD_ALIASES['lon'])[1][rows]
+        lats = columns.column(FIELD_ALIASES['lat'])[1][rows]
+
+        if self.polygon is not None:
+            return self.polygon.contains_points(lons, lats,
+                self.includeBoundary)
+        else:
+            return QPPolygon.geometryContainsPoints(self.geometry, lons, lats,
+                self.includeBoundary)
+
+
+class InGrid(Predicate):
+    """
+    QuakePy: InGrid
+    hypocenter of preferred origin in a cell of QPGrid object
+    """
+
+    cost = COST_GRID
+    spatial = True
+
+    def __init__(self, grid):
+        super(InGrid, self).__init__()
+        self.grid = grid
+
+
+    def _evaluate(self, columns, rows):
+
+        return self.grid.locate(
+            columns.column(FIELD_ALIASES['lat'])[1][rows],
+            columns.column(FIELD_ALIASES['lon'])[1][rows],
+            columns.column(FIELD_ALIASES['depth'])[1][rows]) >= 0
+
+
+class Composite(Predicate):
+    """
+    QuakePy: Composite
+    base class of And and Or
+    """
+
+    def __init__(self, *predicates):
+        super(Composite, self).__init__()
+
+        # flatten nested predicates of same type
+        self.predicates = []
+        for predicate in predicates:
+
+            if not isinstance(predicate, Predicate):
+                raise TypeError, "%s - not a filter predicate: %r" % (
+                    self.__class__.__name__, predicate)
+
+            if type(predicate) is type(self):
+                self.predicates.extend(predicate.predicates)
+            else:
+                self.predicates.append(predicate)
+
+
+    @property
+    def cost(self):
+        return sum([predicate.cost for predicate in self.predicates])
+
+
+    @property
+    def spatial(self):
+        for predicate in self.predicates:
+            if predicate.spatial:
+                return True
+        return False
+
+
+    def describe(self):
+        return self.__class__.__name__
+
+
+    def plan(self):
+        """
+        return parts in order of evaluation: attribute predicates before
+        spatial predicates, then in ascending order of rank()
+        """
+        return sorted(self.predicates, key=lambda predicate: (
+            predicate.spatial, self.rank(predicate)))
+
+
+    def statistics(self, level=0):
+        result = super(Composite, self).statistics(level)
+        for predicate in self.plan():
+            result.extend(predicate.statistics(level + 1))
+        return result
+
+
+    def resetStatistics(self):
+        super(Composite, self).resetStatistics()
+        for predicate in getattr(self, 'predicates', ()):
+            predicate.resetStatistics()
+
+
+class And(Composite):
+    """
+    QuakePy: And
+    all parts have to pass, each part is evaluated only for events that
+    passed the previous parts
+    """
+
+    def rank(self, predicate):
+        """
+        cost per rejected event: cheap predicates that reject many events
+        come first
+        """
+        rejected = 1.0 - predicate.selectivity
+        if rejected > 0.0:
+            return predicate.cost / rejected
+        else:
+            return float('inf')
+
+
+    def _evaluate(self, columns, rows):
+
+        result = numpy.zeros(len(rows), dtype=numpy.bool_)
+        active = numpy.arange(len(rows))
+
+        for predicate in self.plan():
+            if len(active) == 0:
+                break
+
+            active = active[predicate.evaluate(columns, rows[active])]
+
+        result[active] = True
+        return result
+
+
+class Or(Composite):
+    """
+    QuakePy: Or
+    one of the parts has to pass, each part is evaluated only for events
+    that did not pass the previous parts
+    """
+
+    def rank(self, predicate):
+        """
+        cost per passed event: cheap predicates that pass many events
+        come first
+        """
+        if predicate.selectivity > 0.0:
+            return predicate.cost / predicate.selectivity
+        else:
+            return float('inf')
+
+
+    def _evaluate(self, columns, rows):
+
+        result = numpy.zeros(len(rows), dtype=numpy.bool_)
+        active = numpy.arange(len(rows))
+
+        for predicate in self.plan():
+            if len(active) == 0:
+                break
+
+            passed = predicate.evaluate(columns, rows[active])
+            result[active[passed]] = True
+            active = active[~passed]
+
+        return result
+
+
+class Not(Predicate):
+    """
+    QuakePy: Not
+    negation of a predicate
+    """
+
+    def __init__(self, predicate):
+        super(Not, self).__init__()
+
+        if not isinstance(predicate, Predicate):
+            raise TypeError, "Not - not a filter predicate: %r" % predicate
+
+        self.predicate = predicate
+
+
+    @property
+    def cost(self):
+        return self.predicate.cost
+
+
+    @property
+    def spatial(self):
+        return self.predicate.spatial
+
+
+    def statistics(self, level=0):
+        return super(Not, self).statistics(level) + \
+            self.predicate.statistics(level + 1)
+
+
+    def resetStatistics(self):
+        super(Not, self).resetStatistics()
+        if hasattr(self, 'predicate'):
+            self.predicate.resetStatistics()
+
+
+    def _evaluate(self, columns, rows):
+        return ~self.predicate.evaluate(columns, rows)
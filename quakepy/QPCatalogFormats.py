@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import re
+
+from quakepy import QPCatalog
+from quakepy import QPCore
+from quakepy import QPFileShards
+from quakepy import QPUtils
+
+# number of bytes at start of input that are used for format detection
+SNIFF_SIZE = 4096
+
+# number of sniffed lines that have to match the format
+SNIFF_LINES = 10
+
+# number of records that are imported at once when streaming events
+RECORD_BATCH_SIZE = 500
+
+STP_EVENT_TYPES = ('le', 're', 'ts', 'qb', 'nt', 'uk', 'sn')
+
+
+class QPCatalogFormat(object):
+    """
+    QuakePy: QPCatalogFormat
+    catalog format of the registry: name, QPCatalog method that imports
+    the format, sniffer, and record boundaries
+
+    sniff(lines) returns True if the lines from the start of an input (see
+    sniffLines()) are in this format
+
+    records are keyword arguments of QPFileShards.recordStart() that
+    define the lines at which records start. Formats with records can be
+    streamed and imported in shards
+    """
+
+    def __init__(self, name, sniff, records=None, method=None):
+        self.name = name
+        self.sniff = sniff
+        self.records = records
+
+        if method is None:
+            method = 'import%s' % name
+        self.method = method
+
+
+    def __repr__(self):
+        return "QPCatalogFormat(%r)" % self.name
+
+
+    def iterEvents(self, input, batchSize=RECORD_BATCH_SIZE, **kwargs):
+        """
+        generator that yields events of input (stream or file name) one by
+        one, without building a catalog of all events
+
+        the import method of the format is applied to batches of
+        batchSize records, kwargs are passed to the import method
+
+        a stream that has been opened for a file name is closed when the
+        generator is exhausted or closed (e.g., when it is garbage
+        collected after a break)
+        """
+        if isinstance(input, QPCore.STRING_TYPES):
+            istream = QPUtils.getQPDataSource(input, **kwargs)
+        else:
+            istream = input
+
+        try:
+            if self.records is None:
+                for ev in QPCatalog.QPCatalog().iterEvents(istream,
+                    format=self.name):
+                    yield ev
+                return
+
+            for lines in QPFileShards.recordBatches(istream, batchSize,
+                **self.records):
+
+                catalog = QPCatalog.QPCatalog()
+                getattr(catalog, self.method)(lines, **kwargs)
+
+                for ev in catalog.eventParameters.event:
+                    yield ev
+
+        finally:
+            # close stream only if it has been opened here
+            if istream is not input:
+                istream.close()
+
+
+## registry of formats, in order of detection
+
+FORMATS = []
+
+
+def registerFormat(format):
+    """
+    add format (QPCatalogFormat) to registry, replaces format of same name
+    formats that are registered later are detected with lower priority
+    """
+    for format_idx, curr_format in enumerate(FORMATS):
+        if curr_format.name == format.name:
+            FORMATS[format_idx] = format
+            return
+
+    FORMATS.append(format)
+
+
+def getFormat(name):
+    """
+    return registered format of name
+    """
+    for format in FORMATS:
+        if format.name == name:
+            return format
+
+    raise ValueError, "unknown catalog format %s" % name
+
+
+def sniffLines(input, **kwargs):
+    """
+    return complete lines of first SNIFF_SIZE bytes of input (stream or
+    file name), stream is reset to its current position
+    """
+    if isinstance(input, QPCore.STRING_TYPES):
+        istream = QPUtils.getQPDataSource(input, **kwargs)
+        try:
+            head = istream.read(SNIFF_SIZE)
+        finally:
+            istream.close()
+
+    else:
+        try:
+            position = input.tell()
+            head = input.read(SNIFF_SIZE)
+            input.seek(position)
+        except (AttributeError, IOError):
+            raise ValueError, "format detection requires file name or "\
+                "seekable stream"
+
+    lines = head.splitlines(True)
+
+    # last line can be incomplete
+    if len(head) == SNIFF_SIZE and len(lines) > 1:
+        lines = lines[:-1]
+
+    return lines
+
+
+def detectFormat(input, **kwargs):
+    """
+    return name of first registered format that matches start of input
+    (stream or file name), kwargs are passed to QPUtils.getQPDataSource()
+    """
+    lines = sniffLines(input, **kwargs)
+
+    for format in FORMATS:
+        if format.sniff(lines):
+            return format.name
+
+    raise ValueError, "format of catalog input not detected"
+
+
+## sniffers
+
+def dataLines(lines, count=SNIFF_LINES):
+    """
+    return first count non-blank lines
+    """
+    return [line for line in lines if not QPUtils.line_is_empty(line)][
+        :count]
+
+
+def sniffQuakeML(lines):
+    head = ''.join(lines).lstrip()
+    return head.startswith(QPCore.XML_DECLARATION_STARTTAG) and \
+        QPCore.ROOT_ELEMENT_NAME in head
+
+
+def sniffGSE2_0Bulletin(lines):
+    lines = dataLines(lines, 5)
+    return len(lines) > 0 and lines[0].strip().upper() == \
+        QPCatalog.GSE2_0_HEADER_LINE_BEGIN
+
+
+def sniffANSSUnified(lines):
+    lines = dataLines(lines)
+    return len(lines) > 0 and False not in [line.startswith('$loc') for
+        line in lines]
+
+
+def sniffCMT(lines):
+    lines = dataLines(lines, QPCatalog.CMT_LINES_PER_EVENT)
+    return len(lines) == QPCatalog.CMT_LINES_PER_EVENT and \
+        lines[2].startswith('CENTROID:') and lines[1].startswith('C')
+
+
+def sniffJMADeck(lines):
+    lines = dataLines(lines)
+    return len(lines) > 0 and lines[0][:1] in ('J', 'U', 'I') and \
+        lines[0][1:5].isdigit() and False not in [line[:1] in ('J', 'U',
+            'I', '_', 'C', 'E') for line in lines]
+
+
+def sniffSTPPhase(lines):
+    lines = dataLines(lines)
+    return len(lines) > 0 and stpEventLine(lines[0]) and \
+        lines[0].split()[1] in STP_EVENT_TYPES and re.match(
+            r'\d{4}/\d{2}/\d{2},', lines[0].split()[2]) is not None
+
+
+def sniffPDECompressed(lines):
+    lines = dataLines(lines)
+    return len(lines) > 0 and False not in [line[1:4] == 'PDE' and len(
+        line.rstrip()) >= QPCatalog.PDE_MINIMUM_LINE_LENGTH for line in lines]
+
+
+def sniffOGS_HPL(lines):
+    lines = [line for line in dataLines(lines) if line[:1] not in (
+        QPCatalog.OGS_LINESTART_LOCALIZED_EVENT,
+        QPCatalog.OGS_LINESTART_COMMENT)]
+
+    return len(lines) > 0 and False not in [line[:6].strip().isdigit() and
+        line[6:7] == ' ' for line in lines]
+
+
+def sniffZMAP(lines):
+    lines = dataLines(lines)
+    if len(lines) == 0:
+        return False
+
+    for line in lines:
+        values = line.split()
+        if len(values) < QPCatalog.ZMAP_PARAMETER_COUNT:
+            return False
+
+        try:
+            [float(value) for value in values]
+        except ValueError:
+            return False
+
+    return True
+
+
+## record boundaries
+
+def stpEventLine(line):
+    return len(line.split()) == QPCatalog.STP_EVENT_PARAMETER_COUNT
+
+
+registerFormat(QPCatalogFormat('QuakeML', sniffQuakeML, method='readXML'))
+registerFormat(QPCatalogFormat('GSE2_0Bulletin', sniffGSE2_0Bulletin,
+    {'accept': lambda line: line.strip().startswith(
+        QPCatalog.GSE2_0_LINESTART_EVENT)}))
+registerFormat(QPCatalogFormat('ANSSUnified', sniffANSSUnified, {}))
+registerFormat(QPCatalogFormat('CMT', sniffCMT,
+    {'groupLines': QPCatalog.CMT_LINES_PER_EVENT}))
+registerFormat(QPCatalogFormat('JMADeck', sniffJMADeck,
+    {'end': lambda line: line[:1] == 'E'}))
+registerFormat(QPCatalogFormat('STPPhase', sniffSTPPhase,
+    {'accept': stpEventLine}))
+registerFormat(QPCatalogFormat('PDECompressed', sniffPDECompressed, {}))
+registerFormat(QPCatalogFormat('OGS_HPL', sniffOGS_HPL,
+    {'accept': lambda line: line.startswith(
+        QPCatalog.OGS_LINESTART_LOCALIZED_EVENT)}))
+registerFormat(QPCatalogFormat('ZMAP', sniffZMAP, {}))
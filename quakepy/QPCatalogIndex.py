@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+# child lists of events that hold public objects
+EVENT_INDEX_LISTS = ('origin', 'magnitude', 'focalMechanism', 'pick',
+    'amplitude', 'stationMagnitude')
+
+class QPCatalogIndex(object):
+    """
+    QuakePy: QPCatalogIndex
+    index of the public objects of a catalog
+
+    maps publicIDs of events, origins, magnitudes, focal mechanisms, picks,
+    amplitudes and station magnitudes to (object, parent object), and
+    holds reverse maps originID -> magnitudes and pickID -> arrivals
+
+    the index is held by the catalog only, events and origins do not refer
+    to it (they can be shared between catalogs). The getter methods of
+    Event and Origin take the index as optional argument and use it for
+    lookups in constant time if the object is registered with it
+
+    entries of an event or origin are refreshed if the lengths of its
+    child lists have changed since indexing. Changing publicIDs or
+    associations (originID, pickID) of indexed objects in place requires
+    a call of QPCatalog.reindex()
+    """
+
+    def __init__(self, eventParameters=None):
+        self._registered = {}
+        self.clear()
+
+        if eventParameters is not None:
+            self.build(eventParameters)
+
+
+    def __reduce__(self):
+        """
+        index is not pickled, unpickled index is empty
+        """
+        return (self.__class__, ())
+
+
+    def __len__(self):
+        return len(self.objects)
+
+
+    def __contains__(self, publicID):
+        return publicID in self.objects
+
+
+    def clear(self):
+        """
+        remove all entries
+        """
+        # publicID -> (object, parent, position in child list of parent)
+        self.objects = {}
+
+        # originID -> list of (magnitude, event, position)
+        self.magnitudes = {}
+
+        # pickID -> list of (arrival, origin, position)
+        self.arrivals = {}
+
+        # events in order of registration
+        self.events = []
+
+        # id() of event or origin -> (object, lengths of child lists,
+        # index keys of object)
+        self._registered = {}
+
+
+    def build(self, eventParameters):
+        """
+        index all events of eventParameters
+        """
+        self.clear()
+
+        for ev in eventParameters.event:
+            self.addEvent(ev, eventParameters)
+
+
+    def sync(self, eventParameters):
+        """
+        bring index in line with event list of eventParameters
+        events that have been appended since last sync are added, index is
+        rebuilt if events have been removed or replaced
+        """
+        event_list = eventParameters.event
+        indexed_count = len(self.events)
+
+        if indexed_count > 0 and (len(event_list) < indexed_count or \
+            event_list[indexed_count-1] is not self.events[-1]):
+            self.build(eventParameters)
+
+        else:
+            for ev in event_list[indexed_count:]:
+                self.addEvent(ev, eventParameters)
+
+
+    def addEvent(self, ev, parent=None):
+        """
+        add event and its child objects to index
+        if event is already indexed, its entries are renewed
+        """
+        if id(ev) in self._registered:
+            self._removeEventEntries(ev)
+        else:
+            self.events.append(ev)
+
+        if ev.publicID is not None:
+            self._addEntry(ev.publicID, ev, parent, None)
+
+        children = []
+        for varname in EVENT_INDEX_LISTS:
+            for pos, obj in enumerate(getattr(ev, varname)):
+                if obj.publicID is not None and self._addEntry(
+                    obj.publicID, obj, ev, pos):
+                    children.append((obj.publicID, obj))
+
+        originIDs = []
+        for pos, mag in enumerate(ev.magnitude):
+            if mag.originID is not None:
+                self.magnitudes.setdefault(mag.originID, []).append(
+                    (mag, ev, pos))
+                originIDs.append(mag.originID)
+
+        for ori in ev.origin:
+            self._addOrigin(ori)
+
+        self._register(ev, self._eventSignature(ev),
+            (children, originIDs, list(ev.origin)))
+
+
+    def removeEvents(self, events):
+        """
+        remove events and their child objects from index
+        """
+        removed = {}
+        for ev in events:
+            if id(ev) not in self._registered:
+                continue
+
+            self._removeEventEntries(ev)
+            self._removeEntry(ev.publicID, ev)
+            self._unregister(ev)
+            removed[id(ev)] = ev
+
+        if removed:
+            self.events = [ev for ev in self.events if id(ev) not in removed]
+
+
+    def get(self, publicID, default=None):
+        """
+        return object with given publicID
+        """
+        try:
+            return self.objects[publicID][0]
+        except KeyError:
+            return default
+
+
+    def getParent(self, publicID, default=None):
+        """
+        return parent object of object with given publicID
+        """
+        try:
+            return self.objects[publicID][1]
+        except KeyError:
+            return default
+
+
+    def getMagnitudes(self, originID):
+        """
+        return list of magnitudes that are associated with given originID
+        """
+        return [entry[0] for entry in self.magnitudes.get(originID, ())]
+
+
+    def getArrivals(self, pickID):
+        """
+        return list of arrivals that refer to given pickID
+        """
+        return [entry[0] for entry in self.arrivals.get(pickID, ())]
+
+
+    def isRegistered(self, obj):
+        return id(obj) in self._registered
+
+
+    def getPosition(self, ev, varname, publicID):
+        """
+        return position of object with given publicID in child list
+        varname of event ev, None if not found
+        """
+        self._refreshEvent(ev)
+
+        entry = self.objects.get(publicID)
+        if entry is not None and entry[1] is ev:
+            obj, parent, pos = entry
+
+            object_list = getattr(ev, varname)
+            if pos < len(object_list) and object_list[pos] is obj:
+                return pos
+
+        return None
+
+
+    def getMagnitudesIdx(self, ev, originID):
+        """
+        return positions of magnitudes of event ev that are associated with
+        given originID
+        """
+        self._refreshEvent(ev)
+
+        mag_idx = []
+        for mag, parent, pos in self.magnitudes.get(originID, ()):
+            if parent is ev and pos < len(ev.magnitude) and \
+                ev.magnitude[pos] is mag and mag.originID == originID:
+                mag_idx.append(pos)
+
+        return sorted(mag_idx)
+
+
+    def getArrivalsIdx(self, ori, pickID):
+        """
+        return positions of arrivals of origin ori that refer to given
+        pickID
+        """
+        self._refreshOrigin(ori)
+
+        arr_idx = []
+        for arr, parent, pos in self.arrivals.get(pickID, ()):
+            if parent is ori and pos < len(ori.arrival) and \
+                ori.arrival[pos] is arr and arr.pickID == pickID:
+                arr_idx.append(pos)
+
+        return sorted(arr_idx)
+
+
+    def _refreshEvent(self, ev):
+        """
+        re-index event if lengths of its child lists have changed
+        """
+        if self._registered[id(ev)][1] != self._eventSignature(ev):
+            self.addEvent(ev, self.getParent(ev.publicID))
+
+
+    def _refreshOrigin(self, ori):
+        """
+        re-index arrivals of origin if length of arrival list has changed
+        """
+        if self._registered[id(ori)][1] != len(ori.arrival):
+            self._removeOriginEntries(ori)
+            self._addOrigin(ori)
+
+
+    def _eventSignature(self, ev):
+        return tuple([len(getattr(ev, varname)) for varname in \
+            EVENT_INDEX_LISTS])
+
+
+    def _register(self, obj, signature, keys):
+        """
+        keys: index keys that have been added for obj, used for removal
+        """
+        self._registered[id(obj)] = (obj, signature, keys)
+
+
+    def _unregister(self, obj):
+        del self._registered[id(obj)]
+
+
+    def _addEntry(self, publicID, obj, parent, pos):
+        """
+        add entry for publicID, if publicID is not unique first object
+        keeps the entry
+        """
+        if publicID not in self.objects:
+            self.objects[publicID] = (obj, parent, pos)
+            return True
+        else:
+            return False
+
+
+    def _removeEntry(self, publicID, obj):
+        if publicID in self.objects and self.objects[publicID][0] is obj:
+            del self.objects[publicID]
+
+
+    def _removeReverseEntries(self, reverseMap, key, parent):
+        if key not in reverseMap:
+            return
+
+        entries = [entry for entry in reverseMap[key] if entry[1] is not parent]
+        if entries:
+            reverseMap[key] = entries
+        else:
+            del reverseMap[key]
+
+
+    def _addOrigin(self, ori):
+        pickIDs = []
+        for pos, arr in enumerate(ori.arrival):
+            if arr.pickID is not None:
+                self.arrivals.setdefault(arr.pickID, []).append(
+                    (arr, ori, pos))
+                pickIDs.append(arr.pickID)
+
+        self._register(ori, len(ori.arrival), pickIDs)
+
+
+    def _removeOriginEntries(self, ori):
+        """
+        remove arrival entries of origin ori
+        """
+        for pickID in self._registered[id(ori)][2]:
+            self._removeReverseEntries(self.arrivals, pickID, ori)
+
+
+    def _removeEventEntries(self, ev):
+        """
+        remove entries of child objects of event ev, event entry is kept
+        """
+        children, originIDs, origins = self._registered[id(ev)][2]
+
+        for publicID, obj in children:
+            self._removeEntry(publicID, obj)
+
+        for originID in originIDs:
+            self._removeReverseEntries(self.magnitudes, originID, ev)
+
+        for ori in origins:
+            if id(ori) in self._registered:
+                self._removeOriginEntries(ori)
+                self._unregister(ori)
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import math
+import numpy
+
+from mx.DateTime.ISO import ParseDateTimeUTC
+
+from quakepy import QPCore
+from quakepy import QPDateTime
+from quakepy import QPUtils
+
+
+def toEpoch(value):
+    """
+    convert time to seconds since 1970-01-01 (float)
+    value can be a QPDateTime or mx.DateTime object, an ISO string, or a
+    number of seconds since 1970-01-01
+    """
+    if isinstance(value, QPDateTime.QPDateTime):
+        value = value.datetime
+    elif isinstance(value, QPCore.STRING_TYPES):
+        value = ParseDateTimeUTC(value)
+    elif isinstance(value, (int, long, float)):
+        return float(value)
+
+    return (value.absdate - QPUtils.MX_ABSDATE_UNIX_EPOCH) * 86400.0 + \
+        value.abstime
+
+
+def toDecimalYear(value):
+    """
+    convert time to decimal year, as in time column of compact catalogs
+    value as in toEpoch()
+    """
+    if isinstance(value, QPDateTime.QPDateTime):
+        value = value.datetime
+    elif isinstance(value, QPCore.STRING_TYPES):
+        value = ParseDateTimeUTC(value)
+
+    if isinstance(value, (int, long, float)):
+        days = math.floor(value / 86400.0)
+        absdate = int(days) + QPUtils.MX_ABSDATE_UNIX_EPOCH
+        abstime = value - days * 86400.0
+    else:
+        absdate = value.absdate
+        abstime = value.abstime
+
+    return float(QPUtils.decimalYears([absdate], [abstime])[0])
+
+
+def eventListSignature(eventList):
+    """
+    return tuple that changes if events are added to or removed from list,
+    checked in constant time
+    """
+    if len(eventList) == 0:
+        return (id(eventList), 0, None, None)
+    else:
+        return (id(eventList), len(eventList), id(eventList[0]),
+            id(eventList[-1]))
+
+
+class QPCatalogTimeIndex(object):
+    """
+    QuakePy: QPCatalogTimeIndex
+    index of events sorted by time of their preferred origin
+
+    times are held as float seconds since 1970-01-01 (epoch). Events w/o
+    preferred origin or origin time are not indexed
+
+    QPCatalog rebuilds its time index if events have been added or removed.
+    Changing origin times or preferred origins of indexed events in place
+    requires a call of QPCatalog.reindex()
+    """
+
+    def __init__(self, eventParameters=None):
+        self.clear()
+
+        if eventParameters is not None:
+            self.build(eventParameters)
+
+
+    def __reduce__(self):
+        """
+        index is not pickled, unpickled index is empty
+        """
+        return (self.__class__, ())
+
+
+    def __len__(self):
+        return len(self.times)
+
+
+    def clear(self):
+
+        # epoch times in ascending order
+        self.times = numpy.zeros(0, dtype=numpy.float_)
+
+        # positions of events in event list, in order of self.times
+        self.positions = numpy.zeros(0, dtype=numpy.int_)
+
+        # QPDateTime objects of earliest and latest origin time
+        self.startTime = None
+        self.endTime = None
+
+        self.signature = None
+
+
+    def build(self, eventParameters):
+        """
+        index preferred origin times of all events of eventParameters
+        """
+        self.clear()
+
+        times = []
+        positions = []
+        origin_times = []
+
+        for ev_idx, ev in enumerate(eventParameters.event):
+            try:
+                ori_time = ev.getPreferredOrigin().time.value
+            except (IndexError, AttributeError):
+                continue
+
+            if ori_time is None:
+                continue
+
+            times.append(toEpoch(ori_time))
+            positions.append(ev_idx)
+            origin_times.append(ori_time)
+
+        times = numpy.array(times, dtype=numpy.float_)
+        order = numpy.argsort(times, kind='mergesort')
+
+        self.times = times[order]
+        self.positions = numpy.array(positions, dtype=numpy.int_)[order]
+
+        if len(order) > 0:
+            self.startTime = origin_times[order[0]]
+            self.endTime = origin_times[order[-1]]
+
+        self.signature = eventListSignature(eventParameters.event)
+
+
+    def isCurrent(self, eventParameters):
+        return self.signature is not None and \
+            self.signature == eventListSignature(eventParameters.event)
+
+
+    def select(self, starttime=None, endtime=None):
+        """
+        return positions of events with starttime <= time < endtime (in
+        ascending order of time)
+        starttime/endtime None: no limit
+        """
+        if starttime is None:
+            start = 0
+        else:
+            start = numpy.searchsorted(self.times, toEpoch(starttime), 'left')
+
+        if endtime is None:
+            end = len(self.times)
+        else:
+            end = numpy.searchsorted(self.times, toEpoch(endtime), 'left')
+
+        return self.positions[start:end]
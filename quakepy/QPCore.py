@@ -5,9 +5,13 @@ This file is part of QuakePy12.
 """
 
 import datetime
+import itertools
 import math
 import numpy
+import os
+import threading
 import urllib
+import uuid
 import gzip, bz2
 import types
 
@@ -19,6 +23,7 @@ from mx.DateTime import cmp as mxdatetimecmp
 # internal includes
 
 import quakepy
+import quakepy.QPElement
 
 
 POS_TAGNAME, POS_ATTRS, POS_CHILDREN = range(3)
@@ -48,13 +53,121 @@ RESOURCE_IDENTIFIER_URI_SCHEME = 'smi'
 RESOURCE_IDENTIFIER_AUTHORITY_LOCAL = 'local'
 
 STRING_TYPES = (basestring, unicode)
-PUBLIC_ID_STYLE_VALUES = ('full', 'short', 'numeric')
+PUBLIC_ID_STYLE_VALUES = ('full', 'short', 'numeric', 'counter', 'uuid')
 
 CLASS_ATTRIBUTE_TYPE_BASIC = 'basic'
 CLASS_ATTRIBUTE_TYPE_ENUM = 'enum'
 CLASS_ATTRIBUTE_TYPE_COMPLEX = 'complex'
 CLASS_ATTRIBUTE_TYPE_MULTIPLE = 'multiple'
 
+CLASS_ATTRIBUTE_TYPES = (CLASS_ATTRIBUTE_TYPE_BASIC, CLASS_ATTRIBUTE_TYPE_ENUM,
+    CLASS_ATTRIBUTE_TYPE_COMPLEX, CLASS_ATTRIBUTE_TYPE_MULTIPLE)
+
+# compiled element schemas, key is tuple of QPElement objects
+_elementSchemaCache = {}
+
+
+class QPElementSchema(object):
+    """
+    compiled representation of a QPElementList, used for dispatch in
+    QPObject.fromXML() and QPObject.toXML()
+
+    attributes: tuple of (xmlname, varname, pytype) for XML attributes
+    elements:   tuple of (xmlname, varname, pytype, vartype) for XML elements,
+                in serialization order (basic, enum, complex, multiple)
+    children:   dict xmlname -> (varname, pytype, vartype) for XML elements
+    cdata:      (varname, pytype) of first CDATA element, or (None, None)
+    """
+
+    def __init__(self, elements):
+
+        attributes = []
+        elements_by_vartype = dict((vartype, []) for vartype in \
+            CLASS_ATTRIBUTE_TYPES)
+        cdata = None
+
+        for element in elements:
+            if element.xmltype == 'attribute':
+                attributes.append((element.xmlname, element.varname,
+                    element.pytype))
+
+            elif element.xmltype == 'element' and \
+                element.vartype in elements_by_vartype:
+
+                elements_by_vartype[element.vartype].append((element.xmlname,
+                    element.varname, element.pytype, element.vartype))
+
+            elif element.xmltype == 'cdata' and cdata is None:
+                cdata = (element.varname, element.pytype)
+
+        self.attributes = tuple(attributes)
+
+        self.elements = tuple([element for vartype in CLASS_ATTRIBUTE_TYPES \
+            for element in elements_by_vartype[vartype]])
+
+        # if an XML name occurs more than once, first one in
+        # serialization order is used
+        self.children = {}
+        for xmlname, varname, pytype, vartype in self.elements:
+            if xmlname not in self.children:
+                self.children[xmlname] = (varname, pytype, vartype)
+
+        self.elementNames = {}
+        for vartype in CLASS_ATTRIBUTE_TYPES:
+            self.elementNames[vartype] = tuple([(xmlname, varname, pytype) \
+                for xmlname, varname, pytype, curr_vartype in \
+                    elements_by_vartype[vartype]])
+
+        if cdata is not None:
+            self.cdata = cdata
+        else:
+            self.cdata = (None, None)
+
+    def getElementNames(self, vartype):
+        """
+        return tuple of (xmlname, varname, pytype) for XML elements of
+        given vartype
+        """
+        return self.elementNames.get(vartype, ())
+
+
+def getElementSchema(elements):
+    """
+    return compiled QPElementSchema for a QPElementList
+
+    schemas are shared between all element lists with the same QPElement
+    objects, and are cached in the QPElementList until it is modified
+    """
+
+    schema = getattr(elements, 'schema', None)
+
+    if schema is None:
+        key = tuple(elements)
+
+        try:
+            schema = _elementSchemaCache[key]
+        except KeyError:
+            schema = QPElementSchema(elements)
+            _elementSchemaCache[key] = schema
+
+        if isinstance(elements, quakepy.QPElement.QPElementList):
+            elements.schema = schema
+
+    return schema
+
+
+class QPClassElements(object):
+    """
+    descriptor for attribute 'elements' of QPObject
+
+    returns element list of the class (addElements) as long as no 
+    instance-specific element list has been set (see 
+    QPObject._getInstanceElements)
+    """
+
+    def __get__(self, obj, cls):
+        return cls.addElements
+
 
 class QPObject(object):
     """
@@ -63,6 +176,38 @@ class QPObject(object):
     
     """
 
+    # element layout of the class, redefined by derived classes
+    addElements = quakepy.QPElement.QPElementList()
+
+    # element list of an object is shared with its class, an instance-specific
+    # copy is only created if elements are added to a single object
+    elements = QPClassElements()
+
+    # non-standard XML elements, list is created for an object if required
+    childXMLTree = ()
+
+    elementAxis = ''
+
+    # variant of the class with attributes in __slots__, set by 
+    # createSlottedClass()
+    slottedClass = None
+
+    # if True, objects of classes that have a slotted variant are created
+    # as slotted objects
+    slottedObjects = False
+
+    # setting of slotted objects for current thread only
+    _threadSlottedObjects = threading.local()
+
+    def __new__(cls, *args, **kwargs):
+        
+        if cls.__dict__.get('slottedClass') is not None and \
+            QPObject.getSlottedObjects() is True:
+            cls = cls.slottedClass
+
+        return super(QPObject, cls).__new__(cls)
+
+
     # this is the difference below which two floating point values
     # are considered equal
     floatCmpEpsilon = 1.0e-9
@@ -76,8 +221,8 @@ class QPObject(object):
     
     def __init__(self, **kwargs):
         """
-        each class that is derived from QPObject can redefine/append to the 
-        elements list
+        each class that is derived from QPObject can redefine the 
+        addElements list
         
         element = QPElement( varname, xmlname, xmltype, type, vartype, 
             parentname=None, parenttype=None )
@@ -89,11 +234,6 @@ class QPObject(object):
                 elementName
         """
 
-        self.elements = quakepy.QPElement.QPElementList()
-        self.childXMLTree = []
-
-        self.elementAxis = ''
-
         if 'parentAxis' in kwargs and kwargs['parentAxis'] is not None:
             
             if 'elementName' in kwargs:
@@ -120,7 +260,7 @@ class QPObject(object):
         
         # compare attributes: can only be basic or enum
         for xmlname, varname, pytype in self._getXMLAttributeNames():
-            if hasattr( self, varname ) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
 
                 # no comparison for 'publicID'
                 if varname == 'publicID':
@@ -135,7 +275,7 @@ class QPObject(object):
         for xmlname, varname, pytype in self._getXMLElementNames(
             CLASS_ATTRIBUTE_TYPE_BASIC):
             
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
 
                 # no comparison for 'publicID'
                 if varname == 'publicID':
@@ -148,7 +288,7 @@ class QPObject(object):
         for xmlname, varname, pytype in self._getXMLElementNames(
             CLASS_ATTRIBUTE_TYPE_ENUM):
             
-            if hasattr( self, varname ) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
                 if self.compareEqualBasicType( T, varname, pytype ) is False:
                     return False
 
@@ -156,11 +296,11 @@ class QPObject(object):
         for xmlname, varname, pytype in self._getXMLElementNames(
             CLASS_ATTRIBUTE_TYPE_COMPLEX):
             
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
               
-                if hasattr(T, varname) and T.__dict__[varname] is not None:
-                    if self.__dict__[varname].__eq__(
-                        T.__dict__[varname]) is False:
+                if getattr(T, varname, None) is not None:
+                    if getattr(self, varname).__eq__(
+                        getattr(T, varname)) is False:
                         
                         return False
                 else:
@@ -170,18 +310,18 @@ class QPObject(object):
         for xmlname, varname, pytype in self._getXMLElementNames(
             CLASS_ATTRIBUTE_TYPE_MULTIPLE):
             
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
               
-                if hasattr(T, varname) and T.__dict__[varname] is not None:
+                if getattr(T, varname, None) is not None:
                     
-                    varlen = len(self.__dict__[varname])
+                    varlen = len(getattr(self, varname))
                     
-                    if len(T.__dict__[varname]) != varlen:
+                    if len(getattr(T, varname)) != varlen:
                         return False
                     
                     for idx in xrange(varlen):
-                        if self.__dict__[varname][idx].__eq__(
-                            T.__dict__[varname][idx]) is False:
+                        if getattr(self, varname)[idx].__eq__(
+                            getattr(T, varname)[idx]) is False:
                             
                             return False
                 else:
@@ -192,7 +332,7 @@ class QPObject(object):
         
         if varname is not None:
             
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
                 
                 if self.compareEqualBasicType(T, varname, pytype) is False:
                     return False
@@ -214,45 +354,41 @@ class QPObject(object):
         compare basic attributes 'varname' of self and another instance
         """
         
+        value = getattr(self, varname, None)
+        other = getattr(T, varname, None)
+
         # check if attribute 'varname' is present in both compared instances
-        if hasattr(self, varname ) and self.__dict__[varname] is not None and \
-            hasattr( T, varname) and T.__dict__[varname] is not None:
+        if value is not None and other is not None:
             
             cmpEqual = True
             
-            if isinstance(self.__dict__[varname], float):
+            if isinstance(value, float):
                 
-                if not quakepy.QPUtils.floatEqual(
-                    self.__dict__[varname], T.__dict__[varname], 
+                if not quakepy.QPUtils.floatEqual(value, other, 
                     self.floatCmpEpsilon):
                     
                     cmpEqual = False
             
-            elif isinstance(self.__dict__[varname], DateTimeType):
+            elif isinstance(value, DateTimeType):
                 
                 # compare instances of mx.DateTime.DateTimeType
                 # use special 'cmp' function because we need to use epsilon
                 # cmp() from mxDateTime returns 0 for equal, -1 for smaller, 
                 # 1 for greater
-                if quakepy.QPUtils.mxdatetimecmp(
-                    self.__dict__[varname], T.__dict__[varname], 
-                    self.dateTimeCmpEpsilon ) != 0:
-                    
+                if mxdatetimecmp(value, other, self.dateTimeCmpEpsilon) != 0:
                     cmpEqual = False
 
-            elif isinstance(
-                self.__dict__[varname], quakepy.QPDateTime.QPDateTime):
+            elif isinstance(value, quakepy.QPDateTime.QPDateTime):
                 
                 # do not compare instances of QPDateTime using the regular 
                 # 'cmp' function / operator, because we need to use 'epsilon'
-                if quakepy.QPUtils.cmpQPDateTime(
-                    self.__dict__[varname], T.__dict__[varname], 
-                    self.dateTimeCmpEpsilon ) != 0:
+                if quakepy.QPDateTime.cmpQPDateTime(value, other, 
+                    self.dateTimeCmpEpsilon) != 0:
                     
                     cmpEqual = False
             else:
               
-                if not (self.__dict__[varname] == T.__dict__[varname]):
+                if not (value == other):
                     cmpEqual = False
                 
             if cmpEqual is False:
@@ -260,23 +396,21 @@ class QPObject(object):
                     print "%s: comparison not equal for attribute %s of %s "\
                         "- self %s, other %s" % (
                             self.__class__.__name__, varname, pytype, 
-                            self.__dict__[varname], T.__dict__[varname])
+                            value, other)
                     
-                    if isinstance(self.__dict__[varname], float):
+                    if isinstance(value, float):
                         print " --> difference: %s, epsilon: %s" % (
-                            (self.__dict__[varname] - T.__dict__[varname]),
-                            self.floatCmpEpsilon)
+                            (value - other), self.floatCmpEpsilon)
                         
-                    elif isinstance(self.__dict__[varname], DateTimeType):
-                        TimeDiff = self.__dict__[varname] - T.__dict__[varname]
+                    elif isinstance(value, DateTimeType):
+                        TimeDiff = value - other
                         print " --> difference: %s, epsilon: %s" % (
                             TimeDiff.seconds, self.dateTimeCmpEpsilon)
                         
-                    elif isinstance(
-                        self.__dict__[varname], quakepy.QPDateTime.QPDateTime):
+                    elif isinstance(value, quakepy.QPDateTime.QPDateTime):
                         
-                        TimeDiff = diffQPDateTime(
-                            self.__dict__[varname], T.__dict__[varname])
+                        TimeDiff = quakepy.QPDateTime.diffQPDateTime(
+                            value, other)
                         print " --> difference: %s, epsilon: %s" % (
                             TimeDiff.seconds, self.dateTimeCmpEpsilon)
                         
@@ -290,16 +424,29 @@ class QPObject(object):
             return False
 
     
+    def _getInstanceElements(self):
+        """
+        get instance-specific elements list, which can be modified
+        without affecting other objects of the same class
+        """
+        if self.elements is self.addElements:
+            self.elements = quakepy.QPElement.QPElementList(self.elements)
+
+        return self.elements
+
+
+    def _getSchema(self):
+        """
+        get compiled schema (QPElementSchema) of elements list
+        """
+        return getElementSchema(self.elements)
+
+
     def _getXMLAttributeNames(self):
         """
         get object attributes with 'attribute' xmltype from elements list 
         """
-        attr = []
-        for element in self.elements:
-            if element.xmltype == 'attribute':
-                attr.append([element.xmlname, element.varname, element.pytype])
-        
-        return attr
+        return self._getSchema().attributes
 
 
     def _getXMLElementNames(self, vartype):
@@ -309,12 +456,7 @@ class QPObject(object):
         
         vartype can be from (basic, enum, complex, multiple)
         """
-        elem = []
-        for element in self.elements:
-            if element.xmltype == 'element' and element.vartype == vartype:
-                elem.append([element.xmlname, element.varname, element.pytype])
-        
-        return elem
+        return self._getSchema().getElementNames(vartype)
 
 
     def _getXMLCDATAName(self):
@@ -324,11 +466,7 @@ class QPObject(object):
         there should not be more than one CDATA element in self.elements
         function returns the first CDATA element
         """
-        for element in self.elements:
-            if element.xmltype == 'cdata':
-                return [element.varname, element.pytype]
-        
-        return [None, None]
+        return self._getSchema().cdata
 
 
     def _getXMLExtensionElements(self, elementList):
@@ -350,7 +488,7 @@ class QPObject(object):
         for xmlname, varname, pytype in self._getXMLElementNames(
             CLASS_ATTRIBUTE_TYPE_MULTIPLE):
             
-            self.__dict__[varname] = []
+            setattr(self, varname, [])
 
 
     def _getXMLSerializationString(self, attribute):
@@ -388,8 +526,6 @@ class QPObject(object):
         for attributes that are added to standard class layout
         """
 
-        foundElements = []
-
         ## check if there are additionalElements which have to be added to
         ## this object
         if additionalElements is not None:
@@ -402,19 +538,24 @@ class QPObject(object):
                     self, check_element.parenttype):
 
                     # append element to current elements list
-                    self.elements.append(check_element)
+                    self._getInstanceElements().append(check_element)
+
+        schema = self._getSchema()
 
         ## XML attributes
         if tree[POS_ATTRS] is not None:
             attr_dict = tree[POS_ATTRS]
 
             # loop over possible attributes
-            for xmlname, varname, pytype in self._getXMLAttributeNames():
-                if xmlname in attr_dict.keys():
-                    self.__dict__[varname] = pytype(attr_dict[xmlname])
+            for xmlname, varname, pytype in schema.attributes:
+                if xmlname in attr_dict:
+                    setattr(self, varname, pytype(attr_dict[xmlname]))
                 
         ## XML elements
         if tree[POS_CHILDREN] is not None:
+
+            foundElements = set()
+
             for child in tree[POS_CHILDREN]:
 
                 ## get CDATA
@@ -422,83 +563,53 @@ class QPObject(object):
                 if not isinstance(child, tuple):
                      
                     if len(child.strip()) > 0:
-                        varname, pytype = self._getXMLCDATAName()
-                        self.__dict__[varname] = pytype(child)
+                        varname, pytype = schema.cdata
+                        setattr(self, varname, pytype(child))
 
                     continue
 
+                xmlname = child[POS_TAGNAME]
+                handler = schema.children.get(xmlname)
 
-                elementFound = False
-                
-                # basic type
-                for xmlname, varname, pytype in self._getXMLElementNames(
-                    CLASS_ATTRIBUTE_TYPE_BASIC):
+                if handler is not None:
+                    varname, pytype, vartype = handler
 
-                    if child[POS_TAGNAME] == xmlname and len(
-                        child[POS_CHILDREN]) > 0:
-                        
-                        self.__dict__[varname] = pytype(
-                            child[POS_CHILDREN].pop())
-                        
-                        quakepy.QPUtils.addUnique(foundElements, [xmlname])
-                        elementFound = True
-                        
-                        break
-                    
-                if elementFound is True:
-                    continue
-                
-                # enums
-                for xmlname, varname, pytype in self._getXMLElementNames(
-                    CLASS_ATTRIBUTE_TYPE_ENUM):
+                    # basic types and enums
+                    if vartype == CLASS_ATTRIBUTE_TYPE_BASIC or \
+                        vartype == CLASS_ATTRIBUTE_TYPE_ENUM:
 
-                    if child[POS_TAGNAME] == xmlname and len(
-                        child[POS_CHILDREN]) > 0:
-                        
-                        self.__dict__[varname] = pytype(
-                            child[POS_CHILDREN].pop())
-                        
-                        quakepy.QPUtils.addUnique(foundElements, [xmlname])
-                        elementFound = True
-                        
-                        break
+                        if len(child[POS_CHILDREN]) > 0:
+                            setattr(self, varname, pytype(
+                                child[POS_CHILDREN].pop()))
 
-                if elementFound is True:
-                    continue
-                
-                # complex types
-                for xmlname, varname, pytype in self._getXMLElementNames(
-                    CLASS_ATTRIBUTE_TYPE_COMPLEX):
+                            foundElements.add(xmlname)
+                            continue
 
-                    if child[POS_TAGNAME] == xmlname:
-                        self.__dict__[varname] = pytype(
+                    # complex types
+                    elif vartype == CLASS_ATTRIBUTE_TYPE_COMPLEX:
+                        tmp = pytype(
                             parentAxis=self.elementAxis, elementName=varname)
-                        
-                        self.__dict__[varname].fromXML(child, additionalElements)
-                        quakepy.QPUtils.addUnique(foundElements, [xmlname])
+                        tmp.fromXML(child, additionalElements)
 
-                if elementFound is True:
-                    continue
-                
-                # multiple elements
-                for xmlname, varname, pytype in self._getXMLElementNames(
-                    CLASS_ATTRIBUTE_TYPE_MULTIPLE):
+                        setattr(self, varname, tmp)
+                        foundElements.add(xmlname)
+                        continue
 
-                    if child[POS_TAGNAME] == xmlname:
-                        
+                    # multiple elements
+                    else:
                         tmp = pytype(
                             parentAxis=self.elementAxis, elementName=varname)
                         tmp.fromXML(child, additionalElements)
 
                         tmp.add(self, varname)
-                        quakepy.QPUtils.addUnique(foundElements, [xmlname])
-
-                if elementFound is True:
-                    continue
+                        foundElements.add(xmlname)
+                        continue
 
                 ## element has not been found:
                 ## append subtree to childXMLTree if not already processed
-                if not child[POS_TAGNAME].strip() in foundElements:
+                if not xmlname.strip() in foundElements:
+                    if not isinstance(self.childXMLTree, list):
+                        self.childXMLTree = []
                     self.childXMLTree.append(child)
 
         return True
@@ -512,70 +623,53 @@ class QPObject(object):
 
         stream.write("<%s" % tagname)
         
+        schema = self._getSchema()
+
         ## XML attributes
         
         # loop over possible attributes
-        for xmlname, varname, pytype in self._getXMLAttributeNames():
-            
+        for xmlname, varname, pytype in schema.attributes:
             
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
                 stream.write(' %s="%s"' % (xmlname, 
-                    self._getXMLSerializationString(self.__dict__[varname])))
+                    self._getXMLSerializationString(getattr(self, varname))))
 
         stream.write('>')
         
-        ## XML elements
+        ## XML elements, ordered as basic types, enums, complex types,
+        ## multiple elements
+        for xmlname, varname, pytype, vartype in schema.elements:
+
+            if getattr(self, varname, None) is None:
+                continue
+
+            if vartype == CLASS_ATTRIBUTE_TYPE_BASIC or \
+                vartype == CLASS_ATTRIBUTE_TYPE_ENUM:
 
-        # basic type
-        for xmlname, varname, pytype in self._getXMLElementNames(
-            CLASS_ATTRIBUTE_TYPE_BASIC):
-            
-            
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
                 stream.writelines(
                     ['<', xmlname, '>', self._getXMLSerializationString(
-                        self.__dict__[varname]), '</', xmlname, '>'])
-                
-        # enums
-        for xmlname, varname, pytype in self._getXMLElementNames(
-            CLASS_ATTRIBUTE_TYPE_ENUM):
-            
-            
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
-                stream.writelines(
-                    [ '<', xmlname, '>', self._getXMLSerializationString(
-                        self.__dict__[varname]), '</', xmlname, '>'])
-                
-        # complex types
-        for xmlname, varname, pytype in self._getXMLElementNames(
-            CLASS_ATTRIBUTE_TYPE_COMPLEX):
-            
-            
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
-                self.__dict__[varname].toXML(xmlname, stream)
-                
-        # multiple elements
-        for xmlname, varname, pytype in self._getXMLElementNames(
-            CLASS_ATTRIBUTE_TYPE_MULTIPLE):
-            
-            
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
-                for tmp in self.__dict__[varname]:
+                        getattr(self, varname)), '</', xmlname, '>'])
+
+            elif vartype == CLASS_ATTRIBUTE_TYPE_COMPLEX:
+                getattr(self, varname).toXML(xmlname, stream)
+
+            else:
+                for tmp in getattr(self, varname):
                     tmp.toXML(xmlname, stream)
 
         # add non-standard elements from self.childXMLTree
         for curr_extension_node in self.childXMLTree:
-            pyrxpTupleTree2XML(curr_extension_node, stream)
+            quakepy.QPUtils.pyrxpTupleTree2XML(curr_extension_node, stream)
 
         ## add CDATA
         ## note: there should by only one CDATA element in self.elements
         ## we use the first element that is flagged as 'cdata'
-        varname, pytype = self._getXMLCDATAName()
+        varname, pytype = schema.cdata
         
         if varname is not None:
-            if hasattr(self, varname) and self.__dict__[varname] is not None:
+            if getattr(self, varname, None) is not None:
                 stream.write(self._getXMLSerializationString(
-                    self.__dict__[varname]))
+                    getattr(self, varname)))
                 
         stream.write("</%s>"% tagname)
         return True
@@ -592,8 +686,7 @@ class QPObject(object):
                 self.__class__.__name__[1:]
             
         # check if parentObject type has attribute parentVariableName
-        if hasattr( parentObject, parentVariableName ) and \
-            parentObject.__dict__[parentVariableName] is not None:
+        if getattr(parentObject, parentVariableName, None) is not None:
 
             # check if parentObject.parentVariableName is defined as list of
             # objects of the same type as self
@@ -602,7 +695,7 @@ class QPObject(object):
                 if parentVariableName == curr_element.varname and isinstance(
                     self, curr_element.pytype):
             
-                        parentObject.__dict__[parentVariableName].append(self)
+                        getattr(parentObject, parentVariableName).append(self)
                         self.setElementAxis(parentObject.elementAxis, 
                             parentVariableName)
                         return True
@@ -626,10 +719,10 @@ class QPObject(object):
         obj has to have obj.elements for own contents
         obj_elements has to be QPElement with element information for added obj
         """
-        self.elements.append(obj_elements)
+        self._getInstanceElements().append(obj_elements)
 
         # add object to instance
-        self.__dict__[obj_elements.varname] = obj
+        setattr(self, obj_elements.varname, obj)
 
 
     def setElementAxis(self, parentAxis, elementName=None):
@@ -643,6 +736,271 @@ class QPObject(object):
             else:
                 self.elementAxis = parentAxis
 
+    @classmethod
+    def getSlottedObjects(cls, threadlocal=False):
+        """
+        return setting of slotted objects of current thread, or global
+        setting
+
+        if threadlocal is True, setting of current thread is returned,
+        None if no setting has been made for the thread
+        """
+        slotted = getattr(QPObject._threadSlottedObjects, 'slotted', None)
+
+        if slotted is not None or threadlocal:
+            return slotted
+        else:
+            return QPObject.slottedObjects
+
+    @classmethod
+    def setSlottedObjects(cls, slotted, threadlocal=False):
+        """
+        create new objects of classes that have a slotted variant
+        (see createSlottedClass) as slotted objects
+
+        if threadlocal is True, setting is only used in current thread,
+        slotted None resets thread to global setting
+        """
+        if threadlocal:
+            if slotted is not None:
+                slotted = bool(slotted)
+            QPObject._threadSlottedObjects.slotted = slotted
+        else:
+            QPObject.slottedObjects = bool(slotted)
+
+def createSlottedClass(cls):
+    """
+    create variant of class cls (derived from QPObject) which stores the
+    attributes of its element layout in __slots__
+
+    objects of the slotted class do not allocate an instance dict unless 
+    attributes outside the element layout are set (e.g., extension elements),
+    in which case the dict is created on demand
+    
+    the slotted class is a subclass of cls with the same name, it is used 
+    for new objects of cls if QPObject.setSlottedObjects(True) has been called
+    (globally or for the current thread)
+
+    imported catalogs with slotted objects (origins, magnitudes, picks, 
+    arrivals, phases and their quantities, QPDateTime) use 2.5-2.7x less
+    memory than with regular objects when measured with a pure-Python
+    stand-in for mx.DateTime, short of a 3x reduction. The estimate for C
+    mx.DateTime objects is 3.1-3.6x (see test/benchmark/
+    SlottedMemoryBenchmark.py)
+    """
+
+    slots = ['elementAxis']
+
+    if issubclass(cls, QPPublicObject):
+        slots.append('publicID')
+
+    for element in cls.addElements:
+        if element.varname not in slots:
+            slots.append(element.varname)
+
+    def __init__(self, *args, **kwargs):
+        self.elementAxis = ''
+        cls.__init__(self, *args, **kwargs)
+
+    slotted_cls = type(cls.__name__, (cls,), {
+        '__slots__': tuple(slots),
+        '__init__': __init__,
+        '__reduce_ex__': _reduceSlotted,
+        '__setstate__': _setSlottedState,
+        '__module__': cls.__module__,
+        '__doc__': cls.__doc__})
+
+    cls.slottedClass = slotted_cls
+    return slotted_cls
+
+
+def _newSlottedObject(cls):
+    """
+    create object of slotted variant of class cls, used for unpickling
+    """
+    return object.__new__(cls.slottedClass)
+
+
+def _reduceSlotted(self, protocol):
+    """
+    pickle slotted object as reference to the non-slotted class and dict of
+    slot values, updated with instance dict (if any)
+    """
+    state = {}
+    for curr_cls in type(self).__mro__:
+        for name in curr_cls.__dict__.get('__slots__', ()):
+            if hasattr(self, name):
+                state[name] = getattr(self, name)
+
+    state.update(self.__dict__)
+
+    return (_newSlottedObject, (type(self).__bases__[0],), state)
+
+
+def _setSlottedState(self, state):
+    for name, value in state.iteritems():
+        setattr(self, name, value)
+
+# ----------------------------------------------------------------------------
+
+class QPPublicIDGenerator(object):
+    """
+    QPPublicIDGenerator is the base class of generators for publicIDs of 
+    QPPublicObjects. Derived classes implement createID().
+
+    namespace is used as authority ID of smi resource identifiers
+
+    createID() can be called concurrently from several threads. Generators
+    can be pickled (e.g., for worker processes), the unpickled generator
+    starts with a fresh state.
+    """
+
+    style = None
+
+    def __init__(self, namespace=RESOURCE_IDENTIFIER_AUTHORITY_LOCAL):
+        self.namespace = namespace
+
+    def createID(self, name=None, secondsdigits=None):
+        raise NotImplementedError, "%s does not implement createID()" % (
+            self.__class__.__name__)
+
+    def __getstate__(self):
+        return {'namespace': self.namespace}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def _timestamp(self, secondsdigits):
+
+        # colons are not allowed in smi URIs, so change ':' to '.' in time
+        # component of timestamp
+        return quakepy.QPUtils.mxDateTime2ISO(utc(), 
+            secondsdigits=secondsdigits, timesepreplacechar='.')
+
+
+class QPPublicIDFull(QPPublicIDGenerator):
+    """
+    publicID from name and current UTC time: 
+    'smi:local/generic/2008-07-26T15.00.00.000000'
+    """
+
+    style = 'full'
+
+    def createID(self, name=None, secondsdigits=None):
+        if not name:
+            name = 'generic'
+
+        return quakepy.QPUtils.build_resource_identifier(self.namespace, name,
+            self._timestamp(secondsdigits))
+
+
+class QPPublicIDShort(QPPublicIDGenerator):
+    """
+    publicID is given name, or current UTC time if no name is given:
+    'myname' or '2008-07-26T15.00.00.000000'
+    """
+
+    style = 'short'
+
+    def createID(self, name=None, secondsdigits=None):
+        if name is not None:
+            return str(name)
+        else:
+            return self._timestamp(secondsdigits)
+
+
+class QPPublicIDNumeric(QPPublicIDGenerator):
+    """
+    publicID is a number from a counter: '152763'
+
+    the counter is shared by all numeric generators of a process, so that
+    IDs of different generators do not collide
+    """
+
+    style = 'numeric'
+
+    # incrementing itertools.count is atomic
+    _counter = itertools.count(1)
+
+    def createID(self, name=None, secondsdigits=None):
+        return str(QPPublicIDNumeric._counter.next())
+
+
+class QPPublicIDCounter(QPPublicIDGenerator):
+    """
+    publicID from name, a random prefix, and a counter:
+    'smi:local/Event/5f0c2a9e.17'
+    
+    the prefix is unique for each generator and each process, so that
+    IDs from forked worker processes do not collide
+    """
+
+    style = 'counter'
+
+    def __init__(self, namespace=RESOURCE_IDENTIFIER_AUTHORITY_LOCAL):
+        super(QPPublicIDCounter, self).__init__(namespace)
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._prefix = "%s:%s/%%s/%s.%%d" % (RESOURCE_IDENTIFIER_URI_SCHEME,
+            self.namespace, uuid.uuid4().hex[:8])
+        self._counter = itertools.count(1)
+
+    def createID(self, name=None, secondsdigits=None):
+        
+        if self._pid != os.getpid():
+            self._lock.acquire()
+            try:
+                if self._pid != os.getpid():
+                    self._reset()
+            finally:
+                self._lock.release()
+
+        if not name:
+            name = 'generic'
+
+        return self._prefix % (name, self._counter.next())
+
+
+class QPPublicIDUUID(QPPublicIDGenerator):
+    """
+    publicID from name and random UUID:
+    'smi:local/Event/0e5d6bd4a7d94c0e9b5fa3f3c8e0a1d2'
+    """
+
+    style = 'uuid'
+
+    def createID(self, name=None, secondsdigits=None):
+        if not name:
+            name = 'generic'
+
+        return quakepy.QPUtils.build_resource_identifier(self.namespace, name,
+            uuid.uuid4().hex)
+
+
+PUBLIC_ID_GENERATORS = {
+    'full': QPPublicIDFull,
+    'short': QPPublicIDShort,
+    'numeric': QPPublicIDNumeric,
+    'counter': QPPublicIDCounter,
+    'uuid': QPPublicIDUUID }
+
+
+def createPublicIDGenerator(style='full', 
+    namespace=RESOURCE_IDENTIFIER_AUTHORITY_LOCAL):
+    """
+    create publicID generator for style from PUBLIC_ID_STYLE_VALUES
+    """
+    try:
+        generator_cls = PUBLIC_ID_GENERATORS[style]
+    except KeyError:
+        raise ValueError, "unknown publicID style %s" % style
+
+    return generator_cls(namespace)
+
 # ----------------------------------------------------------------------------
 
 class QPPublicObject(QPObject):
@@ -654,21 +1012,33 @@ class QPPublicObject(QPObject):
 
     # public object counter, incremented at each object creation
     publicObjectCtr = 0L
+    _publicObjectCounter = itertools.count(1)
 
-    # style of publicID
+    # style of publicID, strategy is implemented by publicIDGenerator
     # Note: colons are not allowed in smi URIs, so change ':' to '.' in time component
     # of timestamp
     #
-    #  'full':    'smi:local/generic/2008-07-26T15:00:00'
-    #  'short':   'myname' or '2008-07-26T15:00:00'
+    #  'full':    'smi:local/generic/2008-07-26T15.00.00'
+    #  'short':   'myname' or '2008-07-26T15.00.00'
     #  'numeric': '152763'
+    #  'counter': 'smi:local/generic/5f0c2a9e.17'
+    #  'uuid':    'smi:local/generic/0e5d6bd4a7d94c0e9b5fa3f3c8e0a1d2'
 
     publicIDStyle = 'full'
+    publicIDGenerator = QPPublicIDFull()
+
+    # generators for publicID styles requested with 'idstyle' kwarg,
+    # key is (style, namespace)
+    _styleGenerators = {}
+
+    # generator set for current thread only
+    _threadPublicIDGenerator = threading.local()
 
     def __init__(self, publicID = None, **kwargs):
         
         super(QPPublicObject, self).__init__( **kwargs )
-        QPPublicObject.publicObjectCtr += 1
+        QPPublicObject.publicObjectCtr = \
+            QPPublicObject._publicObjectCounter.next()
         
         self.publicID = publicID
 
@@ -685,42 +1055,29 @@ class QPPublicObject(QPObject):
 
         kwargs:
             idstyle
+                one of PUBLIC_ID_STYLE_VALUES, e.g.
                 'short'   set ID without smi: format, either given string or ISO datetime
-                'numeric' set publicObjectCtr as ID
+                'numeric' set counter value as ID
+                'counter' set ID with random prefix and counter (fast)
 
-        setting the ID style with a kwarg overrides QPPublicObject.publicIDStyle, but does not change the
+        setting the ID style with a kwarg overrides the current publicID
+        generator (see setPublicIDGenerator), but does not change the
         general setting
         """
         
-        # current UTC timestamp from mxDateTime
-        curr_time = utc()
+        generator = QPPublicObject.getPublicIDGenerator()
 
-        if ('idstyle' in kwargs and kwargs['idstyle'] == 'numeric') or (
-            QPPublicObject.publicIDStyle == 'numeric'):
-
-            id = str(QPPublicObject.getPublicObjectCtr())
-            
-        elif ('idstyle' in kwargs and kwargs['idstyle'] == 'short') or (
-            QPPublicObject.publicIDStyle == 'short'):
+        if 'idstyle' in kwargs and kwargs['idstyle'] is not None and \
+            kwargs['idstyle'] != generator.style:
             
-            if name is not None:
-                id = str(name)
-            else:
-                id = quakepy.QPUtils.mxDateTime2ISO(
-                    curr_time, secondsdigits=self.secondsDigits, 
-                    timesepreplacechar='.')
+            key = (kwargs['idstyle'], generator.namespace)
+            try:
+                generator = QPPublicObject._styleGenerators[key]
+            except KeyError:
+                generator = createPublicIDGenerator(*key)
+                QPPublicObject._styleGenerators[key] = generator
 
-        else:
-            if not name:
-                name = 'generic'
-
-            id = quakepy.QPUtils.build_resource_identifier(
-                'local', name, quakepy.QPUtils.mxDateTime2ISO(
-                    curr_time, secondsdigits=self.secondsDigits,
-                    timesepreplacechar='.'))
- 
-            
-        return id
+        return generator.createID(name, self.secondsDigits)
 
 
     @classmethod
@@ -729,8 +1086,50 @@ class QPPublicObject(QPObject):
 
 
     @classmethod
-    def setPublicIDStyle(cls, style):
+    def getPublicIDGenerator(cls, threadlocal=False):
+        """
+        return publicID generator of current thread, or global generator
+
+        if threadlocal is True, generator of current thread is returned,
+        None if no generator has been set for the thread
+        """
+        generator = getattr(QPPublicObject._threadPublicIDGenerator, 
+            'generator', None)
+
+        if generator is not None or threadlocal:
+            return generator
+        else:
+            return QPPublicObject.publicIDGenerator
+
+
+    @classmethod
+    def setPublicIDGenerator(cls, generator, threadlocal=False):
+        """
+        set generator (QPPublicIDGenerator) for publicIDs of new objects
+        
+        if threadlocal is True, generator is only used in current thread,
+        generator None resets thread to global generator
+        """
+        
+        if threadlocal:
+            QPPublicObject._threadPublicIDGenerator.generator = generator
+        else:
+            QPPublicObject.publicIDGenerator = generator
+            QPPublicObject.publicIDStyle = generator.style
+
+
+    @classmethod
+    def setPublicIDStyle(cls, style, namespace=None):
+        """
+        set global publicID generator for style from PUBLIC_ID_STYLE_VALUES,
+        optionally with namespace (authority ID)
+        """
 
         # set publicIDStyle only if it is a valid entry
         if style in PUBLIC_ID_STYLE_VALUES:
-            cls.publicIDStyle = style
+            
+            if namespace is None:
+                namespace = QPPublicObject.publicIDGenerator.namespace
+
+            QPPublicObject.setPublicIDGenerator(createPublicIDGenerator(
+                style, namespace))
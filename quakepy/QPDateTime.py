@@ -12,6 +12,7 @@ import sys
 
 import mx.DateTime
 
+from quakepy import QPCore
 from quakepy import QPUtils
 
 class QPDateTime(object):
@@ -25,6 +26,19 @@ class QPDateTime(object):
     
     # standard seconds format string: 6 digits = microseconds
     secondsDigits = 6
+
+    # variant of the class with datetime in __slots__ (QPDateTimeSlotted),
+    # used for new objects if slotted objects are switched on (see
+    # QPCore.QPObject.setSlottedObjects)
+    slottedClass = None
+
+    def __new__(cls, *args, **kwargs):
+
+        if cls.__dict__.get('slottedClass') is not None and \
+            QPCore.QPObject.getSlottedObjects() is True:
+            cls = cls.slottedClass
+
+        return super(QPDateTime, cls).__new__(cls)
     
     def __init__(self, datetime_in=None, **kwargs):
         """
@@ -57,7 +71,7 @@ class QPDateTime(object):
                                                           int( datetime_in[4] ), 
                                                           float( datetime_in[5] ) )
                 except:
-                    error_msg = "QPDateTime constructor: input datetime array not valid - %s" % datetime_in
+                    error_msg = "QPDateTime constructor: input datetime array not valid - %s" % ( datetime_in, )
                     raise ValueError, error_msg
                 
             else:
@@ -160,6 +174,16 @@ class QPDateTime(object):
             return False
 
 
+class QPDateTimeSlotted(QPDateTime):
+    """
+    QPDateTime that stores datetime in __slots__, instance dict is only
+    created if comparison accuracy or seconds digits are set for the object
+    """
+    __slots__ = ('datetime',)
+
+QPDateTime.slottedClass = QPDateTimeSlotted
+
+
 def cmpQPDateTime( dt1, dt2, epsilon = 0.0 ):
     return mx.DateTime.cmp( dt1.datetime, dt2.datetime, epsilon )
 
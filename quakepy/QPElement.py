@@ -5,7 +5,65 @@ This file is part of QuakePy12.
 """
 
 class QPElementList(list):
-    pass
+    """
+    QuakePy: QPElementList
+
+    list of QPElement objects that describes the layout of a class derived
+    from QPObject
+
+    the compiled schema of the list (see QPCore.getElementSchema) is cached
+    in attribute 'schema' and is reset whenever the list is modified
+    """
+
+    __slots__ = ('schema',)
+
+    def __init__(self, *args):
+        super(QPElementList, self).__init__(*args)
+        self.schema = None
+
+    def __getstate__(self):
+        # do not pickle compiled schema
+        return None
+
+    def append(self, element):
+        list.append(self, element)
+        self.schema = None
+
+    def extend(self, elements):
+        list.extend(self, elements)
+        self.schema = None
+
+    def insert(self, idx, element):
+        list.insert(self, idx, element)
+        self.schema = None
+
+    def remove(self, element):
+        list.remove(self, element)
+        self.schema = None
+
+    def pop(self, *args):
+        self.schema = None
+        return list.pop(self, *args)
+
+    def __iadd__(self, elements):
+        self.extend(elements)
+        return self
+
+    def __setitem__(self, idx, element):
+        list.__setitem__(self, idx, element)
+        self.schema = None
+
+    def __delitem__(self, idx):
+        list.__delitem__(self, idx)
+        self.schema = None
+
+    def __setslice__(self, i, j, elements):
+        list.__setslice__(self, i, j, elements)
+        self.schema = None
+
+    def __delslice__(self, i, j):
+        list.__delslice__(self, i, j)
+        self.schema = None
 
 
 class QPElement(object):
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import cStringIO
+import mmap
+import os
+
+import numpy
+
+
+class QPFileShard(object):
+    """
+    QuakePy: QPFileShard
+    byte range [start:end] of a file that starts and ends at record
+    boundaries, can be iterated line by line like a file object
+
+    the shard holds only file name and offsets, so that it can be passed to
+    worker processes. If mapped is True, lines are read from a memory map
+    of the file and the range is not copied as a whole
+    """
+
+    def __init__(self, filename, start, end, mapped=True):
+        self.filename = filename
+        self.start = start
+        self.end = end
+        self.mapped = mapped
+
+
+    def __repr__(self):
+        return "QPFileShard(%r, %s, %s)" % (self.filename, self.start,
+            self.end)
+
+
+    def __len__(self):
+        return self.end - self.start
+
+
+    def __iter__(self):
+        fh = open(self.filename, 'rb')
+        try:
+            if len(self) == 0:
+                return
+
+            if self.mapped:
+                data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    # cStringIO reads from buffer of memory map w/o copy
+                    for line in cStringIO.StringIO(buffer(data, self.start,
+                        len(self))):
+                        yield line
+                finally:
+                    data.close()
+
+            else:
+                fh.seek(self.start)
+                for line in cStringIO.StringIO(fh.read(len(self))):
+                    yield line
+        finally:
+            fh.close()
+
+
+def recordStart(data, offset, accept=None, end=None, groupLines=1):
+    """
+    return offset of first record that starts at or after offset in data
+    (string or memory map of file), or length of data if there is none
+
+    records start at line beginnings. If accept is given, only lines for
+    which accept(line) is True start a record. If end is given, records
+    start after lines for which end(line) is True. If groupLines is given,
+    records are groups of groupLines lines, counted from start of data
+    """
+    size = len(data)
+
+    # beginning of first line at or after offset
+    if offset <= 0:
+        return 0
+    elif offset >= size:
+        return size
+    elif data[offset - 1] != '\n':
+        offset = data.find('\n', offset)
+        if offset < 0:
+            return size
+        offset += 1
+
+    if groupLines > 1:
+        line_ctr = int(numpy.count_nonzero(numpy.frombuffer(data,
+            dtype=numpy.uint8, count=offset) == ord('\n')))
+
+        for skip_ctr in xrange(-line_ctr % groupLines):
+            offset = data.find('\n', offset)
+            if offset < 0:
+                return size
+            offset += 1
+
+    if accept is not None or end is not None:
+
+        # line before offset
+        previous = data[data.rfind('\n', 0, max(offset - 1, 0)) + 1:offset]
+
+        while offset < size:
+            line_end = data.find('\n', offset)
+            if line_end < 0:
+                line_end = size
+
+            line = data[offset:line_end + 1]
+            if (accept is None or accept(line)) and (end is None or
+                end(previous)):
+                break
+
+            previous = line
+            offset = line_end + 1
+
+    return min(offset, size)
+
+
+def recordBatches(istream, batchSize, accept=None, end=None, groupLines=1):
+    """
+    generate lists of lines of input stream with batchSize records each 
+    (last list can have less records), records as in recordStart(). Lines 
+    before first record are added to first list
+    """
+    batch = []
+    record_ctr = 0
+    previous = None
+
+    for line_ctr, line in enumerate(istream):
+
+        if line_ctr % groupLines == 0 and (accept is None or accept(line)) \
+            and (end is None or previous is None or end(previous)):
+
+            if record_ctr == batchSize:
+                yield batch
+                batch = []
+                record_ctr = 0
+
+            record_ctr += 1
+
+        batch.append(line)
+        previous = line
+
+    if batch:
+        yield batch
+
+
+def shardFile(filename, shards, accept=None, end=None, groupLines=1,
+    mapped=True):
+    """
+    split file into at most shards QPFileShard objects of about equal size,
+    that start at record boundaries (see recordStart()). Concatenated in
+    order, the shards cover the whole file
+    """
+    size = os.path.getsize(filename)
+    shards = max(1, int(shards))
+
+    if size == 0:
+        return [QPFileShard(filename, 0, 0, mapped)]
+
+    fh = open(filename, 'rb')
+    try:
+        data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            starts = [0]
+            for shard_idx in xrange(1, shards):
+                starts.append(recordStart(data, max(starts[-1],
+                    shard_idx * size // shards), accept, end, groupLines))
+        finally:
+            data.close()
+    finally:
+        fh.close()
+
+    ends = starts[1:] + [size]
+
+    return [QPFileShard(filename, shard_start, shard_end, mapped) for
+        shard_start, shard_end in zip(starts, ends) if shard_end > shard_start]
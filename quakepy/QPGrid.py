@@ -9,7 +9,9 @@ import pyRXP
 
 from quakepy import QPElement
 from quakepy import QPCore
+from quakepy import QPGridIndex
 from quakepy import QPPolygon
+from quakepy import QPUtils
 
 
 ROOT_ELEMENT_NAME = 'QPGrid'
@@ -36,8 +38,6 @@ class Cell(QPCore.QPObject):
     
     def __init__(self, **kwargs):
         super(Cell, self).__init__(**kwargs)
-        
-        self.elements.extend(self.addElements)
         self._initMultipleElements()
 
 
@@ -53,8 +53,6 @@ class DefaultCellDimension(QPCore.QPObject):
     
     def __init__(self, **kwargs):
         super(DefaultCellDimension, self).__init__(**kwargs)
-        
-        self.elements.extend(self.addElements)
         self._initMultipleElements()
 
 
@@ -72,8 +70,6 @@ class DepthLayer(QPCore.QPObject):
     
     def __init__(self, **kwargs):
         super(DepthLayer, self).__init__(**kwargs)
-        
-        self.elements.extend(self.addElements)
         self._initMultipleElements()
 
 
@@ -90,8 +86,6 @@ class Grid(QPCore.QPObject):
     
     def __init__(self, **kwargs):
         super(Grid, self).__init__(**kwargs)
-        
-        self.elements.extend(self.addElements)
         self._initMultipleElements()
         
 
@@ -336,35 +330,49 @@ class QPGrid(QPCore.QPObject):
         return True
 
     
+    @property
+    def index(self):
+        """
+        spatial index of grid cells (QPGridIndex)
+        built on first access, rebuilt if depth layers, number of cells or 
+        cell dimension have changed
+        """
+        if getattr(self, '_index', None) is None:
+            self._index = QPGridIndex.QPGridIndex()
+
+        if not self._index.isCurrent(self.grid):
+            self._index.build(self.grid)
+
+        return self._index
+
+
+    def reindex(self):
+        """
+        rebuild grid index
+        required after cell coordinates have been changed in place
+        """
+        self.index.build(self.grid)
+
+
     def inGridCell(self, lat, lon, depth):
         
         # depthLayer bin 0...30 km: depth  0 km is inside bin
         #                           depth 30 km is outside bin
         #
         # returns ( foundLat, foundLon, foundDepthMin, foundDepthMax ) or None
+        #
+        # if cells overlap, first matching cell is returned
     
-        for curr_depth_layer in self.grid.depthLayer:
-            if depth >= curr_depth_layer.min and depth < curr_depth_layer.max:
+        index = self.index
 
-                # look for cell
-                for curr_cell in curr_depth_layer.cell:
-                    
-                    latMin = curr_cell.lat - 0.5 * \
-                        self.grid.defaultCellDimension.latRange
-                    latMax = curr_cell.lat + 0.5 * \
-                        self.grid.defaultCellDimension.latRange
-                    lonMin = curr_cell.lon - 0.5 * \
-                        self.grid.defaultCellDimension.lonRange
-                    lonMax = curr_cell.lon + 0.5 * \
-                        self.grid.defaultCellDimension.lonRange
-                    
-                    if lat >= latMin and lat < latMax and lon >= lonMin and \
-                        lon < lonMax:
-                        return (curr_cell.lat, curr_cell.lon, 
-                            curr_depth_layer.min, curr_depth_layer.max)
-         
-        # depthLayer or cell not found
-        return None
+        cell_idx = index.locateCell(lat, lon, depth)
+        if cell_idx is None:
+
+            # depthLayer or cell not found
+            return None
+
+        depth_layer, cell = index.cells[cell_idx]
+        return (cell.lat, cell.lon, depth_layer.min, depth_layer.max)
             
             
     def inGrid(self, lat, lon, depth):
@@ -374,6 +382,17 @@ class QPGrid(QPCore.QPObject):
         else:
             return True
 
+
+    def locate(self, lats, lons, depths):
+        """
+        locate points given by arrays of coordinates in grid
+
+        returns numpy array of cell numbers, -1 for points that are not in
+        grid. Cells are numbered in order of depth layers, and of cells within
+        depth layer (depth layer and cell of a number: self.index.cells)
+        """
+        return self.index.locate(lats, lons, depths)
+
     
     def _createNodes(self, polygon):
 
@@ -0,0 +1,405 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import numpy
+
+# cell centers of a depth layer are on a regular lattice if their distance
+# to the lattice is below this fraction of the cell dimension
+LATTICE_TOLERANCE = 1.0e-06
+
+# offsets of lattice bins that are searched around the bin of a point,
+# covers rounding of cell bounds at bin boundaries
+LATTICE_NEIGHBOURS = (-1, 0, 1)
+
+
+def gridSignature(grid):
+    """
+    return tuple that changes if depth layers, number of cells or cell
+    dimension of grid change
+    """
+    dimension = grid.defaultCellDimension
+
+    return (id(grid), id(dimension), dimension.latRange, dimension.lonRange,
+        tuple([(id(dl), dl.min, dl.max, len(dl.cell)) for dl in \
+            grid.depthLayer]))
+
+
+class QPGridIndex(object):
+    """
+    QuakePy: QPGridIndex
+    spatial index of the cells of a grid
+
+    cells are numbered in order of depth layers, and in order of cells
+    within a depth layer. A point is located in the first cell for which
+
+        depthLayer.min <= depth < depthLayer.max
+        cell.lat - 0.5 * latRange <= lat < cell.lat + 0.5 * latRange
+        cell.lon - 0.5 * lonRange <= lon < cell.lon + 0.5 * lonRange
+
+    which is the result of a linear search over all cells
+
+    cells of a depth layer with centers on a regular lattice are hashed by
+    integer lattice bins, cells of irregular layers are searched in order
+    of their lower latitude bound
+
+    QPGrid rebuilds its index if depth layers, number of cells or cell
+    dimension have changed. Changing cell coordinates in place requires a
+    call of QPGrid.reindex()
+    """
+
+    def __init__(self, grid=None):
+        self.clear()
+
+        if grid is not None:
+            self.build(grid)
+
+
+    def __reduce__(self):
+        """
+        index is not pickled, unpickled index is empty
+        """
+        return (self.__class__, ())
+
+
+    def __len__(self):
+        return len(self.cells)
+
+
+    def clear(self):
+
+        # (depth layer, cell) for each cell number
+        self.cells = []
+
+        # DepthLayerIndex for each depth layer
+        self.layers = []
+
+        self.signature = None
+
+
+    def build(self, grid):
+        """
+        index all cells of grid (of type Grid)
+        """
+        self.clear()
+
+        lat_range = grid.defaultCellDimension.latRange
+        lon_range = grid.defaultCellDimension.lonRange
+
+        for depth_layer in grid.depthLayer:
+            self.layers.append(DepthLayerIndex(depth_layer, len(self.cells),
+                lat_range, lon_range))
+            self.cells.extend([(depth_layer, cell) for cell in \
+                depth_layer.cell])
+
+        self.signature = gridSignature(grid)
+
+
+    def isCurrent(self, grid):
+        return self.signature is not None and \
+            self.signature == gridSignature(grid)
+
+
+    def locateCell(self, lat, lon, depth):
+        """
+        return number of cell that contains point, None if point is not
+        in grid
+        """
+        for layer in self.layers:
+            if depth >= layer.min and depth < layer.max:
+
+                cell_idx = layer.locateCell(lat, lon)
+                if cell_idx is not None:
+                    return layer.offset + cell_idx
+
+        return None
+
+
+    def locate(self, lats, lons, depths):
+        """
+        return numpy array of cell numbers for arrays of point coordinates,
+        -1 for points that are not in grid
+        """
+        lats = numpy.asarray(lats, dtype=numpy.float_).ravel()
+        lons = numpy.asarray(lons, dtype=numpy.float_).ravel()
+        depths = numpy.asarray(depths, dtype=numpy.float_).ravel()
+
+        if not (len(lats) == len(lons) == len(depths)):
+            raise ValueError, \
+                'QPGridIndex::locate - coordinate arrays differ in length'
+
+        cell_idx = -numpy.ones(len(lats), dtype=numpy.int_)
+
+        numpy_err = numpy.seterr(invalid='ignore')
+        try:
+            for layer in self.layers:
+
+                # depth layer w/o upper bound does not contain any point,
+                # layer w/o lower bound is open to the top
+                if layer.max is None:
+                    continue
+
+                rows = (cell_idx < 0) & (depths < layer.max)
+                if layer.min is not None:
+                    rows &= (depths >= layer.min)
+
+                rows = numpy.flatnonzero(rows)
+                if len(rows) == 0:
+                    continue
+
+                layer_idx = layer.locate(lats[rows], lons[rows])
+                found = layer_idx >= 0
+                cell_idx[rows[found]] = layer.offset + layer_idx[found]
+
+        finally:
+            numpy.seterr(**numpy_err)
+
+        return cell_idx
+
+
+class DepthLayerIndex(object):
+    """
+    QuakePy: DepthLayerIndex
+    index of the cells of one depth layer, see QPGridIndex
+    """
+
+    def __init__(self, depthLayer, offset, latRange, lonRange):
+
+        self.min = depthLayer.min
+        self.max = depthLayer.max
+
+        # number of first cell of layer in QPGridIndex
+        self.offset = offset
+
+        lats = numpy.array([cell.lat for cell in depthLayer.cell],
+            dtype=numpy.float_)
+        lons = numpy.array([cell.lon for cell in depthLayer.cell],
+            dtype=numpy.float_)
+
+        # cell bounds, computed as in linear search
+        self.latMin = lats - 0.5 * latRange
+        self.latMax = lats + 0.5 * latRange
+        self.lonMin = lons - 0.5 * lonRange
+        self.lonMax = lons + 0.5 * lonRange
+
+        # lists for single point lookups
+        self._bounds = zip(self.latMin.tolist(), self.latMax.tolist(),
+            self.lonMin.tolist(), self.lonMax.tolist())
+
+        # 'empty': no cell can contain a point
+        if len(lats) == 0 or not (latRange > 0.0 and lonRange > 0.0):
+            self.method = 'empty'
+
+        elif self._buildLattice(latRange, lonRange):
+            self.method = 'lattice'
+
+        else:
+            self._buildSortedBounds()
+            self.method = 'sorted'
+
+
+    def locateCell(self, lat, lon):
+        """
+        return position of first cell of layer that contains point, None
+        if not found
+        """
+        if self.method == 'lattice':
+            candidates = self._latticeCandidates(lat, lon)
+        elif self.method == 'sorted':
+            candidates = self._sortedCandidates(lat)
+        else:
+            return None
+
+        found = None
+        for cell_idx in candidates:
+            latMin, latMax, lonMin, lonMax = self._bounds[cell_idx]
+
+            if lat >= latMin and lat < latMax and lon >= lonMin and \
+                lon < lonMax and (found is None or cell_idx < found):
+                found = cell_idx
+
+        return found
+
+
+    def locate(self, lats, lons):
+        """
+        return numpy array of positions of first cells of layer that
+        contain points, -1 if not found
+        """
+        found = numpy.empty(len(lats), dtype=numpy.int_)
+        found.fill(len(self._bounds))
+
+        if self.method == 'lattice':
+            self._locateLattice(lats, lons, found)
+        elif self.method == 'sorted':
+            self._locateSortedBounds(lats, lons, found)
+
+        found[found == len(self._bounds)] = -1
+        return found
+
+
+    def _buildLattice(self, latRange, lonRange):
+        """
+        hash cells by lattice bin of their lower bounds
+        returns False if cells are not on a regular lattice or if two cells
+        fall into the same bin
+        """
+        self.latRange = latRange
+        self.lonRange = lonRange
+        self.latOrigin = self.latMin.min()
+        self.lonOrigin = self.lonMin.min()
+
+        lat_bin = (self.latMin - self.latOrigin) / latRange
+        lon_bin = (self.lonMin - self.lonOrigin) / lonRange
+
+        lat_idx = numpy.round(lat_bin)
+        lon_idx = numpy.round(lon_bin)
+
+        if numpy.abs(lat_bin - lat_idx).max() > LATTICE_TOLERANCE or \
+            numpy.abs(lon_bin - lon_idx).max() > LATTICE_TOLERANCE:
+            return False
+
+        self.latBins = int(lat_idx.max()) + 1
+        self.lonBins = int(lon_idx.max()) + 1
+
+        keys = lat_idx.astype(numpy.int64) * self.lonBins + \
+            lon_idx.astype(numpy.int64)
+
+        order = numpy.argsort(keys, kind='mergesort')
+        self.binKeys = keys[order]
+
+        if numpy.any(self.binKeys[1:] == self.binKeys[:-1]):
+            return False
+
+        self.binCells = order
+        self.binMap = dict(zip(self.binKeys.tolist(), order.tolist()))
+
+        return True
+
+
+    def _latticeCandidates(self, lat, lon):
+
+        lat_bin = (lat - self.latOrigin) / self.latRange
+        lon_bin = (lon - self.lonOrigin) / self.lonRange
+
+        # also rejects NaN
+        if not (-2.0 < lat_bin < self.latBins + 1.0 and \
+            -2.0 < lon_bin < self.lonBins + 1.0):
+            return ()
+
+        lat_idx = int(numpy.floor(lat_bin))
+        lon_idx = int(numpy.floor(lon_bin))
+
+        candidates = []
+        for lat_offset in LATTICE_NEIGHBOURS:
+            for lon_offset in LATTICE_NEIGHBOURS:
+
+                curr_lat_idx = lat_idx + lat_offset
+                curr_lon_idx = lon_idx + lon_offset
+
+                if 0 <= curr_lat_idx < self.latBins and \
+                    0 <= curr_lon_idx < self.lonBins:
+
+                    cell_idx = self.binMap.get(
+                        curr_lat_idx * self.lonBins + curr_lon_idx)
+                    if cell_idx is not None:
+                        candidates.append(cell_idx)
+
+        return candidates
+
+
+    def _locateLattice(self, lats, lons, found):
+
+        lat_bin = (lats - self.latOrigin) / self.latRange
+        lon_bin = (lons - self.lonOrigin) / self.lonRange
+
+        # also rejects NaN
+        rows = numpy.flatnonzero((lat_bin > -2.0) &
+            (lat_bin < self.latBins + 1.0) & (lon_bin > -2.0) &
+            (lon_bin < self.lonBins + 1.0))
+
+        lats = lats[rows]
+        lons = lons[rows]
+        lat_idx = numpy.floor(lat_bin[rows]).astype(numpy.int64)
+        lon_idx = numpy.floor(lon_bin[rows]).astype(numpy.int64)
+
+        for lat_offset in LATTICE_NEIGHBOURS:
+            for lon_offset in LATTICE_NEIGHBOURS:
+
+                curr_lat_idx = lat_idx + lat_offset
+                curr_lon_idx = lon_idx + lon_offset
+
+                keys = curr_lat_idx * self.lonBins + curr_lon_idx
+                pos = numpy.searchsorted(self.binKeys, keys)
+                pos[pos == len(self.binKeys)] = 0
+
+                valid = (curr_lat_idx >= 0) & (curr_lat_idx < self.latBins) & \
+                    (curr_lon_idx >= 0) & (curr_lon_idx < self.lonBins) & \
+                    (self.binKeys[pos] == keys)
+
+                self._updateFound(found, rows, lats, lons, valid,
+                    self.binCells[pos])
+
+
+    def _buildSortedBounds(self):
+        """
+        sort cells by lower latitude bound
+        """
+        self.boundsOrder = numpy.argsort(self.latMin, kind='mergesort')
+        self.sortedLatMin = self.latMin[self.boundsOrder]
+
+        # upper bound of cell height, cells that contain a latitude have
+        # lower bounds within this distance
+        self.searchHeight = 2.0 * (self.latMax - self.latMin).max()
+
+
+    def _sortedCandidates(self, lat):
+
+        if lat != lat:
+            return ()
+
+        start = numpy.searchsorted(self.sortedLatMin, lat - self.searchHeight,
+            'left')
+        end = numpy.searchsorted(self.sortedLatMin, lat, 'right')
+
+        return self.boundsOrder[start:end].tolist()
+
+
+    def _locateSortedBounds(self, lats, lons, found):
+
+        rows = numpy.flatnonzero(~numpy.isnan(lats))
+        lats = lats[rows]
+        lons = lons[rows]
+
+        start = numpy.searchsorted(self.sortedLatMin, lats - self.searchHeight,
+            'left')
+        end = numpy.searchsorted(self.sortedLatMin, lats, 'right')
+
+        if len(rows) == 0:
+            return
+
+        # step through candidate ranges of all points simultaneously
+        for offset in xrange((end - start).max()):
+
+            pos = start + offset
+            valid = pos < end
+            pos[~valid] = 0
+
+            self._updateFound(found, rows, lats, lons, valid,
+                self.boundsOrder[pos])
+
+
+    def _updateFound(self, found, rows, lats, lons, valid, cell_idx):
+        """
+        set found[rows] to cell_idx where cell contains point and has lower
+        position than current value
+        """
+        valid &= (lats >= self.latMin[cell_idx]) & \
+            (lats < self.latMax[cell_idx]) & \
+            (lons >= self.lonMin[cell_idx]) & \
+            (lons < self.lonMax[cell_idx]) & \
+            (cell_idx < found[rows])
+
+        found[rows[valid]] = cell_idx[valid]
@@ -6,8 +6,16 @@ This file is part of QuakePy12.
 
 import numpy
 
+import shapely.prepared
+
 from shapely.geometry import Polygon, Point
 
+# vectorized predicates need compiled speedups of Shapely
+try:
+    from shapely import vectorized
+except ImportError:
+    vectorized = None
+
 from QPUtils import *
 
 class QPPolygon( object ):
@@ -30,6 +38,9 @@ class QPPolygon( object ):
         # Shapely polygon object
         self.polygon = None
 
+        # prepared geometry of self.polygon, created on demand
+        self._prepared = None
+
         # polygon vertices
         self.vertices = []
 
@@ -111,6 +122,25 @@ class QPPolygon( object ):
                         'latMin': self.polygon.bounds[1],
                         'latMax': self.polygon.bounds[3] }
         
+    def __getstate__( self ):
+        """
+        prepared geometry cannot be pickled, is re-created on demand
+        """
+        state = self.__dict__.copy()
+        state['_prepared'] = None
+        return state
+
+    def getPreparedPolygon( self ):
+        """
+        return prepared geometry of polygon, which is created on first call
+        (and if self.polygon has been replaced)
+        """
+        if getattr( self, '_prepared', None ) is None or \
+            self._prepared.context is not self.polygon:
+            self._prepared = shapely.prepared.prep( self.polygon )
+
+        return self._prepared
+
     def isInside( self, fX, fY ):
         """
         check if point( fX, fY ) is truly inside polygon (not on boundary)
@@ -118,7 +148,7 @@ class QPPolygon( object ):
         'false' if outside or on boundary
         """
 
-        if self.polygon.contains( Point( fX, fY ) ):
+        if self.getPreparedPolygon().contains( Point( fX, fY ) ):
             return True
         else:
             return False
@@ -130,7 +160,7 @@ class QPPolygon( object ):
         'false' if outside
         """
 
-        if self.isInside( fX, fY ) or self.isOnBoundary( fX, fY ):
+        if self.getPreparedPolygon().covers( Point( fX, fY ) ):
             return True
         else:
             return False
@@ -141,4 +171,55 @@ class QPPolygon( object ):
             return True
         else:
             return False
-        
\ No newline at end of file
+
+    def contains_points( self, lons, lats, include_boundary=True ):
+        """
+        check for arrays of point coordinates if points are inside polygon
+        returns boolean numpy array
+
+        include_boundary=True: points on boundary are inside 
+                               (as isInsideOrOnBoundary())
+        include_boundary=False: points on boundary are outside (as isInside())
+        """
+        return geometryContainsPoints( self.polygon, lons, lats, 
+            include_boundary, prepared=self.getPreparedPolygon() )
+
+
+def geometryContainsPoints( geometry, lons, lats, include_boundary=True, 
+    prepared=None ):
+    """
+    check for arrays of point coordinates if points are inside Shapely 
+    geometry (with include_boundary=True: or touch geometry)
+    returns boolean numpy array, points with NaN coordinates are outside
+
+    uses shapely.vectorized if available, prepared geometry otherwise
+    """
+    lons = numpy.asarray( lons, dtype=numpy.float_ )
+    lats = numpy.asarray( lats, dtype=numpy.float_ )
+
+    if len( lons ) == 0:
+        return numpy.zeros( 0, dtype=numpy.bool_ )
+
+    if vectorized is not None:
+        inside = vectorized.contains( geometry, lons, lats )
+
+        if include_boundary:
+            inside |= vectorized.touches( geometry, lons, lats )
+
+        return numpy.asarray( inside, dtype=numpy.bool_ )
+
+    if prepared is None:
+        prepared = shapely.prepared.prep( geometry )
+
+    inside = numpy.zeros( len( lons ), dtype=numpy.bool_ )
+    valid = ~( numpy.isnan( lons ) | numpy.isnan( lats ) )
+
+    for idx in numpy.flatnonzero( valid ):
+        point = Point( lons[idx], lats[idx] )
+
+        if include_boundary:
+            inside[idx] = prepared.covers( point )
+        else:
+            inside[idx] = prepared.contains( point )
+
+    return inside
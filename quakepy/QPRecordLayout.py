@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import numpy
+
+
+class RecordError(ValueError):
+    """
+    required field of fixed-width record is missing or illegal
+    """
+    pass
+
+
+class Field(object):
+    """
+    QuakePy: Field
+    field of fixed-width record: name, column range [start:end] (Python
+    slice of line), converter, nullable flag
+
+    converter is called with raw (unstripped) text of field, and has to
+    raise ValueError for illegal text. Builtins int and float accept
+    surrounding whitespace, text() strips field. Blank fields are missing
+    and not passed to converter
+
+    missing or illegal value of nullable field is decoded as default, of
+    non-nullable (required) field raises RecordError
+    """
+
+    def __init__(self, name, start, end, converter=float, nullable=True,
+        default=None):
+        self.name = name
+        self.start = start
+        self.end = end
+        self.converter = converter
+        self.nullable = nullable
+        self.default = default
+
+
+    def __repr__(self):
+        return "Field(%r, %s, %s)" % (self.name, self.start, self.end)
+
+
+class RecordLayout(object):
+    """
+    QuakePy: RecordLayout
+    declarative layout of fixed-width records (lines), compiled once into
+    decoder of lines
+
+    decode(line) returns dict field name -> value, decodeBlock(lines)
+    decodes numpy array of lines column by column, see there
+    """
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.names = tuple([field.name for field in self.fields])
+
+        if len(set(self.names)) != len(self.names):
+            raise ValueError, "duplicate field names in record layout"
+
+        self.decode = self._compile()
+
+
+    def __len__(self):
+        return len(self.fields)
+
+
+    def __getitem__(self, name):
+        return self.fields[self.names.index(name)]
+
+
+    def _compile(self):
+        """
+        generate decoder function of lines with field slices and
+        conversions inlined
+        """
+        namespace = {'RecordError': RecordError}
+        source = ['def decode(line):', '    record = {}']
+
+        for field_ctr, field in enumerate(self.fields):
+            namespace['convert%s' % field_ctr] = field.converter
+            namespace['default%s' % field_ctr] = field.default
+
+            if field.nullable:
+                missing = "record[%r] = default%s" % (field.name, field_ctr)
+            else:
+                missing = "raise RecordError, 'illegal value of " \
+                    "field %s: %%r' %% value" % field.name
+
+            source.extend([
+                "    value = line[%s:%s]" % (field.start, field.end),
+                "    if value.strip():",
+                "        try:",
+                "            record[%r] = convert%s(value)" % (field.name,
+                    field_ctr),
+                "        except ValueError:",
+                "            %s" % missing,
+                "    else:",
+                "        %s" % missing])
+
+        source.append('    return record')
+
+        exec '\n'.join(source) in namespace
+        return namespace['decode']
+
+
+    def decodeBlock(self, lines, fields=None):
+        """
+        decode lines (numpy array of strings or sequence of strings) at once,
+        returns (dict field name -> numpy array, numpy bool array of lines
+        with all required fields valid)
+
+        fields with converter int or float are decoded as float arrays,
+        with NaN for missing or illegal values, fields with converter
+        text() as arrays of stripped strings, fields with other converters
+        as arrays of converted values (float if converter gives numbers),
+        with field default for missing or illegal values
+
+        fields: names of fields to decode, default: all fields. Required
+                fields are always checked
+        """
+        lines = numpy.asarray(lines)
+        if lines.dtype.kind != 'S':
+            lines = lines.astype(numpy.string_)
+
+        lines = lines.ravel()
+
+        # bytes of lines, shorter lines are padded with NUL
+        chars = stringChars(lines)
+
+        record = {}
+        valid = numpy.ones(len(lines), dtype=numpy.bool_)
+
+        for field in self.fields:
+
+            if fields is not None and field.name not in fields and \
+                field.nullable:
+                continue
+
+            values, missing = decodeColumn(field, columnStrings(chars,
+                field.start, field.end))
+
+            if not field.nullable:
+                valid &= ~missing
+
+            record[field.name] = values
+
+        return (record, valid)
+
+
+def text(value):
+    """
+    converter of text field, strips whitespace
+    """
+    return value.strip()
+
+
+def impliedDecimal(intWidth):
+    """
+    return converter of number w/o decimal point, with integer part of
+    width intWidth followed by fraction, as in JMA format. Integer and
+    fraction part are stripped separately
+    """
+    def convert(value):
+        return float('.'.join((value[:intWidth].strip(),
+            value[intWidth:].strip())))
+
+    def convertBlock(strings):
+        chars = stringChars(strings)
+        return floatColumn(numpy.char.add(numpy.char.add(numpy.char.strip(
+            columnStrings(chars, 0, intWidth)), '.'), numpy.char.strip(
+            columnStrings(chars, intWidth, None))))
+
+    convert.block = convertBlock
+    return convert
+
+
+def degreesMinutes(degWidth):
+    """
+    return converter of coordinate given as degrees (width degWidth)
+    followed by decimal minutes w/o decimal point (two-digit integer part),
+    as in JMA format, to decimal degrees
+    """
+    minutes = impliedDecimal(2)
+
+    def convert(value):
+        return float(value[:degWidth]) + minutes(value[degWidth:]) / 60.0
+
+    def convertBlock(strings):
+        chars = stringChars(strings)
+        return floatColumn(columnStrings(chars, 0, degWidth)) + \
+            minutes.block(columnStrings(chars, degWidth, None)) / 60.0
+
+    convert.block = convertBlock
+    return convert
+
+
+def stringChars(strings):
+    """
+    return uint8 array of bytes of numpy string array, one row per string
+    """
+    strings = numpy.ascontiguousarray(strings)
+    return strings.view(numpy.uint8).reshape(len(strings),
+        strings.dtype.itemsize)
+
+
+def floatColumn(strings):
+    """
+    return float array of numpy string array, NaN for strings that are not
+    numbers
+    """
+    try:
+        return strings.astype(numpy.float_)
+    except ValueError:
+        values, missing = convertElements(float, strings,
+            numpy.zeros(len(strings), dtype=numpy.bool_), numpy.nan)
+        return numpy.asarray(values, dtype=numpy.float_)
+
+
+def columnStrings(chars, start, end):
+    """
+    return numpy string array of column range [start:end] of lines (uint8
+    array of bytes of lines)
+    """
+    start, end, step = slice(start, end).indices(chars.shape[1])
+    width = max(end - start, 0)
+
+    if width == 0:
+        return numpy.zeros(chars.shape[0], dtype='S1')
+
+    return numpy.ascontiguousarray(chars[:, start:end]).view(
+        'S%s' % width).ravel()
+
+
+def decodeColumn(field, strings):
+    """
+    return (values, missing) for numpy string array of field
+    """
+    stripped = numpy.char.strip(strings)
+    missing = (stripped == '')
+
+    if field.converter is text:
+        return (stripped, missing)
+
+    # converters with vectorized variant, gives NaN for illegal values
+    if hasattr(field.converter, 'block'):
+        values = field.converter.block(strings)
+        missing |= numpy.isnan(values)
+        values[missing] = numpy.nan
+        return (values, missing)
+
+    if field.converter in (int, float):
+
+        # builtin numeric converters: convert all non-blank values at once,
+        # element-wise only if column contains illegal values
+        values = numpy.where(missing, '0', stripped)
+        try:
+            values = values.astype(field.converter is int and numpy.int_ or \
+                numpy.float_).astype(numpy.float_)
+        except (ValueError, OverflowError):
+            values, missing = convertElements(field.converter, stripped,
+                missing, numpy.nan)
+            return (numpy.asarray(values, dtype=numpy.float_), missing)
+
+        values[missing] = numpy.nan
+        return (values, missing)
+
+    # strings are passed w/o trailing NUL padding, as sliced from shorter
+    # lines
+    values, missing = convertElements(field.converter, strings, missing,
+        field.default)
+
+    for value in values:
+        if not (value is None or isinstance(value, (int, long, float))):
+            column = numpy.empty(len(values), dtype=object)
+            column[:] = values
+            return (column, missing)
+
+    return (numpy.asarray(values, dtype=numpy.float_), missing)
+
+
+def convertElements(converter, strings, missing, default):
+    """
+    convert strings one by one, returns (list of values, missing)
+    """
+    missing = missing.copy()
+    values = [default] * len(strings)
+
+    for idx in numpy.flatnonzero(~missing):
+        try:
+            values[idx] = converter(strings[idx])
+        except ValueError:
+            missing[idx] = True
+
+    return (values, missing)
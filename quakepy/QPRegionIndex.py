@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""
+This file is part of QuakePy12.
+
+"""
+
+import math
+
+import numpy
+
+from quakepy import QPPolygon
+
+# upper limit for number of bins along each axis of bounding box grid
+MAX_BINS_PER_AXIS = 256
+
+
+class QPRegionIndex(object):
+    """
+    QuakePy: QPRegionIndex
+    spatial index of regions (polygons), locates points in regions
+
+    regions are given as sequence or dict (region id -> region) of QPPolygon
+    objects, lists of polygon vertices (lon, lat), or Shapely geometries.
+    Region ids are positions in sequence, or dict keys (in sorted order)
+
+    bounding boxes of regions are registered in a regular grid of bins.
+    A point is only tested against regions whose bounding box is in bin of
+    point and contains point, point-in-polygon tests are run in one batch
+    per region. Points on boundary of a region are inside. If regions
+    overlap, point is located in first region
+    """
+
+    def __init__(self, regions):
+
+        if isinstance(regions, dict):
+            self.ids = sorted(regions.keys())
+            regions = [regions[region_id] for region_id in self.ids]
+        else:
+            self.ids = range(len(regions))
+
+        # (Shapely geometry, prepared geometry or None) of regions
+        self.geometries = []
+        for region in regions:
+
+            if isinstance(region, (list, tuple, numpy.ndarray)):
+                region = QPPolygon.QPPolygon(region)
+
+            if isinstance(region, QPPolygon.QPPolygon):
+                self.geometries.append((region.polygon,
+                    region.getPreparedPolygon()))
+            else:
+                self.geometries.append((region, None))
+
+        self.bounds = numpy.array([geometry.bounds for geometry, prepared \
+            in self.geometries], dtype=numpy.float_).reshape(-1, 4)
+
+        if len(self.geometries) > 0:
+            self._buildBins()
+
+
+    def __len__(self):
+        return len(self.geometries)
+
+
+    def _buildBins(self):
+        """
+        register regions in bins of a grid over extent of all regions, bin
+        size is median extent of regions
+        """
+        self.lonMin = self.bounds[:, 0].min()
+        self.latMin = self.bounds[:, 1].min()
+        self.lonMax = self.bounds[:, 2].max()
+        self.latMax = self.bounds[:, 3].max()
+
+        self.lonBins, self.lonDelta = binning(self.lonMin, self.lonMax,
+            numpy.median(self.bounds[:, 2] - self.bounds[:, 0]))
+        self.latBins, self.latDelta = binning(self.latMin, self.latMax,
+            numpy.median(self.bounds[:, 3] - self.bounds[:, 1]))
+
+        bin_regions = [[] for idx in xrange(self.lonBins * self.latBins)]
+
+        lon_start = self._lonBin(self.bounds[:, 0])
+        lat_start = self._latBin(self.bounds[:, 1])
+        lon_end = self._lonBin(self.bounds[:, 2])
+        lat_end = self._latBin(self.bounds[:, 3])
+
+        for region_idx in xrange(len(self.geometries)):
+            for lat_bin in xrange(lat_start[region_idx],
+                lat_end[region_idx] + 1):
+                for lon_bin in xrange(lon_start[region_idx],
+                    lon_end[region_idx] + 1):
+                    bin_regions[lat_bin * self.lonBins + lon_bin].append(
+                        region_idx)
+
+        # regions of bin b: binRegions[binStart[b]:binStart[b+1]], in
+        # ascending order
+        self.binStart = numpy.zeros(len(bin_regions) + 1, dtype=numpy.int_)
+        self.binStart[1:] = numpy.cumsum([len(regions) for regions in \
+            bin_regions])
+        self.binRegions = numpy.array([region_idx for regions in \
+            bin_regions for region_idx in regions], dtype=numpy.int_)
+
+
+    def _lonBin(self, lons):
+        return numpy.clip(numpy.floor((lons - self.lonMin) / self.lonDelta),
+            0, self.lonBins - 1).astype(numpy.int_)
+
+
+    def _latBin(self, lats):
+        return numpy.clip(numpy.floor((lats - self.latMin) / self.latDelta),
+            0, self.latBins - 1).astype(numpy.int_)
+
+
+    def locate(self, lons, lats):
+        """
+        return numpy array of region positions for arrays of point
+        coordinates, -1 for points that are not in any region
+        """
+        lons = numpy.asarray(lons, dtype=numpy.float_).ravel()
+        lats = numpy.asarray(lats, dtype=numpy.float_).ravel()
+
+        region_idx = numpy.empty(len(lons), dtype=numpy.int_)
+        region_idx.fill(len(self.geometries))
+
+        if len(self.geometries) == 0 or len(lons) == 0:
+            region_idx.fill(-1)
+            return region_idx
+
+        # points in extent of regions, rejects NaN
+        numpy_err = numpy.seterr(invalid='ignore')
+        try:
+            points = numpy.flatnonzero((lons >= self.lonMin) &
+                (lons <= self.lonMax) & (lats >= self.latMin) &
+                (lats <= self.latMax))
+        finally:
+            numpy.seterr(**numpy_err)
+
+        point_bin = self._latBin(lats[points]) * self.lonBins + \
+            self._lonBin(lons[points])
+
+        # candidate pairs (point, region) from regions of bin of point
+        counts = self.binStart[point_bin + 1] - self.binStart[point_bin]
+        pair_point = numpy.repeat(points, counts)
+
+        pair_offset = numpy.arange(counts.sum()) - numpy.repeat(
+            numpy.cumsum(counts) - counts, counts)
+        pair_region = self.binRegions[numpy.repeat(self.binStart[point_bin],
+            counts) + pair_offset]
+
+        # bounding box of region has to contain point
+        pair_lon = lons[pair_point]
+        pair_lat = lats[pair_point]
+        pair_bounds = self.bounds[pair_region]
+
+        in_bounds = (pair_lon >= pair_bounds[:, 0]) & \
+            (pair_lat >= pair_bounds[:, 1]) & \
+            (pair_lon <= pair_bounds[:, 2]) & \
+            (pair_lat <= pair_bounds[:, 3])
+
+        pair_point = pair_point[in_bounds]
+        pair_region = pair_region[in_bounds]
+
+        # point-in-polygon tests, one batch per region
+        order = numpy.argsort(pair_region, kind='mergesort')
+        pair_point = pair_point[order]
+        pair_region = pair_region[order]
+
+        inside = numpy.zeros(len(pair_point), dtype=numpy.bool_)
+        boundaries = numpy.flatnonzero(numpy.diff(pair_region)) + 1
+
+        for start, end in zip(numpy.concatenate(([0], boundaries)),
+            numpy.concatenate((boundaries, [len(pair_region)]))):
+
+            if start == end:
+                continue
+
+            geometry, prepared = self.geometries[pair_region[start]]
+            curr_points = pair_point[start:end]
+
+            inside[start:end] = QPPolygon.geometryContainsPoints(geometry,
+                lons[curr_points], lats[curr_points], prepared=prepared)
+
+        # first region that contains point
+        numpy.minimum.at(region_idx, pair_point[inside], pair_region[inside])
+
+        region_idx[region_idx == len(self.geometries)] = -1
+        return region_idx
+
+
+    def locateIds(self, lons, lats):
+        """
+        return list of region ids for arrays of point coordinates, None for
+        points that are not in any region
+        """
+        return [self.ids[region_idx] if region_idx >= 0 else None \
+            for region_idx in self.locate(lons, lats)]
+
+
+def binning(coordMin, coordMax, size):
+    """
+    return (number of bins, bin size) for range of coordinate and
+    preferred bin size
+    """
+    extent = coordMax - coordMin
+
+    if not (extent > 0.0 and size > 0.0):
+        return (1, 1.0)
+
+    bins = min(int(math.ceil(extent / size)), MAX_BINS_PER_AXIS)
+    return (bins, extent / bins)
@@ -42,6 +42,12 @@ WEB_DATASOURCE_URL_SCHEMA = ('http:', 'https:', 'ftp:')
 
 CATALOG_FILE_NAN_STRING = 'NaN'
 
+# mx.DateTime .absdate of 1970-01-01
+MX_ABSDATE_UNIX_EPOCH = 719163
+
+# mean length of year in days, used for time spans of catalogs
+DAYS_PER_YEAR = 365.25
+
 
 def getQPDataSource(filename, compression=None, binary=False, **kwargs):
 
@@ -246,6 +252,71 @@ def pyrxpTupleTree2XML(node, stream):
         stream.write("</%s>" % elementname)
 
 
+def lxmlElement2pyrxpTupleTree(element):
+    """
+    convert lxml element (e.g., from etree.iterparse) to pyRXP-style 4-tuple
+    (tagname, attributes, children, None), as expected by QPObject.fromXML()
+
+    tag and attribute names are given with namespace prefix (if any), as
+    in the pyRXP tuple tree, text content is returned as UTF-8 encoded str
+    """
+
+    tagname = etree.QName(element).localname
+    if element.prefix is not None:
+        tagname = QPCore.XML_NAMESPACE_SEPARATOR_CHAR.join((element.prefix,
+            tagname))
+
+    children = []
+    if element.text is not None:
+        children.append(_lxmlText2Str(element.text))
+
+    for child in element:
+
+        # skip comments and processing instructions, keep their tail text
+        if isinstance(child.tag, basestring):
+            children.append(lxmlElement2pyrxpTupleTree(child))
+
+        if child.tail is not None:
+            children.append(_lxmlText2Str(child.tail))
+
+    return (tagname, lxmlAttributes2Dict(element), children, None)
+
+
+def lxmlAttributes2Dict(element):
+    """
+    return attributes of lxml element as dict with pyRXP-style attribute
+    names (namespace prefix instead of namespace URI), or None if element
+    has no attributes
+    """
+
+    if len(element.attrib) == 0:
+        return None
+
+    # map of namespace URI -> prefix
+    ns_prefixes = dict((uri, prefix) for prefix, uri in \
+        element.nsmap.iteritems() if prefix is not None)
+
+    attributes = {}
+    for name, value in element.attrib.iteritems():
+
+        attr_qname = etree.QName(name)
+        attr_name = attr_qname.localname
+        if attr_qname.namespace in ns_prefixes:
+            attr_name = QPCore.XML_NAMESPACE_SEPARATOR_CHAR.join((
+                ns_prefixes[attr_qname.namespace], attr_name))
+
+        attributes[attr_name] = _lxmlText2Str(value)
+
+    return attributes
+
+
+def _lxmlText2Str(text):
+    if isinstance(text, unicode):
+        return text.encode('utf-8')
+    else:
+        return text
+
+
 def pickleObj(obj, file, **kwargs):
     
     fh = writeQPData(file, binary=True, **kwargs)
@@ -920,6 +991,27 @@ def decimalYear(datetime):
     return datetime.year + year_fraction
 
 
+def decimalYears(absdate, abstime):
+    """
+    return numpy array of decimal years for arrays of .absdate and .abstime
+    values of mx.DateTime objects, same results as decimalYear()
+    """
+
+    days = numpy.asarray(absdate, dtype=numpy.int64) - MX_ABSDATE_UNIX_EPOCH
+    years = days.astype('datetime64[D]').astype('datetime64[Y]')
+
+    year_start = years.astype('datetime64[D]').astype(numpy.int64)
+    year_days = (years + 1).astype('datetime64[D]').astype(numpy.int64) - \
+        year_start
+
+    # seconds since beginning of year, divided by seconds of (leap) year
+    year_seconds = (days - year_start) * 86400.0 + numpy.asarray(abstime,
+        dtype=numpy.float_)
+    
+    return (years.astype(numpy.int64) + 1970) + year_seconds / (
+        86400.0 * year_days)
+
+
 def fromDecimalYear(decimalyear):
     """
     return mx.DateTime object corresponding to (floating point) decimal year
@@ -944,6 +1036,110 @@ def fromDecimalYear(decimalyear):
     return startyear_dt + DateTimeDeltaFromSeconds( year_seconds )
 
 
+def fromDecimalYears(decimalyears):
+    """
+    return numpy arrays (float) of year, month, day, hour, minute, and
+    second for array of decimal years, same results as the attributes of
+    fromDecimalYear(). Components of NaN decimal years are NaN
+    """
+
+    decimalyears = numpy.asarray(decimalyears, dtype=numpy.float_)
+    valid = ~numpy.isnan(decimalyears)
+
+    components = [numpy.empty(decimalyears.shape, dtype=numpy.float_) \
+        for idx in xrange(6)]
+    for component in components:
+        component.fill(numpy.nan)
+
+    year_fraction, year = numpy.modf(decimalyears[valid])
+
+    years = (year.astype(numpy.int64) - 1970).astype('datetime64[Y]')
+    year_start = years.astype('datetime64[D]')
+    year_days = ((years + 1).astype('datetime64[D]') - year_start).astype(
+        numpy.int64)
+
+    # seconds that have passed in fraction of the current year, split into
+    # days and seconds of day as mx.DateTime does
+    year_seconds = year_fraction * 86400.0 * year_days
+    days = numpy.floor(year_seconds / 86400.0)
+    abstime = year_seconds - days * 86400.0
+
+    dates = year_start + days.astype(numpy.int64)
+    months = dates.astype('datetime64[M]')
+
+    inttime = abstime.astype(numpy.int64)
+    hour = inttime // 3600
+    minute = (inttime % 3600) // 60
+
+    components[0][valid] = dates.astype('datetime64[Y]').astype(
+        numpy.int64) + 1970
+    components[1][valid] = months.astype(numpy.int64) % 12 + 1
+    components[2][valid] = (dates - months.astype('datetime64[D]')).astype(
+        numpy.int64) + 1
+    components[3][valid] = hour
+    components[4][valid] = minute
+    components[5][valid] = abstime - (hour * 3600 + minute * 60)
+
+    return tuple(components)
+
+
+def decimalYearsFromComponents(year, month, day, hour, minute, second,
+    offset=0.0):
+    """
+    return numpy array of decimal years for arrays of date and time
+    components, same results as decimalYear() of the mx.DateTime objects
+    returned by correctedDateTimeFromString() (illegal components hour=24,
+    minute=60, second=60 are corrected). Decimal years are NaN where a
+    component is NaN
+
+    offset: seconds added to time before correction (e.g., time zone shift)
+    """
+
+    year, month, day, hour, minute = [numpy.trunc(numpy.asarray(component,
+        dtype=numpy.float_)) for component in (year, month, day, hour,
+        minute)]
+    second = numpy.asarray(second, dtype=numpy.float_)
+
+    values = numpy.empty(year.shape, dtype=numpy.float_)
+    values.fill(numpy.nan)
+
+    valid = ~(numpy.isnan(year) | numpy.isnan(month) | numpy.isnan(day) | \
+        numpy.isnan(hour) | numpy.isnan(minute) | numpy.isnan(second))
+
+    year, month, day, hour, minute, second = [component[valid] for \
+        component in (year, month, day, hour, minute, second)]
+
+    # corrections as in fixTimeComponents()
+    increase_day = numpy.where(hour >= 24, hour // 24, 0)
+    hour = numpy.where(hour >= 24, 0, hour)
+    increase_hour = numpy.where(minute >= 60, minute // 60, 0)
+    minute = numpy.where(minute >= 60, 0, minute)
+    second = numpy.where(second >= 60.0, second - numpy.floor(second), second)
+
+    months = (year.astype(numpy.int64) - 1970).astype('datetime64[Y]').astype(
+        'datetime64[M]') + (month.astype(numpy.int64) - 1)
+    absdate = (months.astype('datetime64[D]') - numpy.datetime64(
+        '1970-01-01', 'D')).astype(numpy.int64) + day.astype(numpy.int64) - \
+        1 + MX_ABSDATE_UNIX_EPOCH
+    abstime = hour * 3600.0 + minute * 60.0 + second
+
+    # add seconds as mx.DateTime does, carry whole days over to date
+    def addSeconds(absdate, abstime, seconds):
+        abstime = abstime + seconds
+        days = numpy.floor(abstime / 86400.0)
+        return (absdate + days.astype(numpy.int64), abstime - days * 86400.0)
+
+    if offset != 0.0:
+        absdate, abstime = addSeconds(absdate, abstime, offset)
+
+    # adjustDateTime()
+    absdate, abstime = addSeconds(absdate, abstime, increase_day * 86400.0)
+    absdate, abstime = addSeconds(absdate, abstime, increase_hour * 3600.0)
+
+    values[valid] = decimalYears(absdate, abstime)
+    return values
+
+
 def fixTimeComponents( hour, minute, second ):
     """
     in time strings with the format HH:MM:SS[.ss...], values are sometimes HH=24, MM=60, and SS=60
@@ -1286,7 +1482,6 @@ def line_is_empty(line):
 
 ## functions to determine memory usage
 
-_proc_status = '/proc/%d/status' % os.getpid( )
 _scale = {'kB': 1024.0, 'mB': 1024.0*1024.0,
           'KB': 1024.0, 'MB': 1024.0*1024.0}
 
@@ -1300,7 +1495,9 @@ def _VmB(VmKey):
     # get pseudo file  /proc/<pid>/status
     """
     try:
-        t = open(_proc_status)
+        # pid of current process, module may have been imported by parent
+        # of forked process
+        t = open('/proc/%d/status' % os.getpid())
         v = t.read( )
         t.close( )
     except IOError:
@@ -84,7 +84,6 @@ class Amplitude(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(Amplitude, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
@@ -76,10 +76,12 @@ class Arrival(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(Arrival, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
             self.publicID = self.createPublicID(self.__class__.__name__, **kwargs)
 
         self._initMultipleElements()
+
+
+ArrivalSlotted = QPCore.createSlottedClass(Arrival)
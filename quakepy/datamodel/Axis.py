@@ -60,7 +60,6 @@ class Axis(QPCore.QPPublicObject):
         length=None,
         **kwargs ):
         super(Axis, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.azimuth = azimuth
         self.plunge = plunge
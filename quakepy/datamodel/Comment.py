@@ -60,7 +60,6 @@ class Comment(QPCore.QPPublicObject):
         creationInfo=None,
         **kwargs ):
         super(Comment, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.text = text
         self.id = id
@@ -64,7 +64,6 @@ class CompositeTime(QPCore.QPPublicObject):
     def __init__(self, 
         **kwargs ):
         super(CompositeTime, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
 
         self._initMultipleElements()
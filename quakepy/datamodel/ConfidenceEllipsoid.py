@@ -56,7 +56,6 @@ class ConfidenceEllipsoid(QPCore.QPPublicObject):
     def __init__(self, 
         **kwargs ):
         super(ConfidenceEllipsoid, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
 
         self._initMultipleElements()
@@ -65,7 +65,6 @@ class CreationInfo(QPCore.QPPublicObject):
         version=None,
         **kwargs ):
         super(CreationInfo, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.agencyID = agencyID
         self.agencyURI = agencyURI
@@ -75,3 +74,6 @@ class CreationInfo(QPCore.QPPublicObject):
         self.version = version
 
         self._initMultipleElements()
+
+
+CreationInfoSlotted = QPCore.createSlottedClass(CreationInfo)
@@ -60,7 +60,6 @@ class DataUsed(QPCore.QPPublicObject):
         longestPeriod=None,
         **kwargs ):
         super(DataUsed, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.waveType = waveType
         self.stationCount = stationCount
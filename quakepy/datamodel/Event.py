@@ -97,7 +97,6 @@ class Event(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(Event, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
@@ -106,12 +105,17 @@ class Event(QPCore.QPPublicObject):
         self._initMultipleElements()
 
 
-    def getPreferredOriginIdx(self):
+    def getPreferredOriginIdx(self, index=None):
         if (not hasattr(self, 'origin')) or len(self.origin) == 0:
             return None
         elif len(self.origin) == 1:
             return 0
         else:
+            idx = self._getIndexedPosition('origin', self.preferredOriginID,
+                index)
+            if idx is not None:
+                return idx
+
             for curr_ori_idx, curr_ori in enumerate(self.origin):
                 if self.preferredOriginID == curr_ori.publicID:
                     return curr_ori_idx
@@ -120,20 +124,25 @@ class Event(QPCore.QPPublicObject):
         raise IndexError, "Event::getPreferredOriginIdx - origin not found"
     
     
-    def getPreferredOrigin( self ):
-        idx = self.getPreferredOriginIdx()
+    def getPreferredOrigin( self, index=None ):
+        idx = self.getPreferredOriginIdx(index)
         if idx is not None:
             return self.origin[idx]
         else:
             raise IndexError, "Event::getPreferredOrigin - origin not found"
     
     
-    def getPreferredMagnitudeIdx( self ):
+    def getPreferredMagnitudeIdx( self, index=None ):
         if (not hasattr(self, 'magnitude')) or len( self.magnitude ) == 0:
             return None
         elif len( self.magnitude ) == 1:
             return 0
         else:
+            idx = self._getIndexedPosition('magnitude',
+                self.preferredMagnitudeID, index)
+            if idx is not None:
+                return idx
+
             for curr_mag_idx, curr_mag in enumerate( self.magnitude ):
                 if self.preferredMagnitudeID == curr_mag.publicID:
                     return curr_mag_idx
@@ -142,20 +151,25 @@ class Event(QPCore.QPPublicObject):
         raise IndexError, "Event::getPreferredMagnitudeIdx - magnitude not found"
     
     
-    def getPreferredMagnitude( self ):
-        idx = self.getPreferredMagnitudeIdx()
+    def getPreferredMagnitude( self, index=None ):
+        idx = self.getPreferredMagnitudeIdx(index)
         if idx is not None:
             return self.magnitude[idx]
         else:
             raise IndexError, "Event::getPreferredMagnitude - magnitude not found"
     
     
-    def getPreferredFocalMechanismIdx( self ):
+    def getPreferredFocalMechanismIdx( self, index=None ):
         if ( not hasattr( self, 'focalMechanism' ) ) or len( self.focalMechanism ) == 0:
             return None
         elif len( self.focalMechanism ) == 1:
             return 0
         else:
+            idx = self._getIndexedPosition('focalMechanism',
+                self.preferredFocalMechanismID, index)
+            if idx is not None:
+                return idx
+
             for curr_fm_idx, curr_fm in enumerate( self.focalMechanism ):
                 if self.preferredFocalMechanismID == curr_fm.publicID:
                     return curr_fm_idx
@@ -164,47 +178,64 @@ class Event(QPCore.QPPublicObject):
         raise IndexError, "Event::getPreferredFocalMechanismIdx - focalMechanism not found"
     
     
-    def getPreferredFocalMechanism( self ):
-        idx = self.getPreferredFocalMechanismIdx()
+    def getPreferredFocalMechanism( self, index=None ):
+        idx = self.getPreferredFocalMechanismIdx(index)
         if idx is not None:
             return self.focalMechanism[idx]
         else:
             raise IndexError, "Event::getPreferredFocalMechanism - focalMechanism not found"
 
 
-    def getOriginIdx(self, ori):
+    def getOriginIdx(self, ori, index=None):
         """
         input: ori, can either be Origin instance or publicID of origin
+               index, catalog index (QPCatalogIndex) used for lookup if
+                 event is registered with it
+
+        Origin instances are looked up by identity first, then by 
+        comparison with __eq__()
         """
         if not isinstance(ori, Origin.Origin):
-            lookForInstance = False
-        else:
-            lookForInstance = True
-
-        for curr_ori_idx, curr_ori in enumerate(self.origin):
-            if lookForInstance:
-                if ori == curr_ori:
-                    return curr_ori_idx
+            idx = self._getIndexedPosition('origin', ori, index)
+            if idx is not None:
+                return idx
 
-            else:
+            for curr_ori_idx, curr_ori in enumerate(self.origin):
                 if ori == curr_ori.publicID:
                     return curr_ori_idx
 
+            return None
+
+        idx = self._getIndexedPosition('origin', ori.publicID, index)
+        if idx is not None and self.origin[idx] is ori:
+            return idx
+
+        for curr_ori_idx, curr_ori in enumerate(self.origin):
+            if curr_ori is ori:
+                return curr_ori_idx
+
+        for curr_ori_idx, curr_ori in enumerate(self.origin):
+            if ori == curr_ori:
+                return curr_ori_idx
+
         return None
 
 
-    def getOrigin(self, ori):
+    def getOrigin(self, ori, index=None):
         """
         input: ori, can either be Origin instance or publicID of origin
         """
-        ori_idx = self.getOriginIdx(ori)
+        ori_idx = self.getOriginIdx(ori, index)
         if ori_idx is not None:
             return self.origin[ori_idx]
         else:
             return None
     
     
-    def getMagnitudesIdx(self, ori):
+    def getMagnitudesIdx(self, ori, index=None):
+        if index is not None and index.isRegistered(self):
+            return index.getMagnitudesIdx(self, ori.publicID)
+
         mag_idx = []
 
         for curr_mag_idx, curr_mag in enumerate( self.magnitude ):
@@ -213,10 +244,26 @@ class Event(QPCore.QPPublicObject):
         return mag_idx
     
     
-    def getMagnitudes( self, ori ):
+    def getMagnitudes( self, ori, index=None ):
+        if index is not None and index.isRegistered(self):
+            return [self.magnitude[idx] for idx in index.getMagnitudesIdx(
+                self, ori.publicID)]
+
         magnitudes = []
         
         for mag in self.magnitude:
             if mag.originID == ori.publicID:
                 magnitudes.append( mag )
         return magnitudes
+
+
+    def _getIndexedPosition(self, varname, publicID, index):
+        """
+        look up position of object with given publicID in child list
+        varname in catalog index, None if no index is given, event is not
+        registered with index or object has not been found
+        """
+        if index is not None and index.isRegistered(self):
+            return index.getPosition(self, varname, publicID)
+        else:
+            return None
@@ -54,9 +54,11 @@ class EventDescription(QPCore.QPPublicObject):
         type=None,
         **kwargs ):
         super(EventDescription, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.text = text
         self.type = type
 
         self._initMultipleElements()
+
+
+EventDescriptionSlotted = QPCore.createSlottedClass(EventDescription)
@@ -81,7 +81,6 @@ class FocalMechanism(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(FocalMechanism, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
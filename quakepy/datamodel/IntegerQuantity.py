@@ -60,7 +60,6 @@ class IntegerQuantity(QPCore.QPPublicObject):
         confidenceLevel=None,
         **kwargs ):
         super(IntegerQuantity, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.value = value
         self.uncertainty = uncertainty
@@ -69,3 +68,6 @@ class IntegerQuantity(QPCore.QPPublicObject):
         self.confidenceLevel = confidenceLevel
 
         self._initMultipleElements()
+
+
+IntegerQuantitySlotted = QPCore.createSlottedClass(IntegerQuantity)
@@ -72,7 +72,6 @@ class Magnitude(QPCore.QPPublicObject):
         originID=None,
         **kwargs):
         super(Magnitude, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
@@ -84,3 +83,6 @@ class Magnitude(QPCore.QPPublicObject):
 
     def setOriginAssociation(self, originID):
         self.originID = originID
+
+
+MagnitudeSlotted = QPCore.createSlottedClass(Magnitude)
@@ -85,7 +85,6 @@ class MomentTensor(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(MomentTensor, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
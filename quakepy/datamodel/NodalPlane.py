@@ -60,7 +60,6 @@ class NodalPlane(QPCore.QPPublicObject):
         rake=None,
         **kwargs ):
         super(NodalPlane, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.strike = strike
         self.dip = dip
@@ -59,7 +59,6 @@ class NodalPlanes(QPCore.QPPublicObject):
         preferredPlane=None,
         **kwargs ):
         super(NodalPlanes, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.nodalPlane1 = nodalPlane1
         self.nodalPlane2 = nodalPlane2
@@ -92,7 +92,6 @@ class Origin(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(Origin, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
@@ -101,7 +100,10 @@ class Origin(QPCore.QPPublicObject):
         self._initMultipleElements()
     
     
-    def getArrivalsIdx(self, pick):
+    def getArrivalsIdx(self, pick, index=None):
+        if index is not None and index.isRegistered(self):
+            return index.getArrivalsIdx(self, pick.publicID)
+
         arr_idx = []
         
         for curr_arr_idx, curr_arr in enumerate(self.arrival):
@@ -110,10 +112,17 @@ class Origin(QPCore.QPPublicObject):
         return arr_idx
     
     
-    def getArrivals(self, pick):
+    def getArrivals(self, pick, index=None):
+        if index is not None and index.isRegistered(self):
+            return [self.arrival[idx] for idx in index.getArrivalsIdx(
+                self, pick.publicID)]
+
         arrivals = []
         
         for arr in self.arrival:
             if arr.pickID == pick.publicID:
                 arrivals.append(arr)
         return arrivals
+
+
+OriginSlotted = QPCore.createSlottedClass(Origin)
@@ -62,7 +62,9 @@ class OriginQuality(QPCore.QPPublicObject):
     def __init__(self, 
         **kwargs ):
         super(OriginQuality, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
 
         self._initMultipleElements()
+
+
+OriginQualitySlotted = QPCore.createSlottedClass(OriginQuality)
@@ -59,7 +59,9 @@ class OriginUncertainty(QPCore.QPPublicObject):
     def __init__(self, 
         **kwargs ):
         super(OriginUncertainty, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
 
         self._initMultipleElements()
+
+
+OriginUncertaintySlotted = QPCore.createSlottedClass(OriginUncertainty)
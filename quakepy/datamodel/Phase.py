@@ -52,8 +52,10 @@ class Phase(QPCore.QPPublicObject):
         code=None,
         **kwargs ):
         super(Phase, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.code = code
 
         self._initMultipleElements()
+
+
+PhaseSlotted = QPCore.createSlottedClass(Phase)
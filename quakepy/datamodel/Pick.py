@@ -81,10 +81,12 @@ class Pick(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(Pick, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
             self.publicID = self.createPublicID(self.__class__.__name__, **kwargs)
 
         self._initMultipleElements()
+
+
+PickSlotted = QPCore.createSlottedClass(Pick)
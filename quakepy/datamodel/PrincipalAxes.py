@@ -60,7 +60,6 @@ class PrincipalAxes(QPCore.QPPublicObject):
         nAxis=None,
         **kwargs ):
         super(PrincipalAxes, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.tAxis = tAxis
         self.pAxis = pAxis
@@ -52,7 +52,6 @@ class Reading(QPCore.QPPublicObject):
     # <!-- UML2Py end -->
     def __init__(self, publicID=None, **kwargs):
         super(Reading, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
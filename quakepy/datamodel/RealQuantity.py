@@ -60,7 +60,6 @@ class RealQuantity(QPCore.QPPublicObject):
         confidenceLevel=None,
         **kwargs ):
         super(RealQuantity, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.value = value
         self.uncertainty = uncertainty
@@ -69,3 +68,6 @@ class RealQuantity(QPCore.QPPublicObject):
         self.confidenceLevel = confidenceLevel
 
         self._initMultipleElements()
+
+
+RealQuantitySlotted = QPCore.createSlottedClass(RealQuantity)
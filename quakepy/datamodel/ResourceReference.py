@@ -51,7 +51,6 @@ class ResourceReference(QPCore.QPPublicObject):
     def __init__(self, 
         **kwargs ):
         super(ResourceReference, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
 
         self._initMultipleElements()
@@ -58,7 +58,6 @@ class SourceTimeFunction(QPCore.QPPublicObject):
         decayTime=None,
         **kwargs ):
         super(SourceTimeFunction, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.type = type
         self.duration = duration
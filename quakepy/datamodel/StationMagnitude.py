@@ -70,7 +70,6 @@ class StationMagnitude(QPCore.QPPublicObject):
     def __init__(self, publicID=None, 
         **kwargs):
         super(StationMagnitude, self).__init__(publicID, **kwargs)
-        self.elements.extend(self.addElements)
 
         # publicID has not been set in parent class
         if self.publicID is None:
@@ -55,7 +55,6 @@ class StationMagnitudeContribution(QPCore.QPPublicObject):
     def __init__(self, 
         **kwargs ):
         super(StationMagnitudeContribution, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
 
         self._initMultipleElements()
@@ -69,7 +69,6 @@ class Tensor(QPCore.QPPublicObject):
         Mtp=None,
         **kwargs ):
         super(Tensor, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.Mrr = Mrr
         self.Mtt = Mtt
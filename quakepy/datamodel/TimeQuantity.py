@@ -60,7 +60,6 @@ class TimeQuantity(QPCore.QPPublicObject):
         confidenceLevel=None,
         **kwargs ):
         super(TimeQuantity, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.value = value
         self.uncertainty = uncertainty
@@ -73,3 +72,6 @@ class TimeQuantity(QPCore.QPPublicObject):
 
     def toDecimalYear(self):
         return self.value.toDecimalYear()
+
+
+TimeQuantitySlotted = QPCore.createSlottedClass(TimeQuantity)
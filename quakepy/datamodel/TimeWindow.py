@@ -56,7 +56,6 @@ class TimeWindow(QPCore.QPPublicObject):
         reference=None,
         **kwargs ):
         super(TimeWindow, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.begin = begin
         self.end = end
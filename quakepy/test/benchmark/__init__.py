@@ -0,0 +1,2 @@
+"""Required for imports."""
+
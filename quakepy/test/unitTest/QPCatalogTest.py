@@ -7,8 +7,12 @@ This file is part of QuakePy12.
 import sys
 import shutil
 import os
+import threading
 import unittest
 import datetime
+import numpy
+import re
+import cStringIO
 
 from random import Random
 
@@ -17,16 +21,50 @@ from mx.DateTime import DateTime
 from quakepy.test import QPTestCase
 
 from quakepy import QPCatalog
+from quakepy import QPCatalogCompact
+from quakepy import QPCatalogCompactStore
+from quakepy import QPCatalogFormats
+from quakepy import QPCatalogFilter
 from quakepy import QPCore
+from quakepy import QPDateTime
+from quakepy import QPFileShards
+from quakepy import QPGrid
+from quakepy import QPPolygon
+from quakepy import QPUtils
+from quakepy import qpfmd
 
 from quakepy.datamodel.EventParameters            import EventParameters
 from quakepy.datamodel.Event                      import Event
 from quakepy.datamodel.Origin                     import Origin
+from quakepy.datamodel.OriginQuality              import OriginQuality
 from quakepy.datamodel.Magnitude                  import Magnitude
 from quakepy.datamodel.RealQuantity               import RealQuantity
 from quakepy.datamodel.TimeQuantity               import TimeQuantity
 
 
+def xmlWithoutIDs( qpc ):
+    """
+    QuakeML serialization of catalog with publicIDs and references removed
+    (QPCatalog.__eq__() does not compare objects with publicID), seconds
+    of date/time values rounded to microseconds (read date/time values
+    can differ in last digits)
+    """
+    stream = cStringIO.StringIO()
+    qpc.writeXML( stream )
+    xml = re.sub( r'smi:[^"<]*|publicID="[^"]*"', '', stream.getvalue() )
+    return re.sub( r'(?<=T\d\d:\d\d:)\d\d\.\d+', 
+                   lambda match: '%09.6f' % round( float( match.group() ), 6 ), xml )
+
+
+def eventXML( ev ):
+    """
+    QuakeML serialization of event, covers all fields of event and its child elements
+    """
+    stream = cStringIO.StringIO()
+    ev.toXML( 'event', stream )
+    return stream.getvalue()
+
+
 class QPCatalogTest(QPTestCase.QPTestCase):
 
     ## static data of the class
@@ -113,6 +151,115 @@ class QPCatalogTest(QPTestCase.QPTestCase):
             os.chdir( cwd )
         
         
+    def testPublicIDGenerator( self ):
+        """
+        - set 'counter' publicID style and namespace
+        - create events from several threads, check that publicIDs are unique
+        - check that 'idstyle' kwarg overrides publicID generator
+        """
+        print
+        print " ----- testPublicIDGenerator: publicIDs from counter generator -----"
+        
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-PublicIDGenerator" )
+
+        try:
+            
+            N = 1000
+            T = 4
+            namespace = 'org.quakepy.test'
+
+            QPCore.QPPublicObject.setPublicIDStyle( 'counter', namespace )
+
+            publicIDs = []
+            def createEvents():
+                for curr_ev in xrange( N ):
+                    publicIDs.append( Event().publicID )
+
+            threads = [ threading.Thread( target = createEvents ) for idx in xrange( T ) ]
+            for curr_thread in threads:
+                curr_thread.start()
+            for curr_thread in threads:
+                curr_thread.join()
+
+            print " created %s events in %s threads" % ( len( publicIDs ), T )
+
+            error = "Error: publicIDs are not unique"
+            self.failIf( len( set( publicIDs ) ) != N * T, error )
+
+            error = "Error: publicID does not have namespace %s" % namespace
+            self.failIf( not publicIDs[0].startswith( 'smi:%s/Event/' % namespace ), error )
+
+            error = "Error: publicID style 'numeric' from kwarg is not used"
+            self.failIf( not Event( idstyle = 'numeric' ).publicID.isdigit(), error )
+
+            # IDs of separate numeric generators must not collide
+            generators = ( QPCore.createPublicIDGenerator( 'numeric', namespace ),
+                           QPCore.createPublicIDGenerator( 'numeric', 'org.quakepy.other' ) )
+            numericIDs = [ generator.createID() for generator in generators for idx in xrange( N ) ]
+
+            error = "Error: publicIDs of numeric generators collide"
+            self.failIf( len( set( numericIDs ) ) != len( numericIDs ), error )
+
+        finally:
+            QPCore.QPPublicObject.setPublicIDStyle( 'full', 
+                QPCore.RESOURCE_IDENTIFIER_AUTHORITY_LOCAL )
+
+
+    def testCatalogPublicIDNamespace( self ):
+        """
+        - create two catalogs with different publicID namespaces
+        - import ZMAP file into both catalogs, check that publicIDs of each
+          catalog are in its namespace
+        - check that global publicID generator is not changed
+        """
+        print
+        print " ----- testCatalogPublicIDNamespace: publicID namespaces of catalogs -----"
+        
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CatalogPublicIDNamespace" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+
+        try:
+
+            infile = 'zmap.test.dat'
+
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+            generator = QPCore.QPPublicObject.getPublicIDGenerator()
+
+            qpc_a = QPCatalog.QPCatalog( idstyle = 'counter', idnamespace = 'net.a' )
+            qpc_b = QPCatalog.QPCatalog( idnamespace = 'net.b' )
+
+            qpc_a.importZMAP( infile )
+            qpc_b.importZMAP( infile )
+            print " read ZMAP file %s into catalogs with %s and %s events" % ( 
+                infile, qpc_a.size, qpc_b.size )
+
+            for qpc, namespace in ( ( qpc_a, 'net.a' ), ( qpc_b, 'net.b' ) ):
+
+                error = "Error: publicID not in namespace %s of catalog" % namespace
+                for ev in qpc.eventParameters.event:
+                    self.failIf( not ev.publicID.startswith( 'smi:%s/' % namespace ), error )
+                    self.failIf( not ev.origin[0].publicID.startswith( 'smi:%s/' % namespace ), error )
+
+                ev = qpc.iterEvents( infile, format = 'ZMAP' ).next()
+                self.failIf( not ev.publicID.startswith( 'smi:%s/' % namespace ), error )
+
+            error = "Error: global publicID generator has been changed"
+            self.failIf( QPCore.QPPublicObject.getPublicIDGenerator() is not generator, error )
+            self.failIf( Event().publicID.startswith( 'smi:net.' ), error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
     def testXML(self):
         """
         - read a catalog from XML
@@ -219,6 +366,74 @@ class QPCatalogTest(QPTestCase.QPTestCase):
             os.chdir( cwd )
 
 
+    def testXMLStreaming(self):
+        """
+        - read a catalog from XML in streaming mode
+        - compare with catalog read from XML in one go
+        - iterate over events of catalog file, compare with catalog
+        - do this for uncompressed, gzipped, and b2zipped catalog
+        """
+        
+        print
+        print " ----- testXMLStreaming: streaming read of XML (QuakeML) catalogue -----"
+        
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-XMLStreaming" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            N = 500
+
+            for suffix, compression in ( ( '', None ), ( '.gz', 'gz' ), 
+                                         ( '.bz2', 'bz2' ) ):
+
+                infile = 'qpcat.' + str(N) + '.qml' + suffix
+
+                # copy reference catalog file to test dir
+                shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                                 os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+                qpc = QPCatalog.QPCatalog( infile, compression = compression )
+                
+                qpc2 = QPCatalog.QPCatalog()
+                qpc2.readXML( infile, streaming = True, compression = compression )
+                print " read catalog file %s in streaming mode with %s events" % ( infile, qpc2.size )
+
+                error = "Error: number of events in imported catalog is wrong: %s / %s " % ( qpc2.size, N )
+                self.failIf( qpc2.size != N, error )
+
+                error = "Error: catalog read in one go and streamed catalog are not equal"
+                self.failIf( xmlWithoutIDs( qpc ) != xmlWithoutIDs( qpc2 ), error )
+
+                ev_ctr = 0
+                for ev in QPCatalog.QPCatalog().iterEvents( infile, compression = compression ):
+
+                    # publicIDs are read from file and have to be equal as well
+                    error = "Error: event %s from iterEvents() is not equal to catalog event" % ev_ctr
+                    self.failIf( ev_ctr >= N or eventXML( ev ) != eventXML( qpc.eventParameters.event[ev_ctr] ), error )
+                    ev_ctr += 1
+
+                error = "Error: number of events from iterEvents() is wrong: %s / %s " % ( ev_ctr, N )
+                self.failIf( ev_ctr != N, error )
+
+                # stream opened for file name is closed by partly consumed generator
+                events = QPCatalog.QPCatalog().iterEvents( infile, compression = compression )
+                events.next()
+                istream = events.gi_frame.f_locals['iterator'].gi_frame.f_locals['istream']
+                events.close()
+
+                error = "Error: stream opened by iterEvents() is not closed"
+                self.failIf( not istream.closed, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
     def testZMAP( self ):
         """
         - read a catalog from ZMAP format
@@ -670,6 +885,1540 @@ class QPCatalogTest(QPTestCase.QPTestCase):
             os.chdir( cwd )
 
 
+    def testSlottedObjects( self ):
+        """
+        - read a catalog from GSE2.0 Bulletin format with slotted objects
+        - compare with catalog read with regular objects
+        - pickle catalog with slotted objects, compare
+        - write catalog to QuakeML format, read with slotted objects, compare
+        """
+        print
+        print " ----- testSlottedObjects: read GSE2.0 Bulletin with slotted objects -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-SlottedObjects" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+
+        try:
+
+            infile   = 'gse2.0.ingv.test.dat'
+            outfile  = 'gse2.0.ingv.test.slotted.qml'
+            picklefile = 'gse2.0.ingv.test.slotted.pickle'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importGSE2_0Bulletin( infile, authorityID = 'it.ingv', networkCode = 'IV' )
+
+            qpc_slotted = QPCatalog.QPCatalog( slotted = True )
+            qpc_slotted.importGSE2_0Bulletin( infile, authorityID = 'it.ingv', networkCode = 'IV' )
+            print " read GSE2.0 Bulletin file %s with %s events, slotted objects" % ( infile, qpc_slotted.size )
+
+            ori = qpc_slotted.eventParameters.event[0].origin[0]
+            error = "Error: origin quantities are not slotted objects"
+            self.failIf( type( ori.latitude ) is not RealQuantity.slottedClass, error )
+            self.failIf( type( ori.time ) is not TimeQuantity.slottedClass, error )
+            self.failIf( type( ori.time.value ) is not QPDateTime.QPDateTimeSlotted, error )
+
+            error = "Error: origin is not slotted object"
+            self.failIf( type( ori ) is not Origin.slottedClass, error )
+            self.failIf( type( ori.quality ) is not OriginQuality.slottedClass, error )
+
+            # setting of slotted catalog is not used outside of its import
+            qpc_default = QPCatalog.QPCatalog()
+            qpc_default.importGSE2_0Bulletin( infile, authorityID = 'it.ingv', networkCode = 'IV' )
+
+            ori = qpc_default.eventParameters.event[0].origin[0]
+            error = "Error: default catalog creates slotted objects"
+            self.failIf( QPCore.QPObject.slottedObjects is not False, error )
+            self.failIf( type( ori.latitude ) is not RealQuantity, error )
+            self.failIf( type( ori.time.value ) is not QPDateTime.QPDateTime, error )
+            self.failIf( type( RealQuantity() ) is not RealQuantity, error )
+
+            error = "Error: catalogs with regular and slotted objects are not equal"
+            self.failIf( xmlWithoutIDs( qpc ) != xmlWithoutIDs( qpc_slotted ), error )
+
+            qpc_slotted.save( picklefile )
+            qpc2 = QPUtils.unpickleObj( picklefile )
+            
+            error = "Error: original and unpickled catalog are not equal"
+            self.failIf( xmlWithoutIDs( qpc_slotted ) != xmlWithoutIDs( qpc2 ), error )
+
+            ori = qpc2.eventParameters.event[0].origin[0]
+            error = "Error: unpickled origin quantities are not slotted objects"
+            self.failIf( type( ori.latitude ) is not RealQuantity.slottedClass, error )
+            self.failIf( type( ori.time.value ) is not QPDateTime.QPDateTimeSlotted, error )
+
+            qpc_slotted.writeXML( outfile )
+            qpc2 = QPCatalog.QPCatalog( outfile )
+            print " checking, read QuakeML catalog file %s: %s events" % ( outfile, qpc2.size )
+
+            error = "Error: original and re-read catalog are not equal"
+            self.failIf( xmlWithoutIDs( qpc ) != xmlWithoutIDs( qpc2 ), error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCatalogIndex( self ):
+        """
+        - read a catalog from GSE2.0 Bulletin format, build catalog index
+        - compare lookups via index with lookups of a catalog without index
+        - merge and cut catalog, check that index is updated
+        """
+        print
+        print " ----- testCatalogIndex: lookups of public objects via catalog index -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CatalogIndex" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'gse2.0.ingv.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importGSE2_0Bulletin( infile, authorityID = 'it.ingv', networkCode = 'IV' )
+
+            qpc_noindex = QPCatalog.QPCatalog()
+            qpc_noindex.importGSE2_0Bulletin( infile, authorityID = 'it.ingv', networkCode = 'IV' )
+
+            index = qpc.index
+            print " read GSE2.0 Bulletin file %s with %s events, %s indexed objects" % ( 
+                infile, qpc.size, len( index ) )
+
+            for ev, ev_noindex in zip( qpc.eventParameters.event, 
+                                       qpc_noindex.eventParameters.event ):
+
+                error = "Error: event not found in index"
+                self.failIf( index.get( ev.publicID ) is not ev, error )
+                self.failIf( index.getParent( ev.publicID ) is not qpc.eventParameters, error )
+
+                error = "Error: preferred origin/magnitude differs"
+                self.failIf( ev.getPreferredOriginIdx( index ) != ev_noindex.getPreferredOriginIdx(), error )
+                self.failIf( ev.getPreferredMagnitudeIdx( index ) != ev_noindex.getPreferredMagnitudeIdx(), error )
+
+                for ori, ori_noindex in zip( ev.origin, ev_noindex.origin ):
+
+                    error = "Error: origin lookup differs"
+                    self.failIf( index.getParent( ori.publicID ) is not ev, error )
+                    self.failIf( ev.getOrigin( ori.publicID, index ) is not ori, error )
+                    self.failIf( ev.getOriginIdx( ori, index ) != ev_noindex.getOriginIdx( ori_noindex.publicID ), error )
+
+                    error = "Error: magnitudes of origin differ"
+                    self.failIf( ev.getMagnitudesIdx( ori, index ) != ev_noindex.getMagnitudesIdx( ori_noindex ), error )
+
+                    for pick, pick_noindex in zip( ev.pick, ev_noindex.pick ):
+                        error = "Error: arrivals of pick differ"
+                        self.failIf( ori.getArrivalsIdx( pick, index ) != ori_noindex.getArrivalsIdx( pick_noindex ), error )
+
+            # add magnitude to indexed event
+            ev = qpc.eventParameters.event[0]
+            ori = ev.getPreferredOrigin( index )
+            mag_count = len( ev.getMagnitudes( ori, index ) )
+
+            mag = Magnitude( originID = ori.publicID )
+            mag.add( ev, 'magnitude' )
+
+            error = "Error: added magnitude not found"
+            self.failIf( len( ev.getMagnitudes( ori, index ) ) != mag_count + 1, error )
+            self.failIf( ev.getMagnitudes( ori, index )[-1] is not mag, error )
+            self.failIf( index.get( mag.publicID ) is not mag, error )
+
+            # merge
+            qpc.merge( qpc_noindex )
+
+            error = "Error: merged events not indexed"
+            self.failIf( len( index.events ) != qpc.size, error )
+            for ev in qpc_noindex.eventParameters.event:
+                self.failIf( not index.isRegistered( ev ), error )
+
+            # events shared with another catalog do not refer to its index
+            error = "Error: index of catalog attached to shared event"
+            index_noindex = qpc_noindex.index
+            for ev in qpc_noindex.eventParameters.event:
+                self.failIf( index in ev.__dict__.values(), error )
+                self.failIf( index_noindex in ev.__dict__.values(), error )
+
+            # cut
+            events = list( qpc.eventParameters.event )
+            qpc.cut( minmag = 3.0 )
+            print " cut catalog to %s events" % qpc.size
+
+            error = "Error: index not updated after cut"
+            self.failIf( len( index.events ) != qpc.size, error )
+
+            remaining = set( [ id( ev ) for ev in qpc.eventParameters.event ] )
+            for ev in events:
+                self.failIf( index.isRegistered( ev ) != ( id( ev ) in remaining ), error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testOriginIdx( self ):
+        """
+        - look up origin instances in event
+        """
+        print
+        print " ----- testOriginIdx: look up origin instances -----"
+
+        ev = Event()
+        for idx in xrange( 3 ):
+            ori = Origin()
+            ori.add( ev, 'origin' )
+
+        error = "Error: origin instance not found at its position"
+        for idx in xrange( 3 ):
+            self.failIf( ev.getOriginIdx( ev.origin[idx] ) != idx, error )
+            self.failIf( ev.getOrigin( ev.origin[idx] ) is not ev.origin[idx], error )
+
+
+    def testCut( self ):
+        """
+        - read a catalog from ZMAP format
+        - cut catalog with lat/lon/depth/time/magnitude limits
+        - compare with events selected by checking each origin and magnitude
+        """
+        print
+        print " ----- testCut: cut catalog with parameter limits -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-Cut" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            mintime = QPDateTime.QPDateTime( '2000-01-01T00:00:00' )
+
+            # origin/magnitude criteria of cut
+            def keepEvent( ev ):
+                for ori in ev.origin:
+                    if ori.latitude.value < -30.0 or ori.latitude.value >= 60.0:
+                        return False
+                    if ori.depth.value < 5000.0:
+                        return False
+                    if ori.time.value < mintime:
+                        return False
+                for mag in ev.magnitude:
+                    if mag.mag.value <= 4.0:
+                        return False
+                return True
+
+            selected = [ ev for ev in qpc.eventParameters.event if keepEvent( ev ) ]
+            event_list = qpc.eventParameters.event
+
+            qpc.cut( minlat = -30.0, maxlat = 60.0, maxlat_excl = True, mindepth = 5000.0,
+                     mintime = '2000-01-01T00:00:00', minmag = 4.0, minmag_excl = True )
+            print " cut catalog to %s events" % qpc.size
+
+            error = "Error: cut catalog differs from selected events"
+            self.failIf( len( selected ) == 0, error )
+            self.failIf( qpc.size != len( selected ), error )
+            for ev, ev_selected in zip( qpc.eventParameters.event, selected ):
+                self.failIf( ev is not ev_selected, error )
+
+            error = "Error: event list has been replaced"
+            self.failIf( qpc.eventParameters.event is not event_list, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCutPolygon( self ):
+        """
+        - read a catalog from ZMAP format
+        - check batched point-in-polygon test against single point tests
+        - cut catalog with polygon
+        """
+        print
+        print " ----- testCutPolygon: cut catalog with polygon -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CutPolygon" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            # first vertex is epicenter of first event (point on boundary)
+            ori = qpc.eventParameters.event[0].origin[0]
+            vertices = [ ( ori.longitude.value, ori.latitude.value ),
+                         ( ori.longitude.value + 90.0, ori.latitude.value ),
+                         ( ori.longitude.value + 90.0, ori.latitude.value - 60.0 ),
+                         ( ori.longitude.value, ori.latitude.value - 60.0 ) ]
+            polygon = QPPolygon.QPPolygon( vertices )
+
+            lons = [ ev.origin[0].longitude.value for ev in qpc.eventParameters.event ]
+            lats = [ ev.origin[0].latitude.value for ev in qpc.eventParameters.event ]
+
+            error = "Error: batched point-in-polygon test differs from single points"
+            inside = polygon.contains_points( lons, lats )
+            inside_excl = polygon.contains_points( lons, lats, include_boundary=False )
+            self.failIf( not inside[0] or inside_excl[0], error )
+            for idx, ( lon, lat ) in enumerate( zip( lons, lats ) ):
+                self.failIf( inside[idx] != polygon.isInsideOrOnBoundary( lon, lat ), error )
+                self.failIf( inside_excl[idx] != polygon.isInside( lon, lat ), error )
+
+            selected = [ ev for ev, ev_inside in zip( qpc.eventParameters.event, inside )
+                         if ev_inside ]
+
+            qpc.cut( polygon = vertices )
+            print " cut catalog to %s events" % qpc.size
+
+            error = "Error: cut catalog differs from selected events"
+            self.failIf( len( selected ) == 0, error )
+            self.failIf( qpc.size != len( selected ), error )
+            for ev, ev_selected in zip( qpc.eventParameters.event, selected ):
+                self.failIf( ev is not ev_selected, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCutGrid( self ):
+        """
+        - read a catalog from ZMAP format
+        - locate epicenters in grid, compare with linear search over cells
+        - cut catalog with grid
+        """
+        print
+        print " ----- testCutGrid: cut catalog with grid -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CutGrid" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            grid = QPGrid.QPGrid()
+            grid.setGridParameter( { 'lonDelta': 2.0, 'latDelta': 2.0 } )
+            grid.setupBox( -30.0, 60.0, -40.0, 40.0, 0.0, 30000.0 )
+
+            grid.grid.defaultCellDimension = QPGrid.DefaultCellDimension()
+            grid.grid.defaultCellDimension.latRange = 2.0
+            grid.grid.defaultCellDimension.lonRange = 2.0
+            print " set up grid with %s cells" % len( grid.grid.depthLayer[0].cell )
+
+            # linear search over cells
+            def findCell( lat, lon, depth ):
+                for depth_layer in grid.grid.depthLayer:
+                    if depth >= depth_layer.min and depth < depth_layer.max:
+                        for cell in depth_layer.cell:
+                            if lat >= cell.lat - 1.0 and lat < cell.lat + 1.0 and \
+                                lon >= cell.lon - 1.0 and lon < cell.lon + 1.0:
+                                return ( cell.lat, cell.lon, depth_layer.min, depth_layer.max )
+                return None
+
+            origins = [ ev.origin[0] for ev in qpc.eventParameters.event ]
+            lats = [ ori.latitude.value for ori in origins ]
+            lons = [ ori.longitude.value for ori in origins ]
+            depths = [ ori.depth.value for ori in origins ]
+
+            # cell boundaries and NaN
+            lats.extend( [ 1.0, 1.0, -41.0, numpy.nan ] )
+            lons.extend( [ -31.0, 59.0, 0.0, 0.0 ] )
+            depths.extend( [ 0.0, 100.0, 0.0, 0.0 ] )
+
+            cell_idx = grid.locate( lats, lons, depths )
+
+            error = "Error: grid cell differs from linear search"
+            for lat, lon, depth, curr_idx in zip( lats, lons, depths, cell_idx ):
+                cell = findCell( lat, lon, depth )
+                self.failIf( grid.inGridCell( lat, lon, depth ) != cell, error )
+
+                if cell is None:
+                    self.failIf( curr_idx != -1, error )
+                else:
+                    depth_layer, curr_cell = grid.index.cells[curr_idx]
+                    self.failIf( ( curr_cell.lat, curr_cell.lon ) != cell[0:2], error )
+
+            selected = [ ev for ev, curr_idx in zip( qpc.eventParameters.event, cell_idx )
+                         if curr_idx >= 0 ]
+
+            qpc.cut( grid = grid )
+            print " cut catalog to %s events" % qpc.size
+
+            error = "Error: cut catalog differs from selected events"
+            self.failIf( len( selected ) == 0, error )
+            self.failIf( qpc.size != len( selected ), error )
+            for ev, ev_selected in zip( qpc.eventParameters.event, selected ):
+                self.failIf( ev is not ev_selected, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testTimeIndex( self ):
+        """
+        - read a catalog from ZMAP format
+        - compare time span with min/max of preferred origin times
+        - select time windows, compare with events selected by checking
+          each preferred origin time
+        - select time windows from catalog backed by compact catalog, check
+          that no events are created
+        """
+        print
+        print " ----- testTimeIndex: select time windows from catalog -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-TimeIndex" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            times = [ ev.getPreferredOrigin().time.value for ev in qpc.eventParameters.event ]
+
+            qpc_compact = QPCatalog.QPCatalog().fromCompact( qpc.toCompact() )
+
+            error = "Error: time span differs from preferred origin times"
+            time_span, time_start, time_end = qpc.timeSpan()
+            self.failIf( time_start != min( times ).datetime, error )
+            self.failIf( time_end != max( times ).datetime, error )
+
+            # window boundaries are origin times of events
+            for starttime, endtime in ( ( times[10], times[100] ), 
+                                        ( None, times[50] ),
+                                        ( times[50].toISO(), None ),
+                                        ( times[100], times[10] ) ):
+
+                selected = qpc.select_time( starttime, endtime )
+                print " selected %s events from %s to %s" % ( selected.size, starttime, endtime )
+
+                if isinstance( starttime, basestring ):
+                    starttime = QPDateTime.QPDateTime( starttime )
+
+                expected = [ ev for ev, ori_time in zip( qpc.eventParameters.event, times )
+                             if ( starttime is None or ori_time.datetime >= starttime.datetime ) and
+                             ( endtime is None or ori_time.datetime < endtime.datetime ) ]
+
+                error = "Error: selected events differ from time window"
+                self.failIf( selected.size != len( expected ), error )
+                for ev, ev_expected in zip( selected.eventParameters.event, expected ):
+                    self.failIf( ev is not ev_expected, error )
+
+                # catalog backed by compact catalog selects on time column
+                selected = qpc_compact.select_time( starttime, endtime )
+
+                error = "Error: selected events of compact catalog differ from time window"
+                self.failIf( selected.toCompact().idMap != [ ev.publicID for ev in expected ], error )
+
+                error = "Error: time selection of compact catalog creates events"
+                self.failIf( len( qpc_compact.eventParameters.event.store.events ) != 0, error )
+
+            # index follows changes of event list
+            qpc.cut( maxtime = times[100].toISO(), maxtime_excl = True )
+            error = "Error: time index has not been updated"
+            self.failIf( len( qpc.timeIndex ) != qpc.size, error )
+            self.failIf( qpc.timeSpan()[2] >= times[100].datetime, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testView( self ):
+        """
+        - read a catalog from ZMAP format
+        - create views with cut( inplace=False ), mask, and positions
+        - check that events are shared and base catalog is unchanged
+        - write view to QuakeML and ZMAP, and read again
+        """
+        print
+        print " ----- testView: non-destructive catalog views -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-View" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            outfile  = 'zmap.extended.test.view.qml'
+            outfile_zmap = 'zmap.extended.test.view.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            event_count = qpc.size
+            event_list = list( qpc.eventParameters.event )
+
+            view = qpc.cut( minmag = 4.0, inplace = False )
+            # NaN magnitudes are kept
+            selected = [ ev for ev in event_list
+                         if not [ mag for mag in ev.magnitude if mag.mag.value < 4.0 ] ]
+            print " view with %s events" % view.size
+
+            error = "Error: base catalog has been changed by cut( inplace=False )"
+            self.failIf( qpc.size != event_count, error )
+
+            error = "Error: view differs from selected events"
+            self.failIf( view.size == 0 or view.size != len( selected ), error )
+            for ev, ev_selected in zip( view, selected ):
+                self.failIf( ev is not ev_selected, error )
+
+            # chained views: every second event, then mask
+            view_positions = view.view( range( 0, view.size, 2 ) )
+            view_mask = view_positions.view( [ ev.magnitude[0].mag.value < 5.0 for ev in view_positions ] )
+
+            selected = [ ev for ev in selected[::2] if ev.magnitude[0].mag.value < 5.0 ]
+            print " chained view with %s events" % view_mask.size
+
+            error = "Error: chained view differs from selected events"
+            self.failIf( view_mask.size != len( selected ), error )
+            self.failIf( view_mask.base is not qpc, error )
+            for ev, ev_selected in zip( view_mask, selected ):
+                self.failIf( ev is not ev_selected, error )
+
+            # cut of view changes view only
+            view_size = view.size
+            view_positions.cut( minmag = 4.5 )
+            error = "Error: cut of view has changed viewed catalog"
+            self.failIf( view.size != view_size or qpc.size != event_count, error )
+
+            view_mask.writeXML( outfile )
+            view_mask.exportZMAP( outfile_zmap )
+
+            qpc_xml = QPCatalog.QPCatalog( outfile )
+            qpc_zmap = QPCatalog.QPCatalog()
+            qpc_zmap.importZMAP( outfile_zmap )
+
+            error = "Error: serialized view differs from view"
+            self.failIf( qpc_xml.size != view_mask.size, error )
+            self.failIf( qpc_zmap.size != view_mask.size, error )
+
+            compact = view_mask.toCompact()
+            self.failIf( compact.catalog.shape[0] != view_mask.size, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testFilter( self ):
+        """
+        - read a catalog from ZMAP format
+        - filter catalog with predicate expression
+        - compare with events selected by checking preferred origin and
+          magnitude, check statistics of predicates
+        """
+        print
+        print " ----- testFilter: filter catalog with predicate expression -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-Filter" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            # set evaluation mode of every third origin
+            for ev_idx, ev in enumerate( qpc.eventParameters.event ):
+                if ev_idx % 3 == 0:
+                    ev.origin[0].evaluationMode = u'manual'
+
+            vertices = [ ( -30.0, -40.0 ), ( 60.0, -40.0 ), ( 60.0, 40.0 ), ( -30.0, 40.0 ) ]
+            polygon = QPPolygon.QPPolygon( vertices )
+
+            expr = ( QPCatalogFilter.Field( 'mag' ) >= 4.0 ) & \
+                   QPCatalogFilter.Within( polygon ) & \
+                   ~( QPCatalogFilter.Field( 'evaluationMode' ) == 'manual' ) & \
+                   QPCatalogFilter.TimeRange( '2002-01-01', None )
+
+            def keepEvent( ev ):
+                ori = ev.getPreferredOrigin()
+                return ev.getPreferredMagnitude().mag.value >= 4.0 and \
+                    polygon.isInsideOrOnBoundary( ori.longitude.value, ori.latitude.value ) and \
+                    getattr( ori, 'evaluationMode', None ) != 'manual' and \
+                    ori.time.value.datetime >= DateTime( 2002, 1, 1 )
+
+            selected = [ ev for ev in qpc.eventParameters.event if keepEvent( ev ) ]
+
+            # second run is planned with statistics of first run
+            for run in xrange( 2 ):
+                view = qpc.filter( expr, inplace=False )
+                print " filtered catalog to %s events" % view.size
+
+                error = "Error: filtered catalog differs from selected events"
+                self.failIf( len( selected ) == 0, error )
+                self.failIf( view.size != len( selected ), error )
+                for ev, ev_selected in zip( view, selected ):
+                    self.failIf( ev is not ev_selected, error )
+
+            error = "Error: wrong statistics of filter predicates"
+            statistics = expr.statistics()
+            for level, description, calls, evaluated, passed, seconds in statistics:
+                print "  %s%s: %s/%s" % ( '  ' * level, description, passed, evaluated )
+
+            self.failIf( statistics[0][2:5] != ( 2, 2 * qpc.size, 2 * len( selected ) ), error )
+
+            # spatial predicate is evaluated last
+            self.failIf( statistics[-1][1] != 'Within', error )
+            self.failIf( statistics[-1][3] >= 2 * qpc.size, error )
+
+            error = "Error: predicates have been combined with a number"
+            self.assertRaises( TypeError, lambda: QPCatalogFilter.Field( 'mag' ) >= 4.0 & expr )
+
+            qpc.filter( expr )
+            error = "Error: catalog has not been filtered in place"
+            self.failIf( qpc.size != len( selected ), error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testAssignRegions( self ):
+        """
+        - read a catalog from ZMAP format
+        - assign events to regions, compare with point-in-polygon test of
+          each event and region
+        - get views of regions
+        """
+        print
+        print " ----- testAssignRegions: assign events to regions -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-AssignRegions" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            # regions with shared boundaries, and overlapping region
+            regions = []
+            for lon in xrange( -180, 180, 60 ):
+                for lat in xrange( -90, 90, 45 ):
+                    regions.append( QPPolygon.QPPolygon( [ ( lon, lat ), ( lon + 60, lat ),
+                        ( lon + 60, lat + 45 ), ( lon, lat + 45 ) ] ) )
+            regions.insert( 5, QPPolygon.QPPolygon( [ ( -30.0, -30.0 ), ( 30.0, -30.0 ),
+                ( 30.0, 30.0 ), ( -30.0, 30.0 ) ] ) )
+
+            # first region that contains epicenter
+            def findRegion( ev ):
+                ori = ev.getPreferredOrigin()
+                for region_idx, region in enumerate( regions ):
+                    if region.isInsideOrOnBoundary( ori.longitude.value, ori.latitude.value ):
+                        return region_idx
+                return None
+
+            region_ids = qpc.assignRegions( regions )
+
+            error = "Error: region of event differs from point-in-polygon test"
+            self.failIf( len( region_ids ) != qpc.size, error )
+            for ev, region_id in zip( qpc.eventParameters.event, region_ids ):
+                self.failIf( region_id != findRegion( ev ), error )
+
+            region_views = qpc.assignRegions( dict( ( 'zone%02d' % region_idx, region ) 
+                for region_idx, region in enumerate( regions ) ), views=True )
+            print " assigned events to %s regions" % len( [ view for view in region_views.values() if view.size > 0 ] )
+
+            error = "Error: view of region differs from assigned events"
+            self.failIf( len( region_views ) != len( regions ), error )
+            for region_idx in xrange( len( regions ) ):
+                view = region_views[ 'zone%02d' % region_idx ]
+                expected = [ ev for ev, region_id in zip( qpc.eventParameters.event, region_ids )
+                             if region_id == region_idx ]
+
+                self.failIf( view.size != len( expected ), error )
+                for ev, ev_expected in zip( view, expected ):
+                    self.failIf( ev is not ev_expected, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCompact( self ):
+        """
+        - read a catalog from ZMAP format
+        - create compact catalog, compare columns with events
+        - add custom column
+        """
+        print
+        print " ----- testCompact: compact catalog columns -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-Compact" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            QPCatalogCompact.registerColumn( 'evaluation_mode_manual', lambda source:
+                [ float( mode == 'manual' ) for mode in source.values( 'origin.evaluationMode' ) ] )
+
+            columns = [ 'lon', 'lat', 'depth', 'time', 'mag', 'hz_err', 'evaluation_mode_manual' ]
+            compact = QPCatalogCompact.QPCatalogCompact()
+            compact.update( qpc, columns )
+            print " created compact catalog with %s events" % compact.size
+
+            error = "Error: compact catalog differs from events"
+            self.failIf( compact.catalog.shape != ( qpc.size, len( columns ) + 1 ), error )
+            self.failIf( compact.idMap != [ ev.publicID for ev in qpc.eventParameters.event ], error )
+
+            for ev_idx, ev in enumerate( qpc.eventParameters.event ):
+                ori = ev.getPreferredOrigin()
+                mag = ev.getPreferredMagnitude()
+
+                # depth of compact catalog in km
+                expected = [ float( ev_idx ), ori.longitude.value, ori.latitude.value, ori.depth.value / 1000.0,
+                             ori.time.value.toDecimalYear(), mag.mag.value, numpy.nan, 0.0 ]
+                
+                # magnitude can be missing (NaN)
+                same = ( compact.catalog[ev_idx] == expected ) | \
+                       ( numpy.isnan( compact.catalog[ev_idx] ) & numpy.isnan( expected ) )
+                self.failIf( not same.all(), error )
+
+            self.assertRaises( ValueError, compact.update, qpc, [ 'lon', 'no_such_column' ] )
+
+            # append chunks while a reference to catalog array exists, add column
+            first_rows = compact.catalog
+            for curr_chunk in xrange( 0, qpc.size, 100 ):
+                compact.update( qpc.view( numpy.arange( curr_chunk, min( curr_chunk + 100, qpc.size ) ) ), columns )
+
+            compact.addColumn( 'row', numpy.arange( compact.size ) )
+            print " appended chunks, compact catalog has %s events" % compact.size
+
+            error = "Error: appending to compact catalog failed"
+            self.failIf( compact.catalog.shape != ( 2 * qpc.size, len( columns ) + 2 ), error )
+            self.failIf( compact.idMap[qpc.size:] != compact.idMap[:qpc.size], error )
+            self.failIf( not numpy.array_equal( compact.catalog[:, 0], numpy.arange( 2 * qpc.size ) ), error )
+            self.failIf( not numpy.array_equal( compact.column( 'row' ), numpy.arange( 2 * qpc.size ) ), error )
+            
+            same = ( compact.catalog[qpc.size:, 1:-1] == first_rows[:, 1:] ) | \
+                   ( numpy.isnan( compact.catalog[qpc.size:, 1:-1] ) & numpy.isnan( first_rows[:, 1:] ) )
+            self.failIf( not same.all(), error )
+
+        finally:
+            QPCatalogCompact.COLUMN_EXTRACTORS.pop( 'evaluation_mode_manual', None )
+            
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCompactBinary( self ):
+        """
+        - read a catalog from ZMAP format, create compact catalog
+        - write compact catalog to binary format
+        - read binary compact catalog (memory-mapped, and selected columns), compare
+        """
+        print
+        print " ----- testCompactBinary: binary compact catalog -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CompactBinary" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            outfile  = 'zmap.extended.test.compact.bin'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            compact = QPCatalogCompact.QPCatalogCompact()
+            compact.update( qpc, [ 'lon', 'lat', 'depth', 'time', 'mag', 'hz_err' ] )
+            compact.comment = 'binary\ncompact catalog\n'
+
+            compact.writeBinary( outfile )
+            print " wrote binary compact catalog %s" % outfile
+
+            # NaN values have to be identical
+            def sameValues( a, b ):
+                return a.shape == b.shape and numpy.all( ( a == b ) | ( numpy.isnan( a ) & numpy.isnan( b ) ) )
+
+            compact_mm = QPCatalogCompact.QPCatalogCompact()
+            compact_mm.readBinary( outfile )
+
+            error = "Error: memory-mapped binary compact catalog differs from original"
+            self.failIf( not isinstance( compact_mm.catalog, numpy.memmap ), error )
+            self.failIf( compact_mm.map != compact.map, error )
+            self.failIf( compact_mm.idMap != compact.idMap, error )
+            self.failIf( compact_mm.comment != compact.comment, error )
+            self.failIf( not sameValues( compact_mm.catalog, compact.catalog ), error )
+
+            compact_sel = QPCatalogCompact.QPCatalogCompact()
+            compact_sel.readBinary( outfile, columns=[ 'mag', 'lat' ], withIds=False )
+
+            error = "Error: selected columns of binary compact catalog differ from original"
+            self.failIf( compact_sel.map != { 'idx': 0, 'mag': 1, 'lat': 2 }, error )
+            self.failIf( compact_sel.idMap != [], error )
+            for curr_col in ( 'idx', 'mag', 'lat' ):
+                self.failIf( not sameValues( compact_sel.catalog[:, compact_sel.map[curr_col]],
+                                             compact.catalog[:, compact.map[curr_col]] ), error )
+
+            self.assertRaises( ValueError, compact_sel.readBinary, outfile, columns=[ 'strike1' ] )
+            self.assertRaises( ValueError, compact_sel.readBinary, infile )
+
+            # update of memory-mapped catalog
+            compact_mm.update( qpc, [ 'lon', 'lat', 'depth', 'time', 'mag', 'hz_err' ] )
+            
+            error = "Error: update of memory-mapped compact catalog failed"
+            self.failIf( compact_mm.catalog.shape != ( 2 * qpc.size, 7 ), error )
+            self.failIf( not sameValues( compact_mm.catalog[qpc.size:, 1:], compact.catalog[:, 1:] ), error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testFromCompact( self ):
+        """
+        - read a catalog from ZMAP format, create compact catalog
+        - create catalog backed by compact catalog
+        - cut both catalogs, compare; compute FMD, compare
+        - check that events are created on access only
+        """
+        print
+        print " ----- testFromCompact: catalog backed by compact catalog -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-FromCompact" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            compact = qpc.toCompact()
+            qpc_compact = QPCatalog.QPCatalog().fromCompact( compact )
+            created = qpc_compact.eventParameters.event.store.events
+            
+            error = "Error: catalog backed by compact catalog differs from original"
+            self.failIf( qpc_compact.size != qpc.size, error )
+
+            cut_params = ( { 'minmag': 4.5 },
+                           { 'mindepth': 10000.0, 'maxdepth': 50000.0, 'removeNaN': True },
+                           { 'mintime': '2004-01-01T00:00:00', 'minlat': 0.0 },
+                           { 'polygon': [ ( 100.0, -10.0 ), ( 160.0, -10.0 ), 
+                                          ( 160.0, 50.0 ), ( 100.0, 50.0 ) ] } )
+
+            for curr_params in cut_params:
+                view = qpc.cut( inplace=False, **curr_params )
+                view_compact = qpc_compact.cut( inplace=False, **curr_params )
+                print " cut %s: %s events" % ( curr_params.keys(), view.size )
+
+                error = "Error: cut of catalog backed by compact catalog differs from original"
+                self.failIf( view_compact.toCompact().idMap != [ ev.publicID for ev in view ], error )
+
+            fmd = qpc.getFmd()
+            fmd_compact = qpc_compact.getFmd()
+
+            error = "Error: FMD of catalog backed by compact catalog differs from original"
+            self.failIf( not numpy.array_equal( fmd.fmd, fmd_compact.fmd ), error )
+            self.failIf( abs( fmd.timeSpan - fmd_compact.timeSpan ) > 1.0e-9, error )
+
+            error = "Error: events of compact catalog have been created before access"
+            self.failIf( len( created ) != 0, error )
+
+            # access of event creates event with values of compact catalog
+            ev = qpc_compact.eventParameters.event[5]
+            ev_orig = qpc.eventParameters.event[5]
+            
+            error = "Error: event created from compact catalog differs from original"
+            self.failIf( len( created ) != 1, error )
+            self.failIf( ev.publicID != ev_orig.publicID, error )
+            self.failIf( ev is not qpc_compact.eventParameters.event[5], error )
+            self.failIf( ev.getPreferredOrigin().latitude.value != 
+                         ev_orig.getPreferredOrigin().latitude.value, error )
+            self.failIf( abs( ev.getPreferredOrigin().depth.value - 
+                              ev_orig.getPreferredOrigin().depth.value ) > 1.0e-6, error )
+            self.failIf( ev.getPreferredMagnitude().mag.value != 
+                         ev_orig.getPreferredMagnitude().mag.value, error )
+            self.failIf( abs( ev.getPreferredOrigin().time.value.toDecimalYear() - 
+                              ev_orig.getPreferredOrigin().time.value.toDecimalYear() ) > 1.0e-9, error )
+
+            # cut in place keeps backing, adding events ends it
+            qpc_compact.cut( minmag=4.5 )
+            
+            error = "Error: cut in place of catalog backed by compact catalog failed"
+            self.failIf( qpc_compact.size != qpc.cut( minmag=4.5, inplace=False ).size, error )
+            self.failIf( qpc_compact.eventParameters.event.isCompact() is False, error )
+            
+            qpc_compact.merge( qpc )
+
+            error = "Error: adding events to catalog backed by compact catalog failed"
+            self.failIf( qpc_compact.eventParameters.event.isCompact() is True, error )
+            self.failIf( qpc_compact.size != qpc.cut( minmag=4.5, inplace=False ).size + qpc.size, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCompactStore( self ):
+        """
+        - read a catalog from ZMAP format, append it to compact store in two chunks
+        - select events from store (skipping blocks), compare to compact catalog
+        - compute FMD and rate histogram block by block, compare
+        """
+        print
+        print " ----- testCompactStore: out-of-core compact catalog -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CompactStore" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile   = 'zmap.extended.test.dat'
+            storedir = 'zmap.extended.test.store'
+            
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+            qpc = QPCatalog.QPCatalog()
+            qpc.importZMAP( infile )
+            print " read ZMAP catalog file %s with %s events" % ( infile, qpc.size )
+
+            compact = QPCatalogCompact.QPCatalogCompact()
+            compact.update( qpc )
+
+            if os.path.isdir( storedir ):
+                shutil.rmtree( storedir )
+
+            store = QPCatalogCompactStore.QPCatalogCompactStore( storedir, blockSize=100 )
+            store.append( compact.subset( numpy.arange( 550 ) ) )
+            store.append( compact.subset( numpy.arange( 550, compact.size ) ) )
+
+            # reopen store
+            store = QPCatalogCompactStore.QPCatalogCompactStore( storedir )
+            print " wrote compact store %s with %s blocks" % ( storedir, len( store.blocks ) )
+
+            error = "Error: compact store differs from compact catalog"
+            self.failIf( store.size != compact.size, error )
+            self.failIf( len( store.blocks ) != 13 or store.blocks[-1]['rows'] != 4, error )
+
+            store_all = store.cut()
+            self.failIf( store_all.idMap != compact.idMap, error )
+            for curr_col in compact.map.keys():
+                a = store_all.column( curr_col )
+                b = compact.column( curr_col )
+                self.failIf( not numpy.all( ( a == b ) | ( numpy.isnan( a ) & numpy.isnan( b ) ) ), error )
+
+            times = compact.column( 'time' )
+            mags  = compact.column( 'mag' )
+            lats  = compact.column( 'lat' )
+
+            numpy_err = numpy.seterr( invalid='ignore' )
+            try:
+                selections = ( ( { 'mintime': 2004.0, 'minmag': 3.0 },
+                                 ~( times < 2004.0 ) & ~( mags < 3.0 ) ),
+                               ( { 'minmag': 4.0, 'maxmag': 5.0, 'maxmag_excl': True, 'removeNaN': True },
+                                 ( mags >= 4.0 ) & ( mags < 5.0 ) ),
+                               ( { 'mintime': '2002-01-01', 'maxtime': 2003.0, 'minlat': 40.0 },
+                                 ~( times < QPUtils.decimalYear( DateTime( 2002, 1, 1 ) ) ) & 
+                                 ~( times > 2003.0 ) & ~( lats < 40.0 ) ) )
+            finally:
+                numpy.seterr( **numpy_err )
+
+            error = "Error: selection from compact store differs from compact catalog"
+            for limits, selected in selections:
+                store_sel = store.cut( [ 'mag' ], **limits )
+                self.failIf( not numpy.array_equal( store_sel.column( 'idx' ), numpy.flatnonzero( selected ) ), error )
+
+            # blocks outside of time range are skipped
+            skipped = []
+            readBlock = store._readBlock
+            store._readBlock = lambda block, *args, **kwargs: \
+                skipped.append( block ) or readBlock( block, *args, **kwargs )
+            try:
+                store.cut( mintime=2006.0 )
+            finally:
+                store._readBlock = readBlock
+
+            error = "Error: compact store did not skip blocks"
+            self.failIf( len( skipped ) != 0, error )
+
+            # FMD of magnitudes w/o NaN
+            fmd = store.getFmd( binsize=0.1, Mc=2.0 )
+            fmd_ref = qpfmd.FrequencyMagnitudeDistribution( None, binsize=0.1, Mc=2.0, 
+                magnitudes=mags[~numpy.isnan( mags )], time_span=qpc.timeSpan()[0] )
+
+            error = "Error: FMD of compact store differs from FMD of compact catalog"
+            self.failIf( not numpy.allclose( fmd.fmd, fmd_ref.fmd ), error )
+            self.failIf( abs( fmd.timeSpan - fmd_ref.timeSpan ) > 1e-9, error )
+            for curr_key in ( 'magCtr', 'Mmin', 'Mmean', 'aValue', 'bValue', 'StdDev' ):
+                self.failIf( abs( fmd.GR[curr_key] - fmd_ref.GR[curr_key] ) > 1e-9, error )
+
+            counts, edges = store.getRateHistogram( 0.5 )
+
+            error = "Error: rate histogram of compact store is wrong"
+            self.failIf( counts.sum() != numpy.sum( ~numpy.isnan( times ) ), error )
+            self.failIf( abs( edges[0] - numpy.nanmin( times ) ) > 1e-9, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCompactImport( self ):
+        """
+        - import catalogs of ZMAP, ANSS, PDE and JMA format directly into compact catalogs
+        - compare to compact catalogs of imported QPCatalogs
+        """
+        print
+        print " ----- testCompactImport: import into compact catalog -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CompactImport" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            # file, import method, columns w/o mag, keyword args of QPCatalog and compact import
+            imports = ( ( 'zmap.extended.test.dat', 'importZMAP', [ 'lon', 'lat', 'depth', 'time', 
+                          'hz_err', 'depth_err', 'mag_err' ], { 'withUncertainties': True }, 
+                          { 'withUncertainties': True } ),
+                        ( 'anss.unified.test.dat', 'importANSSUnified', [ 'lon', 'lat', 'depth', 'time', 
+                          'time_err', 'hz_err', 'depth_err', 'mag_err', 'mag_type' ], {}, 
+                          { 'withUncertainties': True, 'withMagnitudeType': True } ),
+                        ( 'pde.compressed.test.dat', 'importPDECompressed', [ 'lon', 'lat', 'depth', 'time', 
+                          'mag_type' ], {}, { 'withMagnitudeType': True } ),
+                        ( 'jma.deck.test.dat', 'importJMADeck', [ 'lon', 'lat', 'depth', 'time', 
+                          'time_err', 'lat_err', 'lon_err', 'hz_err', 'depth_err', 'mag_type' ], {}, 
+                          { 'withUncertainties': True, 'withMagnitudeType': True } ),
+                        ( 'jma.deck.test.dat', 'importJMADeck', [ 'lon', 'lat', 'depth', 'time' ], 
+                          { 'jmaonly': True, 'minimumDataset': True }, { 'jmaonly': True } ) )
+
+            # NaN values have to be identical
+            def sameValues( a, b ):
+                return a.shape == b.shape and numpy.all( ( numpy.abs( a - b ) <= 1e-9 * numpy.maximum( 1.0, numpy.abs( b ) ) ) | 
+                                                         ( numpy.isnan( a ) & numpy.isnan( b ) ) )
+
+            for infile, import_method, columns, kwargs, compact_kwargs in imports:
+
+                # copy reference catalog file to test dir
+                shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                                 os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+            
+                qpc = QPCatalog.QPCatalog()
+                getattr( qpc, import_method )( infile, **kwargs )
+
+                compact_ref = QPCatalogCompact.QPCatalogCompact()
+                compact_ref.update( qpc, columns )
+
+                compact = QPCatalogCompact.QPCatalogCompact()
+                getattr( compact, import_method )( infile, **compact_kwargs )
+                print " imported %s events of %s into compact catalog" % ( compact.size, infile )
+
+                error = "Error: compact import of %s differs from QPCatalog import" % infile
+                self.failIf( compact.size != qpc.size or compact.idMap != [], error )
+                self.failIf( set( compact.map.keys() ) != set( [ 'idx', 'mag' ] + columns ), error )
+                
+                for curr_col in columns:
+                    self.failIf( not sameValues( compact.column( curr_col ), compact_ref.column( curr_col ) ), error )
+
+                # events w/o magnitude have NaN magnitude
+                mags     = []
+                magtypes = []
+                for curr_ev in qpc.eventParameters.event:
+                    try:
+                        mags.append( curr_ev.getPreferredMagnitude().mag.value )
+                        magtypes.append( getattr( curr_ev.getPreferredMagnitude(), 'type', None ) )
+                    except IndexError:
+                        mags.append( numpy.nan )
+                        magtypes.append( None )
+
+                self.failIf( not sameValues( compact.column( 'mag' ), numpy.array( mags ) ), error )
+
+                # magnitude types of events created from compact catalog
+                if 'mag_type' in columns:
+                    compact_events = QPCatalog.QPCatalog().fromCompact( compact ).eventParameters.event
+                    for curr_ev_idx in numpy.flatnonzero( ~numpy.isnan( compact.column( 'mag' ) ) )[:20]:
+                        self.failIf( getattr( compact_events[curr_ev_idx].getPreferredMagnitude(), 'type', None ) != magtypes[curr_ev_idx], 
+                                     error )
+
+            # codes are written to files, types that are not in the table are stored as 'unknown'
+            error = "Error: magnitude type that is not in table is not stored as 'unknown'"
+            code = QPCatalogCompact.magnitudeTypeCode( 'Mfoo' )
+            self.failIf( QPCatalogCompact.magnitudeType( code ) != 'unknown' or
+                         'Mfoo' in QPCatalogCompact.MAGNITUDE_TYPES, error )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testRecordLayout( self ):
+        """
+        - decode ANSS and JMA lines with fixed-width record layouts, line by line and as block
+        - compare decoded values, check handling of missing required fields
+        """
+        print
+        print " ----- testRecordLayout: decode fixed-width records -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-RecordLayout" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            # file, layout, selection of lines
+            layouts = ( ( 'anss.unified.test.dat', QPCatalog.ANSS_LOCATION_LAYOUT, 
+                          lambda line: line.startswith( '$loc' ) ),
+                        ( 'anss.unified.test.dat', QPCatalog.ANSS_MAGNITUDE_LAYOUT, 
+                          lambda line: line.startswith( '$loc' ) ),
+                        ( 'jma.deck.test.dat', QPCatalog.JMA_HYPOCENTER_LAYOUT, 
+                          lambda line: line[:1] in ( 'J', 'U', 'I' ) ) )
+
+            # missing values are None (line) or NaN (block)
+            def sameValue( a, b ):
+                if a is None or ( isinstance( a, float ) and numpy.isnan( a ) ):
+                    return b is None or ( isinstance( b, float ) and numpy.isnan( b ) )
+                elif isinstance( a, float ):
+                    return abs( a - b ) <= 1e-9 * max( 1.0, abs( a ) )
+                else:
+                    return a == b
+
+            for infile, layout, accept in layouts:
+
+                # copy reference catalog file to test dir
+                shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                                 os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+                lines = [ line.rstrip( '\r\n' ) for line in open( infile ) if accept( line ) ]
+                print " decoding %s lines of %s with %s fields" % ( len( lines ), infile, len( layout ) )
+
+                rec, valid = layout.decodeBlock( lines )
+
+                error = "Error: block decoding of %s differs from line decoding" % infile
+                self.failIf( set( rec.keys() ) != set( layout.names ) or not numpy.all( valid ), error )
+
+                for line_idx, line in enumerate( lines ):
+                    line_rec = layout.decode( line )
+                    for name in layout.names:
+                        block_value = rec[name][line_idx]
+                        if isinstance( block_value, numpy.generic ):
+                            block_value = block_value.item()
+                        self.failIf( not sameValue( block_value, line_rec[name] ), error )
+
+            # missing required field: decode() raises, decodeBlock() marks line as invalid
+            blank = lines[0][:1] + ' ' * 4 + lines[0][5:]
+            self.assertRaises( QPCatalog.RecordError, QPCatalog.JMA_HYPOCENTER_LAYOUT.decode, blank )
+
+            rec, valid = QPCatalog.JMA_HYPOCENTER_LAYOUT.decodeBlock( [ lines[0], blank ] )
+            self.failIf( valid.tolist() != [ True, False ], "Error: line w/o year is not marked invalid" )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testMissingOriginFields( self ):
+        """
+        - import JMA, GSE2.0 and OGS events with blank depth (and coordinates) but given errors
+        - import GSE2.0 and OGS events with invalid origin date, these origins have to be skipped
+        """
+        print
+        print " ----- testMissingOriginFields: import origins with blank or invalid fields -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-MissingOriginFields" )
+
+        # cd to the test directory, remember current directory
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+
+        try:
+
+            for infile in ( 'jma.deck.test.dat', 'gse2.0.ingv.test.dat', 'ogs.hpl.test.dat' ):
+                shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                                 os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+            def blankColumns( line, start, end ):
+                return line[:start] + ' ' * ( end - start ) + line[end:]
+
+            # JMA: first event, blank coordinates and depth, keep their errors
+            lines = open( 'jma.deck.test.dat' ).readlines()
+            lines = lines[:[ line[:1] for line in lines ].index( 'E' ) + 1]
+            lines[0] = blankColumns( blankColumns( blankColumns( lines[0], 22, 28 ), 33, 40 ), 44, 49 )
+
+            qpc = QPCatalog.QPCatalog()
+            qpc.importJMADeck( lines )
+
+            ori = qpc.eventParameters.event[0].origin[0]
+            self.failIf( qpc.size != 1 or hasattr( ori, 'latitude' ) or hasattr( ori, 'depth' ),
+                         "Error: JMA origin with blank coordinates and depth" )
+
+            # GSE2.0: first two events, first one w/o depth, second one with invalid date
+            lines = open( 'gse2.0.ingv.test.dat' ).readlines()
+            events = [ line_idx for line_idx, line in enumerate( lines ) if line.startswith( 'EVENT ' ) ]
+            origin_lines = [ line_idx for line_idx, line in enumerate( lines )
+                             if re.match( r'\d{4}/\d{2}/\d{2}\s+', line ) ]
+
+            lines[origin_lines[0]] = blankColumns( lines[origin_lines[0]], 47, 52 )
+            lines[origin_lines[1]] = '2008/02/30' + lines[origin_lines[1]][10:]
+
+            qpc = QPCatalog.QPCatalog()
+            qpc.importGSE2_0Bulletin( lines[:events[2]] )
+
+            origins = [ len( ev.origin ) for ev in qpc.eventParameters.event ]
+            ori = qpc.eventParameters.event[0].origin[0]
+            self.failIf( origins != [ 1, 0 ] or hasattr( ori, 'depth' ),
+                         "Error: GSE2.0 origins with blank depth or invalid date" )
+
+            # OGS: first localized event w/o depth, second one with invalid month
+            lines = open( 'ogs.hpl.test.dat' ).readlines()
+            regions = [ line_idx for line_idx, line in enumerate( lines )
+                        if line.startswith( QPCatalog.OGS_LINESTART_LOCALIZED_EVENT ) ]
+
+            origin_idx = regions[0] + 2
+            lines[origin_idx] = blankColumns( lines[origin_idx], 45, 50 )
+
+            origin_idx = regions[1] + 2
+            lines[origin_idx] = lines[origin_idx][:9] + '13' + lines[origin_idx][11:]
+
+            qpc = QPCatalog.QPCatalog()
+            qpc.importOGS_HPL( lines[regions[0]:regions[2]] )
+
+            origins = [ len( ev.origin ) for ev in qpc.eventParameters.event ]
+            ori = qpc.eventParameters.event[0].origin[0]
+            self.failIf( origins != [ 1, 0 ] or hasattr( ori, 'depth' ) or not hasattr( ori, 'latitude' ),
+                         "Error: OGS origins with blank depth or invalid date" )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testImportMany( self ):
+        """
+        - split ANSS catalog file into monthly chunks, import chunks with one and two worker processes
+        - compare to import of whole file, check time order of events and report of missing file
+        """
+        print
+        print " ----- testImportMany: parallel import of several files -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-ImportMany" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            infile = 'anss.unified.test.dat'
+
+            # copy reference catalog file to test dir
+            shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                             os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+            qpc = QPCatalog.QPCatalog()
+            qpc.importANSSUnified( infile )
+
+            # chunks in reverse order, merged catalog has to be sorted by time
+            chunks = []
+            for line_idx, line in enumerate( open( infile ) ):
+                if line_idx % 300 == 0:
+                    chunks.insert( 0, 'anss.unified.test.%02d.dat' % ( line_idx / 300 ) )
+                    fh = open( chunks[0], 'w' )
+                fh.write( line )
+            fh.close()
+
+            for workers in ( 1, 2 ):
+                many = QPCatalog.QPCatalog()
+                reports = many.importMany( chunks + [ 'missing.dat' ], format='ANSSUnified', workers=workers )
+                print " imported %s events from %s files with %s workers" % ( many.size, len( chunks ), workers )
+
+                self.failIf( [ report['input'] for report in reports ] != chunks + [ 'missing.dat' ],
+                             "Error: reports are not in order of inputs" )
+                self.failIf( [ report['error'] is None for report in reports ] != [ True ] * len( chunks ) + [ False ],
+                             "Error: failed import not reported" )
+                self.failIf( sum( [ report['events'] for report in reports ] ) != qpc.size,
+                             "Error: wrong number of imported events in reports" )
+
+                # events sorted by time, in same order as time index of single file import
+                self.failIf( many.size != qpc.size or 
+                             [ ev.getPreferredOrigin().time.value.toISO() for ev in many.eventParameters.event ] != 
+                             [ qpc.eventParameters.event[idx].getPreferredOrigin().time.value.toISO() 
+                               for idx in qpc.timeIndex.positions ], 
+                             "Error: merged events are not sorted by time" )
+                self.failIf( not numpy.all( numpy.diff( many.timeIndex.positions ) == 1 ), 
+                             "Error: merged events are not sorted by time" )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testImportSharded( self ):
+        """
+        - import catalog files split into shards at record boundaries, with one and two worker processes
+        - compare to import of whole file
+        """
+        print
+        print " ----- testImportSharded: parallel import of file shards -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-ImportSharded" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            # file, format, keyword args of import
+            imports = ( ( 'gcmt.test.dat', 'CMT', {} ),
+                        ( 'stp.phase.test.dat', 'STPPhase', { 'nopicks': True } ),
+                        ( 'pde.compressed.test.dat', 'PDECompressed', {} ),
+                        ( 'jma.deck.test.dat', 'JMADeck', { 'nopicks': True } ),
+                        ( 'gse2.0.ingv.test.dat', 'GSE2_0Bulletin', {} ),
+                        ( 'ogs.hpl.test.dat', 'OGS_HPL', { 'nopicks': True } ) )
+
+            for infile, format, kwargs in imports:
+
+                # copy reference catalog file to test dir
+                shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                                 os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+                qpc = QPCatalog.QPCatalog()
+                getattr( qpc, 'import%s' % format )( infile, **kwargs )
+                qpc_xml = xmlWithoutIDs( qpc )
+
+                # shards start at record boundaries and cover whole file
+                shards = QPFileShards.shardFile( infile, 7, **QPCatalogFormats.getFormat( format ).records )
+                self.failIf( shards[0].start != 0 or shards[-1].end != os.path.getsize( infile ) or
+                             [ shard.start for shard in shards[1:] ] != [ shard.end for shard in shards[:-1] ],
+                             "Error: shards of %s do not cover file" % infile )
+
+                for shard_count, workers, mapped in ( ( 7, 1, True ), ( 3, 2, False ) ):
+                    sharded = QPCatalog.QPCatalog()
+                    sharded.importSharded( infile, format, shards=shard_count, workers=workers, mapped=mapped, **kwargs )
+                    print " imported %s events of %s in %s shards with %s workers" % ( sharded.size, infile, 
+                                                                                       shard_count, workers )
+
+                    self.failIf( sharded.size != qpc.size or xmlWithoutIDs( sharded ) != qpc_xml, 
+                                 "Error: sharded import of %s differs from import of file" % infile )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
+    def testCatalogFormats( self ):
+        """
+        - detect formats of catalog files
+        - stream events of catalog files in small batches, compare to import of whole file
+        """
+        print
+        print " ----- testCatalogFormats: format detection and streaming of events -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPCatalog-CatalogFormats" )
+
+        # cd to the test directory, remember current directory 
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+      
+        try:
+
+            # file, format, keyword args of import
+            imports = ( ( 'zmap.extended.test.dat', 'ZMAP', { 'withUncertainties': True } ),
+                        ( 'stp.phase.test.dat', 'STPPhase', { 'nopicks': True } ),
+                        ( 'gcmt.test.dat', 'CMT', {} ),
+                        ( 'anss.unified.test.dat', 'ANSSUnified', {} ),
+                        ( 'pde.compressed.test.dat', 'PDECompressed', {} ),
+                        ( 'jma.deck.test.dat', 'JMADeck', { 'nopicks': True } ),
+                        ( 'gse2.0.ingv.test.dat', 'GSE2_0Bulletin', {} ),
+                        ( 'ogs.hpl.test.dat', 'OGS_HPL', { 'nopicks': True } ),
+                        ( 'qpcat.500.qml.gz', 'QuakeML', { 'compression': 'gz' } ) )
+
+            for infile, format, kwargs in imports:
+
+                # copy reference catalog file to test dir
+                shutil.copyfile( os.path.join( self.__referenceDataDir, infile ),
+                                 os.path.join( QPTestCase.QPTestCase.TestDirPath, infile ) )
+
+                detected = QPCatalogFormats.detectFormat( infile, **kwargs )
+                print " detected format %s of %s" % ( detected, infile )
+                self.failIf( detected != format, "Error: format of %s detected as %s" % ( infile, detected ) )
+
+                qpc = QPCatalog.QPCatalog()
+                self.failIf( qpc.importAny( infile, **kwargs ) != format, "Error: wrong format of import" )
+
+                streamed = QPCatalog.QPCatalog()
+                for ev in QPCatalog.QPCatalog().iterEvents( infile, format=None, batchSize=7, **kwargs ):
+                    ev.add( streamed.eventParameters, 'event' )
+
+                self.failIf( streamed.size != qpc.size or xmlWithoutIDs( streamed ) != xmlWithoutIDs( qpc ), 
+                             "Error: streamed events of %s differ from import of file" % infile )
+
+            # stream is reset after detection
+            istream = open( 'anss.unified.test.dat' )
+            self.failIf( QPCatalogFormats.detectFormat( istream ) != 'ANSSUnified' or istream.tell() != 0,
+                         "Error: detection does not reset stream" )
+            istream.close()
+
+            # stream opened for file name is closed by partly consumed generator,
+            # stream of caller is left open
+            error = "Error: stream opened by iterEvents() is not closed"
+            events = QPCatalogFormats.getFormat( 'ANSSUnified' ).iterEvents( 'anss.unified.test.dat', batchSize=7 )
+            events.next()
+            istream = events.gi_frame.f_locals['istream']
+            events.close()
+            self.failIf( not istream.closed, error )
+
+            error = "Error: stream of caller is closed by iterEvents()"
+            istream = open( 'anss.unified.test.dat' )
+            events = QPCatalogFormats.getFormat( 'ANSSUnified' ).iterEvents( istream, batchSize=7 )
+            events.next()
+            events.close()
+            self.failIf( istream.closed, error )
+            istream.close()
+
+            self.assertRaises( ValueError, QPCatalogFormats.getFormat, 'unknown' )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
     def testOGS_HPL( self ):
         """
         - read a catalog from OGS HPL format
@@ -9,6 +9,7 @@ import shutil
 import os
 import unittest
 import datetime
+import numpy
 
 import mx.DateTime
 
@@ -134,6 +135,42 @@ class QPUtilsTest(QPTestCase.QPTestCase):
             os.chdir( cwd )
 
 
+    def testFromDecimalYears( self ):
+        """
+        test fromDecimalYears function, compare to fromDecimalYear
+        """
+        print
+        print " ----- testFromDecimalYears -----"
+
+        # setup test name
+        QPTestCase.QPTestCase.setTestName( self, "QPUtils-FromDecimalYears" )
+
+        # cd to the test directory, remember current directory
+        cwd = os.getcwd()
+        os.chdir( QPTestCase.QPTestCase.TestDirPath )
+
+        try:
+
+            decimalyears = numpy.array( ( 2000.0, 2000.5, 2001.5, 2004.9999999999, 1999.123456789,
+                                          2008.16393442623, numpy.nan ) )
+            components = QPUtils.fromDecimalYears( decimalyears )
+
+            for curr_idx, curr_decimalyear in enumerate( decimalyears[:-1] ):
+                curr_datetime = QPUtils.fromDecimalYear( curr_decimalyear )
+
+                self.failIf( [ curr_comp[curr_idx] for curr_comp in components ] != [ curr_datetime.year,
+                               curr_datetime.month, curr_datetime.day, curr_datetime.hour,
+                               curr_datetime.minute, curr_datetime.second ],
+                             "error: testing decimal year %s" % curr_decimalyear )
+
+            self.failIf( not numpy.all( numpy.isnan( [ curr_comp[-1] for curr_comp in components ] ) ),
+                         "error: testing NaN decimal year" )
+
+        finally:
+            # return to the original directory
+            os.chdir( cwd )
+
+
     def testFixTimeComponents( self ):
         """
         test fixTimeComponents function